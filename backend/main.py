@@ -4,7 +4,8 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import Response
-from fastapi.staticfiles import StaticFiles
+from services.static_files import UploadStaticFiles
+from services.storage import LocalStorage, storage
 from routes import auth, events, events_visitor
 from routes import companies
 from routes import admin as admin_routes
@@ -14,6 +15,7 @@ import logging
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 import atexit
+from datetime import datetime
 from contextlib import asynccontextmanager
 
 # 스케줄러 초기화
@@ -22,10 +24,28 @@ scheduler = BackgroundScheduler()
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """앱 시작/종료 시 실행되는 함수"""
+    from services.analysis_queue import analysis_queue
+    from services.event_image_filler import event_image_filler
+    from services.survey_dedup import duplicate_guard
+    from services.survey_ingest import survey_ingest
+    from services.survey_summaries import survey_summary_worker
+    from services.unsplash_service import close_unsplash_service
+
     # 앱 시작 시
     start_scheduler()
+    await analysis_queue.start()
+    await event_image_filler.start()
+    await survey_ingest.start()
+    await survey_summary_worker.start()
     yield
-    # 앱 종료 시
+    # 앱 종료 시 (남은 설문 응답을 먼저 저장)
+    await survey_ingest.stop()
+    await survey_summary_worker.stop()
+    duplicate_guard.save_all()
+    await analysis_queue.stop()
+    await event_image_filler.stop()
+    await close_unsplash_service()
+    await storage.close()
     stop_scheduler()
 
 def start_scheduler():
@@ -58,6 +78,72 @@ def start_scheduler():
             replace_existing=True
         )
         
+        # 매시간 30분에 만료된 공유 캐시 항목 정리
+        scheduler.add_job(
+            purge_expired_cache,
+            CronTrigger(minute=30),  # 매시간 30분
+            id='purge_expired_cache',
+            max_instances=1,
+            replace_existing=True
+        )
+        
+        # 30분마다 자동 이미지가 빠진 최근 이벤트 재처리
+        scheduler.add_job(
+            fill_missing_event_images,
+            CronTrigger(minute='*/30'),
+            id='fill_missing_event_images',
+            max_instances=1,
+            replace_existing=True
+        )
+        
+        # 매분 설문 응답 카운터 합계를 surveys.current_responses에 반영
+        scheduler.add_job(
+            sync_survey_response_counts,
+            CronTrigger(minute='*'),
+            id='sync_survey_response_counts',
+            max_instances=1,
+            replace_existing=True
+        )
+        
+        # 15분마다 카운터를 실제 응답 수(COUNT(*))와 대조해 보정 (시작 직후 1회 포함)
+        scheduler.add_job(
+            reconcile_survey_response_counts,
+            CronTrigger(minute='*/15'),
+            id='reconcile_survey_response_counts',
+            max_instances=1,
+            replace_existing=True,
+            next_run_time=datetime.now()
+        )
+        
+        # 10분마다 설문 응답 컬럼형 스냅샷 재생성 (관리자 분석 API용, 시작 직후 1회 포함)
+        scheduler.add_job(
+            refresh_response_snapshot,
+            CronTrigger(minute='*/10'),
+            id='refresh_response_snapshot',
+            max_instances=1,
+            replace_existing=True,
+            next_run_time=datetime.now()
+        )
+        
+        # 15분마다 재계산 표시가 없는 설문(도입 이전 응답)의 문항 집계를 원본에서 채움 (시작 직후 1회 포함)
+        scheduler.add_job(
+            backfill_survey_aggregates,
+            CronTrigger(minute='10-59/15'),
+            id='backfill_survey_aggregates',
+            max_instances=1,
+            replace_existing=True,
+            next_run_time=datetime.now()
+        )
+        
+        # 15분마다 새 답변이 쌓인 주관식 문항/후기를 요약 워커 큐에 넣음
+        scheduler.add_job(
+            refresh_survey_summaries,
+            CronTrigger(minute='5-59/15'),
+            id='refresh_survey_summaries',
+            max_instances=1,
+            replace_existing=True
+        )
+        
         scheduler.start()
         logging.info("이벤트 기반 리포트 및 파일 정리 스케줄러가 시작되었습니다.")
     except Exception as e:
@@ -106,6 +192,91 @@ def cleanup_old_temp_files():
     except Exception as e:
         logging.error(f"임시 파일 정리 실패: {e}")
 
+def purge_expired_cache():
+    """만료된 공유 캐시 항목(cache_entries) 삭제"""
+    try:
+        from services.cache_service import purge_expired_cache_entries
+        deleted = purge_expired_cache_entries()
+        if deleted:
+            logging.info(f"만료된 캐시 {deleted}건 삭제")
+    except Exception as e:
+        logging.error(f"만료 캐시 정리 실패: {e}")
+
+def fill_missing_event_images():
+    """Unsplash 이미지가 빠진 최근 이벤트를 백그라운드 워커 큐에 다시 넣음"""
+    try:
+        from services.event_image_filler import event_image_filler
+        queued = event_image_filler.sweep()
+        if queued:
+            logging.info(f"이미지 없는 이벤트 {queued}건 재처리 예약")
+    except Exception as e:
+        logging.error(f"이벤트 이미지 스윕 실패: {e}")
+
+def sync_survey_response_counts():
+    """설문 응답 카운터 합계를 surveys.current_responses에 반영"""
+    try:
+        from database import SessionLocal
+        from services.survey_counter import sync_current_responses
+        
+        db = SessionLocal()
+        try:
+            sync_current_responses(db)
+        finally:
+            db.close()
+    except Exception as e:
+        logging.error(f"설문 응답 수 반영 실패: {e}")
+
+def reconcile_survey_response_counts():
+    """설문 응답 카운터를 실제 응답 수와 대조해 보정"""
+    try:
+        from database import SessionLocal
+        from services.survey_counter import reconcile, sync_current_responses
+        
+        db = SessionLocal()
+        try:
+            fixed = reconcile(db)
+            if fixed:
+                sync_current_responses(db)
+                logging.info(f"설문 응답 카운터 {len(fixed)}건 보정")
+        finally:
+            db.close()
+    except Exception as e:
+        logging.error(f"설문 응답 카운터 보정 실패: {e}")
+
+def backfill_survey_aggregates():
+    """재계산 표시(surveys.aggregates_ready)가 없는 설문의 문항 집계를 원본 응답에서 채움"""
+    try:
+        from database import SessionLocal
+        from services.survey_aggregates import backfill_missing
+        
+        db = SessionLocal()
+        try:
+            surveys = backfill_missing(db)
+            if surveys:
+                logging.info(f"설문 문항 집계 채우기 {len(surveys)}건")
+        finally:
+            db.close()
+    except Exception as e:
+        logging.error(f"설문 문항 집계 채우기 실패: {e}")
+
+def refresh_response_snapshot():
+    """설문 응답 컬럼형 스냅샷 재생성"""
+    try:
+        from services.response_snapshot import build_snapshot
+        build_snapshot()
+    except Exception as e:
+        logging.error(f"설문 응답 스냅샷 생성 실패: {e}")
+
+def refresh_survey_summaries():
+    """새 답변이 쌓인 주관식 문항/후기를 요약 워커 큐에 넣음"""
+    try:
+        from services.survey_summaries import survey_summary_worker
+        queued = survey_summary_worker.sweep()
+        if queued:
+            logging.info(f"설문 답변 요약 {queued}건 예약")
+    except Exception as e:
+        logging.error(f"설문 답변 요약 스윕 실패: {e}")
+
 app = FastAPI(
     title="전시회 플랫폼 API",
     description="전시회 이벤트 관리 플랫폼",
@@ -142,9 +313,11 @@ app.include_router(events_visitor.router, prefix="/api", tags=["관람객"])  #
 app.include_router(companies.router, prefix="/api", tags=["기업"])
 app.include_router(admin_routes.router, prefix="/api", tags=["관리자"])
 
-# 정적 파일 서빙 (업로드된 이미지)
-os.makedirs("uploads", exist_ok=True)
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+# 정적 파일 서빙 (업로드된 이미지 - 로컬 저장소일 때. S3 저장소는 버킷/CDN이 서빙하고
+# 여기서는 이전에 로컬에 저장된 파일만 남는다)
+upload_dir = storage.root if isinstance(storage, LocalStorage) else "uploads"
+os.makedirs(upload_dir, exist_ok=True)
+app.mount("/uploads", UploadStaticFiles(directory=upload_dir), name="uploads")
 
 @app.get("/favicon.ico", include_in_schema=False)
 def favicon():
@@ -11,8 +11,16 @@ from .venue import Venue
 from .event import Event
 from .tag import Tag
 from .event_manager import EventManager
-from .survey import Survey, SurveyResponse
+from .survey import (
+    Survey,
+    SurveyResponse,
+    SurveyResponseCounter,
+    SurveyQuestionAggregate,
+    SurveyResponseRollup,
+    SurveyAnswerSummary,
+)
 from .interaction import EventLike, EventView
+from .cache_entry import CacheEntry
 
 # Export all models
 __all__ = [
@@ -25,6 +33,11 @@ __all__ = [
     "EventManager",
     "Survey",
     "SurveyResponse",
+    "SurveyResponseCounter",
+    "SurveyQuestionAggregate",
+    "SurveyResponseRollup",
+    "SurveyAnswerSummary",
     "EventLike",
     "EventView",
+    "CacheEntry",
 ]
@@ -0,0 +1,26 @@
+"""
+CacheEntry model - 워커 간 공유 캐시 (LLM 응답 등)
+"""
+from sqlalchemy import Column, String, DateTime, PrimaryKeyConstraint
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from database import Base
+
+
+class CacheEntry(Base):
+    __tablename__ = "cache_entries"
+
+    # 네임스페이스 (예: "llm:enhance", "llm:tags") + 정규화된 입력의 SHA-256
+    namespace = Column(String(50), nullable=False)
+    cache_key = Column(String(64), nullable=False)
+
+    value = Column(JSONB, nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        PrimaryKeyConstraint("namespace", "cache_key", name="pk_cache_entries"),
+    )
+
+    def __repr__(self):
+        return f"<CacheEntry(namespace='{self.namespace}', key='{self.cache_key[:8]}...')>"
@@ -52,6 +52,8 @@ class Event(Base):
     # Unsplash 자동 이미지 생성 관련 필드
     unsplash_image_url = Column(String)  # Unsplash에서 자동 생성된 이미지 URL
     has_custom_image = Column(Boolean, default=False)  # 주최측이 직접 업로드한 이미지 여부
+    image_variants = Column(JSON)  # 로컬 미러 크기별 URL {"640": {"jpg": ..., "webp": ...}}
+    image_attribution = Column(JSON)  # 사진 출처 (사진가, 프로필, 원본 페이지)
 
     is_active = Column(Boolean, default=True, index=True)
     is_featured = Column(Boolean, default=False, index=True)
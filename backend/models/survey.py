@@ -1,10 +1,10 @@
 """
 Survey models - 설문조사 및 응답
 """
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, CheckConstraint
+from sqlalchemy import BigInteger, Column, Integer, SmallInteger, String, Text, Boolean, DateTime, ForeignKey, CheckConstraint, Index, PrimaryKeyConstraint
 from sqlalchemy.dialects.postgresql import JSONB, INET
-from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.orm import deferred, relationship
+from sqlalchemy.sql import func, text
 from database import Base
 
 
@@ -43,8 +43,12 @@ class Survey(Base):
     is_active = Column(Boolean, default=True, index=True)
     require_email = Column(Boolean, default=False)
     require_phone = Column(Boolean, default=False)
+    prevent_duplicates = Column(Boolean, default=False)  # 중복 응답 차단 (services/survey_dedup.py)
     max_responses = Column(Integer)
     current_responses = Column(Integer, default=0)
+    # 문항 집계(survey_question_aggregates)를 원본에서 재계산한 뒤부터 증가분 반영 (services/survey_aggregates.py)
+    # 앱에서 만든 설문은 응답이 없으므로 바로 켜고, 기존 행/SQL로 넣은 설문은 backfill이 켠다
+    aggregates_ready = Column(Boolean, nullable=False, default=True, server_default=text("false"))
     
     # 기간
     start_date = Column(DateTime(timezone=True))
@@ -101,6 +105,12 @@ class SurveyResponse(Base):
     # IP 및 디바이스 정보
     ip_address = Column(INET)
     user_agent = Column(String)
+
+    # 키오스크 일괄 제출 멱등 키 (services/survey_batch.py)
+    client_key = Column(String(64))
+
+    # 주관식 답변 + 후기 검색용 텍스트 - DB 트리거(trg_responses_search_text)가 채움 (services/survey_search.py)
+    search_text = deferred(Column(Text))
     
     # 타임스탬프
     submitted_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
@@ -111,6 +121,29 @@ class SurveyResponse(Base):
             "rating IS NULL OR (rating >= 1 AND rating <= 5)",
             name="chk_rating_range"
         ),
+        # 주관식 답변 커서 페이지네이션 / 문항 키 존재 검사 (services/survey_stats.py)
+        Index("idx_responses_survey_id_id", "survey_id", id.desc()),
+        Index("idx_responses_answers", "answers", postgresql_using="gin"),
+        Index(
+            "uq_responses_survey_client_key",
+            "survey_id",
+            "client_key",
+            unique=True,
+            postgresql_where=client_key.isnot(None),
+        ),
+        Index(
+            "idx_responses_search_trgm",
+            "search_text",
+            postgresql_using="gin",
+            postgresql_ops={"search_text": "gin_trgm_ops"},
+        ),
+        # 후기 요약 대기 건수 (services/survey_summaries.py - 마지막 요약 id 이후만 범위 검색)
+        Index(
+            "idx_responses_review_pending",
+            "survey_id",
+            "id",
+            postgresql_where=review != "",
+        ),
     )
     
     # Relationships
@@ -118,3 +151,84 @@ class SurveyResponse(Base):
     
     def __repr__(self):
         return f"<SurveyResponse(id={self.id}, survey_id={self.survey_id}, rating={self.rating})>"
+
+
+class SurveyResponseCounter(Base):
+    __tablename__ = "survey_response_counters"
+
+    # 설문별 N개 샤드 - 동시 제출이 한 행에 몰리지 않도록 나눠서 증가 (합계 = 응답 수)
+    # 인원 제한(max_responses)이 있는 설문은 정확한 상한 검사를 위해 shard 0만 사용
+    survey_id = Column(Integer, ForeignKey("surveys.id", ondelete="CASCADE"), nullable=False)
+    shard = Column(SmallInteger, nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        PrimaryKeyConstraint("survey_id", "shard", name="pk_survey_response_counters"),
+    )
+
+    def __repr__(self):
+        return f"<SurveyResponseCounter(survey_id={self.survey_id}, shard={self.shard}, count={self.count})>"
+
+
+class SurveyQuestionAggregate(Base):
+    __tablename__ = "survey_question_aggregates"
+
+    # 설문 문항별 누적 집계 - 응답 저장과 같은 트랜잭션에서 증가분만 더함 (services/survey_aggregates.py)
+    survey_id = Column(Integer, ForeignKey("surveys.id", ondelete="CASCADE"), nullable=False)
+    question_key = Column(String(50), nullable=False)
+    total = Column(Integer, nullable=False, default=0)
+    non_empty = Column(Integer, nullable=False, default=0)
+    counts = Column(JSONB, nullable=False, default=dict)  # {선택지/평점 라벨: 수}
+    rating_count = Column(Integer, nullable=False, default=0)
+    rating_sum = Column(BigInteger, nullable=False, default=0)
+    rating_min = Column(Integer)
+    rating_max = Column(Integer)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        PrimaryKeyConstraint("survey_id", "question_key", name="pk_survey_question_aggregates"),
+    )
+
+    def __repr__(self):
+        return f"<SurveyQuestionAggregate(survey_id={self.survey_id}, question_key={self.question_key}, total={self.total})>"
+
+
+class SurveyResponseRollup(Base):
+    __tablename__ = "survey_response_rollups"
+
+    # (설문, 15분 버킷, 부스)별 응답 수 - 응답 저장 시 증가분만 더함 (services/survey_rollups.py)
+    survey_id = Column(Integer, ForeignKey("surveys.id", ondelete="CASCADE"), nullable=False)
+    bucket_start = Column(DateTime(timezone=True), nullable=False)
+    booth_number = Column(String(50), nullable=False, default="")
+    count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("survey_id", "bucket_start", "booth_number", name="pk_survey_response_rollups"),
+    )
+
+    def __repr__(self):
+        return f"<SurveyResponseRollup(survey_id={self.survey_id}, bucket_start={self.bucket_start}, count={self.count})>"
+
+
+class SurveyAnswerSummary(Base):
+    __tablename__ = "survey_answer_summaries"
+
+    # 주관식 문항/후기(_review) LLM 요약 - 백그라운드 워커가 새 답변만 추가 요약 (services/survey_summaries.py)
+    survey_id = Column(Integer, ForeignKey("surveys.id", ondelete="CASCADE"), nullable=False)
+    question_key = Column(String(50), nullable=False)
+    answer_count = Column(Integer, nullable=False, default=0)  # 요약에 반영된 답변 수
+    last_response_id = Column(Integer, nullable=False, default=0)  # 요약에 반영된 마지막 응답 id
+    chunks = Column(JSONB, nullable=False, default=list)  # [{first_id, last_id, count, summary, themes}]
+    overview = Column(Text)
+    themes = Column(JSONB, nullable=False, default=list)
+    status = Column(String(20), nullable=False, default="ready")  # ready | failed
+    error = Column(Text)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        PrimaryKeyConstraint("survey_id", "question_key", name="pk_survey_answer_summaries"),
+    )
+
+    def __repr__(self):
+        return f"<SurveyAnswerSummary(survey_id={self.survey_id}, question_key={self.question_key}, answer_count={self.answer_count})>"
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import re
 import secrets
+import time
 from datetime import datetime
 from typing import List, Optional
 
@@ -361,6 +362,128 @@ def get_scheduler_status():
         }
 
 
+@router.get("/survey-ingest/stats")
+def get_survey_ingest_stats():
+    """설문 응답 write-behind 버퍼 상태 (대기 건수, flush 횟수/지연, 보존 건수)"""
+    from services.survey_ingest import survey_ingest
+
+    return survey_ingest.stats()
+
+
+@router.get("/survey-cache/stats")
+def get_survey_cache_stats():
+    """설문 정의 캐시 상태 (크기, 적중/재검증/병합 횟수)"""
+    from services.survey_cache import survey_cache
+
+    return survey_cache.stats()
+
+
+@router.get("/survey-summaries/stats")
+def get_survey_summary_stats():
+    """주관식 답변 요약 워커 상태 (큐 길이, 요약/실패 횟수, LLM 호출 수)"""
+    from services.survey_summaries import survey_summary_worker
+
+    return survey_summary_worker.stats()
+
+
+@router.get("/survey-duplicate-guard/stats")
+def get_survey_duplicate_guard_stats():
+    """중복 응답 차단 필터 상태 (설문별 등록 키 수/포화 여부, DB 확인/차단 횟수)"""
+    from services.survey_dedup import duplicate_guard
+
+    return duplicate_guard.stats()
+
+
+# ===================== 응답 분석 (컬럼형 스냅샷) =====================
+
+def _analytics_snapshot():
+    """현재 응답 스냅샷 (아직 만들어지지 않았으면 503)"""
+    from services.response_snapshot import current_snapshot
+
+    snapshot = current_snapshot()
+    if snapshot is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="응답 분석 스냅샷이 아직 없습니다. 잠시 후 다시 시도해주세요.",
+        )
+    return snapshot
+
+
+@router.get("/analytics/snapshot")
+def get_analytics_snapshot():
+    """응답 분석 스냅샷 정보 (생성 시각, 행/답변 칸 수, 생성 소요 시간)"""
+    return _analytics_snapshot().summary()
+
+
+@router.post("/analytics/snapshot/refresh")
+def refresh_analytics_snapshot():
+    """응답 분석 스냅샷 즉시 재생성"""
+    from services.response_snapshot import build_snapshot
+
+    summary = build_snapshot()
+    if summary is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="다른 서버 프로세스가 응답 분석 스냅샷을 만드는 중입니다. 잠시 후 다시 시도해주세요.",
+        )
+    return summary
+
+
+@router.get("/analytics/rating-trend")
+def get_rating_trend(
+    group_by: str = Query("company", pattern="^(company|event|event_type|booth)$"),
+    bucket: str = Query("day", pattern="^(hour|day|week|month)$"),
+    company_id: Optional[int] = Query(None),
+    event_id: Optional[int] = Query(None),
+    days: Optional[int] = Query(None, ge=1, description="최근 N일만"),
+):
+    """그룹별 기간 버킷마다 응답 수와 평균 평점"""
+    from services import response_analytics
+
+    snapshot = _analytics_snapshot()
+    started = time.perf_counter()
+    groups = response_analytics.rating_trend(
+        snapshot, group_by=group_by, bucket=bucket, company_id=company_id, event_id=event_id, since_days=days
+    )
+    return {
+        "snapshot": snapshot.summary(),
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+        "groups": groups,
+    }
+
+
+@router.get("/analytics/answer-distribution")
+def get_answer_distribution(
+    group_by: str = Query("event_type", pattern="^(company|event|event_type|booth)$"),
+    kind: Optional[str] = Query(None, pattern="^(choice|rating)$"),
+    survey_id: Optional[int] = Query(None),
+    question_key: Optional[str] = Query(None),
+    question_text: Optional[str] = Query(None, description="문항 제목에 포함된 문자열"),
+    company_id: Optional[int] = Query(None),
+    limit: int = Query(20, ge=1, le=200),
+):
+    """그룹별 선택형/평점 답변 분포"""
+    from services import response_analytics
+
+    snapshot = _analytics_snapshot()
+    started = time.perf_counter()
+    groups = response_analytics.answer_distribution(
+        snapshot,
+        group_by=group_by,
+        kind=kind,
+        survey_id=survey_id,
+        question_key=question_key,
+        question_text=question_text,
+        company_id=company_id,
+        limit=limit,
+    )
+    return {
+        "snapshot": snapshot.summary(),
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+        "groups": groups,
+    }
+
+
 # ===================== 매직링크 재발행 API =====================
 
 class RegenerateMagicLinkRequest(BaseModel):
@@ -2,20 +2,32 @@
 
 from __future__ import annotations
 
-from collections import Counter, defaultdict
 from datetime import date, datetime
 from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from database import get_db
 from models import Company, Event, EventView, EventLike, Survey, SurveyResponse
+from services import (
+    response_export,
+    survey_aggregates,
+    survey_crosstab,
+    survey_rollups,
+    survey_search,
+    survey_stats,
+    survey_summaries,
+)
 
 router = APIRouter(prefix="/companies", tags=["기업"])
 
+# 통계 응답에 함께 넣는 주관식 최신 답변 수 (전체는 /answers 페이지 조회)
+FREE_FORM_PREVIEW_LIMIT = 10
+
 
 class CompanySummary(BaseModel):
     id: int
@@ -78,6 +90,23 @@ class SurveyDistributionItem(BaseModel):
     percentage: float
 
 
+class AnswerSummaryTheme(BaseModel):
+    theme: str
+    description: str = ""
+    mentions: int = 0
+    sentiment: str = "neutral"
+    quotes: List[str] = []
+
+
+class AnswerSummary(BaseModel):
+    overview: Optional[str] = None
+    themes: List[AnswerSummaryTheme] = []
+    answer_count: int  # 요약에 반영된 답변 수
+    pending_answers: int  # 요약 이후 새로 들어온 답변 수
+    status: str
+    updated_at: Optional[datetime] = None
+
+
 class SurveyQuestionStats(BaseModel):
     id: int
     question_text: str
@@ -86,11 +115,102 @@ class SurveyQuestionStats(BaseModel):
     distribution: Dict[str, SurveyDistributionItem]
     statistics: Optional[Dict[str, Any]] = None
     free_form_answers: Optional[List[str]] = None
+    summary: Optional[AnswerSummary] = None
 
 
 class SurveyStatisticsResponse(BaseModel):
     survey: CompanySurveyItem
     questions: List[SurveyQuestionStats]
+    review_summary: Optional[AnswerSummary] = None
+
+
+class SummaryRefreshResponse(BaseModel):
+    queued: int
+
+
+class FreeFormAnswerItem(BaseModel):
+    response_id: int
+    answer: str
+    submitted_at: Optional[datetime] = None
+
+
+class FreeFormAnswerPage(BaseModel):
+    question_id: str
+    answers: List[FreeFormAnswerItem]
+    next_before_id: Optional[int] = None
+
+
+class ResponseSearchMatch(BaseModel):
+    field: str  # answers.<문항 id> | review
+    question_id: Optional[str] = None
+    question: Optional[str] = None
+    snippet: str
+    highlights: List[List[int]]  # 발췌문 안 검색어 위치 [시작, 끝)
+
+
+class ResponseSearchHit(BaseModel):
+    response_id: int
+    survey_id: int
+    booth_number: Optional[str] = None
+    submitted_at: Optional[datetime] = None
+    matches: List[ResponseSearchMatch]
+
+
+class ResponseSearchPage(BaseModel):
+    terms: List[str]
+    hits: List[ResponseSearchHit]
+    next_before_id: Optional[int] = None
+
+
+class CrosstabQuestion(BaseModel):
+    id: Any
+    question_text: str
+    question_type: str
+    labels: List[str]
+
+
+class ChiSquareResult(BaseModel):
+    statistic: float
+    dof: int
+    p_value: float
+    cramers_v: float
+    low_expected_ratio: float
+
+
+class SurveyCrosstabResponse(BaseModel):
+    survey_id: int
+    row_question: CrosstabQuestion
+    column_question: CrosstabQuestion
+    counts: List[List[int]]
+    row_totals: List[int]
+    column_totals: List[int]
+    total: int
+    respondents: int
+    row_percentages: List[List[float]]
+    column_percentages: List[List[float]]
+    multi_select: bool
+    chi_square: Optional[ChiSquareResult] = None
+
+
+class TrendPoint(BaseModel):
+    bucket: datetime
+    count: int
+
+
+class BoothTrend(BaseModel):
+    booth_number: Optional[str] = None
+    total: int
+    series: List[TrendPoint]
+
+
+class ResponseTrendResponse(BaseModel):
+    granularity: str
+    timezone: str
+    since: datetime
+    until: datetime
+    total: int
+    series: List[TrendPoint]
+    booths: Optional[List[BoothTrend]] = None
 
 
 def _get_company_or_404(db: Session, company_id: int) -> Company:
@@ -256,44 +376,44 @@ def get_company_surveys(company_id: int, db: Session = Depends(get_db)):
     ]
 
 
-def _calculate_distribution(question: dict, answers: List[Any]) -> SurveyQuestionStats:
+def _answer_summary(stored: Optional[Dict[str, Any]], pending: int) -> Optional[AnswerSummary]:
+    """저장된 LLM 요약(services.survey_summaries) - 아직 한 번도 요약하지 않았으면 None"""
+    if stored is None:
+        return None
+    return AnswerSummary(
+        overview=stored["overview"],
+        themes=stored["themes"] or [],
+        answer_count=stored["answer_count"],
+        pending_answers=pending,
+        status=stored["status"],
+        updated_at=stored["updated_at"],
+    )
+
+
+def _question_stats(
+    question: dict,
+    aggregate: Dict[str, Any],
+    free_form: Optional[List[str]] = None,
+    summary: Optional[AnswerSummary] = None,
+) -> SurveyQuestionStats:
+    """문항 집계값(services.survey_aggregates)으로 문항 통계 응답 구성"""
     question_id = question.get("id")
     question_text = question.get("question_text") or question.get("text") or ""
-    question_type = question.get("question_type") or question.get("type") or "text"
+    question_type = survey_stats.question_type(question)
 
-    total_responses = len(answers)
+    total_responses = aggregate["total"]
     distribution: Dict[str, SurveyDistributionItem] = {}
     statistics: Optional[Dict[str, Any]] = None
-    free_form: List[str] = []
 
-    if question_type in {"radio", "checkbox", "select"}:
-        counter = Counter()
-        for answer in answers:
-            if isinstance(answer, list):
-                counter.update(str(item) for item in answer if item is not None)
-            elif answer is not None:
-                counter.update([str(answer)])
-
-        for label, count in counter.items():
+    if question_type in survey_stats.CHOICE_QUESTION_TYPES or question_type == survey_stats.RATING_QUESTION_TYPE:
+        for label, count in aggregate["counts"].items():
             percentage = (count / total_responses * 100) if total_responses else 0.0
             distribution[label] = SurveyDistributionItem(label=label, count=count, percentage=round(percentage, 2))
-
-    elif question_type == "rating":
-        numeric_answers = [int(answer) for answer in answers if isinstance(answer, (int, float, str)) and str(answer).isdigit()]
-        counter = Counter(str(value) for value in numeric_answers)
-        for label, count in counter.items():
-            percentage = (count / total_responses * 100) if total_responses else 0.0
-            distribution[label] = SurveyDistributionItem(label=label, count=count, percentage=round(percentage, 2))
-
-        if numeric_answers:
-            statistics = {
-                "average": round(sum(numeric_answers) / len(numeric_answers), 2),
-                "min": min(numeric_answers),
-                "max": max(numeric_answers),
-            }
-
+        rating = aggregate["rating"]
+        if rating:
+            statistics = {name: rating[name] for name in ("average", "min", "max")}
     else:
-        free_form = [str(answer) for answer in answers if answer]
+        statistics = {"answer_count": aggregate["non_empty"]}
 
     # ensure choices with zero count are present
     choices = question.get("choices") or []
@@ -312,6 +432,7 @@ def _calculate_distribution(question: dict, answers: List[Any]) -> SurveyQuestio
         distribution=distribution,
         statistics=statistics,
         free_form_answers=free_form or None,
+        summary=summary,
     )
 
 
@@ -337,21 +458,292 @@ def get_survey_statistics(survey_id: int, db: Session = Depends(get_db)):
         end_date=survey.end_date,
     )
 
-    responses = survey.responses or []
-    question_map: Dict[str, List[Any]] = defaultdict(list)
+    # 응답 저장 시 누적해 둔 문항별 집계만 읽는다 (응답 수와 무관하게 문항 수에 비례)
+    questions = [question for question in survey.questions or [] if question.get("id") is not None]
+    aggregates = survey_aggregates.load(db, survey.id, questions)
+    empty = {"total": 0, "non_empty": 0, "counts": {}, "rating": None}
+    # 주관식 요약은 백그라운드 워커가 저장해 둔 것만 읽는다 (이 요청에서 LLM을 부르지 않음)
+    summaries = survey_summaries.load(db, survey.id)
+    pending = survey_summaries.pending_counts(db, survey.id) if summaries else {}
 
-    for response in responses:
-        answers = response.answers or {}
-        for question_key, value in answers.items():
-            question_map[str(question_key)].append(value)
+    def summary_for(key: str) -> Optional[AnswerSummary]:
+        return _answer_summary(summaries.get(key), pending.get((survey.id, key), (0, True))[0])
 
     question_stats: List[SurveyQuestionStats] = []
-    for question in survey.questions or []:
-        q_id = question.get("id")
-        if q_id is None:
-            continue
-        answers = question_map.get(str(q_id), [])
-        stats = _calculate_distribution(question, answers)
-        question_stats.append(stats)
+    for question in questions:
+        key = str(question["id"])
+        preview = None
+        summary = None
+        if key in survey_stats.question_keys_by_kind([question])["free_form"]:
+            page = survey_stats.fetch_free_form_answers(db, survey.id, key, limit=FREE_FORM_PREVIEW_LIMIT)
+            preview = [item["answer"] for item in page["answers"]]
+            summary = summary_for(key)
+        question_stats.append(_question_stats(question, aggregates.get(key, empty), preview, summary))
+
+    return SurveyStatisticsResponse(
+        survey=survey_item,
+        questions=question_stats,
+        review_summary=summary_for(survey_summaries.REVIEW_KEY),
+    )
+
+
+@router.post(
+    "/surveys/{survey_id}/summaries/refresh",
+    response_model=SummaryRefreshResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+def refresh_answer_summaries(survey_id: int, db: Session = Depends(get_db)):
+    """새 답변이 있는 주관식 문항/후기 요약을 백그라운드 큐에 넣음 (결과는 통계 API에 반영)"""
+    exists = db.query(Survey.id).filter(Survey.id == survey_id).first()
+    if not exists:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="설문을 찾을 수 없습니다.")
+    worker = survey_summaries.survey_summary_worker
+    if not worker.running:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="답변 요약 기능이 꺼져 있습니다.")
+
+    targets = [target for target, (count, _) in survey_summaries.pending_counts(db, survey_id).items() if count > 0]
+    worker.enqueue_threadsafe(targets)
+    return SummaryRefreshResponse(queued=len(targets))
+
+
+@router.get("/surveys/{survey_id}/questions/{question_id}/answers", response_model=FreeFormAnswerPage)
+def get_free_form_answers(
+    survey_id: int,
+    question_id: str,
+    limit: int = Query(50, ge=1, le=200),
+    before_id: Optional[int] = Query(None, description="이전 페이지의 next_before_id"),
+    db: Session = Depends(get_db),
+):
+    """주관식 답변 목록 (최신순, 커서 기반 페이지네이션)"""
+    exists = db.query(Survey.id).filter(Survey.id == survey_id).first()
+    if not exists:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="설문을 찾을 수 없습니다.")
 
-    return SurveyStatisticsResponse(survey=survey_item, questions=question_stats)
\ No newline at end of file
+    page = survey_stats.fetch_free_form_answers(db, survey_id, question_id, limit=limit, before_id=before_id)
+    return FreeFormAnswerPage(question_id=question_id, **page)
+
+
+@router.get("/surveys/{survey_id}/crosstab", response_model=SurveyCrosstabResponse)
+def get_survey_crosstab(
+    survey_id: int,
+    q1: str = Query(..., description="행 문항 id"),
+    q2: str = Query(..., description="열 문항 id"),
+    chi_square: bool = Query(False, description="카이제곱 독립성 검정 포함 (복수 선택 문항이 있으면 생략)"),
+    db: Session = Depends(get_db),
+):
+    """두 선택형/평점 문항의 교차표 (복수 선택은 선택지마다 집계)"""
+    survey = db.query(Survey).filter(Survey.id == survey_id).first()
+    if not survey:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="설문을 찾을 수 없습니다.")
+    if q1 == q2:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="서로 다른 두 문항을 선택해주세요.")
+
+    questions = {str(question.get("id")): question for question in survey.questions or []}
+    selected = []
+    for key in (q1, q2):
+        question = questions.get(key)
+        if question is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"문항을 찾을 수 없습니다: {key}")
+        kind = survey_stats.question_type(question)
+        if kind not in survey_stats.CHOICE_QUESTION_TYPES and kind != survey_stats.RATING_QUESTION_TYPE:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="선택형 또는 평점 문항만 교차 분석할 수 있습니다.",
+            )
+        selected.append(question)
+
+    result = survey_crosstab.compute_crosstab(db, survey_id, selected[0], selected[1], include_chi_square=chi_square)
+
+    def describe(question: Dict[str, Any], labels: List[str]) -> CrosstabQuestion:
+        return CrosstabQuestion(
+            id=question.get("id"),
+            question_text=question.get("question_text") or question.get("text") or "",
+            question_type=survey_stats.question_type(question),
+            labels=labels,
+        )
+
+    return SurveyCrosstabResponse(
+        survey_id=survey_id,
+        row_question=describe(selected[0], result.pop("row_labels")),
+        column_question=describe(selected[1], result.pop("column_labels")),
+        **result,
+    )
+
+
+# ===================== 응답 추이 (15분 롤업) =====================
+
+TREND_GRANULARITY_PATTERN = "^(15min|hour|day|week)$"
+
+
+@router.get("/events/{event_id}/responses/trend", response_model=ResponseTrendResponse)
+def get_event_response_trend(
+    event_id: int,
+    granularity: str = Query("15min", pattern=TREND_GRANULARITY_PATTERN),
+    since: Optional[datetime] = Query(None, description="생략하면 단위별 기본 범위 (15min은 오늘 0시부터)"),
+    until: Optional[datetime] = Query(None),
+    survey_id: Optional[int] = Query(None),
+    booth: Optional[str] = Query(None, description="부스 번호"),
+    by_booth: bool = Query(False, description="부스별 추이 포함"),
+    db: Session = Depends(get_db),
+):
+    """이벤트(또는 그 안의 설문 하나)의 시간대별 응답 수"""
+    event = db.query(Event.id).filter(Event.id == event_id).first()
+    if not event:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="이벤트를 찾을 수 없습니다.")
+    query = db.query(Survey.id).filter(Survey.event_id == event_id)
+    if survey_id is not None:
+        query = query.filter(Survey.id == survey_id)
+    survey_ids = [row.id for row in query.all()]
+    return survey_rollups.trend(db, survey_ids, granularity, since, until, booth, by_booth)
+
+
+@router.get("/{company_id}/responses/trend", response_model=ResponseTrendResponse)
+def get_company_response_trend(
+    company_id: int,
+    granularity: str = Query("day", pattern=TREND_GRANULARITY_PATTERN),
+    since: Optional[datetime] = Query(None),
+    until: Optional[datetime] = Query(None),
+    booth: Optional[str] = Query(None, description="부스 번호"),
+    by_booth: bool = Query(False, description="부스별 추이 포함"),
+    db: Session = Depends(get_db),
+):
+    """기업의 모든 이벤트 설문에 대한 시간대별 응답 수"""
+    _get_company_or_404(db, company_id)
+    survey_ids = [
+        row.id
+        for row in db.query(Survey.id)
+        .join(Event, Survey.event_id == Event.id)
+        .filter(Event.company_id == company_id)
+        .all()
+    ]
+    return survey_rollups.trend(db, survey_ids, granularity, since, until, booth, by_booth)
+
+
+# ===================== 주관식 답변/후기 검색 =====================
+
+def _search_page(db: Session, survey_ids: List[int], q: str, limit: int, before_id: Optional[int]) -> ResponseSearchPage:
+    try:
+        page = survey_search.search_responses(db, survey_ids, q, limit=limit, before_id=before_id)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return ResponseSearchPage(**page)
+
+
+@router.get("/surveys/{survey_id}/responses/search", response_model=ResponseSearchPage)
+def search_survey_responses(
+    survey_id: int,
+    q: str = Query(..., max_length=200, description="검색어 (공백으로 나누면 모두 포함한 응답)"),
+    limit: int = Query(20, ge=1, le=100),
+    before_id: Optional[int] = Query(None, description="이전 페이지의 next_before_id"),
+    db: Session = Depends(get_db),
+):
+    """설문 하나의 주관식 답변/후기 검색 (최신순, 커서 기반 페이지네이션)"""
+    exists = db.query(Survey.id).filter(Survey.id == survey_id).first()
+    if not exists:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="설문을 찾을 수 없습니다.")
+    return _search_page(db, [survey_id], q, limit, before_id)
+
+
+@router.get("/events/{event_id}/responses/search", response_model=ResponseSearchPage)
+def search_event_responses(
+    event_id: int,
+    q: str = Query(..., max_length=200, description="검색어 (공백으로 나누면 모두 포함한 응답)"),
+    limit: int = Query(20, ge=1, le=100),
+    before_id: Optional[int] = Query(None, description="이전 페이지의 next_before_id"),
+    db: Session = Depends(get_db),
+):
+    """이벤트의 모든 설문 응답에서 주관식 답변/후기 검색"""
+    event = db.query(Event.id).filter(Event.id == event_id).first()
+    if not event:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="이벤트를 찾을 수 없습니다.")
+    survey_ids = [row.id for row in db.query(Survey.id).filter(Survey.event_id == event_id).all()]
+    return _search_page(db, survey_ids, q, limit, before_id)
+
+
+@router.get("/{company_id}/responses/search", response_model=ResponseSearchPage)
+def search_company_responses(
+    company_id: int,
+    q: str = Query(..., max_length=200, description="검색어 (공백으로 나누면 모두 포함한 응답)"),
+    limit: int = Query(20, ge=1, le=100),
+    before_id: Optional[int] = Query(None, description="이전 페이지의 next_before_id"),
+    db: Session = Depends(get_db),
+):
+    """기업의 모든 이벤트 설문 응답에서 주관식 답변/후기 검색"""
+    _get_company_or_404(db, company_id)
+    survey_ids = [
+        row.id
+        for row in db.query(Survey.id)
+        .join(Event, Survey.event_id == Event.id)
+        .filter(Event.company_id == company_id)
+        .all()
+    ]
+    return _search_page(db, survey_ids, q, limit, before_id)
+
+
+# ===================== 응답 내보내기 (CSV / XLSX) =====================
+
+EXPORT_FORMAT_PATTERN = "^(csv|xlsx)$"
+
+
+def _export_response(surveys: List[Survey], file_format: str, filename: str) -> StreamingResponse:
+    """설문 정의로 열을 만들고 응답 행을 서버 측 커서로 읽으며 스트리밍"""
+    definitions = [
+        {"id": survey.id, "title": survey.title, "questions": survey.questions or []}
+        for survey in sorted(surveys, key=lambda survey: survey.id)
+    ]
+    media_type = response_export.XLSX_MEDIA_TYPE if file_format == "xlsx" else response_export.CSV_MEDIA_TYPE
+    return StreamingResponse(
+        response_export.stream_export(file_format, definitions),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}.{file_format}"',
+            "Cache-Control": "no-store",
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
+@router.get("/surveys/{survey_id}/responses/export")
+def export_survey_responses(
+    survey_id: int,
+    file_format: str = Query("csv", alias="format", pattern=EXPORT_FORMAT_PATTERN),
+    db: Session = Depends(get_db),
+):
+    """설문 하나의 전체 응답 내보내기 (문항별 한 열)"""
+    survey = db.query(Survey).filter(Survey.id == survey_id).first()
+    if not survey:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="설문을 찾을 수 없습니다.")
+    return _export_response([survey], file_format, f"survey-{survey_id}-responses")
+
+
+@router.get("/events/{event_id}/responses/export")
+def export_event_responses(
+    event_id: int,
+    file_format: str = Query("csv", alias="format", pattern=EXPORT_FORMAT_PATTERN),
+    db: Session = Depends(get_db),
+):
+    """이벤트의 모든 설문 응답 내보내기 (문항 열 머리글에 설문 제목 포함)"""
+    event = db.query(Event.id).filter(Event.id == event_id).first()
+    if not event:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="이벤트를 찾을 수 없습니다.")
+    surveys = db.query(Survey).filter(Survey.event_id == event_id).all()
+    return _export_response(surveys, file_format, f"event-{event_id}-responses")
+
+
+@router.get("/{company_id}/responses/export")
+def export_company_responses(
+    company_id: int,
+    file_format: str = Query("csv", alias="format", pattern=EXPORT_FORMAT_PATTERN),
+    db: Session = Depends(get_db),
+):
+    """회사의 모든 이벤트/설문 응답 내보내기"""
+    company = db.query(Company.id).filter(Company.id == company_id).first()
+    if not company:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="기업 정보를 찾을 수 없습니다.")
+    surveys = (
+        db.query(Survey)
+        .join(Event, Survey.event_id == Event.id)
+        .filter(Event.company_id == company_id)
+        .all()
+    )
+    return _export_response(surveys, file_format, f"company-{company_id}-responses")
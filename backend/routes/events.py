@@ -1,14 +1,15 @@
 # routes/events.py
 """Event management routes with LLM helpers."""
 
+import asyncio
+import json
 import logging
 import os
-import uuid
 from datetime import date, datetime
-from typing import List, Optional, Tuple
+from typing import Any, List, Optional, Tuple
 
-import aiofiles
 from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 from sqlalchemy import func, or_
 from sqlalchemy.orm import Session
@@ -16,7 +17,10 @@ from sqlalchemy.orm import Session
 from database import get_db
 from models.event import Event
 from models.tag import Tag, event_tags
+from services.analysis_queue import FINISHED_STATUSES, REMOTE_POLL_SECONDS, analysis_queue
+from services.event_image_filler import event_image_filler
 from services.llm_service import llm_service
+from services.storage import normalize_temp_key, promote_temp_upload, save_temp_upload, storage
 from services.unsplash_service import get_unsplash_service
 
 
@@ -264,12 +268,51 @@ def _build_event_response(event: Event) -> EventResponse:
 # ========================================
 
 
+async def _save_temp_upload(file: UploadFile) -> Tuple[str, str]:
+    """분석용 이미지를 저장소 임시 영역에 저장하고 (임시 키, 미리보기 URL)을 반환한다."""
+
+    # 1. 파일 유효성 검사
+    if not file.filename or file.filename == "null":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="유효한 이미지 파일을 업로드해주세요."
+        )
+    
+    # 이미지 파일 확장자 검사
+    allowed_extensions = {".jpg", ".jpeg", ".png", ".gif", ".bmp", ".webp"}
+    file_ext = os.path.splitext(file.filename)[1].lower()
+    if file_ext not in allowed_extensions:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"지원되지 않는 파일 형식입니다. 허용된 형식: {', '.join(allowed_extensions)}"
+        )
+
+    # 2. 이미지 저장 (최종 이벤트 생성시에만 영구 키로 이동)
+    content = await file.read()
+    return await save_temp_upload(content, file_ext)
+
+
+def _format_sse(event: str, data: Any) -> str:
+    """Server-Sent Events 메시지 한 건을 직렬화한다."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+def _analysis_job_payload(job: dict) -> dict:
+    payload = dict(job)
+    if job.get("result") is not None:
+        payload["result"] = LLMAnalysisResponse(**job["result"]).dict()
+    return payload
+
+
 @router.post("/analyze-image", response_model=LLMAnalysisResponse)
 async def analyze_event_image(
     file: UploadFile = File(...),
     provider: Optional[str] = Query(
         None, description="LLM provider (openai/anthropic)"
     ),
+    async_job: bool = Query(
+        False, description="true면 분석 작업을 큐에 넣고 job_id를 즉시 반환 (202)"
+    ),
 ):
     """
     이벤트 이미지 업로드 → LLM 분석 → 폼 자동 완성
@@ -280,6 +323,10 @@ async def analyze_event_image(
     3. 폼 데이터 + 태그 자동 생성
     4. 프론트엔드에서 폼에 자동 입력
 
+    `async_job=true`이면 분석을 워커 큐에 넣고 `{"job_id": ...}`를 즉시 반환한다.
+    결과는 `GET /analyze-image/jobs/{job_id}` (폴링) 또는
+    `GET /analyze-image/jobs/{job_id}/events` (SSE)로 받는다.
+
     ## 응답 예시
     ```json
     {
@@ -298,67 +345,202 @@ async def analyze_event_image(
     ```
     """
 
-    # 1. 파일 유효성 검사
-    if not file.filename or file.filename == "null":
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="유효한 이미지 파일을 업로드해주세요."
-        )
-    
-    # 이미지 파일 확장자 검사
-    allowed_extensions = {".jpg", ".jpeg", ".png", ".gif", ".bmp", ".webp"}
-    file_ext = os.path.splitext(file.filename)[1].lower()
-    if file_ext not in allowed_extensions:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"지원되지 않는 파일 형식입니다. 허용된 형식: {', '.join(allowed_extensions)}"
-        )
-
-    # 2. 이미지 저장
-    upload_dir = "uploads/temp"
-    os.makedirs(upload_dir, exist_ok=True)
-
-    # 안전한 파일명 생성
-    import uuid
-    safe_filename = f"{uuid.uuid4().hex}_{file.filename}"
-    file_path = f"{upload_dir}/{safe_filename}"
+    temp_key, temp_web_url = await _save_temp_upload(file)
 
-    async with aiofiles.open(file_path, "wb") as f:
-        content = await file.read()
-        await f.write(content)
+    if async_job:
+        try:
+            job = analysis_queue.submit(
+                {
+                    "file_path": temp_key,
+                    "temp_image_url": temp_web_url,
+                    "original_filename": file.filename,
+                    "provider": provider,
+                }
+            )
+        except (asyncio.QueueFull, RuntimeError) as exc:
+            await storage.delete(temp_key)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="분석 요청이 많습니다. 잠시 후 다시 시도해주세요.",
+            ) from exc
+        # 다른 워커로 간 폴링/SSE 요청도 찾을 수 있도록 응답 전에 기록
+        await analysis_queue.publish(job)
+
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={
+                "job_id": job.id,
+                "status": job.status,
+                "status_url": f"/api/events/analyze-image/jobs/{job.id}",
+                "events_url": f"/api/events/analyze-image/jobs/{job.id}/events",
+            },
+        )
 
-    # 3. 임시 저장만 (분석용)
-    # 최종 이벤트 생성시에만 permanent로 이동
-    
-    # 4. 임시 웹 URL 생성 (프론트엔드 미리보기용)
-    temp_web_url = f"/uploads/temp/{safe_filename}"
-    
-    # 5. LLM 분석 (로컬 파일 경로 사용)
+    # LLM 분석 (저장소 키 사용)
     try:
         result = await llm_service.analyze_and_fill_event_form(
-            image_url=file_path,
+            image_url=temp_key,
             provider=provider,
         )
         
         # 분석 결과에 임시 이미지 정보 추가
         result["temp_image_url"] = temp_web_url
-        result["temp_image_path"] = file_path  # 서버 내부용
-        result["original_filename"] = file.filename
-        result["temp_image_url"] = temp_web_url
-        result["temp_image_path"] = file_path  # 서버 내부용
+        result["temp_image_path"] = temp_key  # 서버 내부용 (저장소 키)
         result["original_filename"] = file.filename
         
         return LLMAnalysisResponse(**result)
     except Exception as exc:  # noqa: BLE001
         # 오류 시 임시 파일 삭제
-        if os.path.exists(file_path):
-            os.remove(file_path)
+        await storage.delete(temp_key)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"이미지 분석 실패: {exc}",
         ) from exc
 
 
+@router.post("/analyze-image/stream")
+async def stream_event_image_analysis(
+    file: UploadFile = File(...),
+    provider: Optional[str] = Query(
+        None, description="LLM provider (openai/anthropic)"
+    ),
+):
+    """
+    이미지 분석 스트리밍 버전 (Server-Sent Events)
+
+    LLM 응답을 부분 JSON으로 파싱하면서 채워지는 필드를 바로 전달한다.
+    - `field`: `{"name": "eventName", "value": "..."}` (같은 필드가 점점 길어지며 여러 번 올 수 있음)
+    - `tags`, `categories`: 현재까지 생성된 목록
+    - `result`: `/analyze-image` 응답과 동일한 최종 결과
+    - `error`: `{"detail": "..."}`
+    """
+
+    temp_key, temp_web_url = await _save_temp_upload(file)
+
+    async def event_stream():
+        # 업로드 직후 바로 첫 이벤트를 보내 연결/진행 상태를 알린다
+        yield _format_sse("status", {"status": "analyzing"})
+        try:
+            async for kind, data in llm_service.stream_analyze_event_form(
+                image_url=temp_key,
+                provider=provider,
+            ):
+                if kind != "result":
+                    yield _format_sse(kind, data)
+                    continue
+                data["temp_image_url"] = temp_web_url
+                data["temp_image_path"] = temp_key  # 서버 내부용 (저장소 키)
+                data["original_filename"] = file.filename
+                yield _format_sse("result", LLMAnalysisResponse(**data).dict())
+        except Exception as exc:  # noqa: BLE001
+            # 오류 시 임시 파일 삭제
+            await storage.delete(temp_key)
+            yield _format_sse("error", {"detail": f"이미지 분석 실패: {exc}"})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/analyze-image/queue/stats")
+async def get_analysis_queue_stats():
+    """분석 큐 상태 (깊이, 대기 시간, 처리 시간) - 워커 수 산정용"""
+
+    return analysis_queue.stats()
+
+
+@router.get("/llm/providers/stats")
+async def get_llm_provider_stats():
+    """LLM 제공자별 서킷 브레이커 상태, 지연 시간 히스토그램, 헤징/페일오버 횟수"""
+
+    return llm_service.router.stats()
+
+
+@router.get("/llm/cache/stats")
+async def get_llm_cache_stats():
+    """LLM 응답 캐시 적중/미스 지표 (설명 개선, 태그 생성)"""
+
+    return {
+        "enabled": llm_service.cache_enabled,
+        "caches": [llm_service.enhance_cache.stats(), llm_service.tags_cache.stats()],
+    }
+
+
+@router.get("/llm/usage/stats")
+async def get_llm_usage_stats():
+    """호출별 토큰 사용량 - 프롬프트 캐시에서 읽은 입력 토큰, 캐시 적중 여부별 평균 지연 시간"""
+
+    return llm_service.usage_stats.stats()
+
+
+@router.get("/unsplash/stats")
+async def get_unsplash_stats():
+    """Unsplash 검색어/사진 캐시 적중률, 클라이언트 측 시간당 요청 한도 잔량"""
+
+    return {**get_unsplash_service().stats(), "filler": event_image_filler.stats()}
+
+
+@router.get("/analyze-image/jobs/{job_id}")
+async def get_analysis_job(job_id: str):
+    """비동기 분석 작업 상태/결과 조회 (폴링)"""
+
+    job = await analysis_queue.lookup(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="분석 작업을 찾을 수 없습니다.")
+    return _analysis_job_payload(job)
+
+
+@router.get("/analyze-image/jobs/{job_id}/events")
+async def stream_analysis_job(job_id: str):
+    """
+    비동기 분석 작업 상태를 Server-Sent Events로 전달
+
+    이 워커가 실행 중인 작업은 상태 변화를 바로 전달하고, 다른 워커의 작업은
+    공유 저장소를 REMOTE_POLL_SECONDS마다 다시 읽어 전달한다.
+    """
+
+    local_job = analysis_queue.get(job_id)
+    snapshot = await analysis_queue.lookup(job_id)
+    if not snapshot:
+        raise HTTPException(status_code=404, detail="분석 작업을 찾을 수 없습니다.")
+
+    async def event_stream():
+        job = snapshot
+        last_status = None
+        idle_seconds = 0.0
+        while True:
+            if job["status"] != last_status:
+                last_status = job["status"]
+                idle_seconds = 0.0
+                yield _format_sse("status", {"job_id": job_id, "status": job["status"]})
+            if job["status"] in FINISHED_STATUSES:
+                yield _format_sse(job["status"], _analysis_job_payload(job))
+                return
+            if local_job is not None:
+                changed = await local_job.wait_for_change(timeout=15)
+                idle_seconds = 0.0 if changed else 15.0
+            else:
+                await asyncio.sleep(REMOTE_POLL_SECONDS)
+                idle_seconds += REMOTE_POLL_SECONDS
+            if idle_seconds >= 15:
+                # 프록시 유휴 타임아웃 방지용 keep-alive
+                idle_seconds = 0.0
+                yield ": keep-alive\n\n"
+            latest = await analysis_queue.lookup(job_id)
+            if latest is None:
+                yield _format_sse("failed", {"job_id": job_id, "status": "failed", "error": "작업 정보가 만료되었습니다."})
+                return
+            job = latest
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # ========================================
 # 이벤트 생성 (LLM 결과 저장)
 # ========================================
@@ -407,47 +589,12 @@ async def create_event(request: EventCreateRequest, db: Session = Depends(get_db
     # 임시 이미지를 영구 저장소로 이동
     final_image_url = None
     has_custom_image = False
-    unsplash_image_url = None
 
-    if request.temp_image_path and os.path.exists(request.temp_image_path):
-        import shutil
-
-        # 영구 저장소 디렉토리 생성
-        permanent_dir = "uploads/events"
-        os.makedirs(permanent_dir, exist_ok=True)
-
-        # 새로운 파일명 생성 (이벤트 ID 기반)
-        file_ext = os.path.splitext(request.original_filename or "")[1] or ".jpg"
-        permanent_filename = f"event_{uuid.uuid4().hex}{file_ext}"
-        permanent_path = f"{permanent_dir}/{permanent_filename}"
-
-        # 파일 이동
-        shutil.move(request.temp_image_path, permanent_path)
-        final_image_url = f"/uploads/events/{permanent_filename}"
+    temp_key = normalize_temp_key(request.temp_image_path)
+    if temp_key and await storage.exists(temp_key):
+        # 내용 해시 키로 저장 - 같은 이미지는 한 번만 저장된다
+        _, final_image_url = await promote_temp_upload(temp_key)
         has_custom_image = True
-    else:
-        # 주최측이 이미지 업로드하지 않음 -> Unsplash에서 자동 생성
-        import logging
-        logger = logging.getLogger(__name__)
-
-        try:
-            unsplash_service = get_unsplash_service()
-            image_data = await unsplash_service.get_event_image(
-                event_name=request.form_data.eventName,
-                description=request.form_data.description,
-                tags=request.tags,
-                orientation="landscape"
-            )
-
-            if image_data:
-                unsplash_image_url = image_data["url_regular"]  # 1080px width
-                logger.info(f"Unsplash 이미지 생성 성공: {unsplash_image_url}")
-            else:
-                logger.warning(f"Unsplash 이미지 생성 실패: {request.form_data.eventName}")
-
-        except Exception as e:
-            logger.error(f"Unsplash 이미지 생성 중 오류: {e}")
-            # 실패 시 무시하고 계속 진행 (이미지 없이 이벤트 생성)
 
     event = Event(
         event_name=request.form_data.eventName,
@@ -463,7 +610,7 @@ async def create_event(request: EventCreateRequest, db: Session = Depends(get_db
         categories=request.categories or [],
         company_id=request.company_id,
         image_url=final_image_url,  # 최종 이미지 URL 저장
-        unsplash_image_url=unsplash_image_url,  # Unsplash 자동 생성 이미지
+        unsplash_image_url=None,  # Unsplash 자동 이미지는 저장 후 백그라운드에서 채움
         has_custom_image=has_custom_image,  # 주최측 업로드 여부
     )
 
@@ -483,6 +630,10 @@ async def create_event(request: EventCreateRequest, db: Session = Depends(get_db
     db.commit()
     db.refresh(event)
 
+    if not has_custom_image:
+        # 주최측이 이미지 업로드하지 않음 -> Unsplash 이미지는 응답 후 백그라운드에서 채움
+        event_image_filler.enqueue(event.id)
+
     return _build_event_response(event)
 
 
@@ -642,6 +793,39 @@ async def enhance_event_description(
         ) from exc
 
 
+@router.post("/enhance-description/stream")
+async def stream_event_description(
+    event_name: str, description: str, provider: Optional[str] = None
+):
+    """
+    이벤트 설명 개선 스트리밍 버전 (Server-Sent Events)
+
+    - `delta`: `{"text": "..."}` 생성된 텍스트 조각
+    - `done`: `{"enhanced_description": "..."}` 전체 결과
+    - `error`: `{"detail": "..."}`
+    """
+
+    async def event_stream():
+        chunks: List[str] = []
+        try:
+            async for text in llm_service.stream_enhance_description(
+                original_description=description,
+                event_name=event_name,
+                provider=provider,
+            ):
+                chunks.append(text)
+                yield _format_sse("delta", {"text": text})
+            yield _format_sse("done", {"enhanced_description": "".join(chunks)})
+        except Exception as exc:  # noqa: BLE001
+            yield _format_sse("error", {"detail": f"설명 개선 실패: {exc}"})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # ========================================
 # 추가 태그 생성 (LLM)
 # ========================================
@@ -3,18 +3,28 @@
 - 현재 시간 기준 입장 가능한 이벤트만 표시
 - 방문 시간 변경 필터링 기능
 """
-from datetime import date, datetime, time as dt_time
+import asyncio
+import hashlib
+import json
+from datetime import date, datetime, time as dt_time, timezone
 from typing import List, Optional
 
 import os
 from dotenv import load_dotenv
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
 from sqlalchemy import and_, func, or_
 from sqlalchemy.orm import Session
 
 from database import get_db
-from models import Company, Event, Survey, SurveyResponse as SurveyResponseModel, Venue
+from models import Company, Event, SurveyResponse as SurveyResponseModel, Venue
+from services.image_mirror import build_srcset
+from services import survey_aggregates, survey_batch, survey_counter, survey_rollups
+from services.survey_cache import survey_cache
+from services.survey_dedup import duplicate_guard
+from services.survey_ingest import survey_ingest
 
 router = APIRouter()
 
@@ -48,6 +58,20 @@ def get_valid_image_url(event) -> Optional[str]:
     return None
 
 
+def get_image_extras(event) -> dict:
+    """
+    자동(Unsplash) 이미지가 표시될 때만 srcset과 출처 정보를 함께 반환
+    (커스텀 이미지에는 로컬 변형이 없음)
+    """
+    if get_valid_image_url(event) != event.unsplash_image_url or not event.unsplash_image_url:
+        return {}
+    return {
+        "image_srcset": build_srcset(event.image_variants),
+        "image_srcset_webp": build_srcset(event.image_variants, "webp"),
+        "image_attribution": event.image_attribution,
+    }
+
+
 # Response Models
 class SurveySummary(BaseModel):
     id: int
@@ -71,6 +95,9 @@ class EventResponse(BaseModel):
     description: Optional[str] = None
     booth_number: Optional[str] = None
     image_url: Optional[str] = None
+    image_srcset: Optional[str] = None
+    image_srcset_webp: Optional[str] = None
+    image_attribution: Optional[dict] = None
     latitude: Optional[str] = None
     longitude: Optional[str] = None
     venue_id: Optional[int] = None
@@ -109,6 +136,19 @@ class SurveyDetailResponse(BaseModel):
 
 
 class SurveyResponseCreateRequest(BaseModel):
+    # 길이는 survey_responses 컬럼 크기와 같게 - 넘치는 값은 버퍼에 넣기 전에 422
+    answers: dict
+    respondent_name: Optional[str] = Field(None, max_length=100)
+    respondent_email: Optional[str] = Field(None, max_length=100)
+    respondent_company: Optional[str] = Field(None, max_length=200)
+    respondent_phone: Optional[str] = Field(None, max_length=20)
+    booth_number: Optional[str] = Field(None, max_length=50)
+    rating: Optional[int] = None
+    review: Optional[str] = None
+
+
+class SurveyBatchItem(BaseModel):
+    # 길이 제한은 두지 않음 - 한 건 때문에 묶음 전체가 422가 되지 않도록 survey_batch가 응답별 invalid로 돌려줌
     answers: dict
     respondent_name: Optional[str] = None
     respondent_email: Optional[str] = None
@@ -117,6 +157,47 @@ class SurveyResponseCreateRequest(BaseModel):
     booth_number: Optional[str] = None
     rating: Optional[int] = None
     review: Optional[str] = None
+    client_key: str = Field(..., min_length=8, max_length=64, description="태블릿이 응답마다 만든 멱등 키 (UUID)")
+    submitted_at: Optional[datetime] = Field(None, description="태블릿에서 제출 버튼을 누른 시각")
+
+
+class SurveyBatchRequest(BaseModel):
+    responses: List[SurveyBatchItem]
+
+
+class SurveyBatchResult(BaseModel):
+    client_key: str
+    status: str = Field(description="created | duplicate | repeat | full | invalid")
+    response_id: Optional[int] = None
+    submitted_at: Optional[datetime] = None
+    detail: Optional[str] = None
+    errors: Optional[List[dict]] = Field(None, description="invalid일 때 항목별 오류 (field, question_id, question, message)")
+
+
+class SurveyBatchResponse(BaseModel):
+    success: bool
+    survey_id: int
+    created: int
+    duplicates: int
+    rejected: int
+    results: List[SurveyBatchResult]
+
+
+class SurveyBundleResponse(BaseModel):
+    id: int
+    event_id: int
+    title: str
+    description: Optional[str] = None
+    questions: List[dict]
+    is_active: bool
+    require_email: bool
+    require_phone: bool
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    event_name: str
+    company_name: str
+    bundle_version: str = Field(description="설문 정의 해시 (ETag와 같음)")
+    batch_max_items: int = Field(description="일괄 제출 한 번에 보낼 수 있는 최대 응답 수")
 
 
 def _parse_time(value: Optional[str]) -> Optional[dt_time]:
@@ -211,6 +292,7 @@ def build_event_response(
         booth_number=event.booth_number,
         # 이미지 우선순위: 1) 주최측 커스텀 이미지, 2) Unsplash 자동 생성 이미지, 3) None
         image_url=get_valid_image_url(event),
+        **get_image_extras(event),
         latitude=event.latitude,
         longitude=event.longitude,
         venue_id=venue.id if venue else None,
@@ -377,31 +459,26 @@ async def get_survey_detail(
     survey_id: int,
     db: Session = Depends(get_db)
 ):
-    survey_query = db.query(Survey, Event, Company).join(
-        Event, Survey.event_id == Event.id
-    ).join(Company, Event.company_id == Company.id)
+    # 설문 정의는 캐시에서 (버전 재검증/쓰기 무효화는 services/survey_cache.py)
+    survey = await survey_cache.get(survey_id)
 
-    result = survey_query.filter(Survey.id == survey_id).first()
-
-    if not result:
+    if not survey:
         raise HTTPException(status_code=404, detail="설문을 찾을 수 없습니다")
 
-    survey, event, company = result
-
     return SurveyDetailResponse(
-        id=survey.id,
-        event_id=survey.event_id,
-        title=survey.title,
-        description=survey.description,
-        questions=survey.questions or [],
-        is_active=survey.is_active,
-        require_email=survey.require_email,
-        require_phone=survey.require_phone,
-        current_responses=survey.current_responses or 0,
-        start_date=survey.start_date,
-        end_date=survey.end_date,
-        event_name=event.event_name,
-        company_name=company.company_name,
+        id=survey["id"],
+        event_id=survey["event_id"],
+        title=survey["title"],
+        description=survey["description"],
+        questions=survey["questions"],
+        is_active=survey["is_active"],
+        require_email=survey["require_email"],
+        require_phone=survey["require_phone"],
+        current_responses=survey_counter.current_counts(db, [survey_id])[survey_id],
+        start_date=survey["start_date"],
+        end_date=survey["end_date"],
+        event_name=survey["event_name"],
+        company_name=survey["company_name"],
     )
 
 
@@ -409,34 +486,100 @@ async def get_survey_detail(
 async def submit_survey_response(
     survey_id: int,
     payload: SurveyResponseCreateRequest,
+    request: Request,
     db: Session = Depends(get_db)
 ):
-    survey = db.query(Survey).filter(Survey.id == survey_id).first()
+    survey = await survey_cache.get(survey_id)
 
     if not survey:
         raise HTTPException(status_code=404, detail="설문을 찾을 수 없습니다")
 
-    if not survey.is_active:
+    if not survey["is_active"]:
         raise HTTPException(status_code=400, detail="현재 응답을 받을 수 없는 설문입니다")
 
     if payload.rating is not None and not (1 <= payload.rating <= 5):
         raise HTTPException(status_code=400, detail="평점은 1에서 5 사이여야 합니다")
 
-    response = SurveyResponseModel(
-        survey_id=survey_id,
-        respondent_name=payload.respondent_name,
-        respondent_email=payload.respondent_email,
-        respondent_phone=payload.respondent_phone,
-        respondent_company=payload.respondent_company,
-        booth_number=payload.booth_number,
-        answers=payload.answers,
-        rating=payload.rating,
-        review=payload.review,
-    )
+    # 설문 버전마다 컴파일해 캐시에 둔 검증기로 답변 검사 (services/survey_validation.py)
+    errors = survey["validator"].validate(payload.answers, payload.respondent_email, payload.respondent_phone)
+    if errors:
+        raise HTTPException(status_code=422, detail={"message": "설문 응답을 확인해주세요", "errors": errors})
+
+    user_agent = (request.headers.get("user-agent") or "")[:500] or None
+    row = {
+        "survey_id": survey_id,
+        "respondent_name": payload.respondent_name,
+        "respondent_email": payload.respondent_email,
+        "respondent_phone": payload.respondent_phone,
+        "respondent_company": payload.respondent_company,
+        "booth_number": payload.booth_number,
+        "answers": payload.answers,
+        "rating": payload.rating,
+        "review": payload.review,
+        "ip_address": request.client.host if request.client else None,
+        "user_agent": user_agent,
+    }
+
+    # 중복 응답 차단 설문 - 응답자 키 Bloom 필터로 걸러 의심될 때만 DB 확인 (services/survey_dedup.py)
+    guard_keys = []
+    if duplicate_guard.active_for(survey):
+        await duplicate_guard.prepare(survey_id)
+        guard_keys = duplicate_guard.keys_for(row, row["ip_address"], user_agent)
+        if duplicate_guard.check_and_add(db, survey_id, guard_keys):
+            raise HTTPException(status_code=409, detail="이미 응답한 설문입니다")
+
+    # 인원 제한 설문은 원자적 UPDATE로 자리를 먼저 예약 (초과 제출은 409)
+    capped = survey["max_responses"] is not None
+    if capped:
+        if not survey_counter.try_reserve(db, survey_id, survey["max_responses"]):
+            db.rollback()
+            duplicate_guard.forget(survey_id, guard_keys)
+            raise HTTPException(status_code=409, detail="응답 인원이 마감된 설문입니다")
+        row["counted"] = True
+
+    if survey_ingest.running:
+        # write-behind: 버퍼에 넣고 바로 응답 (수 ms 안에 배치로 저장됨)
+        try:
+            ack = survey_ingest.submit(row)
+        except asyncio.QueueFull as exc:
+            if capped:
+                survey_counter.release(db, survey_id)
+                db.commit()
+            duplicate_guard.forget(survey_id, guard_keys)
+            raise HTTPException(
+                status_code=503,
+                detail="응답이 몰리고 있습니다. 잠시 후 다시 제출해주세요.",
+            ) from exc
+        if capped:
+            db.commit()
+        return JSONResponse(
+            status_code=202,
+            content=jsonable_encoder({
+                "success": True,
+                "survey_id": survey_id,
+                "response_id": None,
+                "ingest_id": ack["ingest_id"],
+                "submitted_at": ack["submitted_at"],
+            }),
+        )
+
+    row.pop("counted", None)
+    # 롤업 버킷과 저장 시각이 어긋나지 않도록 제출 시각을 직접 정함
+    row["submitted_at"] = datetime.now(timezone.utc)
+    response = SurveyResponseModel(**row)
 
-    db.add(response)
-    survey.current_responses = (survey.current_responses or 0) + 1
-    db.commit()
+    try:
+        db.add(response)
+        if not capped:
+            survey_counter.add(db, {survey_id: 1})
+        survey_aggregates.apply_responses(db, [row], {survey_id: survey["questions"]})
+        survey_rollups.apply_responses(db, [row])
+        db.commit()
+    except Exception:
+        # 저장되지 않았으므로 다시 제출할 수 있도록 중복 방지 키를 되돌림 (예약한 자리도 함께 롤백)
+        db.rollback()
+        duplicate_guard.forget(survey_id, guard_keys)
+        raise
     db.refresh(response)
 
     return {
@@ -447,6 +590,73 @@ async def submit_survey_response(
     }
 
 
+@router.get("/visitor/surveys/{survey_id}/bundle", response_model=SurveyBundleResponse)
+async def get_survey_bundle(
+    survey_id: int,
+    request: Request,
+    response: Response,
+):
+    """
+    부스 키오스크가 로컬에 보관할 설문 번들 (오프라인에서도 설문을 띄울 수 있도록)
+
+    응답 수처럼 자주 바뀌는 값은 빼고 정의만 담아 ETag를 건다. 키오스크는 If-None-Match로
+    재검증하므로 바뀌지 않았으면 본문 없이 304만 오간다.
+    """
+    survey = await survey_cache.get(survey_id)
+
+    if not survey:
+        raise HTTPException(status_code=404, detail="설문을 찾을 수 없습니다")
+
+    bundle = {
+        key: survey[key]
+        for key in SurveyBundleResponse.model_fields
+        if key not in ("bundle_version", "batch_max_items")
+    }
+    bundle["batch_max_items"] = survey_batch.BATCH_MAX_ITEMS
+    version = hashlib.sha1(
+        json.dumps(bundle, sort_keys=True, default=str, ensure_ascii=False).encode("utf-8")
+    ).hexdigest()
+    headers = {"ETag": f'"{version}"', "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return SurveyBundleResponse(**bundle, bundle_version=version)
+
+
+@router.post("/visitor/surveys/{survey_id}/responses/batch", response_model=SurveyBatchResponse)
+async def submit_survey_response_batch(
+    survey_id: int,
+    payload: SurveyBatchRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    키오스크 오프라인 큐 일괄 제출 (멱등)
+
+    응답마다 client_key가 있어 같은 묶음을 다시 보내도 한 번만 저장된다.
+    답변 검증에 실패한 응답은 invalid와 항목별 errors로 돌려준다.
+    결과는 응답별 status로 돌려주며, 태블릿은 created/duplicate/full/invalid 모두 큐에서 지운다.
+    """
+    if len(payload.responses) > survey_batch.BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"한 번에 최대 {survey_batch.BATCH_MAX_ITEMS}건까지 보낼 수 있습니다",
+        )
+
+    survey = await survey_cache.get(survey_id)
+
+    if not survey:
+        raise HTTPException(status_code=404, detail="설문을 찾을 수 없습니다")
+
+    if not survey["is_active"]:
+        raise HTTPException(status_code=400, detail="현재 응답을 받을 수 없는 설문입니다")
+
+    if duplicate_guard.active_for(survey):
+        await duplicate_guard.prepare(survey_id)
+    result = survey_batch.submit_batch(db, survey, [item.model_dump() for item in payload.responses])
+    return {"success": True, "survey_id": survey_id, **result}
+
+
 @router.get("/visitor/maps-api-key")
 @router.get("/visitor/maps_api_key")
 @router.get("/maps-api-key")
@@ -0,0 +1,304 @@
+# services/analysis_queue.py
+"""
+LLM 이미지 분석 작업 큐 - 제한된 워커 풀로 비동기 처리
+
+`/events/analyze-image?async_job=true` 요청은 작업을 큐에 넣고 job_id를 즉시 반환한다.
+워커 수(LLM_ANALYSIS_WORKERS)만큼만 동시에 LLM을 호출하고, 큐 길이는
+LLM_ANALYSIS_QUEUE_SIZE로 제한한다. 결과는 폴링 또는 SSE로 조회한다.
+
+작업은 요청을 받은 워커 프로세스에서 실행되지만, 상태가 바뀔 때마다 cache_entries
+(네임스페이스 analysis:jobs)에도 기록하므로 uvicorn 워커/노드가 여럿이어도 폴링·SSE 요청이
+어느 워커로 가든 조회된다 (LLM_ANALYSIS_SHARED_JOBS=false면 단일 워커 배포 전용).
+"""
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+from services.cache_service import PersistentTTLCache
+
+logger = logging.getLogger(__name__)
+
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+FINISHED_STATUSES = (JOB_DONE, JOB_FAILED)
+
+# 다른 워커가 실행 중인 작업을 SSE로 전달할 때 공유 저장소를 다시 읽는 간격
+REMOTE_POLL_SECONDS = 1.0
+
+
+class AnalysisJob:
+    """큐에 들어간 분석 작업 하나"""
+
+    def __init__(self, payload: Dict[str, Any]):
+        self.id = uuid.uuid4().hex
+        self.payload = payload
+        self.status = JOB_QUEUED
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._changed = asyncio.Event()
+        # 공유 저장소 기록 순서 보장 (늦게 끝난 기록이 최신 상태를 덮어쓰지 않도록)
+        self.publish_lock = asyncio.Lock()
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    @property
+    def wait_ms(self) -> Optional[int]:
+        """큐 대기 시간 (ms)"""
+        if self.started_at is None:
+            return None
+        return int((self.started_at - self.created_at) * 1000)
+
+    @property
+    def processing_ms(self) -> Optional[int]:
+        """실제 처리 시간 (ms)"""
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return int((self.finished_at - self.started_at) * 1000)
+
+    def mark(self, status: str) -> None:
+        """상태 변경 후 대기 중인 구독자(SSE)를 깨운다."""
+        self.status = status
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def wait_for_change(self, timeout: float) -> bool:
+        """상태가 바뀔 때까지 대기 (timeout 초 경과 시 False)"""
+        changed = self._changed
+        try:
+            await asyncio.wait_for(changed.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "wait_ms": self.wait_ms,
+            "processing_ms": self.processing_ms,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class _DurationStats:
+    """최근 N개 측정값의 평균/p95 (워커 수 산정용)"""
+
+    def __init__(self, maxlen: int = 500):
+        self._values: Deque[float] = deque(maxlen=maxlen)
+
+    def add(self, value_ms: float) -> None:
+        self._values.append(value_ms)
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        if not self._values:
+            return {"count": 0, "avg_ms": None, "p95_ms": None, "max_ms": None}
+        ordered = sorted(self._values)
+        p95_index = min(len(ordered) - 1, int(len(ordered) * 0.95))
+        return {
+            "count": len(ordered),
+            "avg_ms": round(sum(ordered) / len(ordered), 1),
+            "p95_ms": round(ordered[p95_index], 1),
+            "max_ms": round(ordered[-1], 1),
+        }
+
+
+class AnalysisJobQueue:
+    """제한된 크기의 asyncio 큐 + 고정 크기 워커 풀"""
+
+    def __init__(self, handler: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]):
+        self._handler = handler
+        self.worker_count = max(1, int(os.getenv("LLM_ANALYSIS_WORKERS", "4")))
+        self.max_queue_size = max(1, int(os.getenv("LLM_ANALYSIS_QUEUE_SIZE", "100")))
+        self.job_ttl_seconds = int(os.getenv("LLM_ANALYSIS_JOB_TTL_SECONDS", "900"))
+        self.shared = os.getenv("LLM_ANALYSIS_SHARED_JOBS", "true").lower() == "true"
+        # 워커 간 작업 상태 공유 - 항상 DB에서 읽으므로 메모리 항목은 두지 않는다
+        self._shared_jobs = PersistentTTLCache(
+            "analysis:jobs", max_entries=1, ttl_seconds=self.job_ttl_seconds, persist=True
+        )
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: list = []
+        self._jobs: Dict[str, AnalysisJob] = {}
+        self._in_flight = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._wait_stats = _DurationStats()
+        self._processing_stats = _DurationStats()
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    async def start(self) -> None:
+        """워커 시작 (앱 lifespan에서 호출)"""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._workers = [
+            asyncio.create_task(self._worker(index), name=f"llm-analysis-worker-{index}")
+            for index in range(self.worker_count)
+        ]
+        logger.info(
+            "LLM 분석 워커 %d개 시작 (큐 최대 %d건)", self.worker_count, self.max_queue_size
+        )
+
+    async def stop(self) -> None:
+        """
+        워커 종료
+
+        대기/실행 중인 작업은 먼저 실패로 기록해 공유 저장소에 남긴다
+        (다른 워커의 폴링·SSE 구독자가 TTL까지 기다리지 않도록).
+        """
+        unfinished = [job for job in self._jobs.values() if not job.is_finished]
+        for job in unfinished:
+            job.error = "서버가 종료되어 작업이 취소되었습니다. 다시 시도해주세요."
+            job.finished_at = time.time()
+            job.mark(JOB_FAILED)
+        if unfinished:
+            await asyncio.gather(*(self.publish(job) for job in unfinished), return_exceptions=True)
+            logger.warning("종료로 취소된 LLM 분석 작업 %d건을 실패로 기록했습니다.", len(unfinished))
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        logger.info("LLM 분석 워커가 중지되었습니다.")
+
+    def submit(self, payload: Dict[str, Any]) -> AnalysisJob:
+        """작업을 큐에 넣는다. 큐가 가득 찼으면 asyncio.QueueFull 발생"""
+        if not self.running or self._queue is None:
+            raise RuntimeError("분석 작업 큐가 실행 중이 아닙니다.")
+
+        self._prune_finished_jobs()
+        job = AnalysisJob(payload)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self._rejected += 1
+            raise
+        self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[AnalysisJob]:
+        """이 워커가 받은 작업 (다른 워커의 작업은 lookup)"""
+        return self._jobs.get(job_id)
+
+    async def lookup(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """작업 상태 (이 워커의 작업이면 현재 상태, 아니면 공유 저장소에 기록된 마지막 상태)"""
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job.to_dict()
+        if not self.shared:
+            return None
+        return await self._shared_jobs.get(job_id, refresh=True)
+
+    async def publish(self, job: AnalysisJob) -> None:
+        """작업의 현재 상태를 공유 저장소에 기록 (submit 직후와 상태가 바뀔 때마다)"""
+        if not self.shared:
+            return
+        async with job.publish_lock:
+            await self._shared_jobs.set(job.id, job.to_dict())
+
+    def stats(self) -> Dict[str, Any]:
+        """큐 깊이, 대기/처리 시간 (워커 수 산정용 지표)"""
+        return {
+            "workers": self.worker_count,
+            "running": self.running,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "queue_capacity": self.max_queue_size,
+            "in_flight": self._in_flight,
+            "completed": self._completed,
+            "failed": self._failed,
+            "rejected": self._rejected,
+            "tracked_jobs": len(self._jobs),
+            "shared_jobs": self.shared,
+            "wait_time": self._wait_stats.summary(),
+            "processing_time": self._processing_stats.summary(),
+        }
+
+    async def _worker(self, index: int) -> None:
+        assert self._queue is not None
+        while True:
+            job: AnalysisJob = await self._queue.get()
+            job.started_at = time.time()
+            job.mark(JOB_RUNNING)
+            self._in_flight += 1
+            self._wait_stats.add((job.started_at - job.created_at) * 1000)
+            try:
+                await self.publish(job)
+                job.result = await self._handler(job.payload)
+                job.finished_at = time.time()
+                self._completed += 1
+                job.mark(JOB_DONE)
+                await self.publish(job)
+            except asyncio.CancelledError:
+                if not job.is_finished:  # stop()이 이미 실패로 기록했으면 그대로 둔다
+                    job.error = "작업이 취소되었습니다."
+                    job.finished_at = time.time()
+                    job.mark(JOB_FAILED)
+                    await asyncio.shield(self.publish(job))
+                raise
+            except Exception as exc:  # noqa: BLE001
+                logger.error("LLM 분석 작업 실패 (job=%s, worker=%d): %s", job.id, index, exc)
+                job.error = str(exc)
+                job.finished_at = time.time()
+                self._failed += 1
+                job.mark(JOB_FAILED)
+                await self.publish(job)
+            finally:
+                self._in_flight -= 1
+                if job.finished_at is not None:
+                    self._processing_stats.add((job.finished_at - job.started_at) * 1000)
+                self._queue.task_done()
+
+    def _prune_finished_jobs(self) -> None:
+        """TTL이 지난 완료 작업 정리 (메모리 상한 유지)"""
+        cutoff = time.time() - self.job_ttl_seconds
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.is_finished and (job.finished_at or 0) < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+async def _run_event_analysis(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """워커가 실행하는 실제 분석 작업"""
+    from services.llm_service import llm_service
+    from services.storage import storage
+
+    file_path = payload["file_path"]  # 저장소 임시 키
+    try:
+        result = await llm_service.analyze_and_fill_event_form(
+            image_url=file_path,
+            provider=payload.get("provider"),
+        )
+    except Exception:
+        # 오류 시 임시 파일 삭제 (동기 분석과 동일한 동작)
+        await storage.delete(file_path)
+        raise
+
+    result["temp_image_url"] = payload["temp_image_url"]
+    result["temp_image_path"] = file_path  # 서버 내부용 (저장소 키)
+    result["original_filename"] = payload["original_filename"]
+    return result
+
+
+# 싱글톤 인스턴스
+analysis_queue = AnalysisJobQueue(handler=_run_event_analysis)
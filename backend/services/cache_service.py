@@ -0,0 +1,193 @@
+# services/cache_service.py
+"""
+메모리 LRU + TTL 캐시 (선택적으로 PostgreSQL에 영속화하여 워커 간 공유)
+
+- 메모리: 네임스페이스별 최대 항목 수 제한 (가장 오래 사용하지 않은 항목부터 제거)
+- DB: cache_entries 테이블 (persist=True일 때) - 메모리 미스 시 조회, 저장 시 upsert
+- 키: 정규화된 입력(dict)의 SHA-256
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _normalize(value: Any) -> Any:
+    """공백 차이만 있는 입력이 같은 키가 되도록 정규화"""
+    if isinstance(value, str):
+        return _WHITESPACE.sub(" ", value).strip()
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in sorted(value.items())}
+    if isinstance(value, (list, tuple, set)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def make_cache_key(**parts: Any) -> str:
+    """정규화된 입력으로 캐시 키(SHA-256 hex) 생성"""
+    payload = json.dumps(_normalize(parts), ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class PersistentTTLCache:
+    """네임스페이스 하나에 대한 LRU + TTL 캐시"""
+
+    def __init__(
+        self,
+        namespace: str,
+        max_entries: int = 1000,
+        ttl_seconds: int = 86400,
+        persist: bool = False,
+    ) -> None:
+        self.namespace = namespace
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.persist = persist
+
+        # key -> (만료 시각(epoch), 값)
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._metrics = {
+            "hits": 0,
+            "db_hits": 0,
+            "misses": 0,
+            "sets": 0,
+            "evictions": 0,
+            "db_errors": 0,
+        }
+
+    async def get(self, key: str, refresh: bool = False) -> Optional[Any]:
+        """refresh=True면 메모리를 건너뛰고 DB에서 읽는다 (다른 워커가 계속 갱신하는 값)"""
+        entry = None if refresh and self.persist else self._entries.get(key)
+        now = time.time()
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > now:
+                self._entries.move_to_end(key)
+                self._metrics["hits"] += 1
+                return value
+            del self._entries[key]
+
+        if self.persist:
+            stored = await asyncio.to_thread(self._db_get, key)
+            if stored is not None:
+                expires_at, value = stored
+                self._remember(key, value, expires_at)
+                self._metrics["db_hits"] += 1
+                return value
+
+        self._metrics["misses"] += 1
+        return None
+
+    async def set(self, key: str, value: Any, ttl_seconds: Optional[int] = None) -> None:
+        expires_at = time.time() + (ttl_seconds or self.ttl_seconds)
+        self._remember(key, value, expires_at)
+        self._metrics["sets"] += 1
+        if self.persist:
+            await asyncio.to_thread(self._db_set, key, value, expires_at)
+
+    def invalidate(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._metrics["hits"] + self._metrics["db_hits"] + self._metrics["misses"]
+        hit_count = self._metrics["hits"] + self._metrics["db_hits"]
+        return {
+            "namespace": self.namespace,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "persist": self.persist,
+            "hit_rate": round(hit_count / lookups, 3) if lookups else None,
+            **self._metrics,
+        }
+
+    def _remember(self, key: str, value: Any, expires_at: float) -> None:
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._metrics["evictions"] += 1
+
+    # ---------- PostgreSQL 영속화 (스레드에서 실행) ----------
+
+    def _db_get(self, key: str) -> Optional[Tuple[float, Any]]:
+        from database import SessionLocal
+        from models.cache_entry import CacheEntry
+
+        db = SessionLocal()
+        try:
+            entry = (
+                db.query(CacheEntry)
+                .filter(
+                    CacheEntry.namespace == self.namespace,
+                    CacheEntry.cache_key == key,
+                    CacheEntry.expires_at > datetime.now(timezone.utc),
+                )
+                .first()
+            )
+            if entry is None:
+                return None
+            return entry.expires_at.timestamp(), entry.value
+        except Exception as exc:  # noqa: BLE001
+            self._metrics["db_errors"] += 1
+            logger.warning("캐시 조회 실패 (%s): %s", self.namespace, exc)
+            return None
+        finally:
+            db.close()
+
+    def _db_set(self, key: str, value: Any, expires_at: float) -> None:
+        from sqlalchemy.dialects.postgresql import insert
+
+        from database import SessionLocal
+        from models.cache_entry import CacheEntry
+
+        expires = datetime.fromtimestamp(expires_at, tz=timezone.utc)
+        statement = insert(CacheEntry).values(
+            namespace=self.namespace,
+            cache_key=key,
+            value=value,
+            expires_at=expires,
+        )
+        statement = statement.on_conflict_do_update(
+            constraint="pk_cache_entries",
+            set_={"value": statement.excluded.value, "expires_at": statement.excluded.expires_at},
+        )
+
+        db = SessionLocal()
+        try:
+            db.execute(statement)
+            db.commit()
+        except Exception as exc:  # noqa: BLE001
+            db.rollback()
+            self._metrics["db_errors"] += 1
+            logger.warning("캐시 저장 실패 (%s): %s", self.namespace, exc)
+        finally:
+            db.close()
+
+
+def purge_expired_cache_entries() -> int:
+    """만료된 cache_entries 행 삭제 (스케줄러에서 호출)"""
+    from database import SessionLocal
+    from models.cache_entry import CacheEntry
+
+    db = SessionLocal()
+    try:
+        deleted = (
+            db.query(CacheEntry)
+            .filter(CacheEntry.expires_at <= datetime.now(timezone.utc) - timedelta(minutes=1))
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+        return deleted
+    finally:
+        db.close()
@@ -20,13 +20,26 @@ MAIL_USERNAME = os.getenv("MAIL_USERNAME")
 MAIL_PASSWORD = os.getenv("MAIL_PASSWORD")
 MAIL_FROM = os.getenv("MAIL_FROM", MAIL_USERNAME)
 MAIL_USE_TLS = os.getenv("MAIL_USE_TLS", "true").lower() == "true"
+# "fake"면 실제 SMTP 대신 프로세스 내 가짜 서버 사용 (FAKE_MAIL_* 로 지연/오류율 조절)
+MAIL_BACKEND = os.getenv("MAIL_BACKEND", "smtp").lower()
 
 
 def _is_configured() -> bool:
     """Return True if SMTP credentials are present."""
+    if MAIL_BACKEND == "fake":
+        return True
     return all([MAIL_SERVER, MAIL_USERNAME, MAIL_PASSWORD, MAIL_FROM])
 
 
+def _smtp_client_class():
+    """Return smtplib.SMTP, or the in-process fake when MAIL_BACKEND=fake."""
+    if MAIL_BACKEND == "fake":
+        from services.fake_providers import FakeSMTP
+
+        return FakeSMTP
+    return smtplib.SMTP
+
+
 def send_html_email(recipient_email: str, subject: str, html_body: str) -> bool:
     """Send a generic HTML email. Returns False when SMTP is not configured."""
     if not _is_configured():
@@ -41,12 +54,12 @@ def send_html_email(recipient_email: str, subject: str, html_body: str) -> bool:
 
     msg = MIMEMultipart("alternative")
     msg["Subject"] = subject
-    msg["From"] = MAIL_FROM
+    msg["From"] = MAIL_FROM or "noreply@example.com"
     msg["To"] = recipient_email
     msg.attach(MIMEText(html_body, "html"))
 
     try:
-        with smtplib.SMTP(MAIL_SERVER, MAIL_PORT, timeout=30) as server:
+        with _smtp_client_class()(MAIL_SERVER, MAIL_PORT, timeout=30) as server:
             if MAIL_USE_TLS:
                 server.starttls()
             server.login(MAIL_USERNAME, MAIL_PASSWORD)
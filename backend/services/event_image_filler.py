@@ -0,0 +1,411 @@
+# services/event_image_filler.py
+"""
+이벤트 자동 이미지(Unsplash) 백그라운드 채우기
+
+create_event는 이벤트를 바로 저장하고 ID만 이 큐에 넣는다. 워커가 짧은 시간 동안 모인
+이벤트를 배치로 묶어 Unsplash를 조회하고(동시 요청 수 제한), 사진을 로컬에 미러링한 뒤
+(services/image_mirror.py) 결과를 한 트랜잭션으로 unsplash_image_url에 기록한다. 실패한 이벤트는 지수 백오프로 재시도하고, 끝내 실패한
+이벤트는 스케줄러의 주기적 스윕이나 백필 명령으로 다시 처리된다.
+
+스윕은 워커 프로세스마다 돌기 때문에, 외부 API를 부르기 전에 cache_entries에 이벤트별 점유 행을
+(UNSPLASH_FILL_CLAIM_MINUTES 동안) 먼저 넣은 프로세스만 처리한다. 같은 프로세스의 재시도는 점유를 연장한다.
+
+백필:
+    python -m services.event_image_filler --limit 500
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+CLAIM_NAMESPACE = "event_image_fill"
+CLAIM_MINUTES = float(os.getenv("UNSPLASH_FILL_CLAIM_MINUTES", "25"))
+
+
+def _claim_owner() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _claim(db, event_ids: List[int]) -> Set[int]:
+    """
+    이벤트 점유 (다른 프로세스가 점유 중이 아니거나 점유가 만료됐으면, 또는 이 프로세스의 점유면 연장)
+    점유한 이벤트 ID 반환
+    """
+    from sqlalchemy import or_
+    from sqlalchemy.dialects.postgresql import insert
+
+    from models.cache_entry import CacheEntry
+
+    if not event_ids:
+        return set()
+    now = datetime.now(timezone.utc)
+    owner = _claim_owner()
+    statement = insert(CacheEntry).values([
+        {
+            "namespace": CLAIM_NAMESPACE,
+            "cache_key": str(event_id),
+            "value": {"owner": owner},
+            "expires_at": now + timedelta(minutes=CLAIM_MINUTES),
+        }
+        for event_id in sorted(event_ids)
+    ])
+    statement = statement.on_conflict_do_update(
+        constraint="pk_cache_entries",
+        set_={"value": statement.excluded.value, "expires_at": statement.excluded.expires_at},
+        where=or_(CacheEntry.expires_at <= now, CacheEntry.value["owner"].astext == owner),
+    ).returning(CacheEntry.cache_key)
+    claimed = {int(key) for key in db.execute(statement).scalars()}
+    db.commit()
+    return claimed
+
+
+def _load_events(event_ids: List[int]) -> List[Dict]:
+    """이미지가 아직 없는 이벤트의 검색 입력값 조회 - 이 프로세스가 점유한 이벤트만 (스레드에서 실행)"""
+    from sqlalchemy.orm import selectinload
+
+    from database import SessionLocal
+    from models.event import Event
+
+    db = SessionLocal()
+    try:
+        events = (
+            db.query(Event)
+            .options(selectinload(Event.tags))
+            .filter(
+                Event.id.in_(event_ids),
+                Event.unsplash_image_url.is_(None),
+                Event.image_url.is_(None),
+            )
+            .all()
+        )
+        claimed = _claim(db, [event.id for event in events])
+        skipped = len(events) - len(claimed)
+        if skipped:
+            logger.info("다른 프로세스가 처리 중인 이벤트 %d건은 건너뜀", skipped)
+        return [
+            {
+                "id": event.id,
+                "event_name": event.event_name,
+                "description": event.description or "",
+                "tags": [tag.name for tag in event.tags],
+            }
+            for event in events
+            if event.id in claimed
+        ]
+    finally:
+        db.close()
+
+
+def _save_images(images: Dict[int, Dict]) -> int:
+    """조회한 이미지를 한 트랜잭션으로 저장 - 그 사이 이미지가 생긴 이벤트는 건드리지 않음"""
+    from database import SessionLocal
+    from models.event import Event
+
+    db = SessionLocal()
+    try:
+        updated = 0
+        for event_id, image in images.items():
+            updated += (
+                db.query(Event)
+                .filter(
+                    Event.id == event_id,
+                    Event.unsplash_image_url.is_(None),
+                    Event.image_url.is_(None),
+                )
+                .update(
+                    {
+                        Event.unsplash_image_url: image["url"],
+                        Event.image_variants: image.get("variants"),
+                        Event.image_attribution: image.get("attribution"),
+                    },
+                    synchronize_session=False,
+                )
+            )
+        db.commit()
+        return updated
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def find_events_missing_images(
+    limit: int, min_age_minutes: int = 0, max_age_hours: Optional[int] = None
+) -> List[int]:
+    """자동 이미지가 필요한데 아직 없는 이벤트 ID (오래된 순)"""
+    from database import SessionLocal
+    from models.event import Event
+
+    db = SessionLocal()
+    try:
+        query = db.query(Event.id).filter(
+            Event.unsplash_image_url.is_(None),
+            Event.image_url.is_(None),
+            Event.has_custom_image.isnot(True),
+        )
+        if min_age_minutes:
+            cutoff = datetime.now(timezone.utc) - timedelta(minutes=min_age_minutes)
+            query = query.filter(Event.created_at <= cutoff)
+        if max_age_hours:
+            since = datetime.now(timezone.utc) - timedelta(hours=max_age_hours)
+            query = query.filter(Event.created_at >= since)
+        return [row.id for row in query.order_by(Event.id).limit(limit).all()]
+    finally:
+        db.close()
+
+
+class EventImageFiller:
+    """이벤트 ID 큐 + 배치 워커 (앱 lifespan에서 시작/종료)"""
+
+    def __init__(self) -> None:
+        self.batch_size = max(1, int(os.getenv("UNSPLASH_FILL_BATCH_SIZE", "10")))
+        self.batch_window = float(os.getenv("UNSPLASH_FILL_BATCH_WINDOW_MS", "500")) / 1000
+        self.concurrency = max(1, int(os.getenv("UNSPLASH_FILL_CONCURRENCY", "4")))
+        self.max_attempts = max(1, int(os.getenv("UNSPLASH_FILL_MAX_ATTEMPTS", "4")))
+        self.retry_base_seconds = float(os.getenv("UNSPLASH_FILL_RETRY_BASE_SECONDS", "30"))
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._pending: Set[int] = set()  # 큐에 있거나 재시도 대기 중인 이벤트 (중복 방지)
+        self._attempts: Dict[int, int] = {}
+        self._retry_handles: Dict[int, asyncio.TimerHandle] = {}
+        self.counters = {"filled": 0, "retried": 0, "gave_up": 0, "batches": 0}
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run(), name="event-image-filler")
+        logger.info("이벤트 이미지 백그라운드 워커 시작 (배치 %d건, 동시 %d건)", self.batch_size, self.concurrency)
+
+    async def stop(self) -> None:
+        for handle in self._retry_handles.values():
+            handle.cancel()
+        self._retry_handles.clear()
+        if self._worker is not None:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+        self._worker = None
+        self._pending.clear()
+
+    def enqueue(self, event_id: int) -> bool:
+        """이벤트 하나를 이미지 채우기 대상으로 등록 (이벤트 루프 안에서 호출)"""
+        if not self.running or self._queue is None:
+            logger.warning("이미지 워커가 실행 중이 아니어서 이벤트 %s는 스윕에서 처리됩니다.", event_id)
+            return False
+        if event_id in self._pending:
+            return False
+        self._pending.add(event_id)
+        self._queue.put_nowait(event_id)
+        return True
+
+    def enqueue_threadsafe(self, event_ids: List[int]) -> None:
+        """스케줄러 스레드 등 다른 스레드에서 등록"""
+        if self._loop is None or not self.running:
+            return
+        for event_id in event_ids:
+            self._loop.call_soon_threadsafe(self.enqueue, event_id)
+
+    def sweep(self) -> int:
+        """
+        최근 이벤트 중 이미지가 없는 것을 다시 큐에 넣음 (APScheduler 스레드에서 호출)
+
+        검색 결과가 없는 이벤트가 매번 한도를 쓰지 않도록 최근 48시간 이벤트만 본다.
+        그보다 오래된 이벤트는 백필 명령으로 처리한다.
+        """
+        if not self.running:
+            return 0
+        candidates = find_events_missing_images(
+            limit=self.batch_size * 20, min_age_minutes=10, max_age_hours=48
+        )
+        event_ids = [event_id for event_id in candidates if event_id not in self._pending]
+        for event_id in event_ids:
+            # 스윕으로 다시 들어온 이벤트는 재시도 횟수를 새로 센다
+            self._attempts.pop(event_id, None)
+        self.enqueue_threadsafe(event_ids)
+        return len(event_ids)
+
+    def stats(self) -> Dict:
+        return {
+            "running": self.running,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "pending": len(self._pending),
+            "waiting_retry": len(self._retry_handles),
+            **self.counters,
+        }
+
+    async def _next_batch(self) -> List[int]:
+        """첫 항목을 기다린 뒤 batch_window 동안 더 모아서 반환"""
+        assert self._queue is not None
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.batch_window
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self._process_batch(batch)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:  # noqa: BLE001
+                logger.error("이벤트 이미지 배치 처리 실패 (%d건): %s", len(batch), exc)
+                for event_id in batch:
+                    self._schedule_retry(event_id)
+
+    async def _process_batch(self, event_ids: List[int]) -> None:
+        self.counters["batches"] += 1
+        events = await asyncio.to_thread(_load_events, event_ids)
+        found = {event["id"] for event in events}
+        for event_id in event_ids:
+            if event_id not in found:
+                # 삭제됐거나 이미 이미지가 있거나 다른 프로세스가 처리 중
+                self._done(event_id)
+
+        images, failed = await fill_images(events, self.concurrency)
+        if images:
+            await asyncio.to_thread(_save_images, images)
+        for event_id in images:
+            self.counters["filled"] += 1
+            self._done(event_id)
+        for event_id in failed:
+            self._schedule_retry(event_id)
+
+    def _done(self, event_id: int) -> None:
+        self._pending.discard(event_id)
+        self._attempts.pop(event_id, None)
+
+    def _schedule_retry(self, event_id: int) -> None:
+        attempts = self._attempts.get(event_id, 0) + 1
+        if attempts >= self.max_attempts:
+            logger.warning("이벤트 %s 이미지 채우기 %d회 실패 - 다음 스윕에서 다시 시도", event_id, attempts)
+            self.counters["gave_up"] += 1
+            self._done(event_id)
+            return
+        self._attempts[event_id] = attempts
+
+        from services.unsplash_service import get_unsplash_service
+
+        # 시간당 한도를 다 썼으면 토큰이 다시 생길 때까지는 기다린다
+        delay = max(
+            self.retry_base_seconds * (2 ** (attempts - 1)),
+            get_unsplash_service().rate_limit_wait_seconds(),
+        )
+        self.counters["retried"] += 1
+        assert self._loop is not None
+        self._retry_handles[event_id] = self._loop.call_later(delay, self._requeue, event_id)
+
+    def _requeue(self, event_id: int) -> None:
+        self._retry_handles.pop(event_id, None)
+        if self._queue is not None:
+            self._queue.put_nowait(event_id)
+
+
+async def fill_images(events: List[Dict], concurrency: int):
+    """
+    이벤트별 Unsplash 조회 + 로컬 미러링 (동시 요청 수 제한)
+
+    Returns:
+        (성공 {id: {"url", "variants", "attribution"}}, 실패 id 목록)
+        미러링에 실패하면 Unsplash URL을 그대로 사용한다.
+    """
+    from services.image_mirror import build_attribution, mirror_unsplash_photo
+    from services.unsplash_service import get_unsplash_service
+
+    unsplash_service = get_unsplash_service()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def lookup(event: Dict) -> Optional[Dict]:
+        async with semaphore:
+            image_data = await unsplash_service.get_event_image(
+                event_name=event["event_name"],
+                description=event["description"],
+                tags=event["tags"],
+                orientation="landscape",
+            )
+            if not image_data or not image_data.get("url_regular"):
+                return None
+            mirrored = await mirror_unsplash_photo(image_data)
+        return {
+            "url": mirrored["url"] if mirrored else image_data["url_regular"],  # 1080px width
+            "variants": mirrored["variants"] if mirrored else None,
+            "attribution": build_attribution(image_data),
+        }
+
+    results = await asyncio.gather(*(lookup(event) for event in events), return_exceptions=True)
+
+    images: Dict[int, Dict] = {}
+    failed: List[int] = []
+    for event, image in zip(events, results):
+        if isinstance(image, dict):
+            images[event["id"]] = image
+        else:
+            if isinstance(image, BaseException):
+                logger.error("이벤트 %s Unsplash 조회 오류: %s", event["id"], image)
+            failed.append(event["id"])
+    return images, failed
+
+
+async def backfill(limit: int, batch_size: int, concurrency: int, dry_run: bool = False) -> Dict[str, int]:
+    """기존 이벤트 중 이미지가 없는 이벤트 일괄 처리 (한 번씩만 시도)"""
+    from services.unsplash_service import close_unsplash_service
+
+    event_ids = await asyncio.to_thread(find_events_missing_images, limit)
+    summary = {"candidates": len(event_ids), "filled": 0, "failed": 0}
+    if dry_run:
+        return summary
+
+    try:
+        for start in range(0, len(event_ids), batch_size):
+            events = await asyncio.to_thread(_load_events, event_ids[start:start + batch_size])
+            images, failed = await fill_images(events, concurrency)
+            if images:
+                summary["filled"] += await asyncio.to_thread(_save_images, images)
+            summary["failed"] += len(failed)
+            logger.info(
+                "백필 진행: %d/%d (채움 %d, 실패 %d)",
+                min(start + batch_size, len(event_ids)), len(event_ids), summary["filled"], summary["failed"],
+            )
+    finally:
+        await close_unsplash_service()
+    return summary
+
+
+# 싱글톤 인스턴스
+event_image_filler = EventImageFiller()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="이미지가 없는 기존 이벤트에 Unsplash 이미지 채우기")
+    parser.add_argument("--limit", type=int, default=500, help="처리할 최대 이벤트 수")
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--dry-run", action="store_true", help="대상 이벤트 수만 출력")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    result = asyncio.run(backfill(args.limit, args.batch_size, args.concurrency, args.dry_run))
+    print(result)
@@ -0,0 +1,600 @@
+# services/fake_providers.py
+"""
+외부 API(OpenAI, Anthropic, Unsplash, SMTP)의 프로세스 내 가짜 구현 - 오프라인 부하 테스트용
+
+실제 SDK/프로토콜과 같은 인터페이스를 흉내 내므로 서비스 코드는 그대로 두고 클라이언트만 바꾼다.
+
+- LLM_BACKEND=fake      → llm_service (OpenAI/Anthropic 비동기 클라이언트 대체)
+- UNSPLASH_BACKEND=fake → unsplash_service (검색/다운로드 트리거 대체)
+- MAIL_BACKEND=fake     → email_service (smtplib.SMTP 대체, 보낸 메일은 fake_outbox에 보관)
+
+동작은 FAKE_<LLM|UNSPLASH|MAIL>_* 환경변수로 조절한다.
+- LATENCY_MS:        지연 시간 중앙값 (로그정규분포)
+- LATENCY_SIGMA:     로그정규분포 sigma (0이면 고정 지연, 0.5 정도면 긴 꼬리)
+- ERROR_RATE:        서버 오류(5xx) 확률 (0.0 ~ 1.0)
+- RATE_LIMIT_RATE:   429/403 rate limit 응답 확률
+- RATE_LIMIT:        "요청 수/초" 형식의 고정 윈도 한도 (예: Unsplash "50/3600")
+FAKE_SEED를 지정하면 난수 순서가 고정된다.
+"""
+
+import asyncio
+import hashlib
+import io
+import json
+import logging
+import math
+import os
+import random
+import smtplib
+import time
+from collections import deque
+from datetime import date, timedelta
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_rng = random.Random(os.getenv("FAKE_SEED") or None)
+
+# 제공자 프롬프트 캐시 최소 길이/유지 시간 (실제 제공자와 같은 수준으로 흉내)
+PROMPT_CACHE_MIN_TOKENS = 1024
+PROMPT_CACHE_TTL_SECONDS = 300
+
+
+class FakeRateLimited(Exception):
+    """가짜 백엔드가 rate limit 응답을 만들어야 할 때"""
+
+
+class FakeServerError(Exception):
+    """가짜 백엔드가 서버 오류 응답을 만들어야 할 때"""
+
+
+class FakeBehavior:
+    """지연 시간 분포 + 오류/rate limit 주입 설정 (FAKE_<NAME>_* 환경변수)"""
+
+    def __init__(
+        self,
+        name: str,
+        latency_ms: float,
+        latency_sigma: float = 0.35,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        rate_limit: Optional[str] = None,
+    ) -> None:
+        prefix = f"FAKE_{name.upper()}_"
+        self.name = name
+        self.latency_ms = float(os.getenv(prefix + "LATENCY_MS", latency_ms))
+        self.latency_sigma = float(os.getenv(prefix + "LATENCY_SIGMA", latency_sigma))
+        self.error_rate = float(os.getenv(prefix + "ERROR_RATE", error_rate))
+        self.rate_limit_rate = float(os.getenv(prefix + "RATE_LIMIT_RATE", rate_limit_rate))
+
+        self.window_limit: Optional[int] = None
+        self.window_seconds = 0.0
+        limit = os.getenv(prefix + "RATE_LIMIT", rate_limit or "")
+        if limit:
+            count, _, seconds = limit.partition("/")
+            self.window_limit = int(count)
+            self.window_seconds = float(seconds or 60)
+        self._window_started = time.monotonic()
+        self._window_count = 0
+
+        self.counters = {"requests": 0, "errors": 0, "rate_limited": 0}
+
+    def sample_latency(self) -> float:
+        """지연 시간 표본 (초)"""
+        if self.latency_ms <= 0:
+            return 0.0
+        if self.latency_sigma <= 0:
+            return self.latency_ms / 1000
+        return _rng.lognormvariate(math.log(self.latency_ms), self.latency_sigma) / 1000
+
+    def window_remaining(self) -> Optional[int]:
+        if self.window_limit is None:
+            return None
+        return max(0, self.window_limit - self._window_count)
+
+    def check(self) -> None:
+        """요청 하나를 세고, 주입할 실패가 있으면 예외 발생"""
+        self.counters["requests"] += 1
+
+        if self.window_limit is not None:
+            now = time.monotonic()
+            if now - self._window_started >= self.window_seconds:
+                self._window_started = now
+                self._window_count = 0
+            self._window_count += 1
+            if self._window_count > self.window_limit:
+                self.counters["rate_limited"] += 1
+                raise FakeRateLimited(f"{self.name}: {self.window_limit}/{self.window_seconds:g}s 한도 초과")
+
+        roll = _rng.random()
+        if roll < self.rate_limit_rate:
+            self.counters["rate_limited"] += 1
+            raise FakeRateLimited(f"{self.name}: rate limit (주입)")
+        if roll < self.rate_limit_rate + self.error_rate:
+            self.counters["errors"] += 1
+            raise FakeServerError(f"{self.name}: 서버 오류 (주입)")
+
+    async def wait(self) -> None:
+        await asyncio.sleep(self.sample_latency())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "latency_ms": self.latency_ms,
+            "latency_sigma": self.latency_sigma,
+            "error_rate": self.error_rate,
+            "rate_limit_rate": self.rate_limit_rate,
+            "window_limit": self.window_limit,
+            "window_seconds": self.window_seconds,
+            **self.counters,
+        }
+
+
+# ---------- LLM 공용 ----------
+
+def _estimate_tokens(text: str) -> int:
+    """대략적인 토큰 수 (한국어 위주 프롬프트 기준 2자당 1토큰)"""
+    return max(1, len(text) // 2)
+
+
+def _message_text(content: Any) -> str:
+    """메시지 content(문자열 또는 블록 목록)에서 텍스트만 이어 붙임"""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "\n".join(
+            block.get("text", "") for block in content if isinstance(block, dict)
+        )
+    return ""
+
+
+def _has_image(messages: List[Dict[str, Any]]) -> bool:
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, list) and any(
+            isinstance(block, dict) and block.get("type") in ("image", "image_url")
+            for block in content
+        ):
+            return True
+    return False
+
+
+_SAMPLE_EVENTS = (
+    ("AI 스타트업 데모데이", "코엑스", "3층 컨퍼런스룸 E", ["컨퍼런스", "IT"]),
+    ("친환경 생활용품 박람회", "킨텍스", "제2전시장 7홀", ["박람회", "친환경"]),
+    ("로컬 크래프트 맥주 페스티벌", "성수동", "S팩토리 야외무대", ["축제", "푸드"]),
+    ("어린이 과학 체험전", "부산 벡스코", "1전시장 B홀", ["체험행사", "교육"]),
+)
+
+
+def _fake_analysis_json() -> str:
+    """이미지 분석 응답 (EVENT_ANALYSIS_PROMPT 형식)"""
+    name, location, venue, categories = _rng.choice(_SAMPLE_EVENTS)
+    start = date.today() + timedelta(days=_rng.randint(3, 60))
+    result = {
+        "form_data": {
+            "eventName": name,
+            "boothNumber": f"{_rng.choice('ABCD')}-{_rng.randint(1, 120)}",
+            "location": location,
+            "venue": venue,
+            "startDate": start.isoformat(),
+            "endDate": (start + timedelta(days=_rng.randint(0, 3))).isoformat(),
+            "startTime": "10:00",
+            "endTime": "18:00",
+            "description": f"{name}에서 다양한 프로그램과 현장 이벤트를 만나보세요.",
+            "participationMethod": "현장 등록 또는 사전 예약",
+            "benefits": "선착순 기념품 증정",
+        },
+        "tags": ["체험가능", "무료관람", "사진촬영가능", "가족환영", "현장등록가능"],
+        "categories": categories,
+        "target_audience": ["일반 관람객"],
+        "atmosphere": ["활기찬"],
+    }
+    return "```json\n" + json.dumps(result, ensure_ascii=False, indent=2) + "\n```"
+
+
+def _fake_completion_text(system_text: str, prompt_text: str, has_image: bool) -> str:
+    """요청 종류(이미지 분석/태그/검색어/설명 개선)에 맞는 그럴듯한 응답"""
+    if has_image or "form_data" in system_text:
+        return _fake_analysis_json()
+    if "JSON 객체로만 반환" in prompt_text:
+        # 설문 답변 요약 (map/reduce)
+        themes = _rng.sample(["안내가 친절함", "체험이 재미있음", "대기 시간이 김", "굿즈가 좋음", "설명이 어려움"], 3)
+        return json.dumps(
+            {
+                "summary": "방문객 대부분이 체험과 안내에 만족했고, 일부는 대기 시간을 아쉬워했습니다.",
+                "themes": [
+                    {"theme": theme, "description": f"{theme}는 의견", "mentions": _rng.randint(1, 10),
+                     "sentiment": _rng.choice(["positive", "neutral", "negative"]), "quotes": [theme]}
+                    for theme in themes
+                ],
+            },
+            ensure_ascii=False,
+        )
+    if "JSON 배열" in prompt_text:
+        return json.dumps(
+            _rng.sample(["주차가능", "사전예약필수", "어린이환영", "인터랙티브", "교육적인", "네트워킹"], 5),
+            ensure_ascii=False,
+        )
+    if "image search" in system_text:
+        return _rng.choice(["exhibition hall crowd", "conference stage", "booth display product"])
+    return (
+        "다양한 전시와 체험 프로그램이 준비된 이번 행사에서 새로운 트렌드를 직접 만나보세요.\n\n"
+        "전문가와의 대화, 현장 한정 혜택까지 방문객 모두가 즐길 수 있는 시간이 될 것입니다."
+    )
+
+
+class _PromptCacheSim:
+    """제공자 측 prefix 캐시 흉내 - 같은 고정 prefix가 TTL 안에 다시 오면 캐시 적중"""
+
+    def __init__(self) -> None:
+        self._entries: Dict[str, float] = {}
+
+    def lookup(self, prefix: str) -> Tuple[int, int]:
+        """(캐시 읽기 토큰, 캐시 쓰기 토큰)"""
+        tokens = _estimate_tokens(prefix) if prefix else 0
+        if tokens < PROMPT_CACHE_MIN_TOKENS:
+            return 0, 0
+        key = hashlib.sha256(prefix.encode("utf-8")).hexdigest()
+        now = time.monotonic()
+        hit = self._entries.get(key, 0) > now
+        self._entries[key] = now + PROMPT_CACHE_TTL_SECONDS
+        return (tokens, 0) if hit else (0, tokens)
+
+
+def _split_chunks(text: str, size: int = 12) -> List[str]:
+    return [text[index:index + size] for index in range(0, len(text), size)] or [""]
+
+
+async def _paced(chunks: List[str], total_seconds: float) -> AsyncIterator[str]:
+    """전체 지연 중 30%를 첫 조각(TTFT) 전에, 나머지를 조각 사이에 나눠 보낸다."""
+    await asyncio.sleep(total_seconds * 0.3)
+    gap = total_seconds * 0.7 / max(1, len(chunks))
+    for chunk in chunks:
+        yield chunk
+        await asyncio.sleep(gap)
+
+
+# ---------- OpenAI ----------
+
+def _openai_error(exc: Exception) -> Exception:
+    import httpx
+    import openai
+
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    if isinstance(exc, FakeRateLimited):
+        response = httpx.Response(429, request=request, headers={"retry-after": "1"})
+        return openai.RateLimitError(str(exc), response=response, body=None)
+    response = httpx.Response(500, request=request)
+    return openai.InternalServerError(str(exc), response=response, body=None)
+
+
+class _FakeOpenAICompletions:
+    def __init__(self, behavior: FakeBehavior, cache: _PromptCacheSim) -> None:
+        self._behavior = behavior
+        self._cache = cache
+
+    async def create(
+        self,
+        model: str,
+        messages: List[Dict[str, Any]],
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        stream: bool = False,
+        stream_options: Optional[Dict[str, Any]] = None,
+        **_: Any,
+    ) -> Any:
+        try:
+            self._behavior.check()
+        except (FakeRateLimited, FakeServerError) as exc:
+            await asyncio.sleep(self._behavior.sample_latency() * 0.1)
+            raise _openai_error(exc) from None
+
+        system_text = "".join(
+            _message_text(m.get("content")) for m in messages if m.get("role") == "system"
+        )
+        prompt_text = "".join(_message_text(m.get("content")) for m in messages)
+        has_image = _has_image(messages)
+        text = _fake_completion_text(system_text, prompt_text, has_image)
+        if max_tokens:
+            text = text[: max_tokens * 2]
+
+        cached_tokens, _ = self._cache.lookup(system_text)
+        prompt_tokens = _estimate_tokens(prompt_text) + (765 if has_image else 0)
+        usage = SimpleNamespace(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=_estimate_tokens(text),
+            total_tokens=prompt_tokens + _estimate_tokens(text),
+            prompt_tokens_details=SimpleNamespace(cached_tokens=cached_tokens),
+        )
+        # 캐시 적중 시 입력 처리 시간이 줄어드는 효과를 반영
+        latency = self._behavior.sample_latency() * (0.8 if cached_tokens else 1.0)
+
+        if stream:
+            include_usage = bool((stream_options or {}).get("include_usage"))
+            return self._stream(model, text, usage if include_usage else None, latency)
+
+        await asyncio.sleep(latency)
+        return SimpleNamespace(
+            id=f"chatcmpl-fake-{_rng.getrandbits(32):08x}",
+            model=model,
+            choices=[
+                SimpleNamespace(
+                    index=0,
+                    message=SimpleNamespace(role="assistant", content=text),
+                    finish_reason="stop",
+                )
+            ],
+            usage=usage,
+        )
+
+    async def _stream(
+        self, model: str, text: str, usage: Optional[SimpleNamespace], latency: float
+    ) -> AsyncIterator[Any]:
+        async for piece in _paced(_split_chunks(text), latency):
+            yield SimpleNamespace(
+                model=model,
+                choices=[SimpleNamespace(index=0, delta=SimpleNamespace(content=piece), finish_reason=None)],
+                usage=None,
+            )
+        if usage is not None:
+            yield SimpleNamespace(model=model, choices=[], usage=usage)
+
+
+class FakeOpenAIClient:
+    """openai.AsyncOpenAI 대체 (chat.completions.create만 지원)"""
+
+    def __init__(self, behavior: Optional[FakeBehavior] = None) -> None:
+        self.behavior = behavior or FakeBehavior("llm", latency_ms=1200)
+        self.chat = SimpleNamespace(
+            completions=_FakeOpenAICompletions(self.behavior, _PromptCacheSim())
+        )
+
+
+# ---------- Anthropic ----------
+
+def _anthropic_error(exc: Exception) -> Exception:
+    import anthropic
+    import httpx
+
+    request = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+    if isinstance(exc, FakeRateLimited):
+        response = httpx.Response(429, request=request, headers={"retry-after": "1"})
+        return anthropic.RateLimitError(str(exc), response=response, body=None)
+    response = httpx.Response(500, request=request)
+    return anthropic.InternalServerError(str(exc), response=response, body=None)
+
+
+def _anthropic_cached_prefix(system: Any) -> Tuple[str, str]:
+    """(전체 system 텍스트, cache_control이 붙은 블록까지의 prefix)"""
+    if isinstance(system, str):
+        return system, ""
+    full, prefix = "", ""
+    for block in system or []:
+        full += block.get("text", "")
+        if block.get("cache_control"):
+            prefix = full
+    return full, prefix
+
+
+class _FakeAnthropicStream:
+    """messages.stream(...) 컨텍스트 매니저 (text_stream, get_final_message)"""
+
+    def __init__(self, message: SimpleNamespace, latency: float) -> None:
+        self._message = message
+        self._latency = latency
+        self.text_stream = _paced(_split_chunks(message.content[0].text), latency)
+
+    async def __aenter__(self) -> "_FakeAnthropicStream":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        return None
+
+    async def get_final_message(self) -> SimpleNamespace:
+        return self._message
+
+
+class _FakeAnthropicMessages:
+    def __init__(self, behavior: FakeBehavior, cache: _PromptCacheSim) -> None:
+        self._behavior = behavior
+        self._cache = cache
+
+    def _build(self, model: str, messages: List[Dict[str, Any]], system: Any, max_tokens: int) -> Tuple[SimpleNamespace, float]:
+        system_text, cached_prefix = _anthropic_cached_prefix(system)
+        prompt_text = "".join(_message_text(m.get("content")) for m in messages)
+        has_image = _has_image(messages)
+        text = _fake_completion_text(system_text, prompt_text, has_image)[: max_tokens * 2]
+
+        cache_read, cache_write = self._cache.lookup(cached_prefix)
+        # input_tokens는 캐시 이후 부분만 (실제 API와 동일)
+        input_tokens = (
+            _estimate_tokens(system_text + prompt_text) + (1600 if has_image else 0)
+            - cache_read - cache_write
+        )
+        message = SimpleNamespace(
+            id=f"msg_fake_{_rng.getrandbits(32):08x}",
+            model=model,
+            role="assistant",
+            content=[SimpleNamespace(type="text", text=text)],
+            stop_reason="end_turn",
+            usage=SimpleNamespace(
+                input_tokens=max(1, input_tokens),
+                output_tokens=_estimate_tokens(text),
+                cache_read_input_tokens=cache_read,
+                cache_creation_input_tokens=cache_write,
+            ),
+        )
+        latency = self._behavior.sample_latency() * (0.8 if cache_read else 1.0)
+        return message, latency
+
+    async def create(
+        self,
+        model: str,
+        messages: List[Dict[str, Any]],
+        max_tokens: int,
+        system: Any = None,
+        **_: Any,
+    ) -> SimpleNamespace:
+        try:
+            self._behavior.check()
+        except (FakeRateLimited, FakeServerError) as exc:
+            await asyncio.sleep(self._behavior.sample_latency() * 0.1)
+            raise _anthropic_error(exc) from None
+
+        message, latency = self._build(model, messages, system, max_tokens)
+        await asyncio.sleep(latency)
+        return message
+
+    def stream(
+        self,
+        model: str,
+        messages: List[Dict[str, Any]],
+        max_tokens: int,
+        system: Any = None,
+        **_: Any,
+    ) -> _FakeAnthropicStream:
+        try:
+            self._behavior.check()
+        except (FakeRateLimited, FakeServerError) as exc:
+            raise _anthropic_error(exc) from None
+
+        message, latency = self._build(model, messages, system, max_tokens)
+        return _FakeAnthropicStream(message, latency)
+
+
+class FakeAnthropicClient:
+    """anthropic.AsyncAnthropic 대체 (messages.create / messages.stream만 지원)"""
+
+    def __init__(self, behavior: Optional[FakeBehavior] = None) -> None:
+        self.behavior = behavior or FakeBehavior("llm", latency_ms=1500)
+        self.messages = _FakeAnthropicMessages(self.behavior, _PromptCacheSim())
+
+
+# ---------- Unsplash ----------
+
+class FakeUnsplashAPI:
+    """
+    Unsplash /search/photos, download_location 응답 흉내
+
+    (HTTP 상태, JSON 본문, 응답 헤더)를 반환한다. 한도 초과 시 실제 API처럼
+    403 "Rate Limit Exceeded" + X-Ratelimit-Remaining: 0.
+    """
+
+    def __init__(self, behavior: Optional[FakeBehavior] = None) -> None:
+        # 데모 키 기본 한도 50회/시간
+        self.behavior = behavior or FakeBehavior("unsplash", latency_ms=250, rate_limit="50/3600")
+
+    def _headers(self) -> Dict[str, str]:
+        remaining = self.behavior.window_remaining()
+        if remaining is None:
+            return {}
+        return {
+            "X-Ratelimit-Limit": str(self.behavior.window_limit),
+            "X-Ratelimit-Remaining": str(remaining),
+        }
+
+    async def search_photos(self, params: Dict[str, Any]) -> Tuple[int, Any, Dict[str, str]]:
+        await self.behavior.wait()
+        try:
+            self.behavior.check()
+        except FakeRateLimited:
+            return 403, "Rate Limit Exceeded", {**self._headers(), "X-Ratelimit-Remaining": "0"}
+        except FakeServerError:
+            return 503, "Service Unavailable", self._headers()
+
+        query = str(params.get("query", ""))
+        per_page = int(params.get("per_page", 10))
+        seed = hashlib.sha256(query.encode("utf-8")).hexdigest()[:10]
+        results = [
+            {
+                "id": f"fake-{seed}-{index}",
+                "description": f"{query} #{index + 1}",
+                "alt_description": query,
+                "urls": {
+                    size: f"https://images.unsplash.test/photo-{seed}-{index}?size={size}"
+                    for size in ("raw", "full", "regular", "small")
+                },
+                "links": {
+                    "html": f"https://unsplash.com/photos/fake-{seed}-{index}",
+                    "download_location": f"https://api.unsplash.test/photos/fake-{seed}-{index}/download",
+                },
+                "user": {
+                    "name": "Fake Photographer",
+                    "links": {"html": "https://unsplash.com/@fake"},
+                },
+            }
+            for index in range(per_page)
+        ]
+        return 200, {"total": per_page, "total_pages": 1, "results": results}, self._headers()
+
+    async def trigger_download(self, download_location: str) -> int:
+        await asyncio.sleep(self.behavior.sample_latency() * 0.5)
+        return 200
+
+    async def download_photo(self, url: str) -> bytes:
+        """CDN 이미지 다운로드 - URL별로 색이 정해지는 단색 JPEG"""
+        from PIL import Image
+
+        await asyncio.sleep(self.behavior.sample_latency())
+        digest = hashlib.sha256(url.encode("utf-8")).digest()
+        buffer = io.BytesIO()
+        Image.new("RGB", (1600, 1067), tuple(digest[:3])).save(buffer, "JPEG", quality=85)
+        return buffer.getvalue()
+
+
+# ---------- SMTP ----------
+
+# 가짜 SMTP로 보낸 메일 (최근 200건, 부하 테스트 검증용)
+fake_outbox: Deque[Dict[str, Any]] = deque(maxlen=200)
+
+_smtp_behavior: Optional[FakeBehavior] = None
+
+
+def _get_smtp_behavior() -> FakeBehavior:
+    global _smtp_behavior
+    if _smtp_behavior is None:
+        _smtp_behavior = FakeBehavior("mail", latency_ms=400)
+    return _smtp_behavior
+
+
+class FakeSMTP:
+    """smtplib.SMTP 대체 (동기 - 실제 SMTP 전송처럼 호출 스레드를 막는다)"""
+
+    def __init__(self, host: str = "", port: int = 0, timeout: float = 30) -> None:
+        self.host = host
+        self.port = port
+        self.behavior = _get_smtp_behavior()
+
+    def __enter__(self) -> "FakeSMTP":
+        # 연결 + EHLO 지연
+        time.sleep(self.behavior.sample_latency() * 0.3)
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        return None
+
+    def starttls(self) -> None:
+        return None
+
+    def login(self, user: str, password: str) -> None:
+        return None
+
+    def send_message(self, msg: Any) -> Dict[str, Any]:
+        time.sleep(self.behavior.sample_latency() * 0.7)
+        try:
+            self.behavior.check()
+        except FakeRateLimited as exc:
+            raise smtplib.SMTPResponseException(421, f"4.7.0 Try again later ({exc})".encode())
+        except FakeServerError as exc:
+            raise smtplib.SMTPServerDisconnected(str(exc))
+
+        fake_outbox.append(
+            {
+                "to": msg.get("To"),
+                "from": msg.get("From"),
+                "subject": msg.get("Subject"),
+                "sent_at": time.time(),
+            }
+        )
+        return {}
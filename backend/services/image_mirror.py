@@ -0,0 +1,150 @@
+# services/image_mirror.py
+"""
+Unsplash 사진 미러링 - 한 번만 내려받아 크기별 변형(JPEG/WebP)으로 저장
+
+방문자 페이지가 images.unsplash.com을 직접 참조하지 않도록 선택된 사진을
+저장소(services/storage.py)의 events/unsplash/ 아래에 저장하고 우리 URL로 서빙한다.
+파일명은 원본 내용의 해시라서 바뀌지 않으므로 장기 캐시(immutable)가 가능하다.
+"""
+
+import asyncio
+import hashlib
+import io
+import logging
+import os
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlencode
+
+from services.storage import IMMUTABLE_CACHE_CONTROL, storage
+
+logger = logging.getLogger(__name__)
+
+MIRROR_PREFIX = "events/unsplash/"
+
+# 카드(320/640), 상세(1080), 고해상도 화면(1600)
+VARIANT_WIDTHS = (320, 640, 1080, 1600)
+DEFAULT_WIDTH = 1080
+JPEG_QUALITY = 82
+WEBP_QUALITY = 78
+
+# Unsplash 가이드라인: 사진가/Unsplash 링크에 UTM 파라미터 포함
+UTM_PARAMS = urlencode({
+    "utm_source": os.getenv("UNSPLASH_APP_NAME", "booth_talk"),
+    "utm_medium": "referral",
+})
+
+
+def _with_utm(url: Optional[str]) -> Optional[str]:
+    if not url:
+        return url
+    return f"{url}{'&' if '?' in url else '?'}{UTM_PARAMS}"
+
+
+def build_attribution(image_data: Dict[str, Any]) -> Dict[str, Any]:
+    """이벤트에 저장할 출처 정보 (사진가, 프로필, 원본 사진 페이지)"""
+    return {
+        "source": "unsplash",
+        "photo_id": image_data.get("id"),
+        "photographer": image_data.get("photographer"),
+        "photographer_profile": _with_utm(image_data.get("photographer_profile")),
+        "photo_page": _with_utm(image_data.get("photo_page")),
+        "source_url": image_data.get("url_regular"),
+    }
+
+
+def _download_url(image_data: Dict[str, Any]) -> Optional[str]:
+    """가장 큰 변형 크기로 리사이즈된 원본 URL (raw + imgix 파라미터)"""
+    raw = image_data.get("url_raw")
+    if raw:
+        params = urlencode({"w": max(VARIANT_WIDTHS), "fm": "jpg", "q": 90, "fit": "max"})
+        return f"{raw}{'&' if '?' in raw else '?'}{params}"
+    return image_data.get("url_full") or image_data.get("url_regular")
+
+
+def _encode_variants(image_bytes: bytes) -> Tuple[str, Dict[int, Dict[str, bytes]]]:
+    """크기별 JPEG/WebP 인코딩 (CPU 작업 - 스레드에서 실행). (내용 해시, {폭: {확장자: 바이트}})"""
+    from PIL import Image, ImageOps
+
+    digest = hashlib.sha256(image_bytes).hexdigest()[:20]
+
+    with Image.open(io.BytesIO(image_bytes)) as source:
+        image = ImageOps.exif_transpose(source).convert("RGB")
+
+    widths = [width for width in VARIANT_WIDTHS if width < image.width] + [
+        min(image.width, max(VARIANT_WIDTHS))
+    ]
+    encoded: Dict[int, Dict[str, bytes]] = {}
+    for width in sorted(set(widths)):
+        height = round(image.height * width / image.width)
+        resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+        encoded[width] = {}
+        for fmt, extension, options in (
+            ("JPEG", "jpg", {"quality": JPEG_QUALITY, "optimize": True, "progressive": True}),
+            ("WEBP", "webp", {"quality": WEBP_QUALITY, "method": 4}),
+        ):
+            buffer = io.BytesIO()
+            resized.save(buffer, fmt, **options)
+            encoded[width][extension] = buffer.getvalue()
+    return digest, encoded
+
+
+async def _store_variants(image_bytes: bytes) -> Dict[str, Dict[str, str]]:
+    """변형을 저장소에 올리고 {폭: {확장자: URL}} 반환. 이미 있는 키는 다시 쓰지 않음"""
+    digest, encoded = await asyncio.to_thread(_encode_variants, image_bytes)
+    variants: Dict[str, Dict[str, str]] = {}
+    for width, files in encoded.items():
+        urls = {}
+        for extension, data in files.items():
+            key = f"{MIRROR_PREFIX}{digest}_{width}.{extension}"
+            if not await storage.exists(key):
+                await storage.put(
+                    key,
+                    data,
+                    content_type="image/jpeg" if extension == "jpg" else "image/webp",
+                    cache_control=IMMUTABLE_CACHE_CONTROL,
+                )
+            urls[extension] = storage.public_url(key)
+        variants[str(width)] = urls
+    return variants
+
+
+def default_variant_url(variants: Dict[str, Dict[str, str]]) -> Optional[str]:
+    """카드/상세 기본 이미지 - DEFAULT_WIDTH 이하 중 가장 큰 JPEG"""
+    if not variants:
+        return None
+    widths = sorted(int(width) for width in variants)
+    candidates = [width for width in widths if width <= DEFAULT_WIDTH] or widths[:1]
+    return variants[str(candidates[-1])]["jpg"]
+
+
+def build_srcset(variants: Optional[Dict[str, Dict[str, str]]], extension: str = "jpg") -> Optional[str]:
+    """<img srcset> 문자열"""
+    if not variants:
+        return None
+    return ", ".join(
+        f"{files[extension]} {width}w"
+        for width, files in sorted(variants.items(), key=lambda item: int(item[0]))
+        if extension in files
+    )
+
+
+async def mirror_unsplash_photo(image_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Unsplash 검색 결과를 저장소에 저장한다.
+
+    Returns:
+        {"url": 기본 미러 URL, "variants": {폭: {"jpg": URL, "webp": URL}}} 또는 실패 시 None
+        (실패하면 호출 측은 Unsplash URL을 그대로 사용)
+    """
+    from services.unsplash_service import get_unsplash_service
+
+    url = _download_url(image_data)
+    if not url:
+        return None
+    try:
+        image_bytes = await get_unsplash_service().download_photo(url)
+        variants = await _store_variants(image_bytes)
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Unsplash 사진 미러링 실패 (%s): %s", image_data.get("id"), exc)
+        return None
+    return {"url": default_variant_url(variants), "variants": variants}
@@ -0,0 +1,336 @@
+# services/llm_resilience.py
+"""
+LLM 제공자 라우팅 - 헤징(hedged request), 자동 페일오버, 제공자별 서킷 브레이커
+
+- 페일오버: 주 제공자가 실패하면 다음 제공자로 재시도
+- 헤징: 주 제공자가 p95 지연 시간 안에 응답하지 않으면 보조 제공자에도 같은 요청을 보내
+  먼저 도착한 응답을 사용하고 나머지는 취소
+- 서킷 브레이커: 연속 실패한 제공자는 일정 시간 호출하지 않음
+- 지연 시간 히스토그램: 제공자 × 작업(analyze/enhance/tags ...)별로 기록, 헤징 지연값 산출
+"""
+
+import asyncio
+import bisect
+import logging
+import os
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+PROVIDERS = ("openai", "anthropic")
+
+# 히스토그램 버킷 상한 (ms) - 마지막 버킷은 그 이상 전부
+LATENCY_BUCKETS_MS = (
+    100, 200, 300, 500, 750, 1000, 1500, 2000, 3000, 4000,
+    5000, 7500, 10000, 15000, 20000, 30000, 45000, 60000,
+)
+
+
+class LLMProvidersUnavailableError(RuntimeError):
+    """호출 가능한 제공자가 없을 때 (모든 서킷이 열림)"""
+
+
+class LatencyHistogram:
+    """고정 버킷 지연 시간 히스토그램"""
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.total = 0
+        self.sum_ms = 0.0
+
+    def observe(self, value_ms: float) -> None:
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, value_ms)] += 1
+        self.total += 1
+        self.sum_ms += value_ms
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """percent 분위가 속한 버킷의 상한 (ms). 표본이 없으면 None"""
+        if not self.total:
+            return None
+        threshold = self.total * percent / 100
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= threshold:
+                if index < len(LATENCY_BUCKETS_MS):
+                    return float(LATENCY_BUCKETS_MS[index])
+                return float(LATENCY_BUCKETS_MS[-1])
+        return float(LATENCY_BUCKETS_MS[-1])
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.total,
+            "avg_ms": round(self.sum_ms / self.total, 1) if self.total else None,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "buckets": {
+                (f"le_{bound}" if index < len(LATENCY_BUCKETS_MS) else "inf"): count
+                for index, (bound, count) in enumerate(
+                    zip(LATENCY_BUCKETS_MS + ("inf",), self.counts)
+                )
+                if count
+            },
+        }
+
+
+class CircuitBreaker:
+    """연속 실패 횟수 기반 서킷 브레이커 (closed → open → half_open)"""
+
+    def __init__(self, failure_threshold: int, reset_seconds: float) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        if self.state == "open" and time.monotonic() - (self.opened_at or 0) >= self.reset_seconds:
+            self.state = "half_open"
+            self._trial_in_flight = False
+        if self.state == "half_open" and not self._trial_in_flight:
+            # 반개방 상태에서는 시험 요청 1건만 허용
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        self._trial_in_flight = False
+        if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+            if self.state != "open":
+                logger.warning("LLM 서킷 브레이커 열림 (연속 실패 %d회)", self.consecutive_failures)
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """결과 없이 끝난 호출(취소)의 반개방 시험 슬롯 반환"""
+        self._trial_in_flight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+        }
+
+
+class ProviderRouter:
+    """제공자 선택/헤징/페일오버를 담당"""
+
+    def __init__(self, configured_providers: List[str]) -> None:
+        self.configured_providers = [p for p in PROVIDERS if p in configured_providers]
+        self.hedging_enabled = os.getenv("LLM_HEDGING_ENABLED", "false").lower() == "true"
+        self.failover_enabled = os.getenv("LLM_FAILOVER_ENABLED", "true").lower() == "true"
+        self.default_hedge_delay_ms = float(os.getenv("LLM_HEDGE_DELAY_MS", "3000"))
+        self.hedge_percentile = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+        self.hedge_min_samples = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+        self.min_hedge_delay_ms = float(os.getenv("LLM_HEDGE_MIN_DELAY_MS", "300"))
+
+        failure_threshold = int(os.getenv("LLM_BREAKER_FAILURE_THRESHOLD", "5"))
+        reset_seconds = float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
+        self.breakers = {p: CircuitBreaker(failure_threshold, reset_seconds) for p in PROVIDERS}
+        self.histograms: Dict[str, Dict[str, LatencyHistogram]] = {p: {} for p in PROVIDERS}
+        self.counters = {
+            "calls": 0,
+            "failovers": 0,
+            "hedges_fired": 0,
+            "hedges_won": 0,
+            "rejected": 0,
+        }
+
+    # ---------- 지표 ----------
+
+    def _histogram(self, provider: str, operation: str) -> LatencyHistogram:
+        return self.histograms[provider].setdefault(operation, LatencyHistogram())
+
+    def hedge_delay_seconds(self, provider: str, operation: str) -> float:
+        """주 제공자의 p95 지연 시간 (표본이 적으면 기본값)"""
+        histogram = self._histogram(provider, operation)
+        delay_ms = self.default_hedge_delay_ms
+        if histogram.total >= self.hedge_min_samples:
+            delay_ms = histogram.percentile(self.hedge_percentile) or delay_ms
+        return max(delay_ms, self.min_hedge_delay_ms) / 1000
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hedging_enabled": self.hedging_enabled,
+            "failover_enabled": self.failover_enabled,
+            "configured_providers": self.configured_providers,
+            "counters": dict(self.counters),
+            "providers": {
+                provider: {
+                    "breaker": self.breakers[provider].snapshot(),
+                    "latency": {
+                        operation: histogram.snapshot()
+                        for operation, histogram in self.histograms[provider].items()
+                    },
+                    "hedge_delay_ms": {
+                        operation: round(self.hedge_delay_seconds(provider, operation) * 1000)
+                        for operation in self.histograms[provider]
+                    },
+                }
+                for provider in PROVIDERS
+            },
+        }
+
+    # ---------- 호출 ----------
+
+    def _candidates(self, primary: str) -> List[str]:
+        """주 제공자 + (페일오버/헤징 허용 시) 설정된 다른 제공자 순서"""
+        order = [primary]
+        if self.failover_enabled or self.hedging_enabled:
+            order.extend(p for p in self.configured_providers if p != primary)
+        return order
+
+    async def _timed(self, provider: str, operation: str, factory: Callable[[], Awaitable[T]]) -> T:
+        started = time.perf_counter()
+        breaker = self.breakers[provider]
+        try:
+            result = await factory()
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        except Exception:
+            breaker.record_failure()
+            raise
+        breaker.record_success()
+        self._histogram(provider, operation).observe((time.perf_counter() - started) * 1000)
+        return result
+
+    async def call(
+        self,
+        operation: str,
+        primary: str,
+        calls: Dict[str, Callable[[], Awaitable[T]]],
+    ) -> T:
+        """
+        제공자별 호출 함수(calls) 중 하나의 결과를 반환한다.
+
+        헤징이 켜져 있으면 주 제공자가 hedge delay 안에 끝나지 않을 때 다음 제공자를 동시에
+        호출하고 먼저 성공한 결과를 사용한다. 실패한 제공자는 다음 후보로 넘어간다.
+        """
+        self.counters["calls"] += 1
+        pending_providers = [p for p in self._candidates(primary) if p in calls]
+        running: Dict[asyncio.Task, str] = {}
+        last_error: Optional[BaseException] = None
+        hedged = False
+
+        def launch_next() -> bool:
+            while pending_providers:
+                provider = pending_providers.pop(0)
+                if not self.breakers[provider].allow():
+                    logger.info("LLM 서킷 열림으로 %s 건너뜀 (%s)", provider, operation)
+                    continue
+                task = asyncio.ensure_future(self._timed(provider, operation, calls[provider]))
+                running[task] = provider
+                return True
+            return False
+
+        if not launch_next():
+            self.counters["rejected"] += 1
+            raise LLMProvidersUnavailableError("사용 가능한 LLM 제공자가 없습니다. 잠시 후 다시 시도해주세요.")
+
+        try:
+            while running:
+                timeout = None
+                if self.hedging_enabled and len(running) == 1 and pending_providers:
+                    timeout = self.hedge_delay_seconds(next(iter(running.values())), operation)
+
+                done, _ = await asyncio.wait(
+                    running.keys(), timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                if not done:
+                    # 주 제공자가 느림 → 보조 제공자에 헤지 요청
+                    if launch_next():
+                        hedged = True
+                        self.counters["hedges_fired"] += 1
+                    continue
+
+                for task in done:
+                    provider = running.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        if provider != primary:
+                            self.counters["hedges_won" if hedged else "failovers"] += 1
+                        return task.result()
+                    last_error = error
+                    logger.warning("LLM 호출 실패 (%s/%s): %s", provider, operation, error)
+
+                if not running and not launch_next():
+                    break
+        finally:
+            for task in running:
+                task.cancel()
+
+        assert last_error is not None
+        raise last_error
+
+    async def stream(
+        self,
+        operation: str,
+        primary: str,
+        streams: Dict[str, Callable[[], AsyncIterator[T]]],
+    ) -> AsyncIterator[T]:
+        """
+        스트리밍 호출 - 첫 조각을 받기 전에 실패하면 다음 제공자로 넘어간다.
+
+        이미 전달을 시작한 스트림은 중간에 제공자를 바꾸지 않는다 (응답이 섞이지 않도록).
+        """
+        self.counters["calls"] += 1
+        last_error: Optional[BaseException] = None
+        attempted = False
+
+        for provider in self._candidates(primary):
+            if provider not in streams:
+                continue
+            breaker = self.breakers[provider]
+            if not breaker.allow():
+                continue
+            attempted = True
+            if provider != primary:
+                self.counters["failovers"] += 1
+
+            started = time.perf_counter()
+            first_chunk = True
+            try:
+                async for chunk in streams[provider]():
+                    if first_chunk:
+                        # 스트리밍은 첫 조각까지의 시간(TTFT)을 기록
+                        self._histogram(provider, f"{operation}_ttft").observe(
+                            (time.perf_counter() - started) * 1000
+                        )
+                        first_chunk = False
+                    yield chunk
+            except (asyncio.CancelledError, GeneratorExit):
+                breaker.release()
+                raise
+            except Exception as exc:  # noqa: BLE001
+                breaker.record_failure()
+                if not first_chunk:
+                    raise
+                last_error = exc
+                logger.warning("LLM 스트리밍 실패 (%s/%s): %s", provider, operation, exc)
+                continue
+
+            breaker.record_success()
+            self._histogram(provider, operation).observe((time.perf_counter() - started) * 1000)
+            return
+
+        if not attempted:
+            self.counters["rejected"] += 1
+            raise LLMProvidersUnavailableError("사용 가능한 LLM 제공자가 없습니다. 잠시 후 다시 시도해주세요.")
+        assert last_error is not None
+        raise last_error
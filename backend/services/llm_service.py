@@ -4,55 +4,32 @@ LLM API 연동 서비스 - 이벤트 폼 자동 완성 + 태그 생성
 """
 
 import os
-from typing import Optional, Dict, Any, List
+import base64
+import logging
+import mimetypes
+import time
+from collections import deque
+from datetime import date
+from typing import Optional, Dict, Any, List, Tuple, AsyncIterator
+import aiofiles
+import aiohttp
 import openai
 import anthropic
 from dotenv import load_dotenv
 import json
 
+from services.cache_service import PersistentTTLCache, make_cache_key
+from services.llm_resilience import ProviderRouter
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
 
-class LLMService:
-    """LLM API 통합 서비스"""
-    
-    def __init__(self):
-        self.openai_client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        self.anthropic_client = anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
-        self.default_provider = os.getenv("LLM_PROVIDER", "openai")
-    
-    
-    async def analyze_and_fill_event_form(
-        self, 
-        image_url: str,
-        provider: Optional[str] = None
-    ) -> Dict[str, Any]:
-        """
-        이벤트 이미지 분석 → 폼 자동 완성 + 태그 생성
-        
-        Args:
-            image_url: 분석할 이미지 URL (포스터, 전단지 등)
-            provider: LLM 제공자 (openai/anthropic)
-            
-        Returns:
-            dict: {
-                "form_data": {
-                    "eventName": "이벤트 제목",
-                    "boothNumber": "부스 번호",
-                    "date": "날짜",
-                    "time": "시간",
-                    "description": "설명",
-                    "participationMethod": "참여 방법",
-                    "benefits": "혜택"
-                },
-                "tags": ["태그1", "태그2", ...],
-                "categories": ["카테고리1", "카테고리2"],
-                "confidence": 0.95
-            }
-        """
-        provider = provider or self.default_provider
-        
-        prompt = """
+
+# 이벤트 이미지 분석 프롬프트 (analyze_and_fill_event_form / 스트리밍 버전 공용)
+# 요청마다 바뀌지 않는 고정 지시문 - 시스템 블록으로 맨 앞에 보내 제공자 측 프롬프트 캐시를 재사용한다.
+# (OpenAI는 동일 prefix 자동 캐시, Anthropic은 cache_control 지정) 여기에 가변 값을 넣지 말 것.
+EVENT_ANALYSIS_PROMPT = """
 이 이미지를 분석하여 이벤트/전시회/박람회 정보를 추출해주세요.
 이벤트 유형에 관계없이 아래 JSON 형식으로 정확하게 반환해주세요.
 
@@ -122,11 +99,309 @@ class LLMService:
 
 ⚠️ 중요: 이미지에 없는 정보는 빈 문자열 ""로 처리하세요.
 """
+
+# 요청마다 바뀌는 부분 - 고정 지시문 뒤, 이미지 앞에 붙는다.
+EVENT_ANALYSIS_CONTEXT = """
+오늘 날짜: {today}
+연도가 표기되지 않은 날짜는 오늘 이후 가장 가까운 날짜의 연도를 사용하세요.
+위 지시에 따라 다음 이미지를 분석하고 JSON만 반환하세요.
+"""
+
+# 이미지 분석(비전) 모델
+VISION_MODELS = {
+    "openai": "gpt-4o",
+    "anthropic": "claude-3-opus-20240229",
+}
+
+# 텍스트 생성(설명 개선/태그) 모델 - 캐시 키에도 포함
+TEXT_MODELS = {
+    "openai": "gpt-4-turbo-preview",
+    "anthropic": "claude-3-sonnet-20240229",
+}
+
+# 폼 필드 중 스트리밍 중간 결과로 전달할 문자열 필드
+STREAMED_FORM_FIELDS = (
+    "eventName",
+    "boothNumber",
+    "location",
+    "venue",
+    "startDate",
+    "endDate",
+    "startTime",
+    "endTime",
+    "description",
+    "participationMethod",
+    "benefits",
+)
+
+
+def _parse_partial_json(text: str) -> Optional[Any]:
+    """
+    스트리밍 중인(미완성) JSON 텍스트를 최대한 파싱한다.
+
+    열린 문자열/괄호를 닫아 보고, 실패하면 마지막으로 완성된 값(쉼표 직전)까지
+    잘라서 다시 시도한다. 아직 객체가 시작되지 않았으면 None.
+    """
+    start = text.find("{")
+    if start < 0:
+        return None
+    body = text[start:]
+
+    stack: List[str] = []
+    in_string = False
+    escaped = False
+    # (잘라낼 위치, 그 시점의 괄호 스택) - 쉼표 직전 / 여는 괄호 직후
+    safe_points: List[Tuple[int, Tuple[str, ...]]] = []
+
+    for index, char in enumerate(body):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+        if char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+            safe_points.append((index + 1, tuple(stack)))
+        elif char in "}]":
+            if stack:
+                stack.pop()
+            if not stack:
+                # 최상위 객체 완성 - 뒤따르는 ``` 등은 무시
+                body = body[: index + 1]
+                break
+        elif char == ",":
+            safe_points.append((index, tuple(stack)))
+
+    candidates = []
+    tail = body
+    if in_string:
+        tail = tail[:-1] if escaped else tail
+        tail += '"'
+    candidates.append(tail + "".join(reversed(stack)))
+    for cut, cut_stack in reversed(safe_points):
+        candidates.append(body[:cut] + "".join(reversed(cut_stack)))
+
+    for candidate in candidates:
+        try:
+            return json.loads(candidate)
+        except ValueError:
+            continue
+    return None
+
+
+# 설문 답변 요약 응답 형식 (map/reduce 공용)
+SURVEY_SUMMARY_FORMAT = """JSON 객체로만 반환:
+{"summary": "요약", "themes": [{"theme": "주제", "description": "설명", "mentions": 3, "sentiment": "positive", "quotes": ["원문"]}]}"""
+
+SURVEY_SUMMARY_SENTIMENTS = {"positive", "neutral", "negative"}
+
+
+def _parse_survey_summary(text: str) -> Dict[str, Any]:
+    """요약 응답 파싱 - JSON이 아니면 응답 전체를 요약문으로 쓴다"""
+    text = (text or "").strip()
+    parsed = None
+    if "{" in text:
+        try:
+            parsed = json.loads(text[text.find("{"):text.rfind("}") + 1])
+        except ValueError:
+            parsed = None
+    if not isinstance(parsed, dict):
+        return {"summary": text, "themes": []}
+
+    themes = []
+    for theme in parsed.get("themes") or []:
+        if not isinstance(theme, dict) or not theme.get("theme"):
+            continue
+        try:
+            mentions = max(0, int(theme.get("mentions") or 0))
+        except (TypeError, ValueError):
+            mentions = 0
+        sentiment = theme.get("sentiment")
+        themes.append({
+            "theme": str(theme["theme"]),
+            "description": str(theme.get("description") or ""),
+            "mentions": mentions,
+            "sentiment": sentiment if sentiment in SURVEY_SUMMARY_SENTIMENTS else "neutral",
+            "quotes": [str(quote) for quote in (theme.get("quotes") or []) if quote][:2],
+        })
+    themes.sort(key=lambda theme: -theme["mentions"])
+    return {"summary": str(parsed.get("summary") or ""), "themes": themes}
+
+
+class PromptUsageStats:
+    """
+    호출별 토큰 사용량 기록 (프롬프트 캐시 효과 확인용)
+
+    cached_tokens: 캐시에서 읽은 입력 토큰 (OpenAI prompt_tokens_details.cached_tokens,
+    Anthropic cache_read_input_tokens), cache_write_tokens: 새로 캐시에 쓴 토큰 (Anthropic)
+    """
+
+    def __init__(self, recent_size: int = 100) -> None:
+        self.recent: deque = deque(maxlen=recent_size)
+        self.totals: Dict[str, Dict[str, Dict[str, int]]] = {}
+
+    def record(
+        self,
+        provider: str,
+        operation: str,
+        input_tokens: int,
+        cached_tokens: int,
+        cache_write_tokens: int,
+        output_tokens: int,
+        latency_ms: float,
+    ) -> None:
+        entry = {
+            "provider": provider,
+            "operation": operation,
+            "input_tokens": input_tokens,
+            "cached_tokens": cached_tokens,
+            "cache_write_tokens": cache_write_tokens,
+            "output_tokens": output_tokens,
+            "latency_ms": round(latency_ms, 1),
+            "at": time.time(),
+        }
+        self.recent.append(entry)
+
+        totals = self.totals.setdefault(provider, {}).setdefault(
+            operation,
+            {
+                "calls": 0,
+                "cache_hit_calls": 0,
+                "input_tokens": 0,
+                "cached_tokens": 0,
+                "cache_write_tokens": 0,
+                "output_tokens": 0,
+                "latency_ms_cached": 0,
+                "latency_ms_uncached": 0,
+            },
+        )
+        totals["calls"] += 1
+        totals["input_tokens"] += input_tokens
+        totals["cached_tokens"] += cached_tokens
+        totals["cache_write_tokens"] += cache_write_tokens
+        totals["output_tokens"] += output_tokens
+        if cached_tokens:
+            totals["cache_hit_calls"] += 1
+            totals["latency_ms_cached"] += int(latency_ms)
+        else:
+            totals["latency_ms_uncached"] += int(latency_ms)
+
+        logger.info(
+            "LLM 토큰 사용량 (%s/%s): 입력 %d (캐시 읽기 %d, 캐시 쓰기 %d), 출력 %d, %.0fms",
+            provider, operation, input_tokens, cached_tokens, cache_write_tokens,
+            output_tokens, latency_ms,
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        summary: Dict[str, Any] = {}
+        for provider, operations in self.totals.items():
+            for operation, totals in operations.items():
+                hit_calls = totals["cache_hit_calls"]
+                miss_calls = totals["calls"] - hit_calls
+                summary.setdefault(provider, {})[operation] = {
+                    "calls": totals["calls"],
+                    "cache_hit_calls": hit_calls,
+                    "input_tokens": totals["input_tokens"],
+                    "cached_tokens": totals["cached_tokens"],
+                    "cache_write_tokens": totals["cache_write_tokens"],
+                    "output_tokens": totals["output_tokens"],
+                    "cached_input_ratio": (
+                        round(totals["cached_tokens"] / totals["input_tokens"], 3)
+                        if totals["input_tokens"] else None
+                    ),
+                    "avg_latency_ms_cached": (
+                        round(totals["latency_ms_cached"] / hit_calls, 1) if hit_calls else None
+                    ),
+                    "avg_latency_ms_uncached": (
+                        round(totals["latency_ms_uncached"] / miss_calls, 1) if miss_calls else None
+                    ),
+                }
+        return {"totals": summary, "recent": list(self.recent)}
+
+
+class LLMService:
+    """LLM API 통합 서비스"""
+    
+    def __init__(self):
+        self.default_provider = os.getenv("LLM_PROVIDER", "openai")
+        self.backend = os.getenv("LLM_BACKEND", "live").lower()
         
-        if provider == "openai":
-            result = await self._analyze_with_openai(image_url, prompt)
+        if self.backend == "fake":
+            # 오프라인 부하 테스트용 가짜 클라이언트 (FAKE_LLM_* 로 지연/오류율 조절)
+            from services.fake_providers import FakeAnthropicClient, FakeOpenAIClient
+            
+            self.openai_client = FakeOpenAIClient()
+            self.anthropic_client = FakeAnthropicClient()
+            configured = ["openai", "anthropic"]
         else:
-            result = await self._analyze_with_claude(image_url, prompt)
+            # 비동기 클라이언트 사용: 분석 워커 여러 개가 이벤트 루프를 막지 않고 동시에 대기
+            self.openai_client = openai.AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+            self.anthropic_client = anthropic.AsyncAnthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+            configured = [
+                name for name, key in (("openai", "OPENAI_API_KEY"), ("anthropic", "ANTHROPIC_API_KEY"))
+                if os.getenv(key)
+            ]
+        
+        # 제공자 라우터: 헤징/페일오버/서킷 브레이커 (API 키가 있는 제공자만 보조로 사용)
+        self.router = ProviderRouter(configured)
+        
+        # 동일 입력 재요청용 응답 캐시 (LLM_CACHE_PERSIST=true면 PostgreSQL로 워커 간 공유)
+        self.cache_enabled = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+        cache_options = {
+            "max_entries": int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1000")),
+            "ttl_seconds": int(os.getenv("LLM_CACHE_TTL_SECONDS", "86400")),
+            "persist": os.getenv("LLM_CACHE_PERSIST", "false").lower() == "true",
+        }
+        self.enhance_cache = PersistentTTLCache("llm:enhance", **cache_options)
+        self.tags_cache = PersistentTTLCache("llm:tags", **cache_options)
+        
+        # 호출별 토큰 사용량 (프롬프트 캐시 적중 확인용)
+        self.usage_stats = PromptUsageStats()
+    
+    
+    async def analyze_and_fill_event_form(
+        self,
+        image_url: str,
+        provider: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        이벤트 이미지 분석 → 폼 자동 완성 + 태그 생성
+        
+        Args:
+            image_url: 분석할 이미지 URL (포스터, 전단지 등)
+            provider: LLM 제공자 (openai/anthropic)
+        
+        Returns:
+            dict: {
+                "form_data": {
+                    "eventName": "이벤트 제목",
+                    "boothNumber": "부스 번호",
+                    "date": "날짜",
+                    "time": "시간",
+                    "description": "설명",
+                    "participationMethod": "참여 방법",
+                    "benefits": "혜택"
+                },
+                "tags": ["태그1", "태그2", ...],
+                "categories": ["카테고리1", "카테고리2"],
+                "confidence": 0.95
+            }
+        """
+        provider = provider or self.default_provider
+        
+        result = await self.router.call(
+            "analyze",
+            provider,
+            {
+                "openai": lambda: self._analyze_with_openai(image_url),
+                "anthropic": lambda: self._analyze_with_claude(image_url),
+            },
+        )
         
         # 신뢰도 추가 (LLM 응답의 완성도 평가)
         result["confidence"] = self._calculate_confidence(result.get("form_data", {}))
@@ -134,8 +409,71 @@ class LLMService:
         return result
     
     
-    async def _analyze_with_openai(self, image_url: str, prompt: str) -> Dict[str, Any]:
-        """OpenAI GPT-4 Vision으로 이미지 분석"""
+    async def stream_analyze_event_form(
+        self,
+        image_url: str,
+        provider: Optional[str] = None
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        analyze_and_fill_event_form의 스트리밍 버전
+        
+        응답 토큰이 도착할 때마다 부분 JSON을 파싱해 바뀐 값만 전달한다.
+        
+        Yields:
+            ("field", {"name": "eventName", "value": "..."})  - 폼 필드 (진행 중인 값 포함)
+            ("tags" | "categories", [...])                      - 목록 필드
+            ("result", {...})                                   - 최종 결과 (analyze_and_fill_event_form과 동일)
+        """
+        provider = provider or self.default_provider
+        
+        deltas = self.router.stream(
+            "analyze",
+            provider,
+            {
+                "openai": lambda: self._stream_openai_analysis(image_url),
+                "anthropic": lambda: self._stream_claude_analysis(image_url),
+            },
+        )
+        
+        result_text = ""
+        sent: Dict[str, Any] = {}
+        async for delta in deltas:
+            result_text += delta
+            partial = _parse_partial_json(result_text)
+            if not isinstance(partial, dict):
+                continue
+            
+            form_data = partial.get("form_data")
+            if isinstance(form_data, dict):
+                for name in STREAMED_FORM_FIELDS:
+                    value = form_data.get(name)
+                    if isinstance(value, str) and sent.get(name) != value:
+                        sent[name] = value
+                        yield "field", {"name": name, "value": value}
+            
+            for list_field in ("tags", "categories"):
+                values = partial.get(list_field)
+                if isinstance(values, list) and values and sent.get(list_field) != values:
+                    sent[list_field] = values
+                    yield list_field, values
+        
+        result = self._parse_json_response(result_text)
+        result["confidence"] = self._calculate_confidence(result.get("form_data", {}))
+        yield "result", result
+    
+    
+    def _analysis_context(self) -> str:
+        """요청마다 바뀌는 부분 (오늘 날짜 기준 연도 추정)"""
+        return EVENT_ANALYSIS_CONTEXT.format(today=date.today().isoformat())
+    
+    
+    async def _openai_analysis_messages(self, image_url: str) -> List[Dict[str, Any]]:
+        """
+        OpenAI 비전 요청 메시지 구성
+        
+        고정 지시문(system) → 날짜 컨텍스트 → 이미지 순서. OpenAI는 1024 토큰 이상의
+        동일한 prefix를 자동으로 캐시하므로 가변 값은 모두 뒤쪽에 둔다.
+        """
         
         # 로컬 파일인지 URL인지 확인
         if image_url.startswith(("http://", "https://")):
@@ -145,104 +483,171 @@ class LLMService:
                 "image_url": {"url": image_url}
             }
         else:
-            # 로컬 파일인 경우 base64로 인코딩
-            import base64
-            
-            try:
-                with open(image_url, "rb") as image_file:
-                    image_data = image_file.read()
-                    image_base64 = base64.b64encode(image_data).decode()
-                    
-                # 파일 확장자로 MIME 타입 결정
-                import mimetypes
-                mime_type, _ = mimetypes.guess_type(image_url)
-                if not mime_type or not mime_type.startswith('image/'):
-                    mime_type = 'image/jpeg'  # 기본값
-                
-                image_input = {
-                    "type": "image_url",
-                    "image_url": {
-                        "url": f"data:{mime_type};base64,{image_base64}"
-                    }
-                }
-            except Exception as e:
-                raise ValueError(f"이미지 파일을 읽을 수 없습니다: {e}")
-        
-        response = self.openai_client.chat.completions.create(
-            model="gpt-4o",  # 최신 GPT-4o 모델 사용
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": prompt},
-                        image_input
-                    ]
+            # 로컬 파일/저장소 키인 경우 base64로 인코딩
+            mime_type, image_base64 = await self._load_image_base64(image_url)
+            image_input = {
+                "type": "image_url",
+                "image_url": {
+                    "url": f"data:{mime_type};base64,{image_base64}"
                 }
-            ],
+            }
+        
+        return [
+            {"role": "system", "content": EVENT_ANALYSIS_PROMPT},
+            {
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": self._analysis_context()},
+                    image_input
+                ]
+            }
+        ]
+    
+    
+    def _claude_analysis_system(self) -> List[Dict[str, Any]]:
+        """Claude 시스템 블록 - 고정 지시문에 cache_control 지정 (5분 ephemeral 캐시)"""
+        return [
+            {
+                "type": "text",
+                "text": EVENT_ANALYSIS_PROMPT,
+                "cache_control": {"type": "ephemeral"},
+            }
+        ]
+    
+    
+    async def _claude_analysis_messages(self, image_url: str) -> List[Dict[str, Any]]:
+        """Claude 비전 요청 메시지 구성 (날짜 컨텍스트 → 이미지)"""
+        
+        # 이미지를 base64로 변환 (로컬 파일/URL 모두 지원)
+        mime_type, image_base64 = await self._load_image_base64(image_url)
+        
+        return [
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "type": "text",
+                        "text": self._analysis_context()
+                    },
+                    {
+                        "type": "image",
+                        "source": {
+                            "type": "base64",
+                            "media_type": mime_type,
+                            "data": image_base64,
+                        },
+                    },
+                ],
+            }
+        ]
+    
+    
+    def _record_openai_usage(self, operation: str, usage: Any, started: float) -> None:
+        if usage is None:
+            return
+        details = getattr(usage, "prompt_tokens_details", None)
+        self.usage_stats.record(
+            provider="openai",
+            operation=operation,
+            input_tokens=usage.prompt_tokens or 0,
+            cached_tokens=getattr(details, "cached_tokens", 0) or 0,
+            cache_write_tokens=0,
+            output_tokens=usage.completion_tokens or 0,
+            latency_ms=(time.perf_counter() - started) * 1000,
+        )
+    
+    
+    def _record_claude_usage(self, operation: str, usage: Any, started: float) -> None:
+        if usage is None:
+            return
+        cache_read = getattr(usage, "cache_read_input_tokens", 0) or 0
+        cache_write = getattr(usage, "cache_creation_input_tokens", 0) or 0
+        self.usage_stats.record(
+            provider="anthropic",
+            operation=operation,
+            # input_tokens는 캐시 이후 부분만 포함하므로 합산해 전체 입력으로 맞춘다
+            input_tokens=(usage.input_tokens or 0) + cache_read + cache_write,
+            cached_tokens=cache_read,
+            cache_write_tokens=cache_write,
+            output_tokens=usage.output_tokens or 0,
+            latency_ms=(time.perf_counter() - started) * 1000,
+        )
+    
+    
+    async def _analyze_with_openai(self, image_url: str) -> Dict[str, Any]:
+        """OpenAI GPT-4 Vision으로 이미지 분석"""
+        
+        messages = await self._openai_analysis_messages(image_url)
+        started = time.perf_counter()
+        response = await self.openai_client.chat.completions.create(
+            model=VISION_MODELS["openai"],  # 최신 GPT-4o 모델 사용
+            messages=messages,
             max_tokens=1500,
             temperature=0.2  # 정확성을 위해 낮게 설정
         )
+        self._record_openai_usage("analyze", response.usage, started)
         
-        result_text = response.choices[0].message.content
-        
-        # JSON 파싱
-        try:
-            if "```json" in result_text:
-                json_str = result_text.split("```json")[1].split("```")[0].strip()
-            else:
-                json_str = result_text
-            
-            result = json.loads(json_str)
-            return result
-        except Exception as e:
-            print(f"JSON 파싱 오류: {e}")
-            return {
-                "form_data": {},
-                "tags": [],
-                "categories": [],
-                "error": str(e),
-                "raw_response": result_text
-            }
+        return self._parse_json_response(response.choices[0].message.content)
     
     
-    async def _analyze_with_claude(self, image_url: str, prompt: str) -> Dict[str, Any]:
+    async def _analyze_with_claude(self, image_url: str) -> Dict[str, Any]:
         """Anthropic Claude Vision으로 이미지 분석"""
         
-        import requests
-        import base64
+        messages = await self._claude_analysis_messages(image_url)
+        started = time.perf_counter()
+        message = await self.anthropic_client.messages.create(
+            model=VISION_MODELS["anthropic"],
+            max_tokens=1500,
+            temperature=0.2,
+            system=self._claude_analysis_system(),
+            messages=messages,
+        )
+        self._record_claude_usage("analyze", message.usage, started)
         
-        # 이미지를 base64로 변환
-        image_data = requests.get(image_url).content
-        image_base64 = base64.b64encode(image_data).decode()
+        return self._parse_json_response(message.content[0].text)
+    
+    
+    async def _stream_openai_analysis(self, image_url: str) -> AsyncIterator[str]:
+        """OpenAI 비전 분석 응답을 토큰 단위로 전달"""
         
-        message = self.anthropic_client.messages.create(
-            model="claude-3-opus-20240229",
+        messages = await self._openai_analysis_messages(image_url)
+        started = time.perf_counter()
+        stream = await self.openai_client.chat.completions.create(
+            model=VISION_MODELS["openai"],
+            messages=messages,
             max_tokens=1500,
             temperature=0.2,
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "image",
-                            "source": {
-                                "type": "base64",
-                                "media_type": "image/jpeg",
-                                "data": image_base64,
-                            },
-                        },
-                        {
-                            "type": "text",
-                            "text": prompt
-                        }
-                    ],
-                }
-            ],
+            stream=True,
+            stream_options={"include_usage": True},  # 마지막 청크에 usage 포함
         )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+            if chunk.usage is not None:
+                self._record_openai_usage("analyze_stream", chunk.usage, started)
+    
+    
+    async def _stream_claude_analysis(self, image_url: str) -> AsyncIterator[str]:
+        """Claude 비전 분석 응답을 토큰 단위로 전달"""
         
-        result_text = message.content[0].text
+        messages = await self._claude_analysis_messages(image_url)
+        started = time.perf_counter()
+        async with self.anthropic_client.messages.stream(
+            model=VISION_MODELS["anthropic"],
+            max_tokens=1500,
+            temperature=0.2,
+            system=self._claude_analysis_system(),
+            messages=messages,
+        ) as stream:
+            async for text in stream.text_stream:
+                yield text
+            final_message = await stream.get_final_message()
+        self._record_claude_usage("analyze_stream", final_message.usage, started)
+    
+    
+    def _parse_json_response(self, result_text: str) -> Dict[str, Any]:
+        """LLM 응답에서 JSON 결과 추출 (실패 시 빈 결과 + 원문)"""
         
-        # JSON 파싱
         try:
             if "```json" in result_text:
                 json_str = result_text.split("```json")[1].split("```")[0].strip()
@@ -262,6 +667,36 @@ class LLMService:
             }
     
     
+    async def _load_image_base64(self, image_url: str) -> Tuple[str, str]:
+        """이미지(URL/로컬 파일/저장소 키)를 읽어 (MIME 타입, base64 문자열)로 반환 (이벤트 루프를 막지 않음)"""
+        
+        try:
+            if image_url.startswith(("http://", "https://")):
+                async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=15)) as session:
+                    async with session.get(image_url) as response:
+                        response.raise_for_status()
+                        image_data = await response.read()
+                        mime_type = response.headers.get("Content-Type", "").split(";")[0]
+            elif os.path.isfile(image_url):
+                async with aiofiles.open(image_url, "rb") as image_file:
+                    image_data = await image_file.read()
+                # 파일 확장자로 MIME 타입 결정
+                mime_type, _ = mimetypes.guess_type(image_url)
+            else:
+                # 업로드 저장소 키 (temp/...) - 로컬/S3 어느 쪽이든 바이트로 읽음
+                from services.storage import storage
+
+                image_data = await storage.get(image_url)
+                mime_type, _ = mimetypes.guess_type(image_url)
+        except Exception as e:
+            raise ValueError(f"이미지 파일을 읽을 수 없습니다: {e}")
+        
+        if not mime_type or not mime_type.startswith('image/'):
+            mime_type = 'image/jpeg'  # 기본값
+        
+        return mime_type, base64.b64encode(image_data).decode()
+    
+    
     def _calculate_confidence(self, form_data: Dict) -> float:
         """
         폼 데이터의 완성도 평가 (0.0 ~ 1.0)
@@ -297,8 +732,81 @@ class LLMService:
             str: 개선된 설명
         """
         provider = provider or self.default_provider
+        cache_key = self._enhance_cache_key(original_description, event_name, provider)
+        if self.cache_enabled:
+            cached = await self.enhance_cache.get(cache_key)
+            if cached is not None:
+                return cached
         
-        prompt = f"""
+        prompt = self._enhance_prompt(original_description, event_name)
+        enhanced = await self.router.call(
+            "enhance",
+            provider,
+            {
+                "openai": lambda: self._complete_with_openai(
+                    TEXT_MODELS["openai"], prompt, max_tokens=500, temperature=0.7
+                ),
+                "anthropic": lambda: self._complete_with_claude(
+                    TEXT_MODELS["anthropic"], prompt, max_tokens=500, temperature=0.7
+                ),
+            },
+        )
+        
+        if self.cache_enabled and enhanced:
+            await self.enhance_cache.set(cache_key, enhanced)
+        return enhanced
+    
+    
+    async def stream_enhance_description(
+        self,
+        original_description: str,
+        event_name: str,
+        provider: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        enhance_description의 스트리밍 버전 - 생성되는 텍스트 조각을 순서대로 전달
+        """
+        provider = provider or self.default_provider
+        cache_key = self._enhance_cache_key(original_description, event_name, provider)
+        if self.cache_enabled:
+            cached = await self.enhance_cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+        
+        prompt = self._enhance_prompt(original_description, event_name)
+        chunks: List[str] = []
+        async for text in self.router.stream(
+            "enhance",
+            provider,
+            {
+                "openai": lambda: self._stream_text_with_openai(
+                    TEXT_MODELS["openai"], prompt, max_tokens=500, temperature=0.7
+                ),
+                "anthropic": lambda: self._stream_text_with_claude(
+                    TEXT_MODELS["anthropic"], prompt, max_tokens=500, temperature=0.7
+                ),
+            },
+        ):
+            chunks.append(text)
+            yield text
+        
+        if self.cache_enabled and chunks:
+            await self.enhance_cache.set(cache_key, "".join(chunks))
+    
+    
+    def _enhance_cache_key(self, original_description: str, event_name: str, provider: str) -> str:
+        return make_cache_key(
+            event_name=event_name,
+            description=original_description,
+            provider=provider,
+            model=TEXT_MODELS.get(provider),
+        )
+    
+    
+    def _enhance_prompt(self, original_description: str, event_name: str) -> str:
+        """설명 개선 프롬프트"""
+        return f"""
 다음 이벤트 설명을 더 매력적이고 전문적으로 개선해주세요:
 
 이벤트명: {event_name}
@@ -310,23 +818,6 @@ class LLMService:
 - 전문적이면서 친근한 톤
 - 핵심 내용 강조
 """
-        
-        if provider == "openai":
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4-turbo-preview",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=500,
-                temperature=0.7
-            )
-            return response.choices[0].message.content
-        else:
-            message = self.anthropic_client.messages.create(
-                model="claude-3-sonnet-20240229",
-                max_tokens=500,
-                temperature=0.7,
-                messages=[{"role": "user", "content": prompt}]
-            )
-            return message.content[0].text
     
     
     async def generate_additional_tags(
@@ -347,6 +838,19 @@ class LLMService:
             list: 추가 태그 (중복 제거)
         """
         provider = provider or self.default_provider
+        cache_key = make_cache_key(
+            event_name=form_data.get('eventName', ''),
+            description=form_data.get('description', ''),
+            participation_method=form_data.get('participationMethod', ''),
+            benefits=form_data.get('benefits', ''),
+            existing_tags=sorted(existing_tags),
+            provider=provider,
+            model=TEXT_MODELS.get(provider),
+        )
+        if self.cache_enabled:
+            cached = await self.tags_cache.get(cache_key)
+            if cached is not None:
+                return cached
         
         prompt = f"""
 다음 이벤트 정보를 바탕으로 검색과 필터링에 유용한 태그를 5-10개 생성해주세요:
@@ -368,22 +872,18 @@ class LLMService:
 JSON 배열로만 반환: ["태그1", "태그2", ...]
 """
         
-        if provider == "openai":
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4-turbo-preview",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=300,
-                temperature=0.5
-            )
-            result_text = response.choices[0].message.content
-        else:
-            message = self.anthropic_client.messages.create(
-                model="claude-3-sonnet-20240229",
-                max_tokens=300,
-                temperature=0.5,
-                messages=[{"role": "user", "content": prompt}]
-            )
-            result_text = message.content[0].text
+        result_text = await self.router.call(
+            "tags",
+            provider,
+            {
+                "openai": lambda: self._complete_with_openai(
+                    TEXT_MODELS["openai"], prompt, max_tokens=300, temperature=0.5
+                ),
+                "anthropic": lambda: self._complete_with_claude(
+                    TEXT_MODELS["anthropic"], prompt, max_tokens=300, temperature=0.5
+                ),
+            },
+        )
         
         # JSON 파싱
         try:
@@ -398,11 +898,166 @@ JSON 배열로만 반환: ["태그1", "태그2", ...]
             new_tags = json.loads(json_str)
             
             # 기존 태그와 중복 제거
-            unique_tags = [tag for tag in new_tags if tag not in existing_tags]
-            
-            return unique_tags[:10]  # 최대 10개
+            unique_tags = [tag for tag in new_tags if tag not in existing_tags][:10]  # 최대 10개
         except:
             return []
+        
+        if self.cache_enabled and unique_tags:
+            await self.tags_cache.set(cache_key, unique_tags)
+        return unique_tags
+
+    
+    async def summarize_survey_answers(
+        self,
+        question_text: str,
+        answers: List[str],
+        provider: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        설문 주관식 답변 묶음 하나 요약 (map 단계 - services/survey_summaries.py)
+        
+        Returns:
+            dict: {"summary": 요약, "themes": [{"theme", "description", "mentions", "sentiment", "quotes"}]}
+        """
+        provider = provider or self.default_provider
+        numbered = "\n".join(f"{index}. {answer}" for index, answer in enumerate(answers, 1))
+        prompt = f"""
+다음은 부스 방문객 설문의 주관식 답변 {len(answers)}개입니다.
+
+문항: {question_text}
+
+답변:
+{numbered}
+
+답변들을 읽고 자주 나온 의견을 주제별로 묶어주세요.
+- summary: 전체 의견을 2-3문장으로 요약
+- themes: 주제 최대 6개 (많이 언급된 순)
+  - theme: 주제 이름 (짧게), description: 한 문장 설명
+  - mentions: 이 주제를 언급한 답변 수, sentiment: positive / neutral / negative
+  - quotes: 대표 답변 원문 1-2개
+
+{SURVEY_SUMMARY_FORMAT}
+"""
+        result_text = await self.router.call(
+            "survey_summary_map",
+            provider,
+            {
+                "openai": lambda: self._complete_with_openai(
+                    TEXT_MODELS["openai"], prompt, max_tokens=800, temperature=0.2
+                ),
+                "anthropic": lambda: self._complete_with_claude(
+                    TEXT_MODELS["anthropic"], prompt, max_tokens=800, temperature=0.2
+                ),
+            },
+        )
+        return _parse_survey_summary(result_text)
+    
+    
+    async def merge_survey_summaries(
+        self,
+        question_text: str,
+        partials: List[Dict[str, Any]],
+        provider: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        답변 묶음별 요약을 하나로 합침 (reduce 단계) - 반환 형식은 summarize_survey_answers와 같음
+        
+        Args:
+            partials: [{"count": 묶음 답변 수, "summary", "themes"}]
+        """
+        provider = provider or self.default_provider
+        sections = "\n\n".join(
+            f"[묶음 {index} - 답변 {partial.get('count', 0)}개]\n"
+            + json.dumps(
+                {"summary": partial.get("summary", ""), "themes": partial.get("themes", [])},
+                ensure_ascii=False,
+            )
+            for index, partial in enumerate(partials, 1)
+        )
+        prompt = f"""
+다음은 같은 설문 문항의 주관식 답변을 여러 묶음으로 나눠 요약한 결과입니다.
+
+문항: {question_text}
+
+{sections}
+
+묶음 요약들을 하나로 합쳐주세요.
+- 같은 의미의 주제는 하나로 합치고 mentions는 더해주세요
+- summary는 전체 답변 기준 2-3문장, themes는 최대 8개 (많이 언급된 순)
+- quotes는 묶음에 있던 원문에서만 고르세요
+
+{SURVEY_SUMMARY_FORMAT}
+"""
+        result_text = await self.router.call(
+            "survey_summary_reduce",
+            provider,
+            {
+                "openai": lambda: self._complete_with_openai(
+                    TEXT_MODELS["openai"], prompt, max_tokens=1200, temperature=0.2
+                ),
+                "anthropic": lambda: self._complete_with_claude(
+                    TEXT_MODELS["anthropic"], prompt, max_tokens=1200, temperature=0.2
+                ),
+            },
+        )
+        return _parse_survey_summary(result_text)
+
+    
+    
+    async def _complete_with_openai(
+        self, model: str, prompt: str, max_tokens: int, temperature: float
+    ) -> str:
+        """OpenAI 텍스트 생성 (단일 user 메시지)"""
+        response = await self.openai_client.chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=max_tokens,
+            temperature=temperature
+        )
+        return response.choices[0].message.content
+    
+    
+    async def _complete_with_claude(
+        self, model: str, prompt: str, max_tokens: int, temperature: float
+    ) -> str:
+        """Claude 텍스트 생성 (단일 user 메시지)"""
+        message = await self.anthropic_client.messages.create(
+            model=model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            messages=[{"role": "user", "content": prompt}]
+        )
+        return message.content[0].text
+    
+    
+    async def _stream_text_with_openai(
+        self, model: str, prompt: str, max_tokens: int, temperature: float
+    ) -> AsyncIterator[str]:
+        """OpenAI 텍스트 생성 스트리밍"""
+        stream = await self.openai_client.chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=max_tokens,
+            temperature=temperature,
+            stream=True,
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    
+    
+    async def _stream_text_with_claude(
+        self, model: str, prompt: str, max_tokens: int, temperature: float
+    ) -> AsyncIterator[str]:
+        """Claude 텍스트 생성 스트리밍"""
+        async with self.anthropic_client.messages.stream(
+            model=model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            messages=[{"role": "user", "content": prompt}]
+        ) as stream:
+            async for text in stream.text_stream:
+                yield text
 
 
 # 싱글톤 인스턴스
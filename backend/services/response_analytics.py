@@ -0,0 +1,201 @@
+# services/response_analytics.py
+"""
+설문 응답 교차 분석 - 컬럼형 스냅샷(services/response_snapshot.py) 위의 NumPy 벡터 집계
+
+행 단위 반복 없이 (그룹 코드 × 버킷/라벨 코드)를 하나의 정수 키로 합친 뒤 np.bincount로
+한 번에 센다. 스냅샷 크기와 무관하게 DB를 건드리지 않는다.
+"""
+
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+
+from services.response_snapshot import ResponseSnapshot
+
+load_dotenv()
+
+# 날짜 버킷 기준 시간대 (기본 KST)
+TZ_OFFSET_SECONDS = int(os.getenv("ANALYTICS_TZ_OFFSET_MINUTES", "540")) * 60
+
+BUCKETS = ("hour", "day", "week", "month")
+GROUP_BY = ("company", "event", "event_type", "booth")
+
+_GROUP_COLUMNS = {"company": "company_id", "event": "event_id", "event_type": "event_type", "booth": "booth"}
+
+
+def _group_label(snapshot: ResponseSnapshot, group_by: str, code: int) -> str:
+    if group_by == "company":
+        return snapshot.meta["companies"].get(str(code), "")
+    if group_by == "event":
+        return snapshot.meta["events"].get(str(code), "")
+    if group_by == "event_type":
+        return snapshot.event_types[code] or "미분류"
+    return snapshot.booths[code] or "미지정"
+
+
+def _bucket_starts(timestamps: np.ndarray, bucket: str) -> np.ndarray:
+    """epoch 초 -> 버킷 시작 시각(현지 시간 기준 epoch 초)"""
+    local = timestamps.astype(np.int64) + TZ_OFFSET_SECONDS
+    if bucket == "hour":
+        return local // 3600 * 3600
+    if bucket == "day":
+        return local // 86400 * 86400
+    if bucket == "week":
+        # 1970-01-01은 목요일 - 월요일 시작 주로 맞춤
+        return ((local // 86400 + 3) // 7 * 7 - 3) * 86400
+    months = local.astype("datetime64[s]").astype("datetime64[M]")
+    return months.astype("datetime64[s]").astype(np.int64)
+
+
+def _bucket_label(start: int, bucket: str) -> str:
+    moment = datetime(1970, 1, 1) + timedelta(seconds=int(start))
+    if bucket == "hour":
+        return moment.strftime("%Y-%m-%d %H:00")
+    if bucket == "month":
+        return moment.strftime("%Y-%m")
+    return moment.strftime("%Y-%m-%d")
+
+
+def _response_mask(
+    snapshot: ResponseSnapshot,
+    company_id: Optional[int] = None,
+    event_id: Optional[int] = None,
+    since_days: Optional[int] = None,
+) -> np.ndarray:
+    mask = np.ones(snapshot.meta["rows"], dtype=bool)
+    if company_id is not None:
+        mask &= snapshot["company_id"] == company_id
+    if event_id is not None:
+        mask &= snapshot["event_id"] == event_id
+    if since_days is not None:
+        since = datetime.now(timezone.utc).timestamp() - since_days * 86400
+        mask &= snapshot["submitted_at"] >= since
+    return mask
+
+
+def _factorize(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(고유값 배열, 각 원소의 고유값 인덱스)"""
+    uniques, inverse = np.unique(values, return_inverse=True)
+    return uniques, inverse.reshape(-1)
+
+
+def rating_trend(
+    snapshot: ResponseSnapshot,
+    group_by: str = "company",
+    bucket: str = "day",
+    company_id: Optional[int] = None,
+    event_id: Optional[int] = None,
+    since_days: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    그룹(회사/이벤트/이벤트 유형/부스)별 버킷마다 응답 수, 평점 응답 수, 평균 평점
+
+    Returns:
+        [{"id", "name", "responses", "average", "series": [{"bucket", "responses", "rated", "average"}]}]
+    """
+    mask = _response_mask(snapshot, company_id=company_id, event_id=event_id, since_days=since_days)
+    if not mask.any():
+        return []
+    groups = np.asarray(snapshot[_GROUP_COLUMNS[group_by]])[mask]
+    ratings = np.asarray(snapshot["rating"])[mask].astype(np.float64)
+    rated = ratings >= 0
+
+    group_codes, group_index = _factorize(groups)
+    bucket_starts, bucket_index = _factorize(_bucket_starts(np.asarray(snapshot["submitted_at"])[mask], bucket))
+    shape = (len(group_codes), len(bucket_starts))
+    keys = group_index * shape[1] + bucket_index
+    size = shape[0] * shape[1]
+    responses = np.bincount(keys, minlength=size).reshape(shape)
+    rated_counts = np.bincount(keys, weights=rated, minlength=size).reshape(shape)
+    rating_sums = np.bincount(keys, weights=np.where(rated, ratings, 0.0), minlength=size).reshape(shape)
+
+    results = []
+    for row, code in enumerate(group_codes):
+        filled = np.flatnonzero(responses[row])
+        total_rated = rated_counts[row].sum()
+        results.append({
+            "id": int(code) if group_by in ("company", "event") else None,
+            "name": _group_label(snapshot, group_by, int(code)),
+            "responses": int(responses[row].sum()),
+            "average": round(float(rating_sums[row].sum() / total_rated), 2) if total_rated else None,
+            "series": [
+                {
+                    "bucket": _bucket_label(bucket_starts[column], bucket),
+                    "responses": int(responses[row, column]),
+                    "rated": int(rated_counts[row, column]),
+                    "average": round(float(rating_sums[row, column] / rated_counts[row, column]), 2)
+                    if rated_counts[row, column] else None,
+                }
+                for column in filled
+            ],
+        })
+    results.sort(key=lambda item: item["responses"], reverse=True)
+    return results
+
+
+def answer_distribution(
+    snapshot: ResponseSnapshot,
+    group_by: str = "event_type",
+    kind: Optional[str] = None,
+    survey_id: Optional[int] = None,
+    question_key: Optional[str] = None,
+    question_text: Optional[str] = None,
+    company_id: Optional[int] = None,
+    limit: int = 20,
+) -> List[Dict[str, Any]]:
+    """
+    그룹별 선택형/평점 답변 라벨 분포 (문항 종류, 설문/문항, 문항 제목 일부로 거를 수 있음)
+
+    Returns:
+        [{"id", "name", "answers", "distribution": [{"label", "count", "percentage"}]}]
+    """
+    questions = snapshot.questions
+    if not questions or not snapshot.meta["cells"]:
+        return []
+    question_mask = np.array(
+        [
+            (kind is None or question["kind"] == kind)
+            and (survey_id is None or question["survey_id"] == survey_id)
+            and (question_key is None or question["key"] == str(question_key))
+            and (not question_text or question_text in question["text"])
+            for question in questions
+        ],
+        dtype=bool,
+    )
+    cell_rows = np.asarray(snapshot["cell_row"])
+    cell_mask = question_mask[np.asarray(snapshot["cell_question"])]
+    if company_id is not None:
+        cell_mask &= np.asarray(snapshot["company_id"])[cell_rows] == company_id
+    if not cell_mask.any():
+        return []
+
+    groups = np.asarray(snapshot[_GROUP_COLUMNS[group_by]])[cell_rows[cell_mask]]
+    values = np.asarray(snapshot["cell_value"])[cell_mask]
+    group_codes, group_index = _factorize(groups)
+    value_codes, value_index = _factorize(values)
+    shape = (len(group_codes), len(value_codes))
+    counts = np.bincount(group_index * shape[1] + value_index, minlength=shape[0] * shape[1]).reshape(shape)
+
+    results = []
+    for row, code in enumerate(group_codes):
+        total = int(counts[row].sum())
+        top = np.argsort(counts[row], kind="stable")[::-1][:limit]
+        results.append({
+            "id": int(code) if group_by in ("company", "event") else None,
+            "name": _group_label(snapshot, group_by, int(code)),
+            "answers": total,
+            "distribution": [
+                {
+                    "label": snapshot.values[value_codes[column]],
+                    "count": int(counts[row, column]),
+                    "percentage": round(float(counts[row, column]) / total * 100, 2),
+                }
+                for column in top
+                if counts[row, column]
+            ],
+        })
+    results.sort(key=lambda item: item["answers"], reverse=True)
+    return results
@@ -0,0 +1,315 @@
+# services/response_export.py
+"""
+설문 응답 내보내기 (CSV / XLSX 스트리밍)
+
+- 응답은 서버 측 커서(stream_results)로 EXPORT_FETCH_SIZE행씩 읽어 바로 내보내므로
+  응답 수와 무관하게 메모리 사용량이 일정하다
+- answers(JSONB)는 설문 정의의 문항마다 한 열로 펼친다 (복수 선택은 "; "로 연결)
+- XLSX는 외부 라이브러리 없이 zip 스트림에 시트 XML을 직접 쓴다 (inline string 셀).
+  한 시트 최대 행 수(1,048,576)를 넘으면 다음 시트로 이어서 쓴다
+"""
+
+import csv
+import io
+import json
+import os
+import re
+import zipfile
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+from xml.sax.saxutils import escape
+
+from dotenv import load_dotenv
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+
+load_dotenv()
+
+EXPORT_FETCH_SIZE = int(os.getenv("SURVEY_EXPORT_FETCH_SIZE", "2000"))
+# 이 행 수마다 한 번씩 버퍼를 비워 클라이언트로 보냄
+FLUSH_ROWS = 500
+XLSX_MAX_ROWS = 1_048_576
+
+CSV_MEDIA_TYPE = "text/csv; charset=utf-8"
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+BASE_COLUMNS = [
+    ("response_id", "응답 ID"),
+    ("survey_id", "설문 ID"),
+    ("survey_title", "설문"),
+    ("event_name", "이벤트"),
+    ("submitted_at", "제출 시각"),
+    ("respondent_name", "이름"),
+    ("respondent_email", "이메일"),
+    ("respondent_phone", "전화번호"),
+    ("respondent_company", "소속"),
+    ("booth_number", "부스 번호"),
+    ("rating", "평점"),
+    ("review", "후기"),
+]
+
+_RESPONSE_QUERY = """
+    SELECT r.id AS response_id, r.survey_id, s.title AS survey_title, e.event_name, r.submitted_at,
+           r.respondent_name, r.respondent_email, r.respondent_phone, r.respondent_company,
+           r.booth_number, r.rating, r.review, r.answers
+    FROM survey_responses r
+    JOIN surveys s ON s.id = r.survey_id
+    JOIN events e ON e.id = s.event_id
+    WHERE r.survey_id = ANY(:survey_ids)
+    ORDER BY r.survey_id, r.id DESC
+"""
+
+# XML 1.0에서 허용되지 않는 제어 문자
+_XML_ILLEGAL = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+
+@dataclass
+class ExportColumn:
+    header: str
+    survey_id: Optional[int] = None  # 문항 열이면 설문 id
+    field: str = ""  # 기본 열이면 응답 필드명, 문항 열이면 answers 키
+
+
+def build_columns(surveys: Sequence[Dict[str, Any]]) -> List[ExportColumn]:
+    """
+    기본 열 + 설문 정의의 문항 열
+
+    surveys: [{"id", "title", "questions"}] - 여러 설문이면 문항 열 머리글에 설문 제목을 붙인다.
+    """
+    columns = [ExportColumn(header=header, field=field) for field, header in BASE_COLUMNS]
+    multiple = len(surveys) > 1
+    for survey in surveys:
+        for question in survey.get("questions") or []:
+            if question.get("id") is None:
+                continue
+            label = question.get("question_text") or question.get("text") or f"문항 {question['id']}"
+            header = f"[{survey.get('title') or survey['id']}] {label}" if multiple else label
+            columns.append(ExportColumn(header=header, survey_id=survey["id"], field=str(question["id"])))
+    return columns
+
+
+def _cell(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return "; ".join(str(_cell(item)) for item in value)
+    if isinstance(value, dict):
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, bool):
+        return "예" if value else "아니오"
+    return value
+
+
+def iter_rows(survey_ids: List[int], columns: List[ExportColumn]) -> Iterator[List[Any]]:
+    """서버 측 커서로 응답을 읽어 열 순서대로 값 목록을 하나씩 반환 (세션은 직접 열고 닫음)"""
+    db: Session = SessionLocal()
+    try:
+        result = db.execute(
+            text(_RESPONSE_QUERY).execution_options(stream_results=True, yield_per=EXPORT_FETCH_SIZE),
+            {"survey_ids": survey_ids},
+        )
+        for row in result.mappings():
+            answers = row["answers"] or {}
+            values = []
+            for column in columns:
+                if column.survey_id is None:
+                    values.append(_cell(row[column.field]))
+                elif column.survey_id == row["survey_id"]:
+                    values.append(_cell(answers.get(column.field)))
+                else:
+                    values.append("")
+            yield values
+    finally:
+        db.close()
+
+
+def _text_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+# ---------- CSV ----------
+
+# 스프레드시트가 수식으로 해석하는 시작 문자 (관람객이 입력한 값이 실행되지 않도록 '를 붙임)
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _csv_value(value: Any) -> Any:
+    value = _text_value(value)
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def stream_csv(columns: List[ExportColumn], rows: Iterator[List[Any]]) -> Iterator[bytes]:
+    """UTF-8(BOM 포함, 엑셀에서 한글이 깨지지 않도록) CSV 청크"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write("\ufeff")
+    writer.writerow([column.header for column in columns])
+    try:
+        for index, values in enumerate(rows, start=1):
+            writer.writerow([_csv_value(value) for value in values])
+            if index % FLUSH_ROWS == 0:
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate(0)
+        yield buffer.getvalue().encode("utf-8")
+    finally:
+        # 클라이언트가 중간에 끊어도 커서/세션을 바로 반환
+        _close(rows)
+
+
+def _close(rows: Iterator[List[Any]]) -> None:
+    close = getattr(rows, "close", None)
+    if close is not None:
+        close()
+
+
+# ---------- XLSX ----------
+
+class _ChunkSink(io.RawIOBase):
+    """zipfile이 쓰는 바이트를 모아 두었다가 꺼내 가는 비탐색(non-seekable) 스트림"""
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+_SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_SHEET_TAIL = "</sheetData></worksheet>"
+
+
+def _xlsx_cell(value: Any) -> str:
+    value = _text_value(value)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f"<c><v>{value}</v></c>"
+    value = _XML_ILLEGAL.sub("", str(value))
+    if not value:
+        return "<c/>"
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{escape(value)}</t></is></c>'
+
+
+def _xlsx_row(number: int, values: List[Any]) -> str:
+    return f'<row r="{number}">' + "".join(_xlsx_cell(value) for value in values) + "</row>"
+
+
+def _xlsx_package_parts(sheet_count: int) -> Dict[str, str]:
+    sheets = "".join(
+        f'<sheet name="responses{"" if index == 1 else f"_{index}"}" sheetId="{index}" r:id="rId{index}"/>'
+        for index in range(1, sheet_count + 1)
+    )
+    sheet_rels = "".join(
+        f'<Relationship Id="rId{index}" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        f'Target="worksheets/sheet{index}.xml"/>'
+        for index in range(1, sheet_count + 1)
+    )
+    sheet_types = "".join(
+        f'<Override PartName="/xl/worksheets/sheet{index}.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        for index in range(1, sheet_count + 1)
+    )
+    header = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    return {
+        "[Content_Types].xml": header
+        + '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        + sheet_types
+        + "</Types>",
+        "_rels/.rels": header
+        + '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/></Relationships>',
+        "xl/workbook.xml": header
+        + '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        f"<sheets>{sheets}</sheets></workbook>",
+        "xl/_rels/workbook.xml.rels": header
+        + '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        + sheet_rels
+        + "</Relationships>",
+    }
+
+
+def stream_xlsx(columns: List[ExportColumn], rows: Iterator[List[Any]]) -> Iterator[bytes]:
+    """시트 XML을 zip 항목으로 바로 압축해 내보내는 XLSX 청크 (시트 목록 등은 마지막에 기록)"""
+    sink = _ChunkSink()
+    headers = [column.header for column in columns]
+    archive = zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED)
+    sheet_count = 0
+    sheet = None
+
+    def open_sheet():
+        nonlocal sheet_count
+        sheet_count += 1
+        handle = archive.open(f"xl/worksheets/sheet{sheet_count}.xml", mode="w", force_zip64=True)
+        handle.write((_SHEET_HEAD + _xlsx_row(1, headers)).encode("utf-8"))
+        return handle
+
+    try:
+        row_number = XLSX_MAX_ROWS
+        for index, values in enumerate(rows, start=1):
+            if row_number >= XLSX_MAX_ROWS:
+                if sheet is not None:
+                    sheet.write(_SHEET_TAIL.encode("utf-8"))
+                    sheet.close()
+                sheet = open_sheet()
+                row_number = 1
+            row_number += 1
+            sheet.write(_xlsx_row(row_number, values).encode("utf-8"))
+            if index % FLUSH_ROWS == 0:
+                yield sink.take()
+
+        if sheet is None:
+            # 응답이 없어도 머리글만 있는 시트 하나
+            sheet = open_sheet()
+        sheet.write(_SHEET_TAIL.encode("utf-8"))
+        sheet.close()
+        sheet = None
+
+        for name, content in _xlsx_package_parts(sheet_count).items():
+            archive.writestr(name, content)
+        archive.close()
+        yield sink.take()
+    finally:
+        _close(rows)
+        if sheet is not None:
+            sheet.close()
+        archive.close()
+
+
+def stream_export(
+    file_format: str,
+    surveys: Sequence[Dict[str, Any]],
+) -> Iterator[bytes]:
+    """설문 목록의 응답 전체를 file_format(csv/xlsx)으로 내보내는 청크 이터레이터"""
+    columns = build_columns(surveys)
+    rows = iter_rows([survey["id"] for survey in surveys], columns)
+    if file_format == "xlsx":
+        return stream_xlsx(columns, rows)
+    return stream_csv(columns, rows)
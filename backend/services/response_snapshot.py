@@ -0,0 +1,303 @@
+# services/response_snapshot.py
+"""
+설문 응답 컬럼형 스냅샷 - 여러 설문을 가로지르는 분석용
+
+survey_responses를 서버 측 커서로 한 번 훑어 열(column)마다 NumPy 배열(.npy)로 저장한다.
+- 응답 열: response_id, survey_id, event_id, company_id, event_type, booth, submitted_at, rating
+- 답변 열(선택형/평점 문항만, 복수 선택은 선택지마다 한 칸):
+  cell_row(응답 행 번호), cell_question, cell_value, cell_number
+- 문자열 값(이벤트 유형, 부스, 문항, 답변 라벨)은 사전(dictionary) 인코딩 - 열에는 int32 코드,
+  코드 -> 문자열 표는 meta.json에 둔다
+
+스냅샷은 SURVEY_SNAPSHOT_DIR/<버전>/ 디렉터리에 통째로 만든 뒤 CURRENT 파일을 바꿔 끼우므로
+읽는 쪽은 항상 완성된 스냅샷만 본다. 읽을 때는 mmap으로 열어 워커끼리 페이지 캐시를 공유한다.
+생성은 pg_try_advisory_lock으로 한 프로세스만 하고, 나머지 워커는 그 결과를 읽는다.
+집계는 services/response_analytics.py.
+
+수동 생성:
+    python -m services.response_snapshot
+"""
+
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from array import array
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from dotenv import load_dotenv
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from services import survey_stats
+from services.survey_aggregates import answer_label, rating_value
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_DIR = os.getenv("SURVEY_SNAPSHOT_DIR", "var/survey_snapshot")
+SNAPSHOT_FETCH_SIZE = int(os.getenv("SURVEY_SNAPSHOT_FETCH_SIZE", "5000"))
+# 새 스냅샷을 만든 뒤에도 남겨 둘 이전 버전 수 (읽는 중인 워커가 있을 수 있으므로)
+KEEP_PREVIOUS = 1
+# pg_try_advisory_lock(분류, 0)의 분류 키 - 스냅샷 생성은 한 프로세스만
+_LOCK_CLASS = 4043
+
+# 열 이름 -> (array 타입코드, NumPy dtype)
+RESPONSE_COLUMNS = {
+    "response_id": ("q", np.int64),
+    "survey_id": ("i", np.int32),
+    "event_id": ("i", np.int32),
+    "company_id": ("i", np.int32),
+    "event_type": ("i", np.int32),
+    "booth": ("i", np.int32),
+    "submitted_at": ("q", np.int64),  # epoch 초
+    "rating": ("h", np.int16),  # 없으면 -1
+}
+CELL_COLUMNS = {
+    "cell_row": ("i", np.int32),
+    "cell_question": ("i", np.int32),
+    "cell_value": ("i", np.int32),
+    "cell_number": ("f", np.float32),  # 평점 문항 값, 선택형은 NaN
+}
+
+_QUERY = text(
+    """
+    SELECT r.id, r.survey_id, s.event_id, e.company_id, e.event_type, r.booth_number,
+           r.submitted_at, r.rating, r.answers
+    FROM survey_responses r
+    JOIN surveys s ON s.id = r.survey_id
+    JOIN events e ON e.id = s.event_id
+    ORDER BY r.id
+    """
+)
+
+
+class _Dictionary:
+    """문자열 -> int32 코드 (등장 순서대로 0부터)"""
+
+    def __init__(self) -> None:
+        self.codes: Dict[Any, int] = {}
+        self.values: List[Any] = []
+
+    def encode(self, value: Any) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+
+def build_snapshot() -> Optional[Dict[str, Any]]:
+    """
+    survey_responses 전체로 새 스냅샷을 만들고 CURRENT로 교체. meta 반환
+
+    다른 프로세스(워커)가 만드는 중이면 건너뛰고 None 반환.
+    """
+    db = SessionLocal()
+    try:
+        # 세션 단위 잠금 - 롤백돼도 유지되므로 끝나면 직접 푼다
+        if not db.execute(
+            text("SELECT pg_try_advisory_lock(:lock_class, 0)"), {"lock_class": _LOCK_CLASS}
+        ).scalar():
+            logger.info("다른 프로세스가 설문 응답 스냅샷을 만드는 중 - 건너뜀")
+            return None
+        try:
+            return _build(db)
+        finally:
+            db.rollback()
+            db.execute(text("SELECT pg_advisory_unlock(:lock_class, 0)"), {"lock_class": _LOCK_CLASS})
+            db.commit()
+    finally:
+        db.close()
+
+
+def _build(db: Session) -> Dict[str, Any]:
+    started = time.perf_counter()
+    columns = {name: array(typecode) for name, (typecode, _) in {**RESPONSE_COLUMNS, **CELL_COLUMNS}.items()}
+    event_types, booths, labels = _Dictionary(), _Dictionary(), _Dictionary()
+    questions = _Dictionary()
+    question_info: Dict[tuple, Dict[str, Any]] = {}
+
+    # 문항 종류/제목과 이름 표 (작은 표라 한 번에 읽음)
+    kinds_by_survey: Dict[int, Dict[str, str]] = {}
+    for survey_id, survey_questions in db.execute(text("SELECT id, questions FROM surveys")).all():
+        kinds = survey_stats.question_keys_by_kind(survey_questions or [])
+        kinds_by_survey[survey_id] = {key: "choice" for key in kinds["choice"]}
+        kinds_by_survey[survey_id].update({key: "rating" for key in kinds["rating"]})
+        for question in survey_questions or []:
+            key = str(question.get("id"))
+            if key in kinds_by_survey[survey_id]:
+                question_info[(survey_id, key)] = {
+                    "survey_id": survey_id,
+                    "key": key,
+                    "text": question.get("question_text") or question.get("text") or "",
+                    "kind": kinds_by_survey[survey_id][key],
+                }
+    companies = {
+        str(company_id): name
+        for company_id, name in db.execute(text("SELECT id, company_name FROM companies")).all()
+    }
+    events = {str(event_id): name for event_id, name in db.execute(text("SELECT id, event_name FROM events")).all()}
+
+    result = db.execute(_QUERY.execution_options(stream_results=True, yield_per=SNAPSHOT_FETCH_SIZE))
+    row_index = 0
+    for response_id, survey_id, event_id, company_id, event_type, booth, submitted_at, rating, answers in result:
+        columns["response_id"].append(response_id)
+        columns["survey_id"].append(survey_id)
+        columns["event_id"].append(event_id)
+        columns["company_id"].append(company_id)
+        columns["event_type"].append(event_types.encode(event_type or ""))
+        columns["booth"].append(booths.encode(booth or ""))
+        columns["submitted_at"].append(int(submitted_at.timestamp()) if submitted_at else 0)
+        columns["rating"].append(rating if rating is not None else -1)
+
+        kinds = kinds_by_survey.get(survey_id, {})
+        for key, value in (answers or {}).items():
+            kind = kinds.get(str(key))
+            if kind is None:
+                continue
+            question_code = questions.encode((survey_id, str(key)))
+            if kind == "rating":
+                number = rating_value(value)
+                if number is None:
+                    continue
+                items, numeric = [str(number)], float(number)
+            else:
+                values = value if isinstance(value, list) else [value]
+                items = [answer_label(item) for item in values if item is not None]
+                numeric = float("nan")
+            for item in items:
+                columns["cell_row"].append(row_index)
+                columns["cell_question"].append(question_code)
+                columns["cell_value"].append(labels.encode(item))
+                columns["cell_number"].append(numeric)
+        row_index += 1
+
+    built_at = datetime.now(timezone.utc)
+    meta = {
+        "version": built_at.strftime("%Y%m%dT%H%M%S%f") + f"-{os.getpid()}",
+        "built_at": built_at.isoformat(),
+        "rows": row_index,
+        "cells": len(columns["cell_row"]),
+        "build_seconds": round(time.perf_counter() - started, 2),
+        "dictionaries": {
+            "event_type": event_types.values,
+            "booth": booths.values,
+            "value": labels.values,
+            "question": [question_info[key] for key in questions.values],
+        },
+        "companies": companies,
+        "events": events,
+    }
+    _publish(meta, columns)
+    logger.info("설문 응답 스냅샷 생성: %d행, 답변 %d칸, %.2fs", meta["rows"], meta["cells"], meta["build_seconds"])
+    return {key: value for key, value in meta.items() if key not in ("dictionaries", "companies", "events")}
+
+
+def _publish(meta: Dict[str, Any], columns: Dict[str, array]) -> None:
+    """임시 디렉터리에 열을 모두 쓴 뒤 이름을 바꾸고 CURRENT를 원자적으로 교체"""
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    final_dir = os.path.join(SNAPSHOT_DIR, meta["version"])
+    staging_dir = final_dir + ".part"
+    os.makedirs(staging_dir)
+    dtypes = {name: dtype for name, (_, dtype) in {**RESPONSE_COLUMNS, **CELL_COLUMNS}.items()}
+    for name, values in columns.items():
+        data = np.frombuffer(values, dtype=dtypes[name]) if len(values) else np.empty(0, dtype=dtypes[name])
+        np.save(os.path.join(staging_dir, f"{name}.npy"), data)
+    with open(os.path.join(staging_dir, "meta.json"), "w", encoding="utf-8") as file:
+        json.dump(meta, file, ensure_ascii=False)
+    os.replace(staging_dir, final_dir)
+
+    pointer = os.path.join(SNAPSHOT_DIR, "CURRENT")
+    with open(pointer + ".part", "w", encoding="utf-8") as file:
+        file.write(meta["version"])
+    os.replace(pointer + ".part", pointer)
+
+    # 오래된 버전 정리 (현재 + 직전 KEEP_PREVIOUS개만 유지)
+    versions = sorted(
+        (name for name in os.listdir(SNAPSHOT_DIR) if name != "CURRENT" and not name.endswith(".part")),
+        reverse=True,
+    )
+    for name in versions[KEEP_PREVIOUS + 1:]:
+        shutil.rmtree(os.path.join(SNAPSHOT_DIR, name), ignore_errors=True)
+
+
+class ResponseSnapshot:
+    """mmap으로 연 스냅샷 한 버전 (열 이름 -> 읽기 전용 배열)"""
+
+    def __init__(self, directory: str) -> None:
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as file:
+            self.meta: Dict[str, Any] = json.load(file)
+        self.columns: Dict[str, np.ndarray] = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+            for name in {**RESPONSE_COLUMNS, **CELL_COLUMNS}
+        }
+        dictionaries = self.meta["dictionaries"]
+        self.event_types: List[str] = dictionaries["event_type"]
+        self.booths: List[str] = dictionaries["booth"]
+        self.values: List[str] = dictionaries["value"]
+        self.questions: List[Dict[str, Any]] = dictionaries["question"]
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    @property
+    def version(self) -> str:
+        return self.meta["version"]
+
+    def summary(self) -> Dict[str, Any]:
+        return {key: self.meta[key] for key in ("version", "built_at", "rows", "cells", "build_seconds")}
+
+
+_current: Optional[ResponseSnapshot] = None
+_current_lock = threading.Lock()
+
+
+def _read_current_version() -> Optional[str]:
+    try:
+        with open(os.path.join(SNAPSHOT_DIR, "CURRENT"), encoding="utf-8") as file:
+            return file.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def current_snapshot() -> Optional[ResponseSnapshot]:
+    """
+    CURRENT가 가리키는 스냅샷 (바뀌었을 때만 다시 연다). 아직 없으면 None
+
+    읽은 버전을 다른 워커가 그 사이에 정리했으면 CURRENT를 한 번 더 읽고,
+    그래도 열 수 없으면 이미 열어 둔 스냅샷을 계속 쓴다 (mmap은 지워진 파일도 읽을 수 있음).
+    """
+    global _current
+    version = _read_current_version()
+    if version is None:
+        return _current
+    snapshot = _current
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+    with _current_lock:
+        for _ in range(2):
+            if _current is not None and _current.version == version:
+                break
+            try:
+                _current = ResponseSnapshot(os.path.join(SNAPSHOT_DIR, version))
+                break
+            except FileNotFoundError:
+                latest = _read_current_version()
+                if latest is None or latest == version:
+                    logger.warning("설문 응답 스냅샷 %s를 열 수 없어 이전 스냅샷 유지", version)
+                    break
+                version = latest
+        return _current
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(json.dumps(build_snapshot(), indent=2, ensure_ascii=False))
@@ -0,0 +1,182 @@
+# services/static_files.py
+"""
+/uploads 정적 파일 서빙
+
+- 내용 해시로 이름 붙인 파일: 1년 immutable 캐시 (재검증 요청 자체가 없음)
+- 그 외 파일: ETag/Last-Modified로 재검증 (304)
+- Range 요청 (206) - 큰 PDF 등을 이어받기/부분 로드
+- 저장소가 미리 만들어 둔 .br/.gz 변형을 Accept-Encoding에 맞춰 전송
+- UPLOADS_ACCEL_REDIRECT_PREFIX 설정 시 파일 전송을 nginx(X-Accel-Redirect)에 넘김
+"""
+
+import mimetypes
+import os
+import re
+from typing import Optional, Tuple
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Receive, Scope, Send
+
+from services.storage import COMPRESSIBLE_TYPES, IMMUTABLE_CACHE_CONTROL
+
+# Unsplash 미러 변형 {sha256 앞 20자}_{폭}.{jpg|webp}, 이벤트 이미지 {sha256}.{ext}
+CONTENT_HASHED_NAME = re.compile(r"/([0-9a-f]{20}_\d+\.(jpg|webp)|[0-9a-f]{64}\.\w+)$")
+
+REVALIDATE_CACHE_CONTROL = "public, no-cache"
+
+# Accept-Encoding 선호 순서
+PRECOMPRESSED_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+# 예: /_protected_uploads/ (nginx의 internal location)
+ACCEL_REDIRECT_PREFIX = os.getenv("UPLOADS_ACCEL_REDIRECT_PREFIX", "")
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _accepts(request_headers: Headers, encoding: str) -> bool:
+    for part in request_headers.get("accept-encoding", "").split(","):
+        name, _, params = part.strip().partition(";")
+        if name.strip().lower() == encoding:
+            return params.replace(" ", "") not in ("q=0", "q=0.0")
+    return False
+
+
+def parse_byte_range(value: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    단일 bytes 범위를 (시작, 끝 포함)으로 변환. 만족할 수 없는 범위면 ValueError
+
+    여러 범위(multipart/byteranges)는 지원하지 않으며 None(전체 전송)을 반환한다.
+    """
+    match = _RANGE.match(value.strip())
+    if not match:
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if not start:
+        # 마지막 N바이트
+        length = int(end)
+        if length == 0:
+            raise ValueError(value)
+        return max(size - length, 0), size - 1
+    first = int(start)
+    last = min(int(end), size - 1) if end else size - 1
+    if first >= size or first > last:
+        raise ValueError(value)
+    return first, last
+
+
+class FileRangeResponse(Response):
+    """파일 일부만 전송하는 206 응답"""
+
+    chunk_size = 64 * 1024
+
+    def __init__(self, path: str, start: int, end: int, headers: dict, method: str) -> None:
+        super().__init__(status_code=206, headers=headers)
+        self.path = path
+        self.start = start
+        self.end = end
+        self.send_body = method != "HEAD"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if not self.send_body:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        remaining = self.end - self.start + 1
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            await file.seek(self.start)
+            while remaining > 0:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+        if remaining > 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+class UploadStaticFiles(StaticFiles):
+    """업로드 파일 서빙 - 캐시 헤더, 조건부 요청, Range, 미리 압축된 변형"""
+
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        request_headers = Headers(scope=scope)
+        path = str(full_path)
+        method = scope["method"]
+        media_type = mimetypes.guess_type(path)[0] or "text/plain"
+        compressible = bool(COMPRESSIBLE_TYPES.match(media_type))
+
+        headers = {
+            "Accept-Ranges": "bytes",
+            "Cache-Control": (
+                IMMUTABLE_CACHE_CONTROL
+                if CONTENT_HASHED_NAME.search(path.replace("\\", "/"))
+                else REVALIDATE_CACHE_CONTROL
+            ),
+        }
+        if compressible:
+            headers["Vary"] = "Accept-Encoding"
+
+        served_path, served_stat, encoding = path, stat_result, None
+        if compressible and status_code == 200 and "range" not in request_headers:
+            for name, suffix in PRECOMPRESSED_ENCODINGS:
+                if _accepts(request_headers, name) and os.path.isfile(path + suffix):
+                    served_path, served_stat, encoding = path + suffix, os.stat(path + suffix), name
+                    headers["Content-Encoding"] = name
+                    break
+
+        response = FileResponse(
+            served_path,
+            status_code=status_code,
+            headers=headers,
+            media_type=media_type,
+            stat_result=served_stat,
+            method=method,
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+
+        if ACCEL_REDIRECT_PREFIX and status_code == 200:
+            # nginx가 파일을 직접 보내도록 위임 (캐시 헤더는 우리가 정한 값 유지).
+            # Range와 .gz/.br 선택은 nginx(gzip_static/brotli_static)가 처리하므로 원본 경로를 넘긴다
+            relative = os.path.relpath(path, os.path.realpath(self.directory)).replace(os.sep, "/")
+            accel_headers = {
+                key: value
+                for key, value in response.headers.items()
+                if key.lower() not in ("content-length", "content-encoding", "etag", "last-modified")
+            }
+            accel_headers["X-Accel-Redirect"] = ACCEL_REDIRECT_PREFIX.rstrip("/") + "/" + relative
+            return Response(status_code=200, headers=accel_headers)
+
+        range_header = request_headers.get("range")
+        if range_header and encoding is None and status_code == 200 and self._if_range_matches(
+            response.headers, request_headers
+        ):
+            size = stat_result.st_size
+            try:
+                byte_range = parse_byte_range(range_header, size)
+            except ValueError:
+                return Response(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+            if byte_range is not None:
+                start, end = byte_range
+                range_headers = {
+                    key: value
+                    for key, value in response.headers.items()
+                    if key.lower() in ("etag", "last-modified", "cache-control", "accept-ranges", "content-type")
+                }
+                range_headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+                range_headers["Content-Length"] = str(end - start + 1)
+                return FileRangeResponse(path, start, end, range_headers, method)
+
+        return response
+
+    @staticmethod
+    def _if_range_matches(response_headers: Headers, request_headers: Headers) -> bool:
+        """If-Range가 있으면 현재 ETag/Last-Modified와 같을 때만 부분 응답"""
+        if_range = request_headers.get("if-range")
+        if not if_range:
+            return True
+        return if_range in (response_headers.get("etag"), response_headers.get("last-modified"))
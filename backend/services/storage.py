@@ -0,0 +1,439 @@
+# services/storage.py
+"""
+업로드 파일 저장소 추상화 - 로컬 파일시스템 / S3 호환 오브젝트 스토리지
+
+STORAGE_BACKEND=local (기본): UPLOAD_DIR(기본 uploads) 아래에 저장, /uploads 정적 경로로 서빙
+STORAGE_BACKEND=s3: S3 호환 API (AWS S3, MinIO, R2 등)에 SigV4 서명 요청으로 저장
+    - 여러 앱 노드가 같은 버킷을 공유할 수 있다
+    - 로컬 테스트: docker run -p 9000:9000 minio/minio server /data
+      S3_ENDPOINT_URL=http://localhost:9000 S3_BUCKET=booth-talk ...
+
+키 규칙:
+    temp/{uuid}{ext}              분석용 임시 업로드 (cleanup_service가 정리)
+    events/{sha256}{ext}          이벤트 이미지 - 내용 주소(content-addressed), 같은 파일은 한 번만 저장
+    events/unsplash/{hash}_{w}.*  Unsplash 미러 변형 (services/image_mirror.py)
+
+내용 주소 키는 내용이 바뀌지 않으므로 immutable 캐시 헤더로 저장/서빙한다.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import hmac
+import logging
+import mimetypes
+import os
+import re
+import time
+import uuid
+import xml.etree.ElementTree as ElementTree
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote, urlsplit
+
+import aiofiles
+import aiohttp
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+TEMP_PREFIX = "temp/"
+EVENT_IMAGE_PREFIX = "events/"
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+_SAFE_KEY = re.compile(r"^[A-Za-z0-9._\-/]+$")
+
+# 미리 압축해 둘 콘텐츠 (이미지는 이미 압축돼 있어 제외)
+COMPRESSIBLE_TYPES = re.compile(r"^(text/|application/(pdf|json|xml|javascript)|image/svg\+xml)")
+PRECOMPRESS_MIN_BYTES = 1024
+PRECOMPRESSED_SUFFIXES = (".br", ".gz")
+
+try:  # brotli는 선택 의존성 - 없으면 gzip만 생성
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+
+class StorageError(RuntimeError):
+    """저장소 요청 실패"""
+
+
+def content_key(data: bytes, prefix: str, extension: str) -> str:
+    """내용 해시 기반 키 (같은 파일이면 같은 키)"""
+    return f"{prefix}{hashlib.sha256(data).hexdigest()}{extension.lower()}"
+
+
+def guess_content_type(key: str) -> str:
+    return mimetypes.guess_type(key)[0] or "application/octet-stream"
+
+
+def _precompress(data: bytes) -> Dict[str, bytes]:
+    """정적 서빙용 .br/.gz 변형 (원본보다 10% 이상 작을 때만)"""
+    variants = {".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants[".br"] = brotli.compress(data, quality=11)
+    return {suffix: body for suffix, body in variants.items() if len(body) < len(data) * 0.9}
+
+
+def _validate_key(key: str) -> str:
+    if not key or key.startswith("/") or ".." in key.split("/") or not _SAFE_KEY.match(key):
+        raise ValueError(f"허용되지 않는 저장소 키입니다: {key!r}")
+    return key
+
+
+class LocalStorage:
+    """로컬 디렉터리 저장소 (단일 노드용)"""
+
+    name = "local"
+
+    def __init__(self, root: str, url_prefix: str = "/uploads") -> None:
+        self.root = root
+        self.url_prefix = url_prefix.rstrip("/")
+        os.makedirs(self.root, exist_ok=True)
+
+    def local_path(self, key: str) -> str:
+        return os.path.join(self.root, *_validate_key(key).split("/"))
+
+    async def put(
+        self,
+        key: str,
+        data: bytes,
+        content_type: Optional[str] = None,
+        cache_control: Optional[str] = None,
+    ) -> None:
+        path = self.local_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        files = {path: data}
+        content_type = content_type or guess_content_type(key)
+        if len(data) >= PRECOMPRESS_MIN_BYTES and COMPRESSIBLE_TYPES.match(content_type):
+            # UploadStaticFiles가 Accept-Encoding에 맞춰 그대로 전송
+            compressed = await asyncio.to_thread(_precompress, data)
+            files.update({path + suffix: body for suffix, body in compressed.items()})
+        for file_path, body in files.items():
+            # 임시 파일에 쓰고 교체해 반쯤 쓰인 파일이 서빙되지 않도록 함
+            temp_path = f"{file_path}.{uuid.uuid4().hex}.part"
+            async with aiofiles.open(temp_path, "wb") as output:
+                await output.write(body)
+            os.replace(temp_path, file_path)
+
+    async def get(self, key: str) -> bytes:
+        async with aiofiles.open(self.local_path(key), "rb") as source:
+            return await source.read()
+
+    async def exists(self, key: str) -> bool:
+        return os.path.isfile(self.local_path(key))
+
+    async def delete(self, key: str) -> None:
+        path = self.local_path(key)
+        for file_path in (path, *(path + suffix for suffix in PRECOMPRESSED_SUFFIXES)):
+            try:
+                os.remove(file_path)
+            except FileNotFoundError:
+                pass
+
+    async def list(self, prefix: str) -> List[Tuple[str, float]]:
+        """prefix 아래 (키, 수정 시각 epoch) 목록"""
+        directory = os.path.join(self.root, *prefix.strip("/").split("/"))
+
+        def scan() -> List[Tuple[str, float]]:
+            if not os.path.isdir(directory):
+                return []
+            return [
+                (f"{prefix.rstrip('/')}/{entry.name}", entry.stat().st_mtime)
+                for entry in os.scandir(directory)
+                if entry.is_file() and not entry.name.endswith((".part", *PRECOMPRESSED_SUFFIXES))
+            ]
+
+        return await asyncio.to_thread(scan)
+
+    def public_url(self, key: str) -> str:
+        return f"{self.url_prefix}/{_validate_key(key)}"
+
+    async def presigned_url(self, key: str, expires_seconds: int = 3600) -> str:
+        # 로컬 파일은 정적 경로로 바로 접근 가능
+        return self.public_url(key)
+
+    async def close(self) -> None:
+        return None
+
+
+class S3Storage:
+    """S3 호환 저장소 - aiohttp + 직접 구현한 SigV4 서명 (path-style 주소)"""
+
+    name = "s3"
+
+    def __init__(
+        self,
+        endpoint_url: str,
+        bucket: str,
+        access_key: str,
+        secret_key: str,
+        region: str = "us-east-1",
+        public_base_url: Optional[str] = None,
+    ) -> None:
+        self.endpoint_url = endpoint_url.rstrip("/")
+        self.bucket = bucket
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        # CDN 또는 공개 읽기 버킷 주소 (없으면 엔드포인트/버킷 경로)
+        self.public_base_url = (public_base_url or f"{self.endpoint_url}/{bucket}").rstrip("/")
+        self._host = urlsplit(self.endpoint_url).netloc
+        self._timeout = aiohttp.ClientTimeout(total=30)
+        # 이벤트 루프별 세션 (스케줄러 스레드의 asyncio.run 루프와 앱 루프가 섞이지 않도록)
+        self._sessions: Dict[int, aiohttp.ClientSession] = {}
+
+    def local_path(self, key: str) -> None:
+        return None
+
+    # ---------- SigV4 ----------
+
+    def _signing_key(self, date_stamp: str) -> bytes:
+        key = ("AWS4" + self.secret_key).encode("utf-8")
+        for part in (date_stamp, self.region, "s3", "aws4_request"):
+            key = hmac.new(key, part.encode("utf-8"), hashlib.sha256).digest()
+        return key
+
+    def _object_path(self, key: str) -> str:
+        return quote(f"/{self.bucket}/{_validate_key(key)}" if key else f"/{self.bucket}", safe="/-_.~")
+
+    @staticmethod
+    def _canonical_query(query: Dict[str, str]) -> str:
+        return "&".join(
+            f"{quote(name, safe='-_.~')}={quote(str(value), safe='-_.~')}"
+            for name, value in sorted(query.items())
+        )
+
+    def _signature(
+        self,
+        method: str,
+        path: str,
+        query: Dict[str, str],
+        headers: Dict[str, str],
+        payload_hash: str,
+        amz_date: str,
+    ) -> Tuple[str, str, str]:
+        """(credential scope, signed headers, signature)"""
+        date_stamp = amz_date[:8]
+        scope = f"{date_stamp}/{self.region}/s3/aws4_request"
+        signed_names = sorted(name.lower() for name in headers)
+        canonical_headers = "".join(
+            f"{name}:{str(headers[original]).strip()}\n"
+            for name in signed_names
+            for original in headers
+            if original.lower() == name
+        )
+        signed_headers = ";".join(signed_names)
+        canonical_request = "\n".join(
+            [method, path, self._canonical_query(query), canonical_headers, signed_headers, payload_hash]
+        )
+        string_to_sign = "\n".join(
+            [
+                "AWS4-HMAC-SHA256",
+                amz_date,
+                scope,
+                hashlib.sha256(canonical_request.encode("utf-8")).hexdigest(),
+            ]
+        )
+        signature = hmac.new(
+            self._signing_key(date_stamp), string_to_sign.encode("utf-8"), hashlib.sha256
+        ).hexdigest()
+        return scope, signed_headers, signature
+
+    def _session(self) -> aiohttp.ClientSession:
+        loop_id = id(asyncio.get_running_loop())
+        session = self._sessions.get(loop_id)
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(
+                timeout=self._timeout,
+                connector=aiohttp.TCPConnector(limit=int(os.getenv("S3_POOL_SIZE", "32"))),
+            )
+            self._sessions[loop_id] = session
+        return session
+
+    async def _request(
+        self,
+        method: str,
+        key: str,
+        query: Optional[Dict[str, str]] = None,
+        data: bytes = b"",
+        extra_headers: Optional[Dict[str, str]] = None,
+        expected: Tuple[int, ...] = (200,),
+    ) -> Tuple[int, bytes, Dict[str, str]]:
+        from yarl import URL
+
+        query = query or {}
+        amz_date = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        payload_hash = hashlib.sha256(data).hexdigest()
+        headers = {
+            "host": self._host,
+            "x-amz-content-sha256": payload_hash,
+            "x-amz-date": amz_date,
+            **(extra_headers or {}),
+        }
+        path = self._object_path(key)
+        scope, signed_headers, signature = self._signature(
+            method, path, query, headers, payload_hash, amz_date
+        )
+        headers["Authorization"] = (
+            f"AWS4-HMAC-SHA256 Credential={self.access_key}/{scope}, "
+            f"SignedHeaders={signed_headers}, Signature={signature}"
+        )
+        del headers["host"]  # aiohttp가 같은 값으로 채움
+
+        query_string = self._canonical_query(query)
+        url = URL(f"{self.endpoint_url}{path}{'?' + query_string if query_string else ''}", encoded=True)
+        async with self._session().request(method, url, data=data or None, headers=headers) as response:
+            body = await response.read()
+            if response.status not in expected:
+                raise StorageError(f"S3 {method} {key} 실패 ({response.status}): {body[:300]!r}")
+            return response.status, body, dict(response.headers)
+
+    # ---------- 저장소 인터페이스 ----------
+
+    async def put(
+        self,
+        key: str,
+        data: bytes,
+        content_type: Optional[str] = None,
+        cache_control: Optional[str] = None,
+    ) -> None:
+        headers = {"content-type": content_type or guess_content_type(key)}
+        if cache_control:
+            headers["cache-control"] = cache_control
+        await self._request("PUT", key, data=data, extra_headers=headers)
+
+    async def get(self, key: str) -> bytes:
+        _, body, _ = await self._request("GET", key)
+        return body
+
+    async def exists(self, key: str) -> bool:
+        status, _, _ = await self._request("HEAD", key, expected=(200, 404))
+        return status == 200
+
+    async def delete(self, key: str) -> None:
+        await self._request("DELETE", key, expected=(200, 204, 404))
+
+    async def list(self, prefix: str) -> List[Tuple[str, float]]:
+        """prefix 아래 (키, 수정 시각 epoch) 목록 (ListObjectsV2, 페이지 이어받기)"""
+        namespace = {"s3": "http://s3.amazonaws.com/doc/2006-03-01/"}
+        objects: List[Tuple[str, float]] = []
+        token: Optional[str] = None
+        while True:
+            query = {"list-type": "2", "prefix": prefix}
+            if token:
+                query["continuation-token"] = token
+            _, body, _ = await self._request("GET", "", query=query)
+            root = ElementTree.fromstring(body)
+            for item in root.findall("s3:Contents", namespace):
+                modified = item.findtext("s3:LastModified", default="", namespaces=namespace)
+                modified_at = datetime.fromisoformat(modified.replace("Z", "+00:00")).timestamp() if modified else 0.0
+                objects.append((item.findtext("s3:Key", default="", namespaces=namespace), modified_at))
+            if root.findtext("s3:IsTruncated", default="false", namespaces=namespace) != "true":
+                return objects
+            token = root.findtext("s3:NextContinuationToken", namespaces=namespace)
+
+    def public_url(self, key: str) -> str:
+        return f"{self.public_base_url}/{quote(_validate_key(key), safe='/-_.~')}"
+
+    async def presigned_url(self, key: str, expires_seconds: int = 3600) -> str:
+        """비공개 객체 임시 GET URL (SigV4 query string 서명)"""
+        amz_date = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        scope = f"{amz_date[:8]}/{self.region}/s3/aws4_request"
+        query = {
+            "X-Amz-Algorithm": "AWS4-HMAC-SHA256",
+            "X-Amz-Credential": f"{self.access_key}/{scope}",
+            "X-Amz-Date": amz_date,
+            "X-Amz-Expires": str(expires_seconds),
+            "X-Amz-SignedHeaders": "host",
+        }
+        path = self._object_path(key)
+        _, _, signature = self._signature(
+            "GET", path, query, {"host": self._host}, "UNSIGNED-PAYLOAD", amz_date
+        )
+        return f"{self.endpoint_url}{path}?{self._canonical_query(query)}&X-Amz-Signature={signature}"
+
+    async def close(self) -> None:
+        """현재 이벤트 루프의 세션 종료"""
+        session = self._sessions.pop(id(asyncio.get_running_loop()), None)
+        if session is not None and not session.closed:
+            await session.close()
+
+
+def _create_storage():
+    backend = os.getenv("STORAGE_BACKEND", "local").lower()
+    if backend == "s3":
+        return S3Storage(
+            endpoint_url=os.getenv("S3_ENDPOINT_URL", "https://s3.amazonaws.com"),
+            bucket=os.environ["S3_BUCKET"],
+            access_key=os.environ["S3_ACCESS_KEY_ID"],
+            secret_key=os.environ["S3_SECRET_ACCESS_KEY"],
+            region=os.getenv("S3_REGION", "us-east-1"),
+            public_base_url=os.getenv("S3_PUBLIC_BASE_URL") or None,
+        )
+    return LocalStorage(root=os.getenv("UPLOAD_DIR", "uploads"))
+
+
+# 싱글톤 인스턴스
+storage = _create_storage()
+
+
+# ---------- 업로드 흐름 (임시 → 영구 → 정리) ----------
+
+async def save_temp_upload(data: bytes, extension: str) -> Tuple[str, str]:
+    """분석용 임시 업로드 저장. (임시 키, 미리보기 URL) 반환"""
+    key = f"{TEMP_PREFIX}{uuid.uuid4().hex}{extension.lower()}"
+    await storage.put(key, data, content_type=guess_content_type(key))
+    return key, await storage.presigned_url(key)
+
+
+def normalize_temp_key(value: Optional[str]) -> Optional[str]:
+    """
+    클라이언트가 돌려준 temp_image_path를 임시 키로 변환 (임시 영역 밖은 거부)
+
+    이전 응답의 로컬 경로 형식("uploads/temp/...")도 받아들인다.
+    """
+    if not value:
+        return None
+    key = value.replace("\\", "/").lstrip("./")
+    if key.startswith("uploads/"):
+        key = key[len("uploads/"):]
+    if not key.startswith(TEMP_PREFIX):
+        return None
+    try:
+        return _validate_key(key)
+    except ValueError:
+        return None
+
+
+async def promote_temp_upload(temp_key: str) -> Tuple[str, str]:
+    """
+    임시 업로드를 내용 주소 키로 영구 저장하고 임시 객체는 삭제.
+    이미 같은 내용이 저장돼 있으면 다시 쓰지 않는다. (영구 키, 공개 URL) 반환
+    """
+    data = await storage.get(temp_key)
+    extension = os.path.splitext(temp_key)[1] or ".jpg"
+    key = content_key(data, EVENT_IMAGE_PREFIX, extension)
+    if not await storage.exists(key):
+        await storage.put(
+            key, data, content_type=guess_content_type(key), cache_control=IMMUTABLE_CACHE_CONTROL
+        )
+    await storage.delete(temp_key)
+    return key, storage.public_url(key)
+
+
+async def delete_temp_older_than(max_age_seconds: float) -> int:
+    """max_age_seconds보다 오래된 임시 업로드 삭제, 삭제 수 반환"""
+    cutoff = time.time() - max_age_seconds
+    deleted = 0
+    for key, modified_at in await storage.list(TEMP_PREFIX):
+        if modified_at < cutoff:
+            try:
+                await storage.delete(key)
+                deleted += 1
+            except Exception as exc:  # noqa: BLE001
+                logger.error("임시 파일 삭제 실패 %s: %s", key, exc)
+    return deleted
@@ -0,0 +1,349 @@
+# services/survey_aggregates.py
+"""
+설문 문항별 누적 집계 - 응답 저장과 같은 트랜잭션에서 증가분만 반영
+
+survey_question_aggregates 테이블에 (설문, 문항)마다 응답 수, 선택지/평점 분포(JSONB),
+평점 합계/개수/최소/최대를 유지한다. 통계 API는 이 행만 읽으므로 응답 수와 무관하게
+문항 수에 비례하는 비용으로 동작한다.
+
+집계 기준은 services/survey_stats.py의 SQL 집계와 같다. rebuild()로 원본 응답에서 다시
+계산해 교체하거나(check=True면 비교만) 어긋남을 확인할 수 있다:
+    python -m services.survey_aggregates rebuild [--survey-id 1] [--check]
+
+증가분은 surveys.aggregates_ready가 켜진 설문에만 더한다. 도입 이전 응답이 있는 설문은
+스케줄러(backfill_missing, 15분마다)나 `python -m services.survey_aggregates backfill`이 원본에서
+재계산하며 표시를 켜고, 그 전에 들어온 응답의 증가분은 버린다(재계산에 포함되므로).
+표시 전까지 통계 API는 SQL 집계를 읽기만 한다.
+
+재계산은 설문별 advisory 잠금(배타)을 잡고, 증가 반영은 같은 키의 공유 잠금을 잡으므로
+재계산 중인 설문의 저장만 잠시 기다린다 (다른 설문의 저장은 막지 않음).
+"""
+
+import argparse
+import json
+import logging
+import re
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from services import survey_stats
+
+logger = logging.getLogger(__name__)
+
+_DIGITS = re.compile(r"[0-9]+")
+
+# pg_advisory_xact_lock(분류, 설문 id)의 분류 키 - 설문별 재계산 잠금
+_LOCK_CLASS = 4040
+# 스케줄러 한 번에 채우는 최대 설문 수
+BACKFILL_BATCH = 20
+
+_MISSING = text(
+    """
+    SELECT s.id
+    FROM surveys s
+    WHERE NOT s.aggregates_ready
+      AND s.id > :after_id
+    ORDER BY s.id
+    LIMIT :limit
+    """
+)
+
+_UPSERT = text(
+    """
+    INSERT INTO survey_question_aggregates AS a
+        (survey_id, question_key, total, non_empty, counts,
+         rating_count, rating_sum, rating_min, rating_max, updated_at)
+    VALUES
+        (:survey_id, :question_key, :total, :non_empty, CAST(:counts AS JSONB),
+         :rating_count, :rating_sum, :rating_min, :rating_max, NOW())
+    ON CONFLICT (survey_id, question_key) DO UPDATE SET
+        total = a.total + EXCLUDED.total,
+        non_empty = a.non_empty + EXCLUDED.non_empty,
+        counts = CASE WHEN EXCLUDED.counts = '{}'::jsonb THEN a.counts ELSE (
+            SELECT COALESCE(jsonb_object_agg(
+                k, COALESCE((a.counts ->> k)::int, 0) + COALESCE((EXCLUDED.counts ->> k)::int, 0)
+            ), '{}'::jsonb)
+            FROM (SELECT jsonb_object_keys(a.counts) UNION SELECT jsonb_object_keys(EXCLUDED.counts)) AS keys(k)
+        ) END,
+        rating_count = a.rating_count + EXCLUDED.rating_count,
+        rating_sum = a.rating_sum + EXCLUDED.rating_sum,
+        rating_min = LEAST(a.rating_min, EXCLUDED.rating_min),
+        rating_max = GREATEST(a.rating_max, EXCLUDED.rating_max),
+        updated_at = NOW()
+    """
+)
+
+
+def answer_label(value: Any) -> str:
+    """JSONB `#>> '{}'`와 같은 문자열 표현"""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+def rating_value(value: Any) -> Optional[int]:
+    """평점 답변의 정수값 (survey_stats의 '^[0-9]+$' 조건과 같은 기준), 아니면 None"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int) and value >= 0:
+        return value
+    if isinstance(value, str) and _DIGITS.fullmatch(value):
+        return int(value)
+    return None
+
+
+def _empty_delta() -> Dict[str, Any]:
+    return {"total": 0, "non_empty": 0, "counts": defaultdict(int), "rating_count": 0,
+            "rating_sum": 0, "rating_min": None, "rating_max": None}
+
+
+def _kinds_by_key(questions: List[Dict[str, Any]]) -> Dict[str, str]:
+    return {
+        key: kind
+        for kind, keys in survey_stats.question_keys_by_kind(questions).items()
+        for key in keys
+    }
+
+
+def apply_responses(
+    db: Session,
+    rows: Iterable[Dict[str, Any]],
+    questions_by_survey: Optional[Dict[int, List[Dict[str, Any]]]] = None,
+) -> None:
+    """
+    저장하는 응답들의 증가분을 설문/문항별로 합쳐 반영한다 (커밋은 호출 측)
+
+    questions_by_survey가 없으면 관련 설문의 questions를 한 번에 조회한다.
+    """
+    rows = list(rows)
+    if not rows:
+        return
+    survey_ids = sorted({row["survey_id"] for row in rows})
+    if questions_by_survey is None:
+        questions_by_survey = dict(
+            db.execute(
+                text("SELECT id, questions FROM surveys WHERE id = ANY(:ids)"), {"ids": survey_ids}
+            ).all()
+        )
+    kinds = {survey_id: _kinds_by_key(questions_by_survey.get(survey_id) or []) for survey_id in survey_ids}
+
+    deltas: Dict[tuple, Dict[str, Any]] = defaultdict(_empty_delta)
+    for row in rows:
+        question_kinds = kinds.get(row["survey_id"], {})
+        for key, value in (row.get("answers") or {}).items():
+            kind = question_kinds.get(str(key))
+            if kind is None:
+                continue
+            delta = deltas[(row["survey_id"], str(key))]
+            delta["total"] += 1
+            if value not in (None, "", 0, False, [], {}):
+                delta["non_empty"] += 1
+            if kind == "choice":
+                for item in value if isinstance(value, list) else [value]:
+                    if item is not None:
+                        delta["counts"][answer_label(item)] += 1
+            elif kind == "rating":
+                rating = rating_value(value)
+                if rating is not None:
+                    delta["counts"][str(rating)] += 1
+                    delta["rating_count"] += 1
+                    delta["rating_sum"] += rating
+                    delta["rating_min"] = rating if delta["rating_min"] is None else min(delta["rating_min"], rating)
+                    delta["rating_max"] = rating if delta["rating_max"] is None else max(delta["rating_max"], rating)
+
+    if not deltas:
+        return
+    # 재계산 중인 설문이면 끝날 때까지 대기 (공유 잠금끼리는 서로 막지 않음)
+    db.execute(
+        text("SELECT pg_advisory_xact_lock_shared(:lock_class, id) FROM unnest(CAST(:ids AS INTEGER[])) AS id"),
+        {"lock_class": _LOCK_CLASS, "ids": sorted({survey_id for survey_id, _ in deltas})},
+    )
+    # 잠금 뒤에 읽어야 재계산이 막 끝낸 표시를 본다. 표시 전 설문의 응답은 재계산이 원본에서 센다
+    ready = {
+        row[0]
+        for row in db.execute(
+            text("SELECT id FROM surveys WHERE id = ANY(:ids) AND aggregates_ready"),
+            {"ids": sorted({survey_id for survey_id, _ in deltas})},
+        ).all()
+    }
+    deltas = {target: delta for target, delta in deltas.items() if target[0] in ready}
+    if not deltas:
+        return
+    # (설문, 문항) 순서로 잠가 동시에 저장하는 트랜잭션끼리 교착이 생기지 않도록 함
+    db.execute(
+        _UPSERT,
+        [
+            {"survey_id": survey_id, "question_key": key, **delta, "counts": json.dumps(delta["counts"], ensure_ascii=False)}
+            for (survey_id, key), delta in sorted(deltas.items())
+        ],
+    )
+
+
+def _read(db: Session, survey_id: int) -> Dict[str, Dict[str, Any]]:
+    rows = db.execute(
+        text(
+            "SELECT question_key, total, non_empty, counts, rating_count, rating_sum, rating_min, rating_max "
+            "FROM survey_question_aggregates WHERE survey_id = :survey_id"
+        ),
+        {"survey_id": survey_id},
+    ).all()
+    aggregates = {}
+    for key, total, non_empty, counts, rating_count, rating_sum, rating_min, rating_max in rows:
+        aggregates[key] = {
+            "total": total,
+            "non_empty": non_empty,
+            "counts": {label: int(count) for label, count in (counts or {}).items() if count},
+            "rating": {
+                "average": round(rating_sum / rating_count, 2),
+                "min": rating_min,
+                "max": rating_max,
+                "count": rating_count,
+                "sum": rating_sum,
+            } if rating_count else None,
+        }
+    return aggregates
+
+
+def _lock(db: Session, survey_id: int) -> None:
+    """설문 재계산 잠금 (트랜잭션 끝까지, 그 설문의 증가 반영만 기다리게 함)"""
+    db.execute(text("SELECT pg_advisory_xact_lock(:lock_class, :survey_id)"), {"lock_class": _LOCK_CLASS, "survey_id": survey_id})
+
+
+def load(
+    db: Session,
+    survey_id: int,
+    questions: Optional[List[Dict[str, Any]]] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    저장된 집계를 survey_stats.compute_question_aggregates()와 같은 형태로 반환
+
+    아직 재계산 표시(aggregates_ready)가 없는 설문(도입 이전 데이터, backfill_missing 전)은 원본 응답의
+    SQL 집계를 그대로 돌려준다. 요청 안에서는 재계산/잠금/커밋을 하지 않는다.
+    """
+    row = db.execute(
+        text("SELECT aggregates_ready, questions FROM surveys WHERE id = :survey_id"), {"survey_id": survey_id}
+    ).first()
+    if row is None:
+        return {}
+    if row[0]:
+        return _read(db, survey_id)
+    return survey_stats.compute_question_aggregates(db, survey_id, (questions if questions is not None else row[1]) or [])
+
+
+def backfill_missing(db: Session, limit: int = BACKFILL_BATCH, after_id: int = 0) -> List[int]:
+    """
+    재계산 표시가 없는 설문을 id 순으로 원본 응답에서 재계산하고 표시한다 (스케줄러/CLI).
+    살펴본 설문 id 반환 (다른 워커가 먼저 채운 설문 포함 - 다음 호출의 after_id로 사용)
+    """
+    survey_ids = [row[0] for row in db.execute(_MISSING, {"limit": limit, "after_id": after_id}).all()]
+    db.rollback()
+    for survey_id in survey_ids:
+        _lock(db, survey_id)
+        # 다른 워커가 먼저 채웠으면 건너뜀
+        if db.execute(text("SELECT aggregates_ready FROM surveys WHERE id = :survey_id"), {"survey_id": survey_id}).scalar():
+            db.rollback()
+            continue
+        rebuild(db, survey_id)
+    return survey_ids
+
+
+def rebuild(db: Session, survey_id: int, check: bool = False) -> List[Dict[str, Any]]:
+    """
+    원본 응답에서 한 설문의 집계를 다시 계산한다.
+
+    설문별 잠금으로 그 설문의 증가 반영만 잠시 막은 뒤 계산하므로, 잠금을 기다리던
+    트랜잭션의 증가분은 재계산 결과 위에 그대로 더해진다. 교체하면서 재계산 표시를 켠다.
+    check=True면 교체하지 않고 저장값과 다른 문항만 반환한다.
+    """
+    questions = db.execute(text("SELECT questions FROM surveys WHERE id = :survey_id"), {"survey_id": survey_id}).scalar()
+    if not check:
+        _lock(db, survey_id)
+    expected = survey_stats.compute_question_aggregates(db, survey_id, questions or [])
+
+    if check:
+        stored = _read(db, survey_id)
+        mismatches = []
+        for key, values in expected.items():
+            current = stored.get(key, {"total": 0, "non_empty": 0, "counts": {}, "rating": None})
+            if _comparable(values) != _comparable(current):
+                mismatches.append({"survey_id": survey_id, "question_key": key,
+                                   "expected": _comparable(values), "stored": _comparable(current)})
+        db.rollback()
+        return mismatches
+
+    db.execute(text("DELETE FROM survey_question_aggregates WHERE survey_id = :survey_id"), {"survey_id": survey_id})
+    params = []
+    for key, values in expected.items():
+        rating = values["rating"] or {}
+        params.append({
+            "survey_id": survey_id,
+            "question_key": key,
+            "total": values["total"],
+            "non_empty": values["non_empty"],
+            "counts": json.dumps(values["counts"], ensure_ascii=False),
+            "rating_count": rating.get("count", 0),
+            "rating_sum": rating.get("sum", 0),
+            "rating_min": rating.get("min"),
+            "rating_max": rating.get("max"),
+        })
+    if params:
+        db.execute(_UPSERT, params)
+    db.execute(
+        text("UPDATE surveys SET aggregates_ready = TRUE WHERE id = :survey_id AND NOT aggregates_ready"),
+        {"survey_id": survey_id},
+    )
+    db.commit()
+    return []
+
+
+def _comparable(values: Dict[str, Any]) -> Dict[str, Any]:
+    rating = values.get("rating") or {}
+    return {
+        "total": values["total"],
+        "non_empty": values["non_empty"],
+        "counts": dict(sorted(values["counts"].items())),
+        "rating": {name: rating.get(name) for name in ("count", "sum", "min", "max")} if rating else None,
+    }
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="설문 문항 집계 도구")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    rebuild_parser = subcommands.add_parser("rebuild", help="원본 응답에서 집계 재계산")
+    rebuild_parser.add_argument("--survey-id", type=int, help="생략하면 전체 설문")
+    rebuild_parser.add_argument("--check", action="store_true", help="교체하지 않고 어긋난 문항만 출력")
+    subcommands.add_parser("backfill", help="재계산 표시가 없는 설문(도입 이전 응답)만 재계산")
+    args = parser.parse_args()
+
+    session = SessionLocal()
+    try:
+        if args.command == "backfill":
+            filled: List[int] = []
+            while True:
+                batch = backfill_missing(session, after_id=filled[-1] if filled else 0)
+                filled.extend(batch)
+                if len(batch) < BACKFILL_BATCH:
+                    break
+            print(json.dumps({"surveys": filled}, indent=2))
+        else:
+            if args.survey_id:
+                survey_ids = [args.survey_id]
+            else:
+                survey_ids = [row[0] for row in session.execute(text("SELECT id FROM surveys ORDER BY id")).all()]
+            mismatches = []
+            for target_id in survey_ids:
+                mismatches.extend(rebuild(session, target_id, check=args.check))
+            print(json.dumps(
+                {"surveys": len(survey_ids), "mode": "check" if args.check else "rebuild", "mismatches": mismatches},
+                indent=2,
+                ensure_ascii=False,
+            ))
+    finally:
+        session.close()
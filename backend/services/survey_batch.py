@@ -0,0 +1,203 @@
+# services/survey_batch.py
+"""
+키오스크 일괄 제출 - 전시장 와이파이가 끊겨도 부스 태블릿에 모아 둔 응답을 나중에 한 번에 올린다
+
+- 응답마다 태블릿이 만든 client_key(UUID)를 붙여 보낸다. (survey_id, client_key) 부분 유니크 인덱스와
+  INSERT ... ON CONFLICT DO NOTHING 덕분에 전송 도중 끊겨 같은 묶음을 다시 보내도 한 번만 저장된다
+- 묶음 전체를 multi-row INSERT 한 문장으로 저장하고 RETURNING으로 새로 저장된 행만 돌려받아
+  카운터/문항 집계/시간대 롤업에는 새 행만 반영한다 (모두 같은 트랜잭션)
+- 이미 저장된 키는 기존 응답 id를 돌려주므로 태블릿은 결과와 상관없이 큐에서 지우면 된다
+- 답변은 설문 정의 캐시의 컴파일된 검증기로 응답마다 검사해 잘못된 응답만 invalid로 돌려준다
+- 인원 제한 설문은 새 응답 수만큼 자리를 한 번에 예약하고, 모자라면 묶음 앞쪽부터 채운다 (나머지는 full)
+- 중복 응답 차단 설문은 이메일/연락처로 이미 응답한 방문객을 repeat로 돌려준다 (services/survey_dedup.py,
+  한 태블릿이 여러 방문객 응답을 보내므로 기기 키는 쓰지 않음)
+"""
+
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from models.survey import SurveyResponse
+from services import survey_aggregates, survey_counter, survey_dedup, survey_rollups, survey_validation
+
+load_dotenv()
+
+# 한 요청에 받는 최대 응답 수 (태블릿은 이 크기로 나눠 보낸다)
+BATCH_MAX_ITEMS = int(os.getenv("SURVEY_BATCH_MAX_ITEMS", "200"))
+# 태블릿이 기록한 제출 시각을 믿는 범위 (벗어나면 서버 수신 시각으로 저장)
+CLIENT_CLOCK_MAX_AGE = timedelta(hours=int(os.getenv("SURVEY_BATCH_MAX_AGE_HOURS", "72")))
+
+# 태블릿이 보낸 값 중 그대로 저장하는 컬럼
+ITEM_COLUMNS = (
+    "respondent_name",
+    "respondent_email",
+    "respondent_phone",
+    "respondent_company",
+    "booth_number",
+    "answers",
+    "rating",
+    "review",
+)
+# 문자열 컬럼 길이 - 한 건이 넘쳐 묶음 전체가 실패하면 태블릿 큐가 막히므로 미리 걸러 invalid로 돌려줌
+_LENGTH_LIMITS = {
+    column: SurveyResponse.__table__.c[column].type.length
+    for column in ITEM_COLUMNS
+    if getattr(SurveyResponse.__table__.c[column].type, "length", None)
+}
+
+_EXISTING = text(
+    """
+    SELECT client_key, id, submitted_at
+    FROM survey_responses
+    WHERE survey_id = :survey_id AND client_key = ANY(:keys)
+    """
+)
+
+
+def _submitted_at(value: Optional[datetime], received_at: datetime) -> datetime:
+    """오프라인 동안 기록된 제출 시각 - 미래이거나 너무 오래된 값(태블릿 시계 오류)은 수신 시각으로"""
+    if value is None:
+        return received_at
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    if value > received_at or value < received_at - CLIENT_CLOCK_MAX_AGE:
+        return received_at
+    return value
+
+
+def _result(client_key: str, status: str, response_id: Optional[int] = None, submitted_at: Any = None,
+            detail: Optional[str] = None, errors: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    return {
+        "client_key": client_key,
+        "status": status,
+        "response_id": response_id,
+        "submitted_at": submitted_at,
+        "detail": detail,
+        "errors": errors,
+    }
+
+
+def submit_batch(db: Session, survey: Dict[str, Any], items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    설문 하나의 응답 묶음을 저장하고 커밋한다
+
+    items: [{"client_key", "submitted_at", 응답 필드...}] - 같은 키가 여러 번 있으면 처음 것만 쓴다
+
+    Returns:
+        {"created", "duplicates", "rejected", "results": [{"client_key", "status", "response_id",
+         "submitted_at", "detail", "errors"}]}  status: created | duplicate | repeat | full | invalid (요청 순서 유지)
+    """
+    survey_id = survey["id"]
+    validator = survey["validator"]
+    received_at = datetime.now(timezone.utc)
+    results: Dict[str, Optional[Dict[str, Any]]] = {}
+    order: List[str] = []
+    candidates: List[Dict[str, Any]] = []
+    for item in items:
+        key = item["client_key"]
+        if key in results:
+            continue
+        order.append(key)
+        if item.get("rating") is not None and not (1 <= item["rating"] <= 5):
+            results[key] = _result(key, "invalid", detail="평점은 1에서 5 사이여야 합니다")
+            continue
+        too_long = next(
+            (column for column, limit in _LENGTH_LIMITS.items() if len(item.get(column) or "") > limit), None
+        )
+        if too_long:
+            results[key] = _result(key, "invalid", detail=f"{too_long} 값이 너무 깁니다 (최대 {_LENGTH_LIMITS[too_long]}자)")
+            continue
+        errors = validator.validate(item.get("answers") or {}, item.get("respondent_email"), item.get("respondent_phone"))
+        if errors:
+            results[key] = _result(key, "invalid", detail=survey_validation.summarize(errors), errors=errors)
+            continue
+        row = {column: item.get(column) for column in ITEM_COLUMNS}
+        row.update(
+            survey_id=survey_id,
+            client_key=key,
+            submitted_at=_submitted_at(item.get("submitted_at"), received_at),
+        )
+        results[key] = None
+        candidates.append(row)
+
+    # 재전송분은 INSERT 전에 걸러 자리 예약/쓰기를 하지 않음
+    if candidates:
+        existing = db.execute(_EXISTING, {"survey_id": survey_id, "keys": [row["client_key"] for row in candidates]})
+        for key, response_id, submitted_at in existing:
+            results[key] = _result(key, "duplicate", response_id, submitted_at)
+        candidates = [row for row in candidates if results[row["client_key"]] is None]
+
+    guard = survey_dedup.duplicate_guard
+    guard_keys: Dict[str, List[str]] = {}
+    if candidates and guard.active_for(survey):
+        accepted = []
+        for row in candidates:
+            keys = guard.keys_for(row)
+            if guard.check_and_add(db, survey_id, keys):
+                results[row["client_key"]] = _result(row["client_key"], "repeat", detail="이미 응답한 방문객입니다")
+                continue
+            guard_keys[row["client_key"]] = keys
+            accepted.append(row)
+        candidates = accepted
+
+    capped = survey["max_responses"] is not None
+    if capped and candidates:
+        reserved = survey_counter.reserve_up_to(db, survey_id, survey["max_responses"], len(candidates))
+        for row in candidates[reserved:]:
+            results[row["client_key"]] = _result(row["client_key"], "full", detail="응답 인원이 마감된 설문입니다")
+            guard.forget(survey_id, guard_keys.get(row["client_key"], []))
+        candidates = candidates[:reserved]
+
+    created: List[Dict[str, Any]] = []
+    try:
+        if candidates:
+            statement = (
+                insert(SurveyResponse)
+                .values(candidates)
+                .on_conflict_do_nothing(
+                    index_elements=["survey_id", "client_key"],
+                    index_where=SurveyResponse.client_key.isnot(None),
+                )
+                .returning(SurveyResponse.id, SurveyResponse.client_key, SurveyResponse.submitted_at)
+            )
+            inserted = {key: (response_id, submitted_at) for response_id, key, submitted_at in db.execute(statement)}
+            created = [row for row in candidates if row["client_key"] in inserted]
+            for row in created:
+                key = row["client_key"]
+                results[key] = _result(key, "created", *inserted[key])
+
+            # 조회와 INSERT 사이에 같은 키가 다른 요청으로 먼저 저장된 경우
+            raced = [row["client_key"] for row in candidates if row["client_key"] not in inserted]
+            if raced:
+                for key in raced:
+                    results[key] = _result(key, "duplicate")
+                for key, response_id, submitted_at in db.execute(_EXISTING, {"survey_id": survey_id, "keys": raced}):
+                    results[key] = _result(key, "duplicate", response_id, submitted_at)
+                if capped:
+                    survey_counter.release(db, survey_id, len(raced))
+
+        if created:
+            if not capped:
+                survey_counter.add(db, {survey_id: len(created)})
+            survey_aggregates.apply_responses(db, created, {survey_id: survey["questions"]})
+            survey_rollups.apply_responses(db, created)
+        db.commit()
+    except Exception:
+        # 저장되지 않았으므로 태블릿이 다시 보낼 때 repeat가 되지 않도록 중복 방지 키를 되돌림
+        db.rollback()
+        for keys in guard_keys.values():
+            guard.forget(survey_id, keys)
+        raise
+
+    ordered = [results[key] for key in order]
+    return {
+        "created": len(created),
+        "duplicates": sum(1 for result in ordered if result["status"] == "duplicate"),
+        "rejected": sum(1 for result in ordered if result["status"] in ("repeat", "full", "invalid")),
+        "results": ordered,
+    }
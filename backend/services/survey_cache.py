@@ -0,0 +1,229 @@
+# services/survey_cache.py
+"""
+설문 정의 캐시 - 부스 QR로 들어오는 설문 조회/제출이 매번 surveys/events/companies를 조인하지 않도록
+
+- 키: 설문 id, 값: 설문 정의(문항 JSONB, 활성 여부, 이벤트/회사명 등)와 버전,
+  그리고 그 버전의 문항으로 컴파일한 응답 검증기(validator, services/survey_validation.py)
+- 버전: GREATEST(surveys/events/companies.updated_at) - 세 테이블 모두 updated_at 트리거가 있어
+  raw SQL이나 다른 워커에서 바꾼 내용도 버전이 달라진다
+- 재검증: 캐시된 지 SURVEY_CACHE_REVALIDATE_SECONDS가 지나면 버전만 조회해(PK 조회 한 번)
+  같으면 그대로 쓰고, 다르면 정의를 다시 읽는다
+- 무효화: 이 프로세스에서 ORM으로 Survey/Event/Company를 커밋하면 즉시 해당 항목을 버린다
+- 크기: SURVEY_CACHE_MAX_ENTRIES개까지 LRU
+- 미스 병합: 같은 설문을 동시에 읽는 요청들은 DB 조회 한 번의 결과를 함께 기다린다
+
+응답 수(current_responses)는 카운터에서 따로 읽으므로 여기에 담지 않는다.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from services.survey_validation import compile_validator
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+_VERSION_QUERY = text(
+    """
+    SELECT GREATEST(s.updated_at, e.updated_at, c.updated_at)
+    FROM surveys s
+    JOIN events e ON e.id = s.event_id
+    JOIN companies c ON c.id = e.company_id
+    WHERE s.id = :survey_id
+    """
+)
+
+_DEFINITION_QUERY = text(
+    """
+    SELECT s.id, s.event_id, e.company_id, s.title, s.description, s.questions, s.is_active,
+           s.require_email, s.require_phone, s.prevent_duplicates, s.max_responses, s.start_date, s.end_date,
+           e.event_name, c.company_name,
+           GREATEST(s.updated_at, e.updated_at, c.updated_at) AS version
+    FROM surveys s
+    JOIN events e ON e.id = s.event_id
+    JOIN companies c ON c.id = e.company_id
+    WHERE s.id = :survey_id
+    """
+)
+
+# 재검증 결과: 버전이 같음
+_UNCHANGED = object()
+
+
+class SurveyDefinitionCache:
+    """설문 id -> 설문 정의 LRU 캐시 (버전 재검증 + 쓰기 무효화)"""
+
+    def __init__(self, max_entries: int = 1000, revalidate_seconds: float = 5.0) -> None:
+        self.max_entries = max(1, max_entries)
+        self.revalidate_seconds = revalidate_seconds
+        # survey_id -> (버전, 마지막 확인 시각(monotonic), 정의)
+        self._entries: "OrderedDict[int, Tuple[Any, float, Dict[str, Any]]]" = OrderedDict()
+        self._loading: Dict[int, "asyncio.Future"] = {}
+        # 커밋 훅은 스레드풀에서도 불리므로 항목 변경은 잠금 안에서
+        self._lock = threading.Lock()
+        # 무효화 세대 - 조회 도중 무효화되면 그 결과는 저장하지 않음
+        self._epoch = 0
+        self._metrics = {
+            "hits": 0,
+            "revalidations": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "loads": 0,
+            "invalidations": 0,
+            "evictions": 0,
+        }
+
+    async def get(self, survey_id: int) -> Optional[Dict[str, Any]]:
+        """
+        설문 정의 반환 (없으면 None). 반환값은 공유 객체이므로 수정하지 말 것.
+        """
+        with self._lock:
+            entry = self._entries.get(survey_id)
+            if entry is not None:
+                self._entries.move_to_end(survey_id)
+        if entry is not None and time.monotonic() - entry[1] < self.revalidate_seconds:
+            self._metrics["hits"] += 1
+            return entry[2]
+
+        pending = self._loading.get(survey_id)
+        if pending is not None:
+            self._metrics["coalesced"] += 1
+            return await asyncio.shield(pending)
+
+        if entry is None:
+            self._metrics["misses"] += 1
+        else:
+            self._metrics["revalidations"] += 1
+        pending = asyncio.ensure_future(self._refresh(survey_id, entry))
+        self._loading[survey_id] = pending
+
+        def _done(future: "asyncio.Future") -> None:
+            if self._loading.get(survey_id) is future:
+                del self._loading[survey_id]
+
+        pending.add_done_callback(_done)
+        return await asyncio.shield(pending)
+
+    async def _refresh(
+        self, survey_id: int, entry: Optional[Tuple[Any, float, Dict[str, Any]]]
+    ) -> Optional[Dict[str, Any]]:
+        epoch = self._epoch
+        known_version = entry[0] if entry is not None else None
+        result = await asyncio.to_thread(self._fetch, survey_id, known_version)
+
+        with self._lock:
+            stale = epoch != self._epoch
+            if result is None:
+                self._entries.pop(survey_id, None)
+                return None
+            if result is _UNCHANGED:
+                if not stale and survey_id in self._entries:
+                    self._entries[survey_id] = (entry[0], time.monotonic(), entry[2])
+                return entry[2]
+            version, definition = result
+            if not stale:
+                self._entries[survey_id] = (version, time.monotonic(), definition)
+                self._entries.move_to_end(survey_id)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self._metrics["evictions"] += 1
+            return definition
+
+    def _fetch(self, survey_id: int, known_version: Any) -> Any:
+        """(스레드에서 실행) 버전이 같으면 _UNCHANGED, 없으면 None, 아니면 (버전, 정의)"""
+        db = SessionLocal()
+        try:
+            if known_version is not None:
+                version = db.execute(_VERSION_QUERY, {"survey_id": survey_id}).scalar()
+                if version is not None and version == known_version:
+                    return _UNCHANGED
+            row = db.execute(_DEFINITION_QUERY, {"survey_id": survey_id}).mappings().first()
+            self._metrics["loads"] += 1
+            if row is None:
+                return None
+            definition = dict(row)
+            version = definition.pop("version")
+            definition["questions"] = definition["questions"] or []
+            # 문항 해석은 버전마다 한 번 - 제출 요청은 컴파일된 검증기를 공유
+            definition["validator"] = compile_validator(definition)
+            return version, definition
+        finally:
+            db.close()
+
+    def invalidate(
+        self,
+        survey_ids: Optional[Set[int]] = None,
+        event_ids: Optional[Set[int]] = None,
+        company_ids: Optional[Set[int]] = None,
+    ) -> None:
+        """설문/이벤트/회사 id에 해당하는 항목 제거"""
+        with self._lock:
+            self._epoch += 1
+            for survey_id, (_, _, definition) in list(self._entries.items()):
+                if (
+                    survey_id in (survey_ids or ())
+                    or definition["event_id"] in (event_ids or ())
+                    or definition["company_id"] in (company_ids or ())
+                ):
+                    del self._entries[survey_id]
+                    self._metrics["invalidations"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._metrics["hits"] + self._metrics["revalidations"] + self._metrics["misses"]
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "revalidate_seconds": self.revalidate_seconds,
+            "hit_rate": round(self._metrics["hits"] / lookups, 3) if lookups else None,
+            **self._metrics,
+        }
+
+
+survey_cache = SurveyDefinitionCache(
+    max_entries=int(os.getenv("SURVEY_CACHE_MAX_ENTRIES", "1000")),
+    revalidate_seconds=float(os.getenv("SURVEY_CACHE_REVALIDATE_SECONDS", "5")),
+)
+
+
+# ---------- ORM 쓰기 무효화 ----------
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session: Session, flush_context: Any) -> None:
+    """flush된 Survey/Event/Company 변경을 모아 두었다가 커밋 후 무효화"""
+    from models import Company, Event, Survey
+
+    changes = session.info.setdefault("survey_cache_changes", {"surveys": set(), "events": set(), "companies": set()})
+    for instance in list(session.dirty) + list(session.deleted):
+        if isinstance(instance, Survey):
+            changes["surveys"].add(instance.id)
+        elif isinstance(instance, Event):
+            changes["events"].add(instance.id)
+        elif isinstance(instance, Company):
+            changes["companies"].add(instance.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    changes = session.info.pop("survey_cache_changes", None)
+    if not changes:
+        return
+    if any(changes.values()):
+        survey_cache.invalidate(
+            survey_ids=changes["surveys"], event_ids=changes["events"], company_ids=changes["companies"]
+        )
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session: Session) -> None:
+    session.info.pop("survey_cache_changes", None)
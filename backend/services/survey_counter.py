@@ -0,0 +1,308 @@
+# services/survey_counter.py
+"""
+설문 응답 수 카운터 - 동시 제출에도 정확한 집계와 max_responses 상한 보장
+
+survey_response_counters 테이블에 설문별 카운터를 둔다.
+- 인원 제한이 없는 설문: SURVEY_COUNTER_SHARDS개 샤드 중 임의의 행에 더해 행 잠금 경합을 분산
+- 인원 제한이 있는 설문: shard 0 한 행에 대한 원자적 UPDATE ... RETURNING으로 자리를 예약
+  (상한 검사와 증가가 한 문장이라 동시 요청이 몰려도 max_responses를 넘지 않음)
+
+surveys.current_responses는 카운터 합계를 주기적으로 반영한 표시용 값이다(sync_current_responses).
+카운터 자체는 reconcile()이 survey_responses의 COUNT(*)와 비교해 어긋난 경우 바로잡는다.
+
+동시성 점검 (500 클라이언트가 같은 설문에 동시에 제출):
+    python -m services.survey_counter stress --survey-id 1 --clients 500 --requests 2000 --max-responses 1000
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+COUNTER_SHARDS = max(1, int(os.getenv("SURVEY_COUNTER_SHARDS", "8")))
+# 최근 이 시간 안에 카운터가 움직인 설문은 보정하지 않음 (버퍼에 있는 예약분을 지우지 않도록)
+RECONCILE_GRACE_SECONDS = int(os.getenv("SURVEY_COUNTER_RECONCILE_GRACE_SECONDS", "120"))
+
+
+def try_reserve(db: Session, survey_id: int, max_responses: int, count: int = 1) -> bool:
+    """
+    인원 제한 설문의 응답 자리 count개를 원자적으로 예약한다 (전부 아니면 전무, 커밋은 호출 측)
+
+    Returns:
+        예약 성공 여부 (False면 남은 자리가 count보다 적음)
+    """
+    if max_responses <= 0 or count <= 0:
+        return False
+    db.execute(
+        text(
+            "INSERT INTO survey_response_counters (survey_id, shard, count) "
+            "VALUES (:survey_id, 0, 0) ON CONFLICT (survey_id, shard) DO NOTHING"
+        ),
+        {"survey_id": survey_id},
+    )
+    # 제한이 나중에 생긴 설문은 다른 샤드에 남은 값까지 합쳐서 상한을 검사
+    row = db.execute(
+        text(
+            """
+            UPDATE survey_response_counters AS c
+            SET count = c.count + :count, updated_at = NOW()
+            WHERE c.survey_id = :survey_id AND c.shard = 0
+              AND c.count + COALESCE((
+                  SELECT SUM(o.count) FROM survey_response_counters o
+                  WHERE o.survey_id = :survey_id AND o.shard <> 0
+              ), 0) + :count <= :max_responses
+            RETURNING c.count
+            """
+        ),
+        {"survey_id": survey_id, "max_responses": max_responses, "count": count},
+    ).first()
+    return row is not None
+
+
+def reserve_up_to(db: Session, survey_id: int, max_responses: int, count: int) -> int:
+    """
+    자리를 최대 count개까지 예약하고 예약한 수를 반환한다 (일괄 제출용, 커밋은 호출 측)
+
+    대부분은 한 번에 전부 예약되고, 마감 직전에만 하나씩 남은 자리를 채운다.
+    """
+    if try_reserve(db, survey_id, max_responses, count):
+        return count
+    reserved = 0
+    while reserved < count - 1 and try_reserve(db, survey_id, max_responses):
+        reserved += 1
+    return reserved
+
+
+def release(db: Session, survey_id: int, count: int = 1) -> None:
+    """저장하지 못한 예약분 반환 (커밋은 호출 측)"""
+    db.execute(
+        text(
+            "UPDATE survey_response_counters SET count = GREATEST(count - :count, 0), updated_at = NOW() "
+            "WHERE survey_id = :survey_id AND shard = 0"
+        ),
+        {"survey_id": survey_id, "count": count},
+    )
+
+
+def add(db: Session, counts: Dict[int, int]) -> None:
+    """인원 제한 없는 설문의 증가분을 임의 샤드에 더한다 (커밋은 호출 측)"""
+    if not counts:
+        return
+    db.execute(
+        text(
+            """
+            INSERT INTO survey_response_counters (survey_id, shard, count, updated_at)
+            VALUES (:survey_id, :shard, :count, NOW())
+            ON CONFLICT (survey_id, shard) DO UPDATE
+            SET count = survey_response_counters.count + EXCLUDED.count, updated_at = NOW()
+            """
+        ),
+        # 설문 id 순서로 잠가 동시에 flush하는 워커끼리 교착이 생기지 않도록 함
+        [
+            {"survey_id": survey_id, "shard": random.randrange(COUNTER_SHARDS), "count": count}
+            for survey_id, count in sorted(counts.items())
+            if count
+        ],
+    )
+
+
+def current_counts(db: Session, survey_ids: Iterable[int]) -> Dict[int, int]:
+    """설문별 현재 응답 수 (샤드 합계)"""
+    ids = list(survey_ids)
+    if not ids:
+        return {}
+    rows = db.execute(
+        text(
+            "SELECT survey_id, SUM(count) FROM survey_response_counters "
+            "WHERE survey_id = ANY(:ids) GROUP BY survey_id"
+        ),
+        {"ids": ids},
+    ).all()
+    counts = {survey_id: 0 for survey_id in ids}
+    counts.update({survey_id: int(total) for survey_id, total in rows})
+    return counts
+
+
+def sync_current_responses(db: Session) -> int:
+    """카운터 합계를 surveys.current_responses에 반영 (값이 바뀐 행만 갱신). 갱신 행 수 반환"""
+    result = db.execute(
+        text(
+            """
+            UPDATE surveys AS s
+            SET current_responses = c.total
+            FROM (
+                SELECT survey_id, SUM(count)::int AS total
+                FROM survey_response_counters GROUP BY survey_id
+            ) AS c
+            WHERE s.id = c.survey_id AND s.current_responses IS DISTINCT FROM c.total
+            """
+        )
+    )
+    db.commit()
+    return result.rowcount or 0
+
+
+def reconcile(
+    db: Session,
+    survey_ids: Optional[List[int]] = None,
+    grace_seconds: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    카운터를 survey_responses COUNT(*)와 비교해 어긋난 설문을 바로잡는다.
+
+    grace_seconds 안에 카운터가 바뀐 설문은 건너뛴다 (아직 flush되지 않은 예약분 보호).
+    Returns:
+        보정한 설문 목록 [{"survey_id", "counted", "actual"}]
+    """
+    grace = RECONCILE_GRACE_SECONDS if grace_seconds is None else grace_seconds
+    drifted = db.execute(
+        text(
+            """
+            WITH actual AS (
+                SELECT s.id AS survey_id, COUNT(r.id) AS total
+                FROM surveys s LEFT JOIN survey_responses r ON r.survey_id = s.id
+                WHERE CAST(:ids AS INTEGER[]) IS NULL OR s.id = ANY(:ids)
+                GROUP BY s.id
+            ), counted AS (
+                SELECT survey_id, SUM(count) AS total, MAX(updated_at) AS last_change
+                FROM survey_response_counters GROUP BY survey_id
+            )
+            SELECT a.survey_id, COALESCE(c.total, 0) AS counted, a.total AS actual
+            FROM actual a LEFT JOIN counted c USING (survey_id)
+            WHERE a.total <> COALESCE(c.total, 0)
+              AND (c.last_change IS NULL OR c.last_change < NOW() - make_interval(secs => :grace))
+            """
+        ),
+        {"ids": survey_ids, "grace": grace},
+    ).all()
+
+    fixed = []
+    for survey_id, counted, actual in drifted:
+        # 샤드를 하나로 합쳐 실제 응답 수로 교체
+        db.execute(text("DELETE FROM survey_response_counters WHERE survey_id = :survey_id"), {"survey_id": survey_id})
+        db.execute(
+            text("INSERT INTO survey_response_counters (survey_id, shard, count) VALUES (:survey_id, 0, :count)"),
+            {"survey_id": survey_id, "count": actual},
+        )
+        fixed.append({"survey_id": survey_id, "counted": int(counted), "actual": int(actual)})
+    db.commit()
+    if fixed:
+        logger.warning("설문 응답 카운터 %d건 보정: %s", len(fixed), fixed[:10])
+    return fixed
+
+
+# ---------- 동시성 점검 ----------
+
+STRESS_MARKER = "__survey_counter_stress__"
+
+
+def _submit_once(survey_id: int, max_responses: Optional[int], index: int) -> bool:
+    """응답 제출 한 건 (직접 커밋 경로와 동일: 예약/증가 + INSERT를 한 트랜잭션으로)"""
+    from models.survey import SurveyResponse
+
+    db = SessionLocal()
+    try:
+        if max_responses is not None:
+            if not try_reserve(db, survey_id, max_responses):
+                db.rollback()
+                return False
+        else:
+            add(db, {survey_id: 1})
+        db.add(SurveyResponse(survey_id=survey_id, respondent_company=STRESS_MARKER, answers={"1": str(index)}))
+        db.commit()
+        return True
+    finally:
+        db.close()
+
+
+def stress(survey_id: int, clients: int, requests: int, max_responses: Optional[int]) -> Dict[str, Any]:
+    """clients개 스레드가 동시에 제출한 뒤 카운터 = COUNT(*) = 허용 건수인지 확인"""
+    from models.survey import Survey, SurveyResponse
+
+    db = SessionLocal()
+    try:
+        survey = db.query(Survey).filter(Survey.id == survey_id).one()
+        original_max = survey.max_responses
+        reconcile(db, [survey_id], grace_seconds=0)
+        before = db.query(SurveyResponse).filter(SurveyResponse.survey_id == survey_id).count()
+        # 상한은 기존 응답 수 + max_responses로 설정해 점검분만 제한
+        effective_max = before + max_responses if max_responses is not None else None
+        survey.max_responses = effective_max
+        db.commit()
+    finally:
+        db.close()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        results = list(pool.map(lambda index: _submit_once(survey_id, effective_max, index), range(requests)))
+    elapsed = time.perf_counter() - started
+
+    db = SessionLocal()
+    try:
+        accepted = sum(results)
+        actual = db.query(SurveyResponse).filter(SurveyResponse.survey_id == survey_id).count()
+        counted = current_counts(db, [survey_id])[survey_id]
+        expected = before + (min(requests, max_responses) if max_responses is not None else requests)
+        report = {
+            "clients": clients,
+            "requests": requests,
+            "accepted": accepted,
+            "rejected": requests - accepted,
+            "elapsed_seconds": round(elapsed, 2),
+            "counter_total": counted,
+            "actual_count": actual,
+            "expected_count": expected,
+            "exact": counted == actual == expected and before + accepted == actual,
+        }
+
+        # 점검 데이터 정리
+        db.query(SurveyResponse).filter(
+            SurveyResponse.survey_id == survey_id, SurveyResponse.respondent_company == STRESS_MARKER
+        ).delete(synchronize_session=False)
+        db.query(Survey).filter(Survey.id == survey_id).update(
+            {Survey.max_responses: original_max}, synchronize_session=False
+        )
+        db.commit()
+        reconcile(db, [survey_id], grace_seconds=0)
+        sync_current_responses(db)
+        from services import survey_aggregates, survey_rollups
+        survey_aggregates.rebuild(db, survey_id)
+        survey_rollups.rebuild(db, survey_id)
+        return report
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="설문 응답 카운터 도구")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    subcommands.add_parser("reconcile", help="카운터를 COUNT(*)로 보정하고 current_responses 반영")
+    stress_parser = subcommands.add_parser("stress", help="동시 제출 정확성 점검")
+    stress_parser.add_argument("--survey-id", type=int, required=True)
+    stress_parser.add_argument("--clients", type=int, default=500)
+    stress_parser.add_argument("--requests", type=int, default=2000)
+    stress_parser.add_argument("--max-responses", type=int, default=None, help="생략하면 샤드 카운터 경로 점검")
+    args = parser.parse_args()
+
+    if args.command == "reconcile":
+        session = SessionLocal()
+        try:
+            fixed = reconcile(session, grace_seconds=0)
+            updated = sync_current_responses(session)
+        finally:
+            session.close()
+        print(json.dumps({"fixed": fixed, "synced": updated}, indent=2, ensure_ascii=False))
+    else:
+        print(json.dumps(stress(args.survey_id, args.clients, args.requests, args.max_responses), indent=2))
@@ -0,0 +1,208 @@
+# services/survey_crosstab.py
+"""
+설문 두 문항의 교차표 (예: 방문 목적별 만족도)
+
+(행 라벨, 열 라벨) 쌍의 개수는 PostgreSQL이 한 번의 GROUP BY로 센다
+(복수 선택 문항은 선택지마다 한 번씩, 응답 행을 파이썬으로 가져오지 않음).
+돌려받은 셀로 NumPy 행렬을 만들어 행/열 비율과 카이제곱 검정을 한 번에 계산한다.
+복수 선택 문항이 끼면 응답 하나가 여러 칸에 들어가 독립 관측 가정이 깨지므로 검정은 생략한다.
+"""
+
+import math
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from services import survey_stats
+from services.survey_aggregates import answer_label
+
+_PAIR_COUNTS = text(
+    """
+    SELECT a #>> '{}' AS row_label, b #>> '{}' AS column_label, COUNT(*) AS count
+    FROM survey_responses r
+    CROSS JOIN LATERAL jsonb_array_elements(
+        CASE WHEN jsonb_typeof(r.answers -> :q1) = 'array' THEN r.answers -> :q1
+             ELSE jsonb_build_array(r.answers -> :q1) END
+    ) AS a
+    CROSS JOIN LATERAL jsonb_array_elements(
+        CASE WHEN jsonb_typeof(r.answers -> :q2) = 'array' THEN r.answers -> :q2
+             ELSE jsonb_build_array(r.answers -> :q2) END
+    ) AS b
+    WHERE r.survey_id = :survey_id
+      AND r.answers ? :q1 AND r.answers ? :q2
+      AND jsonb_typeof(a) <> 'null' AND jsonb_typeof(b) <> 'null'
+    GROUP BY 1, 2
+    """
+)
+
+_RESPONDENTS = text(
+    """
+    SELECT COUNT(*)
+    FROM survey_responses r
+    WHERE r.survey_id = :survey_id
+      AND r.answers ? :q1 AND r.answers ? :q2
+      AND jsonb_typeof(r.answers -> :q1) <> 'null' AND r.answers -> :q1 <> '[]'::jsonb
+      AND jsonb_typeof(r.answers -> :q2) <> 'null' AND r.answers -> :q2 <> '[]'::jsonb
+    """
+)
+
+_NUMBER = re.compile(r"-?[0-9]+(\.[0-9]+)?")
+
+
+def _choice_labels(question: Dict[str, Any]) -> Tuple[List[str], Dict[str, str]]:
+    """
+    설문 정의의 선택지 순서와 별칭 (검증기/통계와 같은 규칙: choices 또는 options.choices)
+
+    {"value", "label"} 선택지는 응답에 저장되는 value를 라벨로 쓰고(통계 API 분포의 키와 같음),
+    label로 저장된 응답도 같은 칸에 센다.
+    """
+    options = question.get("options")
+    choices = question.get("choices") or (options.get("choices") if isinstance(options, dict) else None)
+    labels: List[str] = []
+    aliases: Dict[str, str] = {}
+    for choice in choices or []:
+        if isinstance(choice, dict):
+            value = choice.get("value") if choice.get("value") is not None else choice.get("label")
+            if value is None:
+                continue
+            label = answer_label(value)
+            if choice.get("label") is not None:
+                aliases.setdefault(answer_label(choice["label"]), label)
+        elif choice is None:
+            continue
+        else:
+            label = answer_label(choice)
+        if label and label not in labels:
+            labels.append(label)
+    for label in labels:
+        aliases[label] = label
+    return labels, aliases
+
+
+def _ordered_labels(question: Dict[str, Any], seen: List[str]) -> Tuple[List[str], Dict[str, str]]:
+    """정의된 선택지 먼저, 나머지는 숫자면 숫자 순, 아니면 가나다 순 (+ 응답 값 -> 라벨 별칭)"""
+    labels, aliases = _choice_labels(question)
+    extra = sorted(
+        (label for label in set(seen) if label not in aliases),
+        key=lambda label: (0, float(label), "") if _NUMBER.fullmatch(label) else (1, 0.0, label),
+    )
+    return labels + extra, aliases
+
+
+def _regularized_gamma_q(a: float, x: float) -> float:
+    """정규화 상부 불완전 감마 함수 Q(a, x) (급수 / 연분수 전개)"""
+    if x <= 0:
+        return 1.0
+    log_prefix = -x + a * math.log(x) - math.lgamma(a)
+    if x < a + 1:
+        term = total = 1.0 / a
+        n = a
+        for _ in range(1000):
+            n += 1
+            term *= x / n
+            total += term
+            if abs(term) < abs(total) * 1e-15:
+                break
+        return max(0.0, 1.0 - total * math.exp(log_prefix))
+    tiny = 1e-300
+    b = x + 1 - a
+    c = 1 / tiny
+    d = 1 / b
+    h = d
+    for i in range(1, 1000):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = tiny if abs(d) < tiny else d
+        c = b + an / c
+        c = tiny if abs(c) < tiny else c
+        d = 1 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1) < 1e-15:
+            break
+    return min(1.0, math.exp(log_prefix) * h)
+
+
+def chi_square_test(counts: np.ndarray) -> Optional[Dict[str, Any]]:
+    """
+    독립성 카이제곱 검정 (합계가 0인 행/열은 제외). 2x2 미만이면 None
+
+    Returns:
+        {"statistic", "dof", "p_value", "cramers_v", "low_expected_ratio"}
+    """
+    table = counts[counts.sum(axis=1) > 0][:, counts.sum(axis=0) > 0].astype(np.float64)
+    if table.shape[0] < 2 or table.shape[1] < 2:
+        return None
+    total = table.sum()
+    expected = np.outer(table.sum(axis=1), table.sum(axis=0)) / total
+    statistic = float(((table - expected) ** 2 / expected).sum())
+    dof = (table.shape[0] - 1) * (table.shape[1] - 1)
+    return {
+        "statistic": round(statistic, 4),
+        "dof": dof,
+        "p_value": round(_regularized_gamma_q(dof / 2, statistic / 2), 6),
+        "cramers_v": round(math.sqrt(statistic / (total * (min(table.shape) - 1))), 4),
+        # 기대빈도 5 미만 칸 비율 (20%를 넘으면 검정 결과를 신뢰하기 어려움)
+        "low_expected_ratio": round(float((expected < 5).mean()), 4),
+    }
+
+
+def _percentages(counts: np.ndarray, totals: np.ndarray, axis: int) -> List[List[float]]:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        shares = counts / np.expand_dims(totals, axis) * 100
+    return np.round(np.nan_to_num(shares), 2).tolist()
+
+
+def compute_crosstab(
+    db: Session,
+    survey_id: int,
+    row_question: Dict[str, Any],
+    column_question: Dict[str, Any],
+    include_chi_square: bool = False,
+) -> Dict[str, Any]:
+    """
+    두 문항의 교차표
+
+    Returns:
+        {"row_labels", "column_labels", "counts", "row_totals", "column_totals", "total",
+         "respondents", "row_percentages", "column_percentages", "multi_select", "chi_square"}
+    """
+    params = {"survey_id": survey_id, "q1": str(row_question["id"]), "q2": str(column_question["id"])}
+    cells = db.execute(_PAIR_COUNTS, params).all()
+    respondents = int(db.execute(_RESPONDENTS, params).scalar() or 0)
+
+    row_labels, row_aliases = _ordered_labels(row_question, [cell[0] for cell in cells])
+    column_labels, column_aliases = _ordered_labels(column_question, [cell[1] for cell in cells])
+    row_index = {label: index for index, label in enumerate(row_labels)}
+    column_index = {label: index for index, label in enumerate(column_labels)}
+    row_index.update((alias, row_index[label]) for alias, label in row_aliases.items())
+    column_index.update((alias, column_index[label]) for alias, label in column_aliases.items())
+
+    counts = np.zeros((len(row_labels), len(column_labels)), dtype=np.int64)
+    if cells:
+        rows = np.fromiter((row_index[cell[0]] for cell in cells), dtype=np.int64, count=len(cells))
+        columns = np.fromiter((column_index[cell[1]] for cell in cells), dtype=np.int64, count=len(cells))
+        # value/label 별칭이 같은 칸으로 모일 수 있어 더해서 채운다
+        np.add.at(counts, (rows, columns), np.fromiter((cell[2] for cell in cells), dtype=np.int64, count=len(cells)))
+
+    row_totals = counts.sum(axis=1)
+    column_totals = counts.sum(axis=0)
+    multi_select = "checkbox" in (survey_stats.question_type(row_question), survey_stats.question_type(column_question))
+    return {
+        "row_labels": row_labels,
+        "column_labels": column_labels,
+        "counts": counts.tolist(),
+        "row_totals": row_totals.tolist(),
+        "column_totals": column_totals.tolist(),
+        "total": int(counts.sum()),
+        "respondents": respondents,
+        "row_percentages": _percentages(counts, row_totals, 1),
+        "column_percentages": _percentages(counts, column_totals, 0),
+        "multi_select": multi_select,
+        # 복수 선택이면 한 응답이 여러 칸에 세어져 검정 가정이 맞지 않음
+        "chi_square": chi_square_test(counts) if include_chi_square and not multi_select else None,
+    }
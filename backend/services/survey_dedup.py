@@ -0,0 +1,468 @@
+# services/survey_dedup.py
+"""
+설문 중복 응답 차단 - 경품이 걸린 부스 설문에 같은 사람이 여러 번 제출하는 것을 막는다
+
+surveys.prevent_duplicates가 켜진 설문만 대상이다. 제출마다 survey_responses를 조회하면
+가장 바쁜 쓰기 경로에 쿼리가 하나 늘어나므로, 설문마다 응답자 키의 Bloom 필터를 메모리에 두고
+필터에 없는 키(대부분의 제출)는 DB 조회 없이 통과시킨다.
+
+- 응답자 키: 이메일(소문자), 연락처(숫자만), 기기(IP + User-Agent)
+  기기 키는 단건 제출에만 쓴다 - 키오스크 일괄 제출은 한 태블릿이 여러 방문객 응답을 보내기 때문
+- 필터에 있는 키(중복 의심)만 확인한다: 이 프로세스가 최근 받은 키면 바로 중복,
+  아니면 DB에서 같은 키의 응답이 있는지 확인해 Bloom 필터 오탐은 통과시킨다
+- 다른 워커 프로세스가 저장한 응답은 SURVEY_DUPLICATE_GUARD_SYNC_SECONDS마다
+  (survey_id, id) 인덱스로 새 응답만 읽어 필터에 더한다 (그 사이 다른 워커로 들어온 중복은 놓칠 수 있음).
+  id는 INSERT 때 정해지고 커밋 순서는 다를 수 있으므로, RECENT_SECONDS 전에 이미 읽었던 id부터
+  다시 읽어 늦게 커밋된 작은 id도 놓치지 않는다 (같은 키는 다시 더해도 개수에 세지 않음)
+- 필터 만들기/동기화/재생성은 제출 전에 await하는 prepare()가 스레드에서 설문별로 하나씩 한다
+  (처음 보는 설문의 제출만 필터가 만들어질 때까지 기다리고, 다른 설문의 제출은 막지 않음)
+- 메모리: 필터 하나는 SURVEY_DUPLICATE_GUARD_CAPACITY개 키 기준 크기(기본 10만 키, 오탐률 0.1% 약 180KB)이고
+  SURVEY_DUPLICATE_GUARD_MAX_FILTERS개까지 LRU로 유지한다. 키가 용량을 넘으면 두 배로 다시 만든다
+- 재시작: 종료/LRU 제외 시 필터를 SURVEY_DUPLICATE_GUARD_DIR에 프로세스별 파일({설문}.{pid}.bloom)로
+  저장하고, 다음에 그 설문이 제출되면 가장 최근 응답까지 담은 파일을 읽은 뒤 그 이후 응답만 더한다
+  (파일이 없거나 설정이 바뀌었으면 DB에서 다시 만든다)
+
+같은 공유기 뒤의 같은 기종 휴대폰은 IP와 User-Agent가 같을 수 있으므로,
+공용 와이파이 부스에서는 SURVEY_DUPLICATE_GUARD_KEYS에서 device를 빼는 것이 좋다.
+"""
+
+import asyncio
+import glob
+import hashlib
+import ipaddress
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+KEY_KINDS = ("email", "phone", "device")
+FORMAT_VERSION = 1
+# 최근 받은 키를 정확히 기억하는 시간 (버퍼에 있어 아직 DB에 없는 응답도 중복으로 판정)
+# 동기화도 이 시간 전에 읽었던 id부터 다시 읽는다 (늦게 커밋된 응답)
+RECENT_SECONDS = 120
+USER_AGENT_MAX_LENGTH = 300
+
+_SYNC_QUERY = text(
+    """
+    SELECT id, respondent_email, respondent_phone, host(ip_address) AS ip, user_agent
+    FROM survey_responses
+    WHERE survey_id = :survey_id AND id > :after_id
+    ORDER BY id
+    """
+)
+
+_CONFIRM_QUERY = text(
+    """
+    SELECT EXISTS (
+        SELECT 1
+        FROM survey_responses
+        WHERE survey_id = :survey_id
+          AND (
+              lower(btrim(respondent_email)) = ANY(:emails)
+              OR regexp_replace(COALESCE(respondent_phone, ''), '[^0-9]', '', 'g') = ANY(:phones)
+              OR (host(ip_address) || '|' || left(COALESCE(user_agent, ''), :ua_length)) = ANY(:devices)
+          )
+    )
+    """
+)
+
+
+class BloomFilter:
+    """고정 크기 Bloom 필터 (blake2b 128비트를 나눈 이중 해싱)"""
+
+    __slots__ = ("capacity", "size", "hashes", "count", "bits")
+
+    def __init__(self, capacity: int, error_rate: float, bits: Optional[bytearray] = None,
+                 size: Optional[int] = None, hashes: Optional[int] = None, count: int = 0) -> None:
+        self.capacity = max(1, capacity)
+        self.size = size or max(8, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = hashes or max(1, round(self.size / self.capacity * math.log(2)))
+        self.count = count
+        self.bits = bits if bits is not None else bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str) -> Iterable[int]:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return ((first + index * second) % self.size for index in range(self.hashes))
+
+    def add(self, key: str) -> bool:
+        """
+        키 추가. 새로 켠 비트가 있을 때만 개수를 늘린다 (같은 키를 다시 더해도 한 번만 셈)
+        새 키였으면 True
+        """
+        added = False
+        for position in self._positions(key):
+            mask = 1 << (position & 7)
+            if not self.bits[position >> 3] & mask:
+                self.bits[position >> 3] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    @property
+    def saturated(self) -> bool:
+        return self.count > self.capacity
+
+
+def respondent_keys(
+    email: Optional[str] = None,
+    phone: Optional[str] = None,
+    ip: Optional[str] = None,
+    user_agent: Optional[str] = None,
+    kinds: Iterable[str] = KEY_KINDS,
+) -> List[str]:
+    """응답자 키 목록 (확인 쿼리의 정규화와 같은 규칙)"""
+    keys = []
+    if "email" in kinds and email and email.strip():
+        keys.append("email:" + email.strip().lower())
+    digits = re.sub(r"[^0-9]", "", phone or "")
+    if "phone" in kinds and digits:
+        keys.append("phone:" + digits)
+    if "device" in kinds and ip:
+        try:
+            address = ipaddress.ip_address(ip)
+        except ValueError:
+            address = None
+        if address is not None:
+            # PostgreSQL host(inet)과 같은 표기 (IPv4 매핑 주소는 ::ffff:1.2.3.4)
+            mapped = getattr(address, "ipv4_mapped", None)
+            ip = f"::ffff:{mapped}" if mapped else str(address)
+            keys.append(f"device:{ip}|{(user_agent or '')[:USER_AGENT_MAX_LENGTH]}")
+    return keys
+
+
+class _SurveyFilter:
+    __slots__ = ("bloom", "last_response_id", "synced_at", "recent", "checkpoints")
+
+    def __init__(self, bloom: BloomFilter, last_response_id: int = 0, scan_from: Optional[int] = None) -> None:
+        self.bloom = bloom
+        self.last_response_id = last_response_id
+        self.synced_at = 0.0
+        self.recent: Dict[str, float] = {}  # 키 -> 받은 시각 (monotonic)
+        # (동기화 시각, 그때까지 읽은 마지막 id) - RECENT_SECONDS보다 오래된 것은 가장 최근 하나만 남김
+        self.checkpoints: List[Tuple[float, int]] = [(0.0, last_response_id if scan_from is None else scan_from)]
+
+    def scan_from(self) -> int:
+        """다음 동기화가 다시 읽기 시작할 id (RECENT_SECONDS 전에 이미 읽었던 마지막 id)"""
+        return self.checkpoints[0][1]
+
+
+class SurveyDuplicateGuard:
+    """
+    설문별 Bloom 필터 모음
+
+    필터 준비(파일 읽기, DB 동기화, 재생성)는 prepare()가 설문마다 하나씩 스레드에서 하고,
+    제출 경로의 check_and_add()는 메모리 검사와 (의심될 때만) 확인 쿼리만 한다.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = os.getenv("SURVEY_DUPLICATE_GUARD_ENABLED", "true").lower() == "true"
+        configured = {kind.strip() for kind in os.getenv("SURVEY_DUPLICATE_GUARD_KEYS", ",".join(KEY_KINDS)).split(",")}
+        self.kinds = tuple(kind for kind in KEY_KINDS if kind in configured)
+        self.capacity = int(os.getenv("SURVEY_DUPLICATE_GUARD_CAPACITY", "100000"))
+        self.error_rate = float(os.getenv("SURVEY_DUPLICATE_GUARD_ERROR_RATE", "0.001"))
+        self.max_filters = max(1, int(os.getenv("SURVEY_DUPLICATE_GUARD_MAX_FILTERS", "200")))
+        self.sync_seconds = float(os.getenv("SURVEY_DUPLICATE_GUARD_SYNC_SECONDS", "5"))
+        self.state_dir = os.getenv("SURVEY_DUPLICATE_GUARD_DIR", "var/survey_guard")
+
+        self._filters: "OrderedDict[int, _SurveyFilter]" = OrderedDict()
+        # 이벤트 루프와 관리자 통계(스레드풀) 사이의 메모리 접근만 보호 - DB/파일 작업 중에는 잡지 않음
+        self._lock = threading.Lock()
+        # 설문별 준비 작업 (같은 설문의 읽기/재생성을 한 번에 하나만)
+        self._preparing: Dict[int, asyncio.Lock] = {}
+        self.counters = {
+            "checked": 0,
+            "passed": 0,
+            "suspected": 0,
+            "recent_hits": 0,
+            "confirmed": 0,
+            "false_positives": 0,
+            "unprepared": 0,
+            "loaded": 0,
+            "synced": 0,
+            "rebuilt": 0,
+            "evicted": 0,
+        }
+
+    def active_for(self, survey: Dict[str, Any]) -> bool:
+        return self.enabled and bool(survey.get("prevent_duplicates"))
+
+    def keys_for(self, payload: Dict[str, Any], ip: Optional[str] = None, user_agent: Optional[str] = None) -> List[str]:
+        return respondent_keys(
+            payload.get("respondent_email"), payload.get("respondent_phone"), ip, user_agent, self.kinds
+        )
+
+    async def prepare(self, survey_id: int) -> None:
+        """
+        check_and_add 전에 호출 - 필터가 없으면 만들어질 때까지 기다리고, 동기화 주기가 지났으면
+        새 응답을 더한다 (키가 용량을 넘었으면 크게 다시 만든다).
+
+        DB/파일 작업은 스레드에서 하므로 이벤트 루프와 다른 설문의 제출을 막지 않는다.
+        이미 필터가 있는 설문은 다른 요청이 동기화하는 동안 기다리지 않고 지금 필터로 검사한다.
+        """
+        entry = self._filters.get(survey_id)
+        if entry is not None and time.monotonic() - entry.synced_at < self.sync_seconds:
+            return
+        lock = self._preparing.setdefault(survey_id, asyncio.Lock())
+        if entry is not None and lock.locked():
+            return
+        async with lock:
+            entry = self._filters.get(survey_id)
+            if entry is None:
+                self._install(survey_id, await asyncio.to_thread(self._build, survey_id))
+            elif time.monotonic() - entry.synced_at >= self.sync_seconds:
+                if entry.bloom.saturated:
+                    rebuilt = await asyncio.to_thread(self._build, survey_id, entry.bloom.count * 2, False)
+                    self._install(survey_id, rebuilt, previous=entry)
+                else:
+                    rows = await asyncio.to_thread(self._read_new, survey_id, entry.scan_from())
+                    with self._lock:
+                        self._apply(entry, rows)
+                        self.counters["synced"] += 1
+
+    def check_and_add(self, db: Session, survey_id: int, keys: List[str]) -> bool:
+        """
+        중복이면 True. 아니면 키를 필터에 더하고 False (저장하지 못하면 forget으로 되돌린다)
+
+        필터에 없는 키만 있으면 DB를 조회하지 않는다. prepare() 없이 불려 필터가 없으면
+        모든 키를 DB로 확인한다.
+        """
+        if not keys:
+            return False
+        with self._lock:
+            entry = self._filters.get(survey_id)
+            self.counters["checked"] += 1
+            now = time.monotonic()
+            if entry is None:
+                self.counters["unprepared"] += 1
+                suspected = list(keys)
+            else:
+                self._filters.move_to_end(survey_id)
+                suspected = [key for key in keys if key in entry.bloom]
+                if any(key in entry.recent and now - entry.recent[key] < RECENT_SECONDS for key in suspected):
+                    self.counters["suspected"] += 1
+                    self.counters["recent_hits"] += 1
+                    return True
+
+        if suspected:
+            if self._confirm(db, survey_id, suspected):
+                with self._lock:
+                    self.counters["suspected"] += 1
+                    self.counters["confirmed"] += 1
+                return True
+
+        with self._lock:
+            if entry is None:
+                return False
+            if suspected:
+                self.counters["suspected"] += 1
+                self.counters["false_positives"] += 1
+            else:
+                self.counters["passed"] += 1
+            for key in keys:
+                entry.bloom.add(key)
+                entry.recent[key] = now
+            return False
+
+    def forget(self, survey_id: int, keys: List[str]) -> None:
+        """check_and_add로 받은 키를 저장하지 못했을 때 - 최근 키에서만 지운다 (필터 비트는 DB 확인으로 걸러짐)"""
+        with self._lock:
+            entry = self._filters.get(survey_id)
+            if entry is not None:
+                for key in keys:
+                    entry.recent.pop(key, None)
+
+    def save_all(self) -> int:
+        """메모리의 필터를 모두 파일로 저장 (앱 종료 시). 저장한 수 반환"""
+        with self._lock:
+            entries = list(self._filters.items())
+        saved = 0
+        for survey_id, entry in entries:
+            try:
+                self._save(survey_id, entry)
+                saved += 1
+            except OSError as exc:
+                logger.error("설문 %s 중복 방지 필터 저장 실패: %s", survey_id, exc)
+        return saved
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            filters = {
+                survey_id: {
+                    "keys": entry.bloom.count,
+                    "capacity": entry.bloom.capacity,
+                    "bytes": len(entry.bloom.bits),
+                    "last_response_id": entry.last_response_id,
+                }
+                for survey_id, entry in self._filters.items()
+            }
+            counters = dict(self.counters)
+        return {
+            "enabled": self.enabled,
+            "keys": list(self.kinds),
+            "filters": len(filters),
+            "max_filters": self.max_filters,
+            "memory_bytes": sum(item["bytes"] for item in filters.values()),
+            "surveys": filters,
+            **counters,
+        }
+
+    # ---------- 내부 ----------
+
+    def _install(self, survey_id: int, entry: _SurveyFilter, previous: Optional[_SurveyFilter] = None) -> None:
+        """준비한 필터를 넣는다 (재생성이면 그동안 받은 최근 키를 옮김). 넘친 필터는 파일로 내보냄"""
+        evicted = []
+        with self._lock:
+            if previous is not None:
+                # 아직 DB에 없는(버퍼에 있는) 최근 키와 재생성 중에 받은 키
+                entry.recent.update(previous.recent)
+                for key in previous.recent:
+                    entry.bloom.add(key)
+                self.counters["rebuilt"] += 1
+                logger.info(
+                    "설문 %s 중복 방지 필터 재생성 (키 %d개, 용량 %d)", survey_id, entry.bloom.count, entry.bloom.capacity
+                )
+            self._filters[survey_id] = entry
+            self._filters.move_to_end(survey_id)
+            while len(self._filters) > self.max_filters:
+                evicted.append(self._filters.popitem(last=False))
+                self.counters["evicted"] += 1
+        for evicted_id, evicted_entry in evicted:
+            lock = self._preparing.get(evicted_id)
+            if lock is not None and not lock.locked():
+                del self._preparing[evicted_id]
+            try:
+                self._save(evicted_id, evicted_entry)
+            except OSError as exc:
+                logger.error("설문 %s 중복 방지 필터 저장 실패: %s", evicted_id, exc)
+
+    def _build(self, survey_id: int, capacity: int = 0, use_file: bool = True) -> _SurveyFilter:
+        """저장된 필터(있으면)에 그 이후 응답을 더하거나, DB에서 처음부터 만든다 (스레드에서 실행)"""
+        entry = self._load(survey_id) if use_file else None
+        if entry is None:
+            entry = _SurveyFilter(BloomFilter(max(capacity, self.capacity), self.error_rate))
+        # 아직 아무도 보지 않는 필터라 잠금 없이 채운다
+        self._apply(entry, self._read_new(survey_id, entry.scan_from()))
+        return entry
+
+    def _read_new(self, survey_id: int, after_id: int) -> List[Tuple[int, List[str]]]:
+        """after_id 이후 응답의 (id, 키 목록) - 스레드에서 자체 세션으로 실행"""
+        db = SessionLocal()
+        try:
+            return [
+                (row.id, respondent_keys(row.respondent_email, row.respondent_phone, row.ip, row.user_agent, self.kinds))
+                for row in db.execute(_SYNC_QUERY, {"survey_id": survey_id, "after_id": after_id})
+            ]
+        finally:
+            db.close()
+
+    @staticmethod
+    def _apply(entry: _SurveyFilter, rows: List[Tuple[int, List[str]]]) -> None:
+        """읽어 온 응답 키를 필터에 더함 (다시 읽은 응답의 키는 개수에 다시 세지 않음)"""
+        for response_id, keys in rows:
+            for key in keys:
+                entry.bloom.add(key)
+            entry.last_response_id = max(entry.last_response_id, response_id)
+        now = time.monotonic()
+        entry.synced_at = now
+        entry.recent = {key: at for key, at in entry.recent.items() if now - at < RECENT_SECONDS}
+        entry.checkpoints.append((now, entry.last_response_id))
+        while len(entry.checkpoints) > 1 and now - entry.checkpoints[1][0] >= RECENT_SECONDS:
+            entry.checkpoints.pop(0)
+
+    def _confirm(self, db: Session, survey_id: int, keys: List[str]) -> bool:
+        params: Dict[str, Any] = {"survey_id": survey_id, "ua_length": USER_AGENT_MAX_LENGTH}
+        for kind in KEY_KINDS:
+            params[f"{kind}s"] = [key.split(":", 1)[1] for key in keys if key.startswith(kind + ":")]
+        return bool(db.execute(_CONFIRM_QUERY, params).scalar())
+
+    def _path(self, survey_id: int) -> str:
+        """이 프로세스의 필터 파일 (워커끼리 덮어쓰지 않도록 pid를 붙임)"""
+        return os.path.join(self.state_dir, f"{survey_id}.{os.getpid()}.bloom")
+
+    def _signature(self) -> Dict[str, Any]:
+        return {"format": FORMAT_VERSION, "keys": list(self.kinds), "error_rate": self.error_rate}
+
+    def _save(self, survey_id: int, entry: _SurveyFilter) -> None:
+        """
+        필터를 파일로 저장하고 같은 설문의 더 오래된 파일(이전 실행/다른 워커)은 지운다.
+        어느 파일이든 그 시점까지의 응답을 모두 담고 있어 하나만 남겨도 된다.
+        """
+        os.makedirs(self.state_dir, exist_ok=True)
+        header = {
+            **self._signature(),
+            "capacity": entry.bloom.capacity,
+            "size": entry.bloom.size,
+            "hashes": entry.bloom.hashes,
+            "count": entry.bloom.count,
+            "last_response_id": entry.last_response_id,
+            "scan_from": entry.scan_from(),
+        }
+        path = self._path(survey_id)
+        with open(path + ".part", "wb") as output:
+            output.write(json.dumps(header).encode("utf-8") + b"\n")
+            output.write(entry.bloom.bits)
+        os.replace(path + ".part", path)
+        saved_at = os.path.getmtime(path)
+        for other in glob.glob(os.path.join(self.state_dir, f"{survey_id}.*.bloom")):
+            try:
+                if other != path and os.path.getmtime(other) <= saved_at:
+                    os.remove(other)
+            except FileNotFoundError:
+                pass
+
+    def _load(self, survey_id: int) -> Optional[_SurveyFilter]:
+        """저장된 필터 중 가장 최근 응답까지 담은 것 (없거나 설정이 다르면 None - DB에서 처음부터 다시 읽는다)"""
+        best: Optional[_SurveyFilter] = None
+        for path in glob.glob(os.path.join(self.state_dir, f"{survey_id}.*.bloom")):
+            entry = self._read_file(survey_id, path)
+            if entry is not None and (best is None or entry.last_response_id > best.last_response_id):
+                best = entry
+        if best is not None:
+            with self._lock:
+                self.counters["loaded"] += 1
+        return best
+
+    def _read_file(self, survey_id: int, path: str) -> Optional[_SurveyFilter]:
+        try:
+            with open(path, "rb") as source:
+                header = json.loads(source.readline())
+                bits = bytearray(source.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as exc:
+            logger.warning("설문 %s 중복 방지 필터 파일 %s를 읽지 못했습니다: %s", survey_id, path, exc)
+            return None
+        if any(header.get(name) != value for name, value in self._signature().items()):
+            return None
+        if len(bits) != (header["size"] + 7) // 8:
+            return None
+        bloom = BloomFilter(
+            header["capacity"], self.error_rate, bits=bits,
+            size=header["size"], hashes=header["hashes"], count=header["count"],
+        )
+        return _SurveyFilter(bloom, header["last_response_id"], header.get("scan_from"))
+
+
+# 싱글톤 인스턴스
+duplicate_guard = SurveyDuplicateGuard()
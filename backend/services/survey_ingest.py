@@ -0,0 +1,450 @@
+# services/survey_ingest.py
+"""
+설문 응답 write-behind 수집 - 부스 이벤트(경품 추첨 등) 순간 트래픽 대응
+
+응답을 검증한 뒤 메모리 버퍼에 넣고 바로 202로 응답한다. 백그라운드 flush 루프가
+SURVEY_INGEST_FLUSH_MS마다(또는 배치가 차면 즉시) 모인 응답을 한 번의 multi-row INSERT로
+저장하고, 응답 수 카운터 증가분은 flush 안에서 설문별로 합쳐 한 번씩만 반영한다
+(services/survey_counter.py).
+
+종료 시(stop) 남은 버퍼를 모두 flush하고, DB에 쓸 수 없으면 SURVEY_INGEST_SPILL_DIR에
+프로세스별 파일(JSON Lines)로 남겼다가 다음 시작 시 다시 적재한다. 워커가 여럿이면 파일마다
+이름 바꾸기(rename)로 먼저 가져간 워커 하나만 적재한다. 가져간 워커가 저장 전에 죽었으면
+(*.replaying-<pid>의 프로세스가 없으면) 다음에 시작하는 워커가 다시 가져간다.
+
+SURVEY_INGEST_MODE=direct 이면 기존처럼 요청마다 바로 커밋한다.
+
+벤치마크 (직접 커밋 vs 버퍼):
+    python -m services.survey_ingest bench --survey-id 1 --count 2000 --concurrency 200
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import logging
+import os
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, IntegrityError
+
+from database import SessionLocal
+from models.survey import Survey, SurveyResponse
+from services import survey_aggregates, survey_counter, survey_rollups
+
+logger = logging.getLogger(__name__)
+
+# SurveyResponse에 그대로 INSERT하는 컬럼
+RESPONSE_COLUMNS = (
+    "survey_id",
+    "respondent_name",
+    "respondent_email",
+    "respondent_phone",
+    "respondent_company",
+    "booth_number",
+    "answers",
+    "rating",
+    "review",
+    "ip_address",
+    "user_agent",
+    "submitted_at",
+)
+
+
+def _insert_rows(db, rows: List[Dict[str, Any]]) -> None:
+    """multi-row INSERT + 설문별 카운터/문항 집계/시간대 롤업 증가분 합산 반영 (커밋은 호출 측)"""
+    db.execute(insert(SurveyResponse), [{column: row.get(column) for column in RESPONSE_COLUMNS} for row in rows])
+    # 인원 제한 설문은 제출 시점에 이미 자리를 예약(counted)했으므로 제외
+    survey_counter.add(db, Counter(row["survey_id"] for row in rows if not row.get("counted")))
+    survey_aggregates.apply_responses(db, rows)
+    survey_rollups.apply_responses(db, rows)
+
+
+def write_batch(rows: List[Dict[str, Any]]) -> int:
+    """
+    버퍼 한 묶음을 저장한다 (스레드에서 실행). 저장된 행 수 반환
+
+    배치 안에 저장할 수 없는 행(삭제된 설문, 컬럼 길이 초과, 잘못된 IP 등)이 있으면 행 단위
+    savepoint로 다시 시도해 나머지는 살리고 문제 행만 버린다 (예약한 자리는 반납).
+    연결 오류 등 다른 DB 오류는 그대로 올려 배치 전체를 다시 시도하게 한다.
+    """
+    db = SessionLocal()
+    try:
+        try:
+            _insert_rows(db, rows)
+            db.commit()
+            return len(rows)
+        except (IntegrityError, DataError):
+            db.rollback()
+
+        written = 0
+        for row in rows:
+            try:
+                with db.begin_nested():
+                    _insert_rows(db, [row])
+                written += 1
+            except (IntegrityError, DataError) as exc:
+                logger.warning(
+                    "설문 응답 저장 불가로 제외 (survey=%s, ingest_id=%s): %s",
+                    row.get("survey_id"), row.get("ingest_id"), exc.orig,
+                )
+                if row.get("counted"):
+                    survey_counter.release(db, row["survey_id"])
+        db.commit()
+        return written
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def _process_alive(pid: str) -> bool:
+    """보존 파일을 가져간 프로세스가 아직 살아 있는지 (이 프로세스와 같은 pid면 재사용된 pid로 보고 False)"""
+    try:
+        pid_number = int(pid)
+    except ValueError:
+        return False
+    if pid_number == os.getpid():
+        return False
+    try:
+        os.kill(pid_number, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # 다른 사용자의 살아 있는 프로세스
+    return True
+
+
+class SurveyIngestBuffer:
+    """설문 응답 메모리 버퍼 + 주기적 배치 flush"""
+
+    def __init__(self) -> None:
+        self.mode = os.getenv("SURVEY_INGEST_MODE", "buffered").lower()
+        self.flush_interval = max(1, int(os.getenv("SURVEY_INGEST_FLUSH_MS", "20"))) / 1000
+        self.max_batch = max(1, int(os.getenv("SURVEY_INGEST_MAX_BATCH", "500")))
+        self.max_buffered = max(self.max_batch, int(os.getenv("SURVEY_INGEST_MAX_BUFFERED", "20000")))
+        self.spill_dir = os.getenv("SURVEY_INGEST_SPILL_DIR", "var/survey_ingest_spill")
+
+        self._pending: List[Dict[str, Any]] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._flushing = False
+        self._stopping = False
+        self._claimed_spills: List[str] = []
+        self._consecutive_failures = 0
+
+        self._accepted = 0
+        self._rejected = 0
+        self._written = 0
+        self._dropped = 0
+        self._flushes = 0
+        self._failed_flushes = 0
+        self._spilled = 0
+        self._flush_ms_total = 0.0
+        self._flush_ms_max = 0.0
+        self._largest_batch = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode == "buffered"
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        """flush 루프 시작 (앱 lifespan에서 호출). 이전 종료 때 남긴 파일이 있으면 다시 적재"""
+        if not self.enabled or self.running:
+            return
+        self._load_spill()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="survey-ingest-flush")
+        logger.info(
+            "설문 응답 수집 버퍼 시작 (flush %dms, 배치 최대 %d건)",
+            int(self.flush_interval * 1000),
+            self.max_batch,
+        )
+
+    async def stop(self) -> None:
+        """루프 종료 후 남은 응답을 모두 flush. 실패하면 파일로 보존"""
+        if self._task is None:
+            return
+        # 진행 중인 flush를 취소하면 저장된 행이 버퍼에 남아 중복 저장되므로 루프가 스스로 끝나길 기다림
+        self._stopping = True
+        if self._wakeup is not None:
+            self._wakeup.set()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        self._stopping = False
+
+        while self._pending:
+            batch = self._pending[: self.max_batch]
+            try:
+                await self._flush(batch)
+            except Exception as exc:  # noqa: BLE001
+                logger.error("종료 중 설문 응답 flush 실패 - 파일로 보존: %s", exc)
+                self._spill()
+                break
+        logger.info("설문 응답 수집 버퍼가 중지되었습니다.")
+
+    def submit(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        검증이 끝난 응답을 버퍼에 넣고 접수 정보를 반환한다.
+        버퍼가 가득 찼으면 asyncio.QueueFull, 실행 중이 아니면 RuntimeError
+        """
+        if not self.running:
+            raise RuntimeError("설문 응답 수집 버퍼가 실행 중이 아닙니다.")
+        if len(self._pending) >= self.max_buffered:
+            self._rejected += 1
+            raise asyncio.QueueFull()
+
+        row = dict(row)
+        row["ingest_id"] = uuid.uuid4().hex
+        row["submitted_at"] = row.get("submitted_at") or datetime.now(timezone.utc)
+        self._pending.append(row)
+        self._accepted += 1
+        if len(self._pending) >= self.max_batch and self._wakeup is not None:
+            self._wakeup.set()
+        return {"ingest_id": row["ingest_id"], "submitted_at": row["submitted_at"]}
+
+    async def drain(self) -> None:
+        """지금까지 접수된 응답이 모두 저장될 때까지 대기 (벤치마크/테스트용)"""
+        while self._pending or self._flushing:
+            await asyncio.sleep(self.flush_interval)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "running": self.running,
+            "pending": len(self._pending),
+            "capacity": self.max_buffered,
+            "flush_interval_ms": int(self.flush_interval * 1000),
+            "max_batch": self.max_batch,
+            "accepted": self._accepted,
+            "rejected": self._rejected,
+            "written": self._written,
+            "dropped": self._dropped,
+            "flushes": self._flushes,
+            "failed_flushes": self._failed_flushes,
+            "spilled": self._spilled,
+            "largest_batch": self._largest_batch,
+            "avg_flush_ms": round(self._flush_ms_total / self._flushes, 1) if self._flushes else None,
+            "max_flush_ms": round(self._flush_ms_max, 1),
+        }
+
+    async def _run(self) -> None:
+        assert self._wakeup is not None
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            while self._pending and not self._stopping:
+                batch = self._pending[: self.max_batch]
+                try:
+                    await self._flush(batch)
+                    self._consecutive_failures = 0
+                except Exception as exc:  # noqa: BLE001
+                    self._failed_flushes += 1
+                    self._consecutive_failures += 1
+                    backoff = min(5.0, 0.1 * 2 ** self._consecutive_failures)
+                    logger.error("설문 응답 flush 실패 (%d건, %.1f초 후 재시도): %s", len(batch), backoff, exc)
+                    await asyncio.sleep(backoff)
+                    break
+                if len(self._pending) < self.max_batch:
+                    break
+
+            if self._claimed_spills and not self._pending:
+                # 다시 적재한 응답이 모두 저장됨
+                self._remove_claimed_spills()
+
+    async def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        """배치 저장 - 성공한 경우에만 버퍼 앞부분에서 제거"""
+        self._flushing = True
+        started = time.perf_counter()
+        try:
+            written = await asyncio.to_thread(write_batch, batch)
+        finally:
+            self._flushing = False
+        del self._pending[: len(batch)]
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self._flushes += 1
+        self._written += written
+        self._dropped += len(batch) - written
+        self._flush_ms_total += elapsed_ms
+        self._flush_ms_max = max(self._flush_ms_max, elapsed_ms)
+        self._largest_batch = max(self._largest_batch, len(batch))
+
+    def _spill(self) -> None:
+        """
+        버퍼 전체를 이 프로세스 전용 파일로 기록 (워커끼리 덮어쓰지 않도록 pid + uuid 이름)
+
+        다시 적재한 행도 아직 버퍼에 있으므로 새 파일에 함께 쓰고, 가져왔던 파일은 지운다.
+        """
+        os.makedirs(self.spill_dir, exist_ok=True)
+        path = os.path.join(self.spill_dir, f"{os.getpid()}-{uuid.uuid4().hex}.jsonl")
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as output:
+            for row in self._pending:
+                output.write(json.dumps(row, ensure_ascii=False, default=str) + "\n")
+            output.flush()
+            os.fsync(output.fileno())
+        os.replace(temp_path, path)
+        self._remove_claimed_spills()
+        self._spilled += len(self._pending)
+        logger.warning("설문 응답 %d건을 %s에 보존했습니다.", len(self._pending), path)
+
+    def _claim_spills(self) -> List[str]:
+        """
+        남아 있는 보존 파일을 이름 바꾸기로 가져온다 (먼저 바꾼 워커만 성공하므로 한 번만 적재)
+
+        다른 프로세스가 가져갔다가 저장하지 못하고 죽은 파일(*.replaying-<죽은 pid>)도 다시 가져온다.
+        """
+        candidates = sorted(glob.glob(os.path.join(self.spill_dir, "*.jsonl")))
+        for path in sorted(glob.glob(os.path.join(self.spill_dir, "*.jsonl.replaying-*"))):
+            if path not in self._claimed_spills and not _process_alive(path.rsplit(".replaying-", 1)[1]):
+                candidates.append(path)
+        claimed = []
+        for path in candidates:
+            claimed_path = f"{path.rsplit('.replaying-', 1)[0]}.replaying-{os.getpid()}"
+            try:
+                os.rename(path, claimed_path)
+            except FileNotFoundError:
+                continue  # 다른 워커가 가져감
+            claimed.append(claimed_path)
+        return claimed
+
+    def _load_spill(self) -> None:
+        claimed = self._claim_spills()
+        rows = []
+        for path in claimed:
+            with open(path, encoding="utf-8") as source:
+                for line in source:
+                    if not line.strip():
+                        continue
+                    row = json.loads(line)
+                    if row.get("submitted_at"):
+                        row["submitted_at"] = datetime.fromisoformat(row["submitted_at"])
+                    rows.append(row)
+        if not claimed:
+            return
+        self._pending = rows + self._pending
+        self._claimed_spills.extend(claimed)
+        logger.info("이전 종료 때 보존된 설문 응답 %d건을 다시 적재합니다 (파일 %d개).", len(rows), len(claimed))
+
+    def _remove_claimed_spills(self) -> None:
+        """다시 적재한 응답이 모두 저장됐거나 새 보존 파일에 옮겨졌을 때"""
+        for path in self._claimed_spills:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self._claimed_spills = []
+
+
+# 싱글톤 인스턴스
+survey_ingest = SurveyIngestBuffer()
+
+
+# ---------- 벤치마크 ----------
+
+BENCH_MARKER = "__survey_ingest_bench__"
+
+
+def _bench_row(survey_id: int, index: int) -> Dict[str, Any]:
+    return {
+        "survey_id": survey_id,
+        "respondent_company": BENCH_MARKER,
+        "answers": {"1": f"벤치마크 응답 {index}", "2": "만족"},
+        "rating": index % 5 + 1,
+    }
+
+
+def _direct_write(row: Dict[str, Any]) -> None:
+    """기존 방식 - 요청마다 SELECT, INSERT, 카운터 갱신, 커밋"""
+    db = SessionLocal()
+    try:
+        survey = db.query(Survey).filter(Survey.id == row["survey_id"]).first()
+        db.add(SurveyResponse(**row))
+        survey.current_responses = (survey.current_responses or 0) + 1
+        db.commit()
+    finally:
+        db.close()
+
+
+def _cleanup_bench_rows(survey_id: int) -> int:
+    db = SessionLocal()
+    try:
+        deleted = (
+            db.query(SurveyResponse)
+            .filter(SurveyResponse.survey_id == survey_id, SurveyResponse.respondent_company == BENCH_MARKER)
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+        survey_counter.reconcile(db, [survey_id], grace_seconds=0)
+        survey_counter.sync_current_responses(db)
+        survey_aggregates.rebuild(db, survey_id)
+        survey_rollups.rebuild(db, survey_id)
+        return deleted
+    finally:
+        db.close()
+
+
+async def bench(survey_id: int, count: int, concurrency: int) -> Dict[str, Any]:
+    """같은 건수를 직접 커밋 방식과 버퍼 방식으로 저장해 처리량(건/초) 비교"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def direct(index: int) -> None:
+        async with semaphore:
+            await asyncio.to_thread(_direct_write, _bench_row(survey_id, index))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(direct(index) for index in range(count)))
+    direct_seconds = time.perf_counter() - started
+    _cleanup_bench_rows(survey_id)
+
+    buffer = SurveyIngestBuffer()
+    buffer.mode = "buffered"
+    await buffer.start()
+    started = time.perf_counter()
+    for index in range(count):
+        buffer.submit(_bench_row(survey_id, index))
+        if index % concurrency == 0:
+            await asyncio.sleep(0)  # 요청 처리 사이사이 flush 루프가 돌 수 있도록
+    ack_seconds = time.perf_counter() - started
+    await buffer.drain()
+    buffered_seconds = time.perf_counter() - started
+    await buffer.stop()
+    _cleanup_bench_rows(survey_id)
+
+    return {
+        "count": count,
+        "concurrency": concurrency,
+        "direct_rows_per_second": round(count / direct_seconds, 1),
+        "buffered_rows_per_second": round(count / buffered_seconds, 1),
+        "buffered_ack_rows_per_second": round(count / ack_seconds, 1),
+        "buffer": buffer.stats(),
+    }
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="설문 응답 수집 도구")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    bench_parser = subcommands.add_parser("bench", help="직접 커밋 vs 버퍼 처리량 비교")
+    bench_parser.add_argument("--survey-id", type=int, required=True)
+    bench_parser.add_argument("--count", type=int, default=2000)
+    bench_parser.add_argument("--concurrency", type=int, default=200)
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        print(json.dumps(asyncio.run(bench(args.survey_id, args.count, args.concurrency)), indent=2, ensure_ascii=False))
@@ -0,0 +1,234 @@
+# services/survey_rollups.py
+"""
+설문 응답 시간대별 롤업 - 실시간 추이 차트용
+
+survey_response_rollups에 (설문, 부스, 15분 버킷)마다 응답 수를 유지한다.
+응답 저장과 같은 트랜잭션에서 증가분만 더하므로(services/survey_ingest.py, 직접 저장 경로)
+추이 조회는 survey_responses를 훑지 않고 롤업 행만 더한다.
+15분보다 큰 단위(hour/day/week)는 조회 시 SURVEY_TREND_TIMEZONE 기준으로 묶는다.
+
+도입 이전 응답이나 어긋난 값은 원본에서 다시 계산:
+    python -m services.survey_rollups rebuild [--survey-id 1]
+"""
+
+import argparse
+import json
+import logging
+import os
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from dotenv import load_dotenv
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+BUCKET_SECONDS = 15 * 60
+TREND_TIMEZONE = os.getenv("SURVEY_TREND_TIMEZONE", "Asia/Seoul")
+# 한 번에 돌려주는 최대 버킷 수 (빈 버킷 포함)
+MAX_BUCKETS = 2000
+
+GRANULARITIES = {
+    "15min": timedelta(minutes=15),
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+    "week": timedelta(weeks=1),
+}
+# since를 생략했을 때 기본 조회 범위 (15min은 오늘 0시부터)
+DEFAULT_WINDOWS = {
+    "hour": timedelta(days=2),
+    "day": timedelta(days=7),
+    "week": timedelta(weeks=12),
+}
+
+_UPSERT = text(
+    """
+    INSERT INTO survey_response_rollups (survey_id, booth_number, bucket_start, count)
+    VALUES (:survey_id, :booth_number, :bucket_start, :count)
+    ON CONFLICT (survey_id, bucket_start, booth_number)
+    DO UPDATE SET count = survey_response_rollups.count + EXCLUDED.count
+    """
+)
+
+
+def bucket_start(moment: datetime) -> datetime:
+    """15분 버킷 시작 시각 (UTC)"""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    epoch = int(moment.timestamp())
+    return datetime.fromtimestamp(epoch - epoch % BUCKET_SECONDS, tz=timezone.utc)
+
+
+def apply_responses(db: Session, rows: Iterable[Dict[str, Any]]) -> None:
+    """저장하는 응답들을 (설문, 부스, 버킷)별로 합쳐 롤업에 더한다 (커밋은 호출 측)"""
+    now = datetime.now(timezone.utc)
+    counts: Counter = Counter()
+    for row in rows:
+        submitted_at = row.get("submitted_at") or now
+        if isinstance(submitted_at, str):
+            submitted_at = datetime.fromisoformat(submitted_at)
+        counts[(row["survey_id"], (row.get("booth_number") or "")[:50], bucket_start(submitted_at))] += 1
+    if not counts:
+        return
+    # 키 순서로 잠가 동시에 저장하는 트랜잭션끼리 교착이 생기지 않도록 함
+    db.execute(
+        _UPSERT,
+        [
+            {"survey_id": survey_id, "booth_number": booth, "bucket_start": start, "count": count}
+            for (survey_id, booth, start), count in sorted(counts.items())
+        ],
+    )
+
+
+def _local_floor(moment: datetime, granularity: str, zone: ZoneInfo) -> datetime:
+    local = moment.astimezone(zone)
+    if granularity == "15min":
+        return local.replace(minute=local.minute - local.minute % 15, second=0, microsecond=0)
+    if granularity == "hour":
+        return local.replace(minute=0, second=0, microsecond=0)
+    local = local.replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity == "week":
+        local -= timedelta(days=local.weekday())
+    return local
+
+
+def _next_bucket(moment: datetime, granularity: str, zone: ZoneInfo) -> datetime:
+    # 일/주 단위는 현지 날짜로 더해 서머타임이 있는 시간대에서도 자정에 맞춤
+    if granularity in ("day", "week"):
+        naive = moment.replace(tzinfo=None) + GRANULARITIES[granularity]
+        return naive.replace(tzinfo=zone)
+    return (moment.astimezone(timezone.utc) + GRANULARITIES[granularity]).astimezone(zone)
+
+
+def trend(
+    db: Session,
+    survey_ids: List[int],
+    granularity: str = "15min",
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    booth_number: Optional[str] = None,
+    by_booth: bool = False,
+) -> Dict[str, Any]:
+    """
+    설문들의 응답 수 추이 (빈 버킷은 0으로 채움)
+
+    Returns:
+        {"granularity", "timezone", "since", "until", "total", "series": [{"bucket", "count"}],
+         "booths": [{"booth_number", "total", "series"}] | None}
+    """
+    zone = ZoneInfo(TREND_TIMEZONE)
+    until = until or datetime.now(timezone.utc)
+    if until.tzinfo is None:
+        until = until.replace(tzinfo=zone)
+    if since is None:
+        since = _local_floor(until, "day", zone) if granularity == "15min" else until - DEFAULT_WINDOWS[granularity]
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=zone)
+    start = _local_floor(since, granularity, zone)
+
+    buckets: List[datetime] = []
+    cursor = start
+    while cursor < until and len(buckets) < MAX_BUCKETS:
+        buckets.append(cursor)
+        cursor = _next_bucket(cursor, granularity, zone)
+    if not buckets:
+        buckets.append(start)
+    end = _next_bucket(buckets[-1], granularity, zone)
+
+    rows: List[Tuple[datetime, str, int]] = []
+    if survey_ids:
+        rows = db.execute(
+            text(
+                """
+                SELECT bucket_start, booth_number, SUM(count)
+                FROM survey_response_rollups
+                WHERE survey_id = ANY(:survey_ids)
+                  AND bucket_start >= :start AND bucket_start < :end
+                  AND (CAST(:booth AS VARCHAR) IS NULL OR booth_number = :booth)
+                GROUP BY bucket_start, booth_number
+                """
+            ),
+            {"survey_ids": survey_ids, "start": start, "end": end, "booth": booth_number},
+        ).all()
+
+    # 15분 롤업 행을 요청 단위 버킷에 배정 (버킷 경계는 현지 시간 기준)
+    index = {bucket.astimezone(timezone.utc): position for position, bucket in enumerate(buckets)}
+    totals = [0] * len(buckets)
+    booth_totals: Dict[str, List[int]] = {}
+    for started_at, booth, count in rows:
+        position = index.get(_local_floor(started_at, granularity, zone).astimezone(timezone.utc))
+        if position is None:
+            continue
+        totals[position] += int(count)
+        if by_booth:
+            booth_totals.setdefault(booth, [0] * len(buckets))[position] += int(count)
+
+    def series(counts: List[int]) -> List[Dict[str, Any]]:
+        return [{"bucket": bucket.isoformat(), "count": count} for bucket, count in zip(buckets, counts)]
+
+    return {
+        "granularity": granularity,
+        "timezone": TREND_TIMEZONE,
+        "since": buckets[0].isoformat(),
+        "until": end.isoformat(),
+        "total": sum(totals),
+        "series": series(totals),
+        "booths": [
+            {"booth_number": booth or None, "total": sum(counts), "series": series(counts)}
+            for booth, counts in sorted(booth_totals.items(), key=lambda item: -sum(item[1]))
+        ] if by_booth else None,
+    }
+
+
+def rebuild(db: Session, survey_id: Optional[int] = None) -> int:
+    """
+    원본 응답에서 롤업을 다시 계산한다 (설문 하나 또는 전체). 교체한 행 수 반환
+
+    테이블 잠금으로 진행 중인 증가 반영을 잠시 막은 뒤 계산하므로, 잠금을 기다리던
+    트랜잭션의 증가분은 재계산 결과 위에 그대로 더해진다.
+    """
+    db.execute(text("LOCK TABLE survey_response_rollups IN SHARE ROW EXCLUSIVE MODE"))
+    params = {"survey_id": survey_id}
+    db.execute(
+        text("DELETE FROM survey_response_rollups WHERE CAST(:survey_id AS INTEGER) IS NULL OR survey_id = :survey_id"),
+        params,
+    )
+    result = db.execute(
+        text(
+            f"""
+            INSERT INTO survey_response_rollups (survey_id, booth_number, bucket_start, count)
+            SELECT survey_id, COALESCE(LEFT(booth_number, 50), ''),
+                   to_timestamp(floor(extract(epoch FROM submitted_at) / {BUCKET_SECONDS}) * {BUCKET_SECONDS}),
+                   COUNT(*)
+            FROM survey_responses
+            WHERE CAST(:survey_id AS INTEGER) IS NULL OR survey_id = :survey_id
+            GROUP BY 1, 2, 3
+            """
+        ),
+        params,
+    )
+    db.commit()
+    return result.rowcount or 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="설문 응답 롤업 도구")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    rebuild_parser = subcommands.add_parser("rebuild", help="원본 응답에서 롤업 재계산")
+    rebuild_parser.add_argument("--survey-id", type=int, help="생략하면 전체 설문")
+    args = parser.parse_args()
+
+    session = SessionLocal()
+    try:
+        rows_written = rebuild(session, args.survey_id)
+    finally:
+        session.close()
+    print(json.dumps({"survey_id": args.survey_id, "rollup_rows": rows_written}, indent=2))
@@ -0,0 +1,212 @@
+# services/survey_search.py
+"""
+설문 주관식 답변/후기 검색 (예: 제품명이 언급된 응답 찾기)
+
+survey_responses.search_text에 주관식 문항 답변과 후기를 이어 둔 텍스트를 DB 트리거
+(trg_responses_search_text, database/schema.sql)가 저장 경로와 관계없이 유지하고,
+pg_trgm GIN 인덱스(idx_responses_search_trgm)로 ILIKE '%검색어%'를 인덱스 검색한다.
+trigram은 부분 문자열 검색이라 조사가 붙은 한국어 단어("신제품을")도 그대로 찾는다.
+
+- 공백으로 나눈 검색어는 모두 포함한 응답만 (검색어마다 인덱스 조건이 붙어 비트맵 AND)
+- 응답 id 내림차순 keyset 페이지네이션 (next_before_id)
+- 하이라이트는 돌려줄 페이지의 응답에서만 계산한다 (문항별 발췌 + 검색어 위치)
+
+2글자 검색어는 trigram을 만들 수 없어 범위(설문/이벤트/기업) 안의 응답을 훑는다.
+검색어는 3글자 이상일 때 인덱스를 온전히 탄다.
+
+기존 DB에 컬럼/트리거를 추가한 뒤에는 한 번 채운다:
+    python -m services.survey_search backfill [--batch-size 5000]
+"""
+
+import argparse
+import json
+import logging
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from services import survey_stats
+
+logger = logging.getLogger(__name__)
+
+MIN_TERM_LENGTH = 2
+MAX_TERMS = 5
+# 발췌문에서 첫 일치 앞뒤로 보여주는 글자 수
+SNIPPET_CONTEXT = 40
+
+REVIEW_FIELD = "review"
+
+_SEARCH = """
+    SELECT r.id, r.survey_id, r.booth_number, r.submitted_at, r.answers, r.review
+    FROM survey_responses r
+    WHERE r.survey_id = ANY(:survey_ids)
+      AND (CAST(:before_id AS INTEGER) IS NULL OR r.id < :before_id)
+      AND {conditions}
+    ORDER BY r.id DESC
+    LIMIT :limit
+"""
+
+
+def parse_terms(query: str) -> List[str]:
+    """
+    검색어 목록 (중복 제거, 대소문자 무시)
+
+    Raises:
+        ValueError: 검색어가 없거나 너무 짧거나 많을 때
+    """
+    terms: List[str] = []
+    for term in query.split():
+        if term.casefold() not in (existing.casefold() for existing in terms):
+            terms.append(term)
+    if not terms:
+        raise ValueError("검색어를 입력해주세요.")
+    if any(len(term) < MIN_TERM_LENGTH for term in terms):
+        raise ValueError(f"검색어는 {MIN_TERM_LENGTH}글자 이상이어야 합니다.")
+    if len(terms) > MAX_TERMS:
+        raise ValueError(f"검색어는 {MAX_TERMS}개까지 입력할 수 있습니다.")
+    return terms
+
+
+def _like_pattern(term: str) -> str:
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def highlight(value: str, terms: List[str]) -> Optional[Dict[str, Any]]:
+    """
+    첫 일치 주변 발췌문과 그 안의 검색어 위치 (일치가 없으면 None)
+
+    Returns:
+        {"snippet": 발췌문, "highlights": [[시작, 끝], ...]}  (발췌문 기준 글자 위치)
+    """
+    pattern = re.compile("|".join(re.escape(term) for term in sorted(terms, key=len, reverse=True)), re.IGNORECASE)
+    first = pattern.search(value)
+    if first is None:
+        return None
+    start = max(0, first.start() - SNIPPET_CONTEXT)
+    end = min(len(value), first.end() + SNIPPET_CONTEXT)
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if end < len(value) else ""
+    snippet = prefix + value[start:end] + suffix
+    offset = len(prefix) - start
+    highlights = [
+        [match.start() + offset, match.end() + offset]
+        for match in pattern.finditer(value, start, end)
+    ]
+    return {"snippet": snippet, "highlights": highlights}
+
+
+def _free_form_fields(questions: List[Dict[str, Any]]) -> List[Tuple[str, str]]:
+    """(문항 키, 문항 문구) - 설문 정의 순서, 트리거가 search_text에 넣는 문항과 같음"""
+    free_form = set(survey_stats.question_keys_by_kind(questions)["free_form"])
+    return [
+        (str(question["id"]), question.get("question_text") or question.get("text") or question.get("question") or "")
+        for question in questions or []
+        if str(question.get("id")) in free_form
+    ]
+
+
+def search_responses(
+    db: Session,
+    survey_ids: List[int],
+    query: str,
+    limit: int = 20,
+    before_id: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    설문들의 응답 중 모든 검색어를 포함한 응답 (최신순)
+
+    Returns:
+        {"terms", "hits": [{"response_id", "survey_id", "booth_number", "submitted_at",
+          "matches": [{"field", "question_id", "question", "snippet", "highlights"}]}],
+         "next_before_id"}
+
+    Raises:
+        ValueError: 검색어가 올바르지 않을 때 (parse_terms)
+    """
+    terms = parse_terms(query)
+    if not survey_ids:
+        return {"terms": terms, "hits": [], "next_before_id": None}
+
+    params: Dict[str, Any] = {"survey_ids": survey_ids, "before_id": before_id, "limit": limit + 1}
+    conditions = []
+    for index, term in enumerate(terms):
+        params[f"term_{index}"] = _like_pattern(term)
+        conditions.append(f"r.search_text ILIKE :term_{index}")
+    rows = db.execute(text(_SEARCH.format(conditions=" AND ".join(conditions))), params).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    page_survey_ids = sorted({row.survey_id for row in rows})
+    fields_by_survey = {
+        survey_id: _free_form_fields(questions or [])
+        for survey_id, questions in db.execute(
+            text("SELECT id, questions FROM surveys WHERE id = ANY(:ids)"), {"ids": page_survey_ids}
+        ).all()
+    } if rows else {}
+
+    hits = []
+    for row in rows:
+        matches = []
+        answers = row.answers or {}
+        for key, label in fields_by_survey.get(row.survey_id, []):
+            value = answers.get(key)
+            found = highlight(value, terms) if isinstance(value, str) else None
+            if found:
+                matches.append({"field": f"answers.{key}", "question_id": key, "question": label, **found})
+        found = highlight(row.review, terms) if row.review else None
+        if found:
+            matches.append({"field": REVIEW_FIELD, "question_id": None, "question": None, **found})
+        hits.append(
+            {
+                "response_id": row.id,
+                "survey_id": row.survey_id,
+                "booth_number": row.booth_number,
+                "submitted_at": row.submitted_at,
+                "matches": matches,
+            }
+        )
+    return {"terms": terms, "hits": hits, "next_before_id": rows[-1].id if has_more else None}
+
+
+def backfill(db: Session, batch_size: int = 5000) -> int:
+    """
+    search_text가 비어 있는 기존 응답을 id 구간별로 다시 채운다 (트리거 재실행). 갱신한 행 수 반환
+
+    구간마다 커밋해 긴 잠금 없이 서비스 중에도 실행할 수 있다.
+    """
+    max_id = db.execute(text("SELECT COALESCE(MAX(id), 0) FROM survey_responses")).scalar()
+    updated = 0
+    for start in range(0, max_id, batch_size):
+        result = db.execute(
+            text(
+                """
+                UPDATE survey_responses SET review = review
+                WHERE id > :start AND id <= :end AND search_text IS NULL
+                """
+            ),
+            {"start": start, "end": start + batch_size},
+        )
+        db.commit()
+        updated += result.rowcount or 0
+        logger.info("검색 텍스트 채우기: id %d/%d (갱신 %d)", min(start + batch_size, max_id), max_id, updated)
+    return updated
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="설문 응답 검색 도구")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    backfill_parser = subcommands.add_parser("backfill", help="기존 응답의 search_text 채우기")
+    backfill_parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    session = SessionLocal()
+    try:
+        rows_updated = backfill(session, args.batch_size)
+    finally:
+        session.close()
+    print(json.dumps({"updated": rows_updated}, indent=2))
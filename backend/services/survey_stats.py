@@ -0,0 +1,186 @@
+# services/survey_stats.py
+"""
+설문 통계 집계 - survey_responses.answers(JSONB)를 PostgreSQL에서 바로 집계
+
+응답 행을 파이썬으로 가져오지 않고 jsonb_each / jsonb_array_elements로 문항별
+응답 수, 선택지 분포, 평점 평균/최소/최대만 계산해 돌려받는다.
+주관식 답변은 fetch_free_form_answers()로 페이지 단위 조회한다.
+"""
+
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+CHOICE_QUESTION_TYPES = {"radio", "checkbox", "select", "dropdown"}
+RATING_QUESTION_TYPE = "rating"
+# 글로 답하는 문항 (SurveyCreate.jsx text/textarea) - LLM 요약 대상
+TEXT_QUESTION_TYPES = {"text", "textarea"}
+
+# 파이썬 truthy 판정과 같은 기준의 "내용 있는 답변" (null, "", 0, false, [], {} 제외)
+_HAS_CONTENT = (
+    "jsonb_typeof(e.value) <> 'null' "
+    "AND e.value NOT IN ('\"\"'::jsonb, '0'::jsonb, 'false'::jsonb, '[]'::jsonb, '{}'::jsonb)"
+)
+
+
+def question_type(question: Dict[str, Any]) -> str:
+    return question.get("question_type") or question.get("type") or "text"
+
+
+def question_keys_by_kind(questions: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+    """문항 id(JSONB 키)를 선택형/평점/주관식으로 분류"""
+    kinds: Dict[str, List[str]] = {"choice": [], "rating": [], "free_form": []}
+    for question in questions or []:
+        if question.get("id") is None:
+            continue
+        kind = question_type(question)
+        if kind in CHOICE_QUESTION_TYPES:
+            kinds["choice"].append(str(question["id"]))
+        elif kind == RATING_QUESTION_TYPE:
+            kinds["rating"].append(str(question["id"]))
+        else:
+            kinds["free_form"].append(str(question["id"]))
+    return kinds
+
+
+def text_question_keys(questions: List[Dict[str, Any]]) -> List[str]:
+    """글로 답하는 문항 id (주관식 중 scale/toggle 등 값 문항 제외)"""
+    return [
+        str(question["id"])
+        for question in questions or []
+        if question.get("id") is not None and question_type(question) in TEXT_QUESTION_TYPES
+    ]
+
+
+def compute_question_aggregates(
+    db: Session,
+    survey_id: int,
+    questions: List[Dict[str, Any]],
+) -> Dict[str, Dict[str, Any]]:
+    """
+    문항별 집계값
+
+    Returns:
+        {문항 키: {"total": 응답 수, "counts": {라벨: 수},
+                   "rating": {"average", "min", "max", "count", "sum"} | None,
+                   "non_empty": 내용 있는 답변 수}}
+    """
+    kinds = question_keys_by_kind(questions)
+    aggregates: Dict[str, Dict[str, Any]] = {
+        key: {"total": 0, "counts": {}, "rating": None, "non_empty": 0}
+        for keys in kinds.values()
+        for key in keys
+    }
+    if not aggregates:
+        return aggregates
+
+    totals = db.execute(
+        text(
+            f"""
+            SELECT e.key, COUNT(*) AS total, COUNT(*) FILTER (WHERE {_HAS_CONTENT}) AS non_empty
+            FROM survey_responses r
+            CROSS JOIN LATERAL jsonb_each(r.answers) AS e
+            WHERE r.survey_id = :survey_id AND e.key = ANY(:keys)
+            GROUP BY e.key
+            """
+        ),
+        {"survey_id": survey_id, "keys": list(aggregates)},
+    ).all()
+    for key, total, non_empty in totals:
+        aggregates[key]["total"] = int(total)
+        aggregates[key]["non_empty"] = int(non_empty)
+
+    if kinds["choice"]:
+        # 배열(복수 선택)은 원소별로, 단일 값은 그대로 센다
+        choice_rows = db.execute(
+            text(
+                """
+                SELECT e.key, item #>> '{}' AS label, COUNT(*) AS count
+                FROM survey_responses r
+                CROSS JOIN LATERAL jsonb_each(r.answers) AS e
+                CROSS JOIN LATERAL jsonb_array_elements(
+                    CASE WHEN jsonb_typeof(e.value) = 'array' THEN e.value ELSE jsonb_build_array(e.value) END
+                ) AS item
+                WHERE r.survey_id = :survey_id AND e.key = ANY(:keys) AND jsonb_typeof(item) <> 'null'
+                GROUP BY e.key, label
+                """
+            ),
+            {"survey_id": survey_id, "keys": kinds["choice"]},
+        ).all()
+        for key, label, count in choice_rows:
+            aggregates[key]["counts"][label] = int(count)
+
+    if kinds["rating"]:
+        # (키, 값) 분포와 키별 평균/최소/최대를 GROUPING SETS 한 번으로 계산
+        rating_rows = db.execute(
+            text(
+                """
+                WITH ratings AS (
+                    SELECT e.key, (e.value #>> '{}')::int AS value
+                    FROM survey_responses r
+                    CROSS JOIN LATERAL jsonb_each(r.answers) AS e
+                    WHERE r.survey_id = :survey_id AND e.key = ANY(:keys)
+                      AND jsonb_typeof(e.value) IN ('number', 'string')
+                      AND (e.value #>> '{}') ~ '^[0-9]+$'
+                )
+                SELECT key, value, GROUPING(value) AS is_summary, COUNT(*) AS count, SUM(value) AS sum,
+                       ROUND(AVG(value)::numeric, 2) AS average, MIN(value) AS min, MAX(value) AS max
+                FROM ratings
+                GROUP BY GROUPING SETS ((key, value), (key))
+                """
+            ),
+            {"survey_id": survey_id, "keys": kinds["rating"]},
+        ).all()
+        for key, value, is_summary, count, total, average, minimum, maximum in rating_rows:
+            if is_summary:
+                aggregates[key]["rating"] = {
+                    "average": float(average),
+                    "min": minimum,
+                    "max": maximum,
+                    "count": int(count),
+                    "sum": int(total),
+                }
+            else:
+                aggregates[key]["counts"][str(value)] = int(count)
+
+    return aggregates
+
+
+def fetch_free_form_answers(
+    db: Session,
+    survey_id: int,
+    question_key: str,
+    limit: int = 50,
+    before_id: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    주관식 답변 페이지 조회 (응답 id 내림차순 keyset 페이지네이션)
+
+    `answers ? :key`는 GIN(answers) 인덱스, 정렬/커서는 (survey_id, id) 인덱스를 사용한다.
+    """
+    rows = db.execute(
+        text(
+            """
+            SELECT r.id, r.answers -> :key #>> '{}' AS answer, r.submitted_at
+            FROM survey_responses r
+            WHERE r.survey_id = :survey_id
+              AND r.answers ? :key
+              AND (CAST(:before_id AS INTEGER) IS NULL OR r.id < :before_id)
+              AND jsonb_typeof(r.answers -> :key) <> 'null'
+              AND r.answers -> :key NOT IN ('""'::jsonb, '0'::jsonb, 'false'::jsonb, '[]'::jsonb, '{}'::jsonb)
+            ORDER BY r.id DESC
+            LIMIT :limit
+            """
+        ),
+        {"survey_id": survey_id, "key": question_key, "before_id": before_id, "limit": limit + 1},
+    ).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "answers": [
+            {"response_id": response_id, "answer": answer, "submitted_at": submitted_at}
+            for response_id, answer, submitted_at in rows
+        ],
+        "next_before_id": rows[-1][0] if has_more else None,
+    }
@@ -0,0 +1,481 @@
+# services/survey_summaries.py
+"""
+설문 주관식 답변/후기 LLM 요약 (map-reduce, 백그라운드)
+
+통계 API는 주관식 답변을 미리보기 몇 개만 돌려주므로, 답변이 수백 개 쌓이면 기업 담당자가
+의견을 훑어보기 어렵다. 이 워커가 (설문, 문항)마다 답변을 요약해 survey_answer_summaries에
+저장하고 통계 API는 저장된 요약만 읽는다 (요청 중에 LLM을 부르지 않음).
+
+- map: 새 답변을 응답 id 순으로 글자 수 기준 묶음으로 나눠 묶음마다 요약 (동시 호출 수 제한)
+- reduce: 저장된 묶음 요약 + 새 묶음 요약을 REDUCE_FAN_IN개씩 합치는 트리로 전체 요약/주제 생성
+- 증분: 요약에 반영한 마지막 응답 id를 저장해 다음 실행에는 그 뒤 답변만 map 한다
+  (묶음 요약이 너무 많아지면 첫 reduce 단계 결과로 바꿔 저장해 크기를 유지)
+- 스케줄러가 주기적으로 새 답변이 SURVEY_SUMMARY_MIN_NEW_ANSWERS개 이상 쌓인 문항을 큐에 넣고,
+  기업 화면의 새로고침 요청도 같은 큐로 들어온다
+
+후기(survey_responses.review)는 문항 키 "_review"로 저장한다.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from services import survey_stats
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+REVIEW_KEY = "_review"
+REVIEW_LABEL = "부스 방문 후기"
+
+# 묶음 하나에 넣는 답변 글자 수 / 답변 수 상한
+CHUNK_CHARS = int(os.getenv("SURVEY_SUMMARY_CHUNK_CHARS", "6000"))
+CHUNK_MAX_ANSWERS = int(os.getenv("SURVEY_SUMMARY_CHUNK_MAX_ANSWERS", "80"))
+# 답변 하나를 요약에 넣을 때 자르는 길이
+ANSWER_MAX_CHARS = 500
+# reduce 한 번에 합치는 묶음 요약 수 (저장하는 묶음 요약도 이 수를 넘으면 압축)
+REDUCE_FAN_IN = 8
+# 한 번 실행에 읽는 최대 답변 수 (남은 답변은 이어서 다시 큐에 넣음)
+MAX_ANSWERS_PER_RUN = int(os.getenv("SURVEY_SUMMARY_MAX_ANSWERS_PER_RUN", "2000"))
+# 요약이 있는 문항은 새 답변이 이만큼 쌓여야 다시 요약 (처음 요약은 답변 1개부터)
+MIN_NEW_ANSWERS = int(os.getenv("SURVEY_SUMMARY_MIN_NEW_ANSWERS", "20"))
+
+# survey_stats.fetch_free_form_answers와 같은 "내용 있는 답변" 기준 (집계의 non_empty와 맞춤)
+# 글 답변만 - 숫자/참거짓 값은 요약하지 않음 (search_text 트리거와 같은 조건)
+_NEW_ANSWERS = text(
+    """
+    SELECT r.id, r.answers -> :key #>> '{}' AS answer
+    FROM survey_responses r
+    WHERE r.survey_id = :survey_id
+      AND r.id > :after_id
+      AND r.answers ? :key
+      AND jsonb_typeof(r.answers -> :key) = 'string'
+      AND r.answers -> :key NOT IN ('""'::jsonb, '0'::jsonb, 'false'::jsonb, '[]'::jsonb, '{}'::jsonb)
+    ORDER BY r.id
+    LIMIT :limit
+    """
+)
+
+_NEW_REVIEWS = text(
+    """
+    SELECT r.id, r.review
+    FROM survey_responses r
+    WHERE r.survey_id = :survey_id AND r.id > :after_id AND r.review <> ''
+    ORDER BY r.id
+    LIMIT :limit
+    """
+)
+
+# 요약 이후 새로 들어온 후기 수 - 설문마다 마지막으로 요약한 응답 id 이후 행만 센다
+# (idx_responses_review_pending (survey_id, id) WHERE review <> '' 범위 검색, 테이블 전체 집계 없음)
+_PENDING_REVIEWS = text(
+    """
+    SELECT sv.id AS survey_id, pending.count
+    FROM surveys sv
+    LEFT JOIN survey_answer_summaries s
+      ON s.survey_id = sv.id AND s.question_key = :review_key
+    CROSS JOIN LATERAL (
+        SELECT COUNT(*) AS count
+        FROM survey_responses r
+        WHERE r.survey_id = sv.id
+          AND r.id > COALESCE(s.last_response_id, 0)
+          AND r.review <> ''
+    ) pending
+    WHERE pending.count > 0
+      AND (CAST(:survey_id AS INTEGER) IS NULL OR sv.id = :survey_id)
+    """
+)
+
+# 집계의 내용 있는 답변 수와 요약된 답변 수 비교 (글 답변 문항 여부는 설문 정의로 거른다)
+_PENDING_ANSWERS = text(
+    """
+    SELECT a.survey_id, a.question_key, a.non_empty - COALESCE(s.answer_count, 0) AS pending,
+           s.overview IS NOT NULL AS summarized, sv.questions
+    FROM survey_question_aggregates a
+    JOIN surveys sv ON sv.id = a.survey_id
+    LEFT JOIN survey_answer_summaries s
+      ON s.survey_id = a.survey_id AND s.question_key = a.question_key
+    WHERE a.non_empty > COALESCE(s.answer_count, 0)
+      AND (CAST(:survey_id AS INTEGER) IS NULL OR a.survey_id = :survey_id)
+    """
+)
+
+# 동시에 두 워커가 같은 문항을 요약했으면 먼저 저장한 쪽만 반영 (last_response_id 비교)
+_SAVE = text(
+    """
+    INSERT INTO survey_answer_summaries
+        (survey_id, question_key, answer_count, last_response_id, chunks, overview, themes, status, error, updated_at)
+    VALUES
+        (:survey_id, :question_key, :answer_count, :last_response_id, CAST(:chunks AS JSONB), :overview,
+         CAST(:themes AS JSONB), 'ready', NULL, NOW())
+    ON CONFLICT (survey_id, question_key) DO UPDATE SET
+        answer_count = EXCLUDED.answer_count,
+        last_response_id = EXCLUDED.last_response_id,
+        chunks = EXCLUDED.chunks,
+        overview = EXCLUDED.overview,
+        themes = EXCLUDED.themes,
+        status = 'ready',
+        error = NULL,
+        updated_at = NOW()
+    WHERE survey_answer_summaries.last_response_id = :previous_last_id
+    """
+)
+
+_SAVE_FAILURE = text(
+    """
+    INSERT INTO survey_answer_summaries (survey_id, question_key, status, error, updated_at)
+    VALUES (:survey_id, :question_key, 'failed', :error, NOW())
+    ON CONFLICT (survey_id, question_key) DO UPDATE SET status = 'failed', error = EXCLUDED.error, updated_at = NOW()
+    """
+)
+
+
+def question_label(questions: List[Dict[str, Any]], key: str) -> Optional[str]:
+    """문항 키의 문항 문구 (후기는 고정 라벨, 없는 문항이면 None)"""
+    if key == REVIEW_KEY:
+        return REVIEW_LABEL
+    for question in questions or []:
+        if str(question.get("id")) == key:
+            return question.get("question_text") or question.get("text") or question.get("question") or f"문항 {key}"
+    return None
+
+
+def load(db: Session, survey_id: int) -> Dict[str, Dict[str, Any]]:
+    """
+    저장된 요약 (문항 키별)
+
+    Returns:
+        {문항 키: {"answer_count", "last_response_id", "overview", "themes", "status", "error", "updated_at"}}
+    """
+    rows = db.execute(
+        text(
+            """
+            SELECT question_key, answer_count, last_response_id, overview, themes, status, error, updated_at
+            FROM survey_answer_summaries
+            WHERE survey_id = :survey_id
+            """
+        ),
+        {"survey_id": survey_id},
+    ).mappings().all()
+    return {row["question_key"]: dict(row) for row in rows}
+
+
+def pending_counts(db: Session, survey_id: Optional[int] = None) -> Dict[Tuple[int, str], Tuple[int, bool]]:
+    """
+    요약에 아직 반영되지 않은 답변 수 (text/textarea 문항 + 후기)
+
+    Returns:
+        {(설문 id, 문항 키): (새 답변 수, 완료된 요약 존재 여부)}
+    """
+    pending: Dict[Tuple[int, str], Tuple[int, bool]] = {}
+    text_keys: Dict[int, Set[str]] = {}
+    for row in db.execute(_PENDING_ANSWERS, {"survey_id": survey_id}).mappings():
+        keys = text_keys.get(row["survey_id"])
+        if keys is None:
+            keys = text_keys[row["survey_id"]] = set(survey_stats.text_question_keys(row["questions"] or []))
+        if row["question_key"] in keys:
+            pending[(row["survey_id"], row["question_key"])] = (int(row["pending"]), bool(row["summarized"]))
+
+    summarized_reviews = {
+        row[0]
+        for row in db.execute(
+            text(
+                """
+                SELECT survey_id FROM survey_answer_summaries
+                WHERE question_key = :review_key AND overview IS NOT NULL
+                  AND (CAST(:survey_id AS INTEGER) IS NULL OR survey_id = :survey_id)
+                """
+            ),
+            {"review_key": REVIEW_KEY, "survey_id": survey_id},
+        )
+    }
+    for review_survey_id, count in db.execute(_PENDING_REVIEWS, {"review_key": REVIEW_KEY, "survey_id": survey_id}):
+        pending[(review_survey_id, REVIEW_KEY)] = (int(count), review_survey_id in summarized_reviews)
+    return pending
+
+
+def find_due(limit: int) -> List[Tuple[int, str]]:
+    """다시 요약할 (설문 id, 문항 키) - 새 답변이 많은 순 (스케줄러 스레드에서 실행)"""
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        pending = pending_counts(db)
+    finally:
+        db.close()
+    due = [
+        (target, count)
+        for target, (count, summarized) in pending.items()
+        if count >= MIN_NEW_ANSWERS or (count > 0 and not summarized)
+    ]
+    due.sort(key=lambda item: -item[1])
+    return [target for target, _ in due[:limit]]
+
+
+def _load_state(survey_id: int, key: str) -> Optional[Dict[str, Any]]:
+    """요약 입력 - 문항 문구, 기존 요약 상태, 그 뒤로 들어온 답변 (스레드에서 실행)"""
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        questions = db.execute(text("SELECT questions FROM surveys WHERE id = :survey_id"), {"survey_id": survey_id}).scalar()
+        label = question_label(questions or [], key)
+        if label is None or (key != REVIEW_KEY and key not in survey_stats.text_question_keys(questions or [])):
+            return None  # 설문이 삭제됐거나 문항이 빠짐/글 답변 문항이 아님
+        stored = db.execute(
+            text(
+                """
+                SELECT answer_count, last_response_id, chunks
+                FROM survey_answer_summaries
+                WHERE survey_id = :survey_id AND question_key = :key
+                """
+            ),
+            {"survey_id": survey_id, "key": key},
+        ).first()
+        answer_count, last_response_id, chunks = stored or (0, 0, [])
+        statement = _NEW_REVIEWS if key == REVIEW_KEY else _NEW_ANSWERS
+        answers = db.execute(
+            statement,
+            {"survey_id": survey_id, "key": key, "after_id": last_response_id, "limit": MAX_ANSWERS_PER_RUN},
+        ).all()
+        return {
+            "question_text": label,
+            "answer_count": answer_count,
+            "last_response_id": last_response_id,
+            "chunks": chunks or [],
+            "answers": [(response_id, answer or "") for response_id, answer in answers],
+            "exhausted": len(answers) < MAX_ANSWERS_PER_RUN,
+            "fetched_last_id": answers[-1][0] if answers else last_response_id,
+        }
+    finally:
+        db.close()
+
+
+def _save(survey_id: int, key: str, previous_last_id: int, summary: Dict[str, Any]) -> bool:
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        result = db.execute(
+            _SAVE,
+            {
+                "survey_id": survey_id,
+                "question_key": key,
+                "answer_count": summary["answer_count"],
+                "last_response_id": summary["last_response_id"],
+                "chunks": json.dumps(summary["chunks"], ensure_ascii=False),
+                "overview": summary["overview"],
+                "themes": json.dumps(summary["themes"], ensure_ascii=False),
+                "previous_last_id": previous_last_id,
+            },
+        )
+        db.commit()
+        return bool(result.rowcount)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def _save_failure(survey_id: int, key: str, error: str) -> None:
+    """실패 상태만 기록 - 이전 요약 내용은 그대로 둔다"""
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        db.execute(_SAVE_FAILURE, {"survey_id": survey_id, "question_key": key, "error": error[:500]})
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def chunk_answers(answers: List[Tuple[int, str]]) -> List[List[Tuple[int, str]]]:
+    """응답 id 순서를 유지한 채 CHUNK_CHARS / CHUNK_MAX_ANSWERS 기준으로 묶음 (긴 답변은 자름)"""
+    chunks: List[List[Tuple[int, str]]] = []
+    current: List[Tuple[int, str]] = []
+    size = 0
+    for response_id, answer in answers:
+        answer = " ".join(answer.split())[:ANSWER_MAX_CHARS]
+        if current and (size + len(answer) > CHUNK_CHARS or len(current) >= CHUNK_MAX_ANSWERS):
+            chunks.append(current)
+            current, size = [], 0
+        current.append((response_id, answer))
+        size += len(answer)
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class SurveySummaryWorker:
+    """(설문 id, 문항 키) 큐 + 요약 워커 (앱 lifespan에서 시작/종료)"""
+
+    def __init__(self) -> None:
+        self.enabled = os.getenv("SURVEY_SUMMARY_ENABLED", "true").lower() == "true"
+        self.concurrency = max(1, int(os.getenv("SURVEY_SUMMARY_CONCURRENCY", "4")))
+        self.sweep_limit = max(1, int(os.getenv("SURVEY_SUMMARY_SWEEP_LIMIT", "50")))
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._llm_slots: Optional[asyncio.Semaphore] = None  # 모든 map/reduce 호출이 공유
+        self._pending: Set[Tuple[int, str]] = set()
+        self.counters = {"summarized": 0, "answers": 0, "llm_calls": 0, "failed": 0, "skipped": 0}
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    async def start(self) -> None:
+        if self.running or not self.enabled:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._llm_slots = asyncio.Semaphore(self.concurrency)
+        self._worker = asyncio.create_task(self._run(), name="survey-summary-worker")
+        logger.info("설문 답변 요약 워커 시작 (동시 LLM 호출 %d건)", self.concurrency)
+
+    async def stop(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+        self._worker = None
+        self._pending.clear()
+
+    def enqueue(self, survey_id: int, question_key: str) -> bool:
+        """문항 하나를 요약 대상으로 등록 (이벤트 루프 안에서 호출)"""
+        if not self.running or self._queue is None:
+            return False
+        target = (survey_id, question_key)
+        if target in self._pending:
+            return False
+        self._pending.add(target)
+        self._queue.put_nowait(target)
+        return True
+
+    def enqueue_threadsafe(self, targets: List[Tuple[int, str]]) -> None:
+        """스케줄러 스레드 등 다른 스레드에서 등록"""
+        if self._loop is None or not self.running:
+            return
+        for survey_id, question_key in targets:
+            self._loop.call_soon_threadsafe(self.enqueue, survey_id, question_key)
+
+    def sweep(self) -> int:
+        """새 답변이 쌓인 문항을 큐에 넣음 (APScheduler 스레드에서 호출)"""
+        if not self.running:
+            return 0
+        targets = [target for target in find_due(self.sweep_limit) if target not in self._pending]
+        self.enqueue_threadsafe(targets)
+        return len(targets)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "pending": len(self._pending),
+            **self.counters,
+        }
+
+    async def _run(self) -> None:
+        assert self._queue is not None
+        while True:
+            survey_id, key = await self._queue.get()
+            try:
+                more = await self.summarize(survey_id, key)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:  # noqa: BLE001
+                logger.error("설문 %s 문항 %s 답변 요약 실패: %s", survey_id, key, exc)
+                self.counters["failed"] += 1
+                more = False
+                try:
+                    await asyncio.to_thread(_save_failure, survey_id, key, str(exc) or type(exc).__name__)
+                except Exception as save_exc:  # noqa: BLE001
+                    logger.error("요약 실패 상태 저장 실패: %s", save_exc)
+            finally:
+                self._pending.discard((survey_id, key))
+            if more:
+                self.enqueue(survey_id, key)
+
+    async def summarize(self, survey_id: int, key: str) -> bool:
+        """
+        한 문항의 새 답변을 요약해 저장. 한 번에 다 읽지 못해 남은 답변이 있으면 True
+        """
+        state = await asyncio.to_thread(_load_state, survey_id, key)
+        if state is None or not state["answers"]:
+            self.counters["skipped"] += 1
+            return False
+
+        question_text = state["question_text"]
+        chunks = chunk_answers(state["answers"])
+        mapped = await asyncio.gather(*(self._map(question_text, chunk) for chunk in chunks))
+        partials = list(state["chunks"]) + list(mapped)
+        top, first_level = await self._reduce(question_text, partials)
+
+        summary = {
+            "answer_count": state["answer_count"] + len(state["answers"]),
+            "last_response_id": state["fetched_last_id"],
+            # 묶음 요약이 쌓이면 첫 reduce 결과(REDUCE_FAN_IN개씩 합친 것)로 바꿔 다음 reduce 입력을 줄임
+            "chunks": first_level if len(partials) > REDUCE_FAN_IN and first_level else partials,
+            "overview": top["summary"],
+            "themes": top["themes"],
+        }
+        saved = await asyncio.to_thread(_save, survey_id, key, state["last_response_id"], summary)
+        if not saved:
+            logger.info("설문 %s 문항 %s 요약을 다른 워커가 먼저 저장해 결과를 버립니다.", survey_id, key)
+            return False
+        self.counters["summarized"] += 1
+        self.counters["answers"] += len(state["answers"])
+        return not state["exhausted"]
+
+    async def _map(self, question_text: str, chunk: List[Tuple[int, str]]) -> Dict[str, Any]:
+        from services.llm_service import llm_service
+
+        assert self._llm_slots is not None
+        async with self._llm_slots:
+            self.counters["llm_calls"] += 1
+            result = await llm_service.summarize_survey_answers(question_text, [answer for _, answer in chunk])
+        return {"first_id": chunk[0][0], "last_id": chunk[-1][0], "count": len(chunk), **result}
+
+    async def _merge(self, question_text: str, group: List[Dict[str, Any]]) -> Dict[str, Any]:
+        if len(group) == 1:
+            return group[0]
+        from services.llm_service import llm_service
+
+        assert self._llm_slots is not None
+        async with self._llm_slots:
+            self.counters["llm_calls"] += 1
+            result = await llm_service.merge_survey_summaries(question_text, group)
+        return {
+            "first_id": min(partial["first_id"] for partial in group),
+            "last_id": max(partial["last_id"] for partial in group),
+            "count": sum(partial["count"] for partial in group),
+            **result,
+        }
+
+    async def _reduce(
+        self, question_text: str, partials: List[Dict[str, Any]]
+    ) -> Tuple[Dict[str, Any], Optional[List[Dict[str, Any]]]]:
+        """REDUCE_FAN_IN개씩 합치는 트리 reduce. (최종 요약, 첫 단계 결과) 반환"""
+        level = partials
+        first_level: Optional[List[Dict[str, Any]]] = None
+        while len(level) > 1:
+            groups = [level[start:start + REDUCE_FAN_IN] for start in range(0, len(level), REDUCE_FAN_IN)]
+            level = list(await asyncio.gather(*(self._merge(question_text, group) for group in groups)))
+            if first_level is None:
+                first_level = level
+        return level[0], first_level
+
+
+# 싱글톤 인스턴스
+survey_summary_worker = SurveySummaryWorker()
@@ -0,0 +1,213 @@
+# services/survey_validation.py
+"""
+설문 응답(answers) 검증 - 설문 정의를 미리 컴파일한 검증기
+
+설문 정의(questions JSONB)는 작성 화면/시드마다 키 이름이 조금씩 다르다
+(question_type/type, is_required/required, choices/options/options.choices 등).
+제출마다 이를 해석하지 않도록 설문 버전마다 한 번 문항별 규칙(종류, 필수 여부, 선택지 집합,
+값 범위)으로 컴파일해 둔다. 컴파일된 검증기는 설문 정의 캐시(services/survey_cache.py)에
+정의와 함께 들어 있어 요청끼리 공유되고, 설문이 바뀌면 정의와 함께 버려진다.
+
+검증은 제출된 답변 수에 비례한다 - 답변마다 dict 조회 한 번과 집합 포함 검사만 하고,
+필수 문항은 답변 중에 센 개수가 모자랄 때만 어느 문항이 빠졌는지 찾는다.
+"""
+
+import os
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from services.survey_aggregates import answer_label, rating_value
+
+load_dotenv()
+
+# 주관식 답변 최대 길이
+ANSWER_MAX_LENGTH = int(os.getenv("SURVEY_ANSWER_MAX_LENGTH", "2000"))
+
+SINGLE_CHOICE_TYPES = {"radio", "select", "dropdown", "choice"}
+MULTI_CHOICE_TYPES = {"checkbox"}
+# 종류 -> 기본 (최솟값, 최댓값)
+RANGE_TYPES = {"rating": (1, 5), "scale": (1, 10)}
+BOOLEAN_TYPES = {"toggle"}
+# 예/아니오 문항에 문자열로 온 답변도 허용 (입력 칸 없이 글로 적어 보낸 이전 키오스크 응답)
+BOOLEAN_TEXT_VALUES = {"true", "false", "yes", "no", "예", "아니오"}
+
+
+class _QuestionRule:
+    """문항 하나의 컴파일된 규칙"""
+
+    __slots__ = ("key", "label", "kind", "required", "choices", "minimum", "maximum")
+
+    def __init__(
+        self,
+        key: str,
+        label: str,
+        kind: str,
+        required: bool,
+        choices: Optional[FrozenSet[str]] = None,
+        minimum: Optional[int] = None,
+        maximum: Optional[int] = None,
+    ) -> None:
+        self.key = key
+        self.label = label
+        self.kind = kind
+        self.required = required
+        self.choices = choices
+        self.minimum = minimum
+        self.maximum = maximum
+
+
+def _choice_labels(question: Dict[str, Any]) -> FrozenSet[str]:
+    """선택지로 허용하는 값 - 선택지가 {"value", "label"}이면 둘 다 허용 (JSONB 문자열 표현으로 비교)"""
+    options = question.get("options")
+    choices = question.get("choices")
+    if choices is None:
+        choices = options.get("choices") if isinstance(options, dict) else options
+    labels = set()
+    for choice in choices or []:
+        if isinstance(choice, dict):
+            labels.update(answer_label(choice[field]) for field in ("value", "label") if choice.get(field) is not None)
+        elif choice is not None:
+            labels.add(answer_label(choice))
+    return frozenset(labels)
+
+
+def _compile_question(question: Dict[str, Any]) -> _QuestionRule:
+    key = str(question["id"])
+    kind = question.get("question_type") or question.get("type") or "text"
+    label = question.get("question_text") or question.get("text") or question.get("question") or f"문항 {key}"
+    required = bool(question.get("is_required", question.get("required", False)))
+    if kind in SINGLE_CHOICE_TYPES or kind in MULTI_CHOICE_TYPES:
+        return _QuestionRule(key, label, kind, required, choices=_choice_labels(question))
+    if kind in RANGE_TYPES:
+        options = question.get("options") if isinstance(question.get("options"), dict) else {}
+        minimum, maximum = RANGE_TYPES[kind]
+        try:
+            minimum, maximum = int(options.get("min", minimum)), int(options.get("max", maximum))
+        except (TypeError, ValueError):
+            pass  # 범위를 잘못 적은 설문은 종류별 기본 범위로
+        return _QuestionRule(key, label, kind, required, minimum=minimum, maximum=maximum)
+    return _QuestionRule(key, label, kind, required)
+
+
+class SurveyValidator:
+    """설문 한 버전의 답변 검증기 (읽기 전용이라 요청끼리 공유해도 안전)"""
+
+    __slots__ = ("rules", "required_keys", "require_email", "require_phone")
+
+    def __init__(
+        self,
+        rules: Dict[str, _QuestionRule],
+        require_email: bool = False,
+        require_phone: bool = False,
+    ) -> None:
+        self.rules = rules
+        self.required_keys: Tuple[str, ...] = tuple(key for key, rule in rules.items() if rule.required)
+        self.require_email = require_email
+        self.require_phone = require_phone
+
+    def validate(
+        self,
+        answers: Dict[str, Any],
+        respondent_email: Optional[str] = None,
+        respondent_phone: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        오류 목록 반환 (없으면 빈 목록)
+
+        Returns:
+            [{"field", "question_id", "question", "message"}]
+        """
+        errors: List[Dict[str, Any]] = []
+        answered_required = 0
+        for raw_key, value in answers.items():
+            key = str(raw_key)
+            rule = self.rules.get(key)
+            if rule is None:
+                errors.append(_error(key, None, "설문에 없는 문항입니다"))
+                continue
+            if _is_empty(value):
+                continue
+            if rule.required:
+                answered_required += 1
+            message = _check(rule, value)
+            if message:
+                errors.append(_error(key, rule.label, message))
+
+        if answered_required < len(self.required_keys):
+            for key in self.required_keys:
+                if _is_empty(answers.get(key)):
+                    errors.append(_error(key, self.rules[key].label, "필수 문항입니다"))
+
+        if self.require_email and not (respondent_email or "").strip():
+            errors.append({"field": "respondent_email", "question_id": None, "question": None,
+                           "message": "이메일을 입력해주세요"})
+        if self.require_phone and not (respondent_phone or "").strip():
+            errors.append({"field": "respondent_phone", "question_id": None, "question": None,
+                           "message": "연락처를 입력해주세요"})
+        return errors
+
+
+def _is_empty(value: Any) -> bool:
+    """답하지 않은 것으로 보는 값 (None, 빈 문자열/목록)"""
+    return value is None or (isinstance(value, (str, list, dict)) and not value)
+
+
+def _error(key: str, label: Optional[str], message: str) -> Dict[str, Any]:
+    return {"field": f"answers.{key}", "question_id": key, "question": label, "message": message}
+
+
+def _check(rule: _QuestionRule, value: Any) -> Optional[str]:
+    """답변 하나 검사 - 문제가 있으면 오류 메시지"""
+    kind = rule.kind
+    if kind in SINGLE_CHOICE_TYPES:
+        if isinstance(value, (list, dict)):
+            return "하나만 선택할 수 있습니다"
+        if rule.choices and answer_label(value) not in rule.choices:
+            return "선택지에 없는 값입니다"
+        return None
+    if kind in MULTI_CHOICE_TYPES:
+        items = value if isinstance(value, list) else [value]
+        labels = [answer_label(item) for item in items]
+        if any(isinstance(item, (list, dict)) or item is None for item in items):
+            return "선택지 값 목록이어야 합니다"
+        if rule.choices and any(label not in rule.choices for label in labels):
+            return "선택지에 없는 값이 있습니다"
+        if len(set(labels)) != len(labels):
+            return "같은 선택지를 여러 번 선택했습니다"
+        return None
+    if kind in RANGE_TYPES:
+        number = rating_value(value)
+        if number is None or not (rule.minimum <= number <= rule.maximum):
+            return f"{rule.minimum}에서 {rule.maximum} 사이의 정수여야 합니다"
+        return None
+    if kind in BOOLEAN_TYPES:
+        if isinstance(value, bool) or (isinstance(value, str) and value.strip().lower() in BOOLEAN_TEXT_VALUES):
+            return None
+        return "예/아니오 값이어야 합니다"
+    if not isinstance(value, str):
+        return "문자열이어야 합니다"
+    if len(value) > ANSWER_MAX_LENGTH:
+        return f"{ANSWER_MAX_LENGTH}자 이하로 입력해주세요"
+    return None
+
+
+def compile_validator(definition: Dict[str, Any]) -> SurveyValidator:
+    """설문 정의(questions, require_email, require_phone)를 검증기로 컴파일"""
+    rules = {}
+    for question in definition.get("questions") or []:
+        if isinstance(question, dict) and question.get("id") is not None:
+            rule = _compile_question(question)
+            rules[rule.key] = rule
+    return SurveyValidator(
+        rules,
+        require_email=bool(definition.get("require_email")),
+        require_phone=bool(definition.get("require_phone")),
+    )
+
+
+def summarize(errors: List[Dict[str, Any]]) -> str:
+    """오류 목록을 한 줄로 (일괄 제출 결과 detail용)"""
+    return "; ".join(
+        f"{error['question'] or error['field']}: {error['message']}" for error in errors
+    )
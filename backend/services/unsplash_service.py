@@ -2,18 +2,61 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
-from typing import Dict, List, Optional
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 import aiohttp
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import AsyncOpenAI
+
+from services.cache_service import PersistentTTLCache, make_cache_key
 
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+QUERY_MODEL = "gpt-4o-mini"
+
+
+class _TokenBucket:
+    """Client-side limiter for Unsplash's hourly request quota."""
+
+    def __init__(self, per_hour: int) -> None:
+        self.capacity = max(1, per_hour)
+        self.refill_per_second = self.capacity / 3600
+        self.tokens = float(self.capacity)
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.refill_per_second)
+        self._updated = now
+
+    def try_acquire(self) -> bool:
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def seconds_until_available(self) -> float:
+        self._refill()
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.refill_per_second
+
+    def sync_remaining(self, remaining: int) -> None:
+        """Trust the server's X-Ratelimit-Remaining when it is lower than our estimate."""
+        self._refill()
+        self.tokens = min(self.tokens, float(remaining))
+
+    def snapshot(self) -> Dict[str, Any]:
+        self._refill()
+        return {"capacity": self.capacity, "available": round(self.tokens, 2)}
+
 
 class UnsplashService:
     """Service encapsulating ChatGPT-powered Unsplash searching."""
@@ -22,17 +65,85 @@ class UnsplashService:
         self.access_key = os.getenv("UNSPLASH_ACCESS_KEY", "").strip()
         self.base_url = "https://api.unsplash.com"
         self._timeout = aiohttp.ClientTimeout(total=10)
-        self._query_cache: Dict[str, str] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._background: Set[asyncio.Task] = set()
+
+        # 검색어(ChatGPT)와 선택된 사진을 모두 캐시 - UNSPLASH_CACHE_PERSIST=true면 워커 간 공유
+        persist = os.getenv("UNSPLASH_CACHE_PERSIST", "true").lower() == "true"
+        max_entries = int(os.getenv("UNSPLASH_CACHE_MAX_ENTRIES", "2000"))
+        self._query_cache = PersistentTTLCache(
+            "unsplash:query",
+            max_entries=max_entries,
+            ttl_seconds=int(os.getenv("UNSPLASH_QUERY_CACHE_TTL_SECONDS", str(30 * 86400))),
+            persist=persist,
+        )
+        self._photo_cache = PersistentTTLCache(
+            "unsplash:photo",
+            max_entries=max_entries,
+            ttl_seconds=int(os.getenv("UNSPLASH_PHOTO_CACHE_TTL_SECONDS", str(7 * 86400))),
+            persist=persist,
+        )
+
+        # 데모 키는 시간당 50회, 프로덕션 키는 5000회
+        self._rate_limiter = _TokenBucket(int(os.getenv("UNSPLASH_HOURLY_LIMIT", "50")))
+        self._rate_limit_wait = float(os.getenv("UNSPLASH_RATE_LIMIT_WAIT_SECONDS", "0"))
+
+        # UNSPLASH_BACKEND=fake: 프로세스 내 가짜 API (FAKE_UNSPLASH_* 로 지연/한도 조절)
+        self.backend = os.getenv("UNSPLASH_BACKEND", "live").lower()
+        self._fake_api = None
+        if self.backend == "fake":
+            from services.fake_providers import FakeUnsplashAPI
+
+            self._fake_api = FakeUnsplashAPI()
+            self.access_key = self.access_key or "fake-access-key"
+
+        self._openai_client = None
+        if os.getenv("LLM_BACKEND", "live").lower() == "fake":
+            from services.fake_providers import FakeOpenAIClient
+
+            self._openai_client = FakeOpenAIClient()
+        else:
+            openai_key = os.getenv("OPENAI_API_KEY", "").strip()
+            if openai_key:
+                try:
+                    self._openai_client = AsyncOpenAI(api_key=openai_key)
+                except Exception as exc:  # noqa: BLE001
+                    logger.warning("OpenAI 클라이언트를 초기화하지 못했습니다: %s", exc)
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared pooled session (created lazily inside the running loop)."""
+
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=int(os.getenv("UNSPLASH_POOL_SIZE", "20")),
+                ttl_dns_cache=300,
+                keepalive_timeout=60,
+            )
+            self._session = aiohttp.ClientSession(timeout=self._timeout, connector=connector)
+        return self._session
+
+    async def close(self) -> None:
+        """Close the pooled session (called from the app lifespan)."""
+
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def rate_limit_wait_seconds(self) -> float:
+        """Seconds until the client-side bucket has a token again (0 if available now)."""
+
+        return self._rate_limiter.seconds_until_available()
 
-        openai_key = os.getenv("OPENAI_API_KEY", "").strip()
-        self._openai_client: Optional[OpenAI] = None
-        if openai_key:
-            try:
-                self._openai_client = OpenAI(api_key=openai_key)
-            except Exception as exc:  # noqa: BLE001
-                logger.warning("OpenAI 클라이언트를 초기화하지 못했습니다: %s", exc)
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend,
+            "rate_limiter": self._rate_limiter.snapshot(),
+            "caches": [self._query_cache.stats(), self._photo_cache.stats()],
+        }
 
-    def _generate_search_query(
+    async def _generate_search_query(
         self,
         event_name: str,
         description: str = "",
@@ -41,16 +152,21 @@ class UnsplashService:
         """Return an optimized Unsplash query using ChatGPT (cached)."""
 
         tags = tags or []
-        cache_key = f"{event_name}:{description}:{','.join(sorted(tags))}"
-        if cache_key in self._query_cache:
-            return self._query_cache[cache_key]
+        cache_key = make_cache_key(
+            event_name=event_name,
+            description=description,
+            tags=sorted(tags),
+            model=QUERY_MODEL,
+        )
+        cached = await self._query_cache.get(cache_key)
+        if cached is not None:
+            return cached
 
         fallback_keywords = [kw for kw in [event_name.strip(), description.strip()] if kw]
         fallback_keywords.extend(tag.strip() for tag in tags if tag)
         fallback_query = " ".join(fallback_keywords).strip() or "exhibition event"
 
         if not self._openai_client:
-            self._query_cache[cache_key] = fallback_query
             return fallback_query
 
         system_prompt = (
@@ -70,8 +186,8 @@ class UnsplashService:
         )
 
         try:
-            response = self._openai_client.chat.completions.create(
-                model="gpt-4o-mini",
+            response = await self._openai_client.chat.completions.create(
+                model=QUERY_MODEL,
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt},
@@ -81,13 +197,14 @@ class UnsplashService:
             )
             query = (response.choices[0].message.content or "").strip()
         except Exception as exc:  # noqa: BLE001
+            # 실패한 결과는 캐시하지 않음 (다음 요청에서 다시 생성)
             logger.warning("ChatGPT 검색어 생성 실패, 기본값 사용: %s", exc)
-            query = fallback_query
+            return fallback_query
 
         if not query:
-            query = fallback_query
+            return fallback_query
 
-        self._query_cache[cache_key] = query
+        await self._query_cache.set(cache_key, query)
         return query
 
     async def get_event_image(
@@ -106,9 +223,20 @@ class UnsplashService:
             logger.warning("UNSPLASH_ACCESS_KEY가 설정되지 않아 자동 이미지를 건너뜁니다.")
             return None
 
-        query = self._generate_search_query(event_name, description, tags or [])
-
+        query = await self._generate_search_query(event_name, description, tags or [])
         headers = {"Authorization": f"Client-ID {self.access_key}"}
+
+        photo_key = make_cache_key(query=query, orientation=orientation)
+        cached = await self._photo_cache.get(photo_key)
+        if cached is not None:
+            # 사진을 다시 사용할 때도 다운로드 트리거는 보내야 함 (Unsplash 가이드라인)
+            self._trigger_download_in_background(cached.get("download_location"), headers)
+            return cached
+
+        if not await self._acquire_rate_limit():
+            logger.warning("Unsplash 시간당 요청 한도에 도달해 이미지 검색을 건너뜁니다 (query=%s)", query)
+            return None
+
         params = {
             "query": query,
             "per_page": 10,
@@ -117,59 +245,119 @@ class UnsplashService:
         }
 
         try:
-            async with aiohttp.ClientSession(timeout=self._timeout) as session:
-                async with session.get(
-                    f"{self.base_url}/search/photos",
-                    headers=headers,
-                    params=params,
-                ) as response:
-                    if response.status != 200:
-                        text = await response.text()
-                        logger.warning(
-                            "Unsplash 검색 실패 (%s): %s",
-                            response.status,
-                            text,
-                        )
-                        return None
-                    payload = await response.json()
-
-                results = payload.get("results", [])
-                if not results:
-                    logger.info("Unsplash 검색 결과가 없습니다 (query=%s)", query)
-                    return None
-
-                top = results[0]
-                download_location = top.get("links", {}).get("download_location")
-                if download_location:
-                    await self._trigger_download(download_location, headers)
-
-                urls = top.get("urls", {})
-                user = top.get("user", {})
-                return {
-                    "query": query,
-                    "description": top.get("description") or top.get("alt_description"),
-                    "photographer": user.get("name"),
-                    "photographer_profile": user.get("links", {}).get("html"),
-                    "url_raw": urls.get("raw"),
-                    "url_full": urls.get("full"),
-                    "url_regular": urls.get("regular"),
-                    "url_small": urls.get("small"),
-                    "download_location": download_location,
-                }
+            status, payload, response_headers = await self._search_photos(params, headers)
+            self._sync_rate_limit(status, response_headers)
+            if status != 200:
+                logger.warning(
+                    "Unsplash 검색 실패 (%s): %s",
+                    status,
+                    payload,
+                )
+                return None
+
+            results = payload.get("results", [])
+            if not results:
+                logger.info("Unsplash 검색 결과가 없습니다 (query=%s)", query)
+                return None
+
+            top = results[0]
+            download_location = top.get("links", {}).get("download_location")
+            self._trigger_download_in_background(download_location, headers)
+
+            urls = top.get("urls", {})
+            user = top.get("user", {})
+            image = {
+                "id": top.get("id"),
+                "query": query,
+                "description": top.get("description") or top.get("alt_description"),
+                "photographer": user.get("name"),
+                "photographer_profile": user.get("links", {}).get("html"),
+                "photo_page": top.get("links", {}).get("html"),
+                "url_raw": urls.get("raw"),
+                "url_full": urls.get("full"),
+                "url_regular": urls.get("regular"),
+                "url_small": urls.get("small"),
+                "download_location": download_location,
+            }
         except Exception as exc:  # noqa: BLE001
             logger.error("Unsplash 이미지 검색 중 오류: %s", exc)
             return None
 
+        await self._photo_cache.set(photo_key, image)
+        return image
+
+    async def _acquire_rate_limit(self) -> bool:
+        """Take one request token, waiting up to UNSPLASH_RATE_LIMIT_WAIT_SECONDS."""
+
+        if self._rate_limiter.try_acquire():
+            return True
+        wait = self._rate_limiter.seconds_until_available()
+        if wait > self._rate_limit_wait:
+            return False
+        await asyncio.sleep(wait)
+        return self._rate_limiter.try_acquire()
+
+    def _sync_rate_limit(self, status: int, headers: Dict[str, str]) -> None:
+        remaining = headers.get("X-Ratelimit-Remaining")
+        if remaining is not None and remaining.isdigit():
+            self._rate_limiter.sync_remaining(int(remaining))
+        elif status in (403, 429):
+            self._rate_limiter.sync_remaining(0)
+
+    async def _search_photos(
+        self, params: Dict[str, object], headers: Dict[str, str]
+    ) -> Tuple[int, Any, Dict[str, str]]:
+        """Call /search/photos and return (status, JSON payload or error text, headers)."""
+
+        if self._fake_api is not None:
+            return await self._fake_api.search_photos(params)
+
+        async with self._get_session().get(
+            f"{self.base_url}/search/photos",
+            headers=headers,
+            params=params,
+        ) as response:
+            response_headers = dict(response.headers)
+            if response.status != 200:
+                return response.status, await response.text(), response_headers
+            return response.status, await response.json(), response_headers
+
+    async def download_photo(self, url: str) -> bytes:
+        """Download image bytes from the Unsplash CDN (not counted against the API quota)."""
+
+        if self._fake_api is not None:
+            return await self._fake_api.download_photo(url)
+
+        async with self._get_session().get(
+            url, timeout=aiohttp.ClientTimeout(total=30)
+        ) as response:
+            response.raise_for_status()
+            return await response.read()
+
+    def _trigger_download_in_background(
+        self, download_location: Optional[str], headers: Dict[str, str]
+    ) -> None:
+        """Fire the download trigger without making the caller wait for it."""
+
+        if not download_location:
+            return
+        task = asyncio.create_task(self._trigger_download(download_location, headers))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
     async def _trigger_download(self, download_location: str, headers: Dict[str, str]) -> None:
         """Comply with Unsplash API guidelines by hitting the download endpoint."""
 
         if not download_location:
             return
 
+        if self._fake_api is not None:
+            await self._fake_api.trigger_download(download_location)
+            return
+
         try:
-            async with aiohttp.ClientSession(timeout=self._timeout) as session:
-                async with session.get(download_location, headers=headers) as response:
-                    await response.read()  # 응답 본문 읽기로 요청 완료 처리
+            async with self._get_session().get(download_location, headers=headers) as response:
+                await response.read()  # 응답 본문 읽기로 요청 완료 처리
         except Exception as exc:  # noqa: BLE001
             logger.debug("Unsplash 다운로드 트리거 실패: %s", exc)
 
@@ -184,3 +372,10 @@ def get_unsplash_service() -> UnsplashService:
     if _unsplash_service is None:
         _unsplash_service = UnsplashService()
     return _unsplash_service
+
+
+async def close_unsplash_service() -> None:
+    """Close the singleton's pooled session if it was ever created."""
+
+    if _unsplash_service is not None:
+        await _unsplash_service.close()
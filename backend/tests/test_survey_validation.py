@@ -0,0 +1,91 @@
+"""
+설문 작성 화면(SurveyCreate.jsx)이 저장하는 문항 종류별 정의를 컴파일해,
+응답 화면(SurveyResponse.jsx)이 보내는 값 그대로 검증기를 통과하는지 확인한다.
+
+    cd backend && python -m pytest tests
+"""
+
+import os
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("dotenv")
+os.environ.setdefault("DATABASE_URL", "postgresql://localhost/booth_talk_test")
+
+from services.survey_validation import compile_validator  # noqa: E402
+
+
+def _question(question_id, question_type, choices=None, is_required=True):
+    """SurveyCreate.jsx addQuestion/addChoice와 같은 형태"""
+    return {
+        "id": question_id,
+        "question_text": f"{question_type} 문항",
+        "question_type": question_type,
+        "options": {
+            "choices": [{"value": index + 1, "label": label} for index, label in enumerate(choices or [])]
+        },
+        "is_required": is_required,
+    }
+
+
+# SurveyCreate.jsx QUESTION_TYPES 전체 -> SurveyResponse.jsx가 보내는 답변
+ROUND_TRIP = [
+    (_question(1, "text"), "부스 위치가 좋았어요"),
+    (_question(2, "textarea"), "설명이 친절했습니다.\n다음에도 오고 싶어요"),
+    (_question(3, "radio", ["매우 만족", "만족", "보통"]), 2),
+    (_question(4, "checkbox", ["정보", "사은품", "체험"]), [1, 3]),
+    (_question(5, "dropdown", ["20대", "30대", "40대"]), 1),
+    (_question(6, "rating"), 5),
+    (_question(7, "scale"), 10),
+    (_question(8, "toggle"), True),
+]
+
+
+def _validator():
+    return compile_validator({"questions": [question for question, _ in ROUND_TRIP]})
+
+
+@pytest.mark.parametrize("question, answer", ROUND_TRIP, ids=[q["question_type"] for q, _ in ROUND_TRIP])
+def test_each_question_type_accepts_kiosk_answer(question, answer):
+    validator = compile_validator({"questions": [question]})
+    assert validator.validate({str(question["id"]): answer}) == []
+
+
+def test_full_survey_round_trip():
+    answers = {str(question["id"]): answer for question, answer in ROUND_TRIP}
+    assert _validator().validate(answers) == []
+
+
+def test_missing_required_answers_are_reported():
+    errors = _validator().validate({})
+    assert sorted(error["question_id"] for error in errors) == [str(q["id"]) for q, _ in ROUND_TRIP]
+
+
+@pytest.mark.parametrize("value", [False, "true", "false", "예", "아니오", " YES "])
+def test_toggle_accepts_boolean_and_text_values(value):
+    validator = compile_validator({"questions": [_question(8, "toggle")]})
+    assert validator.validate({"8": value}) == []
+
+
+@pytest.mark.parametrize(
+    "question, answer",
+    [
+        (_question(3, "radio", ["매우 만족", "만족"]), 9),
+        (_question(4, "checkbox", ["정보", "사은품"]), [1, 1]),
+        (_question(6, "rating"), 6),
+        (_question(7, "scale"), 11),
+        (_question(8, "toggle"), "글쎄요"),
+        (_question(1, "text"), 3),
+    ],
+    ids=["radio", "checkbox", "rating", "scale", "toggle", "text"],
+)
+def test_invalid_answers_are_rejected(question, answer):
+    validator = compile_validator({"questions": [question]})
+    errors = validator.validate({str(question["id"]): answer})
+    assert [error["question_id"] for error in errors] == [str(question["id"])]
+
+
+def test_unknown_question_key_is_rejected():
+    errors = _validator().validate({"999": "값"})
+    assert any(error["question_id"] == "999" and error["question"] is None for error in errors)
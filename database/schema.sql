@@ -6,6 +6,11 @@ CREATE DATABASE exhibition_platform;
 \connect exhibition_platform;
 
 -- Clean existing objects when re-running the script -----------------------
+DROP TABLE IF EXISTS survey_answer_summaries CASCADE;
+DROP TABLE IF EXISTS survey_response_rollups CASCADE;
+DROP TABLE IF EXISTS survey_question_aggregates CASCADE;
+DROP TABLE IF EXISTS survey_response_counters CASCADE;
+DROP TABLE IF EXISTS cache_entries CASCADE;
 DROP TABLE IF EXISTS system_logs CASCADE;
 DROP TABLE IF EXISTS event_views CASCADE;
 DROP TABLE IF EXISTS event_likes CASCADE;
@@ -21,6 +26,8 @@ DROP TABLE IF EXISTS admins CASCADE;
 
 -- Optional extensions ------------------------------------------------------
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
+-- 설문 주관식 답변/후기 부분 문자열 검색 (trigram GIN 인덱스)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
 
 -- 1. Admins ---------------------------------------------------------------
 CREATE TABLE admins (
@@ -115,6 +122,10 @@ CREATE TABLE events (
     pdf_url VARCHAR(1024),
     ocr_data JSONB,
     categories JSONB DEFAULT '[]'::JSONB,
+    unsplash_image_url VARCHAR(1024),
+    has_custom_image BOOLEAN DEFAULT FALSE,
+    image_variants JSONB,
+    image_attribution JSONB,
     is_active BOOLEAN DEFAULT TRUE,
     is_featured BOOLEAN DEFAULT FALSE,
     view_count INTEGER DEFAULT 0,
@@ -133,9 +144,15 @@ CREATE INDEX idx_events_start_date ON events (start_date);
 CREATE INDEX idx_events_event_type ON events (event_type);
 CREATE INDEX idx_events_is_active ON events (is_active);
 CREATE INDEX idx_events_is_featured ON events (is_featured);
+-- 자동 이미지(Unsplash)가 아직 없는 이벤트 (백그라운드 스윕/백필용)
+CREATE INDEX idx_events_missing_image ON events (created_at)
+    WHERE unsplash_image_url IS NULL AND image_url IS NULL;
 
 COMMENT ON TABLE events IS '이벤트/프로그램 정보 테이블';
 COMMENT ON COLUMN events.categories IS '카테고리 목록 (JSONB)';
+COMMENT ON COLUMN events.unsplash_image_url IS '주최측 이미지가 없을 때 백그라운드에서 채우는 Unsplash 이미지';
+COMMENT ON COLUMN events.image_variants IS '로컬 미러 이미지 크기별 URL (JPEG/WebP)';
+COMMENT ON COLUMN events.image_attribution IS '자동 이미지 출처 (사진가, 프로필, 원본 페이지)';
 
 -- 5. Event Managers -------------------------------------------------------
 CREATE TABLE event_managers (
@@ -188,8 +205,10 @@ CREATE TABLE surveys (
     is_active BOOLEAN DEFAULT TRUE,
     require_email BOOLEAN DEFAULT FALSE,
     require_phone BOOLEAN DEFAULT FALSE,
+    prevent_duplicates BOOLEAN DEFAULT FALSE,
     max_responses INTEGER,
     current_responses INTEGER DEFAULT 0,
+    aggregates_ready BOOLEAN NOT NULL DEFAULT FALSE,
     start_date TIMESTAMP WITH TIME ZONE,
     end_date TIMESTAMP WITH TIME ZONE,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
@@ -206,6 +225,8 @@ CREATE INDEX idx_surveys_is_active ON surveys (is_active);
 CREATE INDEX idx_surveys_start_date ON surveys (start_date);
 
 COMMENT ON TABLE surveys IS '설문조사 테이블';
+COMMENT ON COLUMN surveys.prevent_duplicates IS '같은 이메일/연락처/기기로 다시 제출하면 거절 (경품 설문 등, services/survey_dedup.py)';
+COMMENT ON COLUMN surveys.aggregates_ready IS '문항 집계를 원본 응답에서 재계산한 뒤 켜짐 - 켜진 설문만 응답 저장 시 증가분 반영 (services/survey_aggregates.py)';
 
 -- 8. Survey Responses -----------------------------------------------------
 CREATE TABLE survey_responses (
@@ -221,6 +242,8 @@ CREATE TABLE survey_responses (
     review TEXT,
     ip_address INET,
     user_agent TEXT,
+    client_key VARCHAR(64),
+    search_text TEXT,
     submitted_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     CONSTRAINT chk_rating_range
         CHECK (rating IS NULL OR (rating BETWEEN 1 AND 5))
@@ -230,8 +253,47 @@ CREATE INDEX idx_responses_survey_id ON survey_responses (survey_id);
 CREATE INDEX idx_responses_submitted_at ON survey_responses (submitted_at);
 CREATE INDEX idx_responses_rating ON survey_responses (rating);
 CREATE INDEX idx_responses_booth ON survey_responses (booth_number);
+-- 주관식 답변 커서 페이지네이션 (survey_id, id DESC) / 문항 키 존재 검사 (answers ? '키')
+CREATE INDEX idx_responses_survey_id_id ON survey_responses (survey_id, id DESC);
+CREATE INDEX idx_responses_answers ON survey_responses USING GIN (answers);
+-- 키오스크 일괄 제출 재전송 중복 방지 (키 없이 들어온 응답은 제외)
+CREATE UNIQUE INDEX uq_responses_survey_client_key ON survey_responses (survey_id, client_key)
+    WHERE client_key IS NOT NULL;
+-- 주관식 답변/후기 검색 (ILIKE '%검색어%'를 trigram으로 인덱스 검색)
+CREATE INDEX idx_responses_search_trgm ON survey_responses USING GIN (search_text gin_trgm_ops);
+-- 후기 요약 대기 건수 (설문별 마지막 요약 응답 id 이후 후기만 범위 검색)
+CREATE INDEX idx_responses_review_pending ON survey_responses (survey_id, id)
+    WHERE review <> '';
 
 COMMENT ON TABLE survey_responses IS '설문 응답 테이블';
+COMMENT ON COLUMN survey_responses.client_key IS '키오스크가 응답마다 만든 멱등 키 (일괄 제출 재전송 시 중복 저장 방지)';
+COMMENT ON COLUMN survey_responses.search_text IS '검색용 텍스트 - 주관식 문항 답변과 후기를 줄바꿈으로 이은 값 (trg_responses_search_text가 유지)';
+
+-- 저장 경로(버퍼 일괄 INSERT, 직접 저장, 키오스크 일괄 제출)와 관계없이 search_text를 채운다.
+-- 주관식 판정은 services/survey_stats.question_keys_by_kind와 같다 (선택형/평점 문항 제외, 문자열 답변만)
+CREATE OR REPLACE FUNCTION survey_response_search_text()
+RETURNS TRIGGER AS $$
+BEGIN
+    SELECT concat_ws(E'\n', string_agg(a.value, E'\n' ORDER BY q.position), NULLIF(NEW.review, ''))
+    INTO NEW.search_text
+    FROM surveys s
+    CROSS JOIN LATERAL jsonb_array_elements(
+        CASE WHEN jsonb_typeof(s.questions) = 'array' THEN s.questions ELSE '[]'::jsonb END
+    ) WITH ORDINALITY AS q (question, position)
+    JOIN LATERAL jsonb_each_text(NEW.answers) AS a ON a.key = q.question ->> 'id'
+    WHERE s.id = NEW.survey_id
+      AND jsonb_typeof(NEW.answers -> a.key) = 'string'
+      AND a.value <> ''
+      AND COALESCE(NULLIF(q.question ->> 'question_type', ''), NULLIF(q.question ->> 'type', ''), 'text')
+          NOT IN ('radio', 'checkbox', 'select', 'dropdown', 'rating');
+    NEW.search_text = NULLIF(NEW.search_text, '');
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_responses_search_text
+    BEFORE INSERT OR UPDATE OF answers, review ON survey_responses
+    FOR EACH ROW EXECUTE FUNCTION survey_response_search_text();
 
 -- 9. Event Likes ---------------------------------------------------------
 CREATE TABLE event_likes (
@@ -288,7 +350,78 @@ CREATE INDEX idx_system_logs_user ON system_logs (user_id);
 
 COMMENT ON TABLE system_logs IS '시스템 로그 테이블';
 
--- 12. Updated_at trigger --------------------------------------------------
+-- 12. Cache Entries -------------------------------------------------------
+CREATE TABLE cache_entries (
+    namespace VARCHAR(50) NOT NULL,
+    cache_key VARCHAR(64) NOT NULL,
+    value JSONB NOT NULL,
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    CONSTRAINT pk_cache_entries PRIMARY KEY (namespace, cache_key)
+);
+
+CREATE INDEX idx_cache_entries_expires_at ON cache_entries (expires_at);
+
+COMMENT ON TABLE cache_entries IS '워커 간 공유 캐시 (LLM 응답 등)';
+
+-- 13. Survey Response Counters --------------------------------------------
+CREATE TABLE survey_response_counters (
+    survey_id INTEGER NOT NULL REFERENCES surveys (id) ON DELETE CASCADE,
+    shard SMALLINT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    CONSTRAINT pk_survey_response_counters PRIMARY KEY (survey_id, shard)
+);
+
+COMMENT ON TABLE survey_response_counters IS '설문 응답 수 카운터 (샤드 합계 = 응답 수, 인원 제한 설문은 shard 0만 사용)';
+
+-- 14. Survey Question Aggregates ------------------------------------------
+CREATE TABLE survey_question_aggregates (
+    survey_id INTEGER NOT NULL REFERENCES surveys (id) ON DELETE CASCADE,
+    question_key VARCHAR(50) NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0,
+    non_empty INTEGER NOT NULL DEFAULT 0,
+    counts JSONB NOT NULL DEFAULT '{}',
+    rating_count INTEGER NOT NULL DEFAULT 0,
+    rating_sum BIGINT NOT NULL DEFAULT 0,
+    rating_min INTEGER,
+    rating_max INTEGER,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    CONSTRAINT pk_survey_question_aggregates PRIMARY KEY (survey_id, question_key)
+);
+
+COMMENT ON TABLE survey_question_aggregates IS '설문 문항별 누적 집계 (응답 저장 시 증가분 반영, services.survey_aggregates)';
+
+-- 15. Survey Response Rollups ---------------------------------------------
+CREATE TABLE survey_response_rollups (
+    survey_id INTEGER NOT NULL REFERENCES surveys (id) ON DELETE CASCADE,
+    bucket_start TIMESTAMP WITH TIME ZONE NOT NULL,
+    booth_number VARCHAR(50) NOT NULL DEFAULT '',
+    count INTEGER NOT NULL DEFAULT 0,
+    CONSTRAINT pk_survey_response_rollups PRIMARY KEY (survey_id, bucket_start, booth_number)
+);
+
+COMMENT ON TABLE survey_response_rollups IS '설문 응답 수 15분 롤업 (설문, 버킷 시작 시각, 부스) - 추이 차트용 (services.survey_rollups)';
+
+-- 16. Survey Answer Summaries ---------------------------------------------
+CREATE TABLE survey_answer_summaries (
+    survey_id INTEGER NOT NULL REFERENCES surveys (id) ON DELETE CASCADE,
+    question_key VARCHAR(50) NOT NULL,
+    answer_count INTEGER NOT NULL DEFAULT 0,
+    last_response_id INTEGER NOT NULL DEFAULT 0,
+    chunks JSONB NOT NULL DEFAULT '[]'::jsonb,
+    overview TEXT,
+    themes JSONB NOT NULL DEFAULT '[]'::jsonb,
+    status VARCHAR(20) NOT NULL DEFAULT 'ready',
+    error TEXT,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    CONSTRAINT pk_survey_answer_summaries PRIMARY KEY (survey_id, question_key)
+);
+
+COMMENT ON TABLE survey_answer_summaries IS '주관식 답변/후기 LLM 요약 (설문, 문항 키 - 후기는 _review) - 요약한 답변 수와 마지막 응답 id까지 보관해 새 답변만 추가 요약 (services.survey_summaries)';
+COMMENT ON COLUMN survey_answer_summaries.chunks IS '답변 묶음별 요약 [{first_id, last_id, count, summary, themes}] - reduce 입력';
+
+-- 17. Updated_at trigger --------------------------------------------------
 CREATE OR REPLACE FUNCTION update_updated_at_column()
 RETURNS TRIGGER AS $$
 BEGIN
@@ -323,7 +456,7 @@ CREATE TRIGGER trg_tags_updated
     BEFORE UPDATE ON tags
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
--- 13. Completion summary --------------------------------------------------
+-- 18. Completion summary --------------------------------------------------
 SELECT 'Database schema created successfully!' AS status;
 SELECT 'Total tables: ' || COUNT(*) AS table_count
 FROM information_schema.tables
@@ -1,4 +1,6 @@
+import { useEffect } from "react";
 import { BrowserRouter, Routes, Route, Navigate } from "react-router-dom";
+import { startAutoFlush } from "./utils/surveyOfflineQueue";
 
 // Company Pages
 import CompanyLogin from "./pages/company/CompanyLogin.jsx"; // ✅ 기업 로그인 활성화
@@ -20,6 +22,9 @@ import AdminDashboard from "./pages/admin/AdminDashboard.jsx";
 import CreateCompanyAccount from "./pages/admin/CreateCompanyAccount.jsx";
 
 function App() {
+  // 부스 키오스크에 쌓인 설문 응답을 연결되는 대로 전송 (페이지를 옮겨도 계속)
+  useEffect(() => startAutoFlush(), []);
+
   return (
     <BrowserRouter>
       <Routes>
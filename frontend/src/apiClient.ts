@@ -78,11 +78,17 @@ export function getAuthToken(): string | null {
 function extractErrorMessage(error: unknown): string {
   if (axios.isAxiosError(error)) {
     const axiosError = error as AxiosError<{
-      detail?: string;
+      detail?: string | { message?: string; errors?: Array<{ message?: string }> };
       message?: string;
     }>;
+    const detail = axiosError.response?.data?.detail;
+    // 설문 답변 검증 오류는 { message, errors: [...] } 형태
+    if (detail && typeof detail === "object") {
+      const first = detail.errors?.[0]?.message;
+      return [detail.message, first].filter(Boolean).join(" - ");
+    }
     return (
-      axiosError.response?.data?.detail ||
+      detail ||
       axiosError.response?.data?.message ||
       axiosError.message ||
       "요청 처리 중 오류가 발생했습니다."
@@ -156,6 +162,58 @@ export async function submitSurveyResponse(
   }
 }
 
+// 키오스크 오프라인 큐용 - 네트워크 오류(status 없음)와 서버 거절(4xx)을 구분할 수 있도록 status를 함께 전달
+function withStatus(error: unknown): Error & { status?: number } {
+  const wrapped: Error & { status?: number } = new Error(
+    extractErrorMessage(error)
+  );
+  if (axios.isAxiosError(error) && error.response) {
+    wrapped.status = error.response.status;
+  }
+  return wrapped;
+}
+
+export async function getSurveyBundle(
+  surveyId: number | string,
+  etag?: string | null
+) {
+  try {
+    const response = await apiClient.get(
+      `/api/visitor/surveys/${surveyId}/bundle`,
+      {
+        headers: etag ? { "If-None-Match": etag } : undefined,
+        validateStatus: (status) => status === 200 || status === 304,
+      }
+    );
+    if (response.status === 304) {
+      return { notModified: true, etag: etag || null, data: null };
+    }
+    // ETag 헤더는 교차 출처에서 읽히지 않을 수 있어 본문의 bundle_version으로 만든다
+    return {
+      notModified: false,
+      etag: `"${response.data.bundle_version}"`,
+      data: response.data,
+    };
+  } catch (error) {
+    throw withStatus(error);
+  }
+}
+
+export async function submitSurveyResponseBatch(
+  surveyId: number | string,
+  responses: Array<Record<string, unknown>>
+) {
+  try {
+    const { data } = await apiClient.post(
+      `/api/visitor/surveys/${surveyId}/responses/batch`,
+      { responses }
+    );
+    return data;
+  } catch (error) {
+    throw withStatus(error);
+  }
+}
+
 export async function requestMagicLink(payload: Record<string, unknown>) {
   try {
     const { data } = await apiClient.post("/api/auth/magic-link", payload);
@@ -243,6 +301,40 @@ export async function getSurveyStatistics(surveyId: number | string) {
   }
 }
 
+// 주관식 답변 요약 갱신 요청 (백그라운드 처리 - 결과는 getSurveyStatistics의 summary에 반영)
+export async function refreshSurveySummaries(surveyId: number | string) {
+  try {
+    const { data } = await apiClient.post(
+      `/api/companies/surveys/${surveyId}/summaries/refresh`
+    );
+    return data;
+  } catch (error) {
+    throw new Error(extractErrorMessage(error));
+  }
+}
+
+// 주관식 답변/후기 검색 - scope: "surveys" | "events" | 기업(companies/{id})
+export async function searchSurveyResponses(
+  scope: "surveys" | "events" | "companies",
+  id: number | string,
+  q: string,
+  beforeId?: number | null,
+  limit = 20
+) {
+  const path =
+    scope === "companies"
+      ? `/api/companies/${id}/responses/search`
+      : `/api/companies/${scope}/${id}/responses/search`;
+  try {
+    const { data } = await apiClient.get(path, {
+      params: { q, limit, before_id: beforeId ?? undefined },
+    });
+    return data;
+  } catch (error) {
+    throw new Error(extractErrorMessage(error));
+  }
+}
+
 export async function getAdminDashboard() {
   try {
     const { data } = await apiClient.get("/api/admin/dashboard");
@@ -62,73 +62,124 @@ export default function EventUpload() {
     }
   }, [navigate]);
 
-  // LLM 이미지 분석 처리
+  // LLM 분석 최종 결과 반영
+  const applyAnalysisResult = (data) => {
+    console.log("LLM 분석 결과:", data);
+
+    // LLM 결과 저장 (이벤트 생성 시 사용)
+    setLlmResult(data);
+
+    // 폼 데이터 설정 - 새로운 분리된 필드 우선 처리
+    setEventData({
+      eventName: data.form_data.eventName || "",
+      boothNumber: data.form_data.boothNumber || "",
+      location: data.form_data.location || "",
+      venue: data.form_data.venue || "",
+
+      // 분리된 날짜 필드 처리
+      startDate: data.form_data.startDate || data.form_data.date || "",
+      endDate: data.form_data.endDate || data.form_data.date || "",
+      date: data.form_data.date || "", // 기존 필드 유지
+
+      // 분리된 시간 필드 처리
+      startTime: data.form_data.startTime || "",
+      endTime: data.form_data.endTime || "",
+      time: data.form_data.time || "", // 기존 필드 유지
+
+      description: data.form_data.description || "",
+      participationMethod: data.form_data.participationMethod || "",
+      benefits: data.form_data.benefits || "",
+    });
+
+    // 알림 메시지 개선
+    const dateInfo = data.form_data.startDate
+      ? `${data.form_data.startDate}${
+          data.form_data.endDate &&
+          data.form_data.endDate !== data.form_data.startDate
+            ? ` ~ ${data.form_data.endDate}`
+            : ""
+        }`
+      : data.form_data.date;
+    const timeInfo = data.form_data.startTime
+      ? `${data.form_data.startTime}${
+          data.form_data.endTime ? ` ~ ${data.form_data.endTime}` : ""
+        }`
+      : data.form_data.time;
+
+    alert(
+      `이미지 분석 완료!\n🎯 이벤트: ${
+        data.form_data.eventName
+      }\n날짜: ${dateInfo}\n시간: ${timeInfo}\n장소: ${
+        data.form_data.location
+      }${data.form_data.venue ? ` (${data.form_data.venue})` : ""}`
+    );
+  };
+
+  // SSE 스트림(fetch 응답 본문)을 읽어 이벤트 단위로 콜백 호출
+  const readEventStream = async (response, onEvent) => {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      let boundary;
+      while ((boundary = buffer.indexOf("\n\n")) >= 0) {
+        const frame = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+
+        let eventName = "message";
+        let data = "";
+        for (const line of frame.split("\n")) {
+          if (line.startsWith("event:")) eventName = line.slice(6).trim();
+          else if (line.startsWith("data:")) data += line.slice(5).trim();
+        }
+        if (data) onEvent(eventName, JSON.parse(data));
+      }
+    }
+  };
+
+  // LLM 이미지 분석 처리 (스트리밍: 분석되는 대로 폼 필드를 채움)
   const processImageWithLLM = async (file) => {
     setIsProcessing(true);
     try {
       const formData = new FormData();
       formData.append("file", file);
-      formData.append("provider", "openai");
-
-      const response = await fetch("/api/events/analyze-image", {
-        method: "POST",
-        body: formData,
-      });
 
-      if (response.ok) {
-        const data = await response.json();
-        console.log("LLM 분석 결과:", data);
-
-        // LLM 결과 저장 (이벤트 생성 시 사용)
-        setLlmResult(data);
-
-        // 폼 데이터 설정 - 새로운 분리된 필드 우선 처리
-        setEventData({
-          eventName: data.form_data.eventName || "",
-          boothNumber: data.form_data.boothNumber || "",
-          location: data.form_data.location || "",
-          venue: data.form_data.venue || "",
-
-          // 분리된 날짜 필드 처리
-          startDate: data.form_data.startDate || data.form_data.date || "",
-          endDate: data.form_data.endDate || data.form_data.date || "",
-          date: data.form_data.date || "", // 기존 필드 유지
-
-          // 분리된 시간 필드 처리
-          startTime: data.form_data.startTime || "",
-          endTime: data.form_data.endTime || "",
-          time: data.form_data.time || "", // 기존 필드 유지
-
-          description: data.form_data.description || "",
-          participationMethod: data.form_data.participationMethod || "",
-          benefits: data.form_data.benefits || "",
-        });
-
-        // 알림 메시지 개선
-        const dateInfo = data.form_data.startDate
-          ? `${data.form_data.startDate}${
-              data.form_data.endDate &&
-              data.form_data.endDate !== data.form_data.startDate
-                ? ` ~ ${data.form_data.endDate}`
-                : ""
-            }`
-          : data.form_data.date;
-        const timeInfo = data.form_data.startTime
-          ? `${data.form_data.startTime}${
-              data.form_data.endTime ? ` ~ ${data.form_data.endTime}` : ""
-            }`
-          : data.form_data.time;
+      const response = await fetch(
+        "/api/events/analyze-image/stream?provider=openai",
+        {
+          method: "POST",
+          body: formData,
+        }
+      );
 
-        alert(
-          `이미지 분석 완료!\n🎯 이벤트: ${
-            data.form_data.eventName
-          }\n날짜: ${dateInfo}\n시간: ${timeInfo}\n장소: ${
-            data.form_data.location
-          }${data.form_data.venue ? ` (${data.form_data.venue})` : ""}`
-        );
-      } else {
+      if (!response.ok || !response.body) {
         console.warn("LLM 분석 실패, 수동 입력으로 진행");
         alert("이미지 분석에 실패했습니다. 수동으로 입력해주세요.");
+        return;
+      }
+
+      let finished = false;
+      await readEventStream(response, (eventName, data) => {
+        if (eventName === "field") {
+          // 진행 중인 필드 값을 바로 폼에 반영
+          setEventData((prev) => ({ ...prev, [data.name]: data.value }));
+        } else if (eventName === "result") {
+          finished = true;
+          applyAnalysisResult(data);
+        } else if (eventName === "error") {
+          finished = true;
+          console.warn("LLM 분석 실패:", data.detail);
+          alert("이미지 분석에 실패했습니다. 수동으로 입력해주세요.");
+        }
+      });
+
+      if (!finished) {
+        alert("이미지 분석이 중간에 끊겼습니다. 입력된 내용을 확인해주세요.");
       }
     } catch (error) {
       console.error("LLM 처리 중 오류:", error);
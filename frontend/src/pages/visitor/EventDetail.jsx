@@ -121,6 +121,8 @@ export default function EventDetail() {
               <>
                 <img
                   src={event.image_url}
+                  srcSet={event.image_srcset || undefined}
+                  sizes="(max-width: 1080px) 100vw, 1080px"
                   alt={event.event_name}
                   style={{
                     width: "100%",
@@ -131,6 +133,26 @@ export default function EventDetail() {
                 <div className="image-overlay">
                   주최측이 이미지를 등록할 예정입니다
                 </div>
+                {event.image_attribution?.photographer && (
+                  <div className="image-attribution">
+                    Photo by{" "}
+                    <a
+                      href={event.image_attribution.photographer_profile}
+                      target="_blank"
+                      rel="noopener noreferrer"
+                    >
+                      {event.image_attribution.photographer}
+                    </a>{" "}
+                    on{" "}
+                    <a
+                      href={event.image_attribution.photo_page}
+                      target="_blank"
+                      rel="noopener noreferrer"
+                    >
+                      Unsplash
+                    </a>
+                  </div>
+                )}
               </>
             ) : (
               <div className="image-placeholder">
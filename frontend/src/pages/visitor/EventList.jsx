@@ -233,6 +233,9 @@ export default function EventList() {
                 <div className="event-item-image">
                   <img
                     src={event.image_url || FALLBACK_POSTER}
+                    srcSet={event.image_srcset || undefined}
+                    sizes="(max-width: 640px) 100vw, 320px"
+                    loading="lazy"
                     alt={event.company_name}
                     onError={(e) => {
                       e.target.onerror = null; // Prevent infinite loop
@@ -1,8 +1,35 @@
-import { useState } from "react";
+import { useEffect, useState } from "react";
 import { useParams, useNavigate } from "react-router-dom";
 import { Send, ArrowLeft } from "lucide-react";
+import {
+  enqueueResponse,
+  flushQueue,
+  loadSurveyBundle,
+  subscribePending,
+} from "../../utils/surveyOfflineQueue";
 import "./SurveyResponse.css";
 
+// 척도 문항 기본 범위 (서버 검증기 RANGE_TYPES와 같음)
+const SCALE_RANGE = { min: 1, max: 10 };
+
+// 서버 설문 정의(question_text/question_type, options.choices)를 화면 형식으로
+function normalizeQuestion(question) {
+  const choices = question.choices || question.options?.choices || [];
+  const min = Number(question.options?.min ?? SCALE_RANGE.min);
+  const max = Number(question.options?.max ?? SCALE_RANGE.max);
+  return {
+    id: question.id,
+    text: question.question_text || question.text || "",
+    type: question.question_type || question.type || "text",
+    range: Number.isInteger(min) && Number.isInteger(max) && min <= max ? { min, max } : SCALE_RANGE,
+    choices: choices.map((choice) =>
+      typeof choice === "object"
+        ? { value: choice.value ?? choice.label, label: choice.label ?? choice.value }
+        : { value: choice, label: String(choice) }
+    ),
+  };
+}
+
 export default function SurveyResponse() {
   const { surveyId } = useParams();
   const navigate = useNavigate();
@@ -17,38 +44,38 @@ export default function SurveyResponse() {
     privacyConsent: false,
   });
 
-  const survey = {
-    id: surveyId,
-    title: "이벤트 만족도 조사",
-    standardQuestions: [
-      { id: 1, text: "이벤트 전반적인 만족도는?", type: "rating" },
-      {
-        id: 2,
-        text: "가장 좋았던 점은?",
-        type: "checkbox",
-        choices: [
-          { value: 1, label: "유익한 정보" },
-          { value: 2, label: "친절한 직원" },
-          { value: 3, label: "좋은 사은품" },
-          { value: 4, label: "편리한 위치" },
-        ],
-      },
-      { id: 3, text: "개선이 필요한 점은?", type: "textarea" },
-    ],
-    customQuestions: [
-      {
-        id: 4,
-        text: "제품 품질 만족도",
-        type: "radio",
-        choices: [
-          { value: 1, label: "매우 만족" },
-          { value: 2, label: "만족" },
-          { value: 3, label: "보통" },
-          { value: 4, label: "불만족" },
-        ],
-      },
-    ],
-  };
+  const [bundle, setBundle] = useState(null);
+  const [loadError, setLoadError] = useState(null);
+  const [reloadKey, setReloadKey] = useState(0);
+  const [pending, setPending] = useState(0);
+
+  // 번들(이 설문의 보관본 포함)이 있을 때만 응답을 받는다 - 없으면 제출할 수 없는 상태로 안내
+  useEffect(() => {
+    let cancelled = false;
+    setBundle(null);
+    setLoadError(null);
+    loadSurveyBundle(surveyId)
+      .then((data) => {
+        if (!cancelled) setBundle(data);
+      })
+      .catch((error) => {
+        console.warn("설문 번들을 불러오지 못했습니다:", error);
+        if (!cancelled) setLoadError(error);
+      });
+    return () => {
+      cancelled = true;
+    };
+  }, [surveyId, reloadKey]);
+
+  useEffect(() => subscribePending(setPending), []);
+
+  const survey = bundle
+    ? {
+        id: bundle.id,
+        title: bundle.title,
+        questions: bundle.questions.map(normalizeQuestion),
+      }
+    : null;
 
   const handleAnswer = (questionId, value) => {
     setAnswers((prev) => ({
@@ -70,16 +97,195 @@ export default function SurveyResponse() {
   };
 
   const handleSubmit = () => {
+    if (!survey) return;
     if (!userInfo.privacyConsent && !userInfo.name) {
       alert("개인정보 동의 또는 정보 입력이 필요합니다");
       return;
     }
 
-    console.log("Submit survey:", { userInfo, answers });
-    alert("설문이 제출되었습니다. 감사합니다!");
+    const ratingQuestion = survey.questions.find((q) => q.type === "rating");
+    // 먼저 기기에 저장한 뒤 전송 - 와이파이가 끊겨 있어도 응답을 잃지 않음
+    enqueueResponse(survey.id, {
+      answers,
+      respondent_name: userInfo.name || null,
+      respondent_email: userInfo.email || null,
+      respondent_phone: userInfo.phone || null,
+      respondent_company:
+        userInfo.affiliation === "회사" ? userInfo.company || null : null,
+      rating: ratingQuestion ? answers[ratingQuestion.id] ?? null : null,
+    });
+    flushQueue();
+
+    alert(
+      navigator.onLine === false
+        ? "설문이 저장되었습니다. 네트워크가 연결되면 자동으로 전송됩니다. 감사합니다!"
+        : "설문이 제출되었습니다. 감사합니다!"
+    );
     navigate("/visitor/events");
   };
 
+  const renderAnswerInput = (q) => {
+    if (q.type === "rating") {
+      return (
+        <div className="rating-group">
+          {[1, 2, 3, 4, 5].map((star) => (
+            <button
+              key={star}
+              className={`star-btn ${answers[q.id] >= star ? "active" : ""}`}
+              onClick={() => handleAnswer(q.id, star)}
+            >
+              ⭐
+            </button>
+          ))}
+        </div>
+      );
+    }
+
+    if (q.type === "checkbox") {
+      return (
+        <div className="checkbox-group">
+          {q.choices.map((choice) => (
+            <label key={choice.value} className="checkbox-option">
+              <input
+                type="checkbox"
+                checked={(answers[q.id] || []).includes(choice.value)}
+                onChange={() => handleCheckbox(q.id, choice.value)}
+              />
+              <span>{choice.label}</span>
+            </label>
+          ))}
+        </div>
+      );
+    }
+
+    if (q.type === "scale") {
+      const points = [];
+      for (let point = q.range.min; point <= q.range.max; point += 1) {
+        points.push(point);
+      }
+      return (
+        <div className="rating-group scale-group">
+          {points.map((point) => (
+            <button
+              key={point}
+              className={`star-btn scale-btn ${answers[q.id] === point ? "active" : ""}`}
+              onClick={() => handleAnswer(q.id, point)}
+            >
+              {point}
+            </button>
+          ))}
+        </div>
+      );
+    }
+
+    // 토글은 true/false로 전송 (서버 검증기가 예/아니오 값만 받음)
+    if (q.type === "toggle") {
+      return (
+        <div className="radio-group toggle-group">
+          {[
+            { value: true, label: "예" },
+            { value: false, label: "아니오" },
+          ].map((choice) => (
+            <label key={choice.label} className="radio-option">
+              <input
+                type="radio"
+                name={`question-${q.id}`}
+                checked={answers[q.id] === choice.value}
+                onChange={() => handleAnswer(q.id, choice.value)}
+              />
+              <span>{choice.label}</span>
+            </label>
+          ))}
+        </div>
+      );
+    }
+
+    if (q.type === "text") {
+      return (
+        <input
+          type="text"
+          className="input"
+          placeholder="답변을 입력해주세요"
+          value={answers[q.id] || ""}
+          onChange={(e) => handleAnswer(q.id, e.target.value)}
+        />
+      );
+    }
+
+    if (["radio", "select", "dropdown"].includes(q.type)) {
+      return (
+        <div className="radio-group">
+          {q.choices.map((choice) => (
+            <label key={choice.value} className="radio-option">
+              <input
+                type="radio"
+                name={`question-${q.id}`}
+                checked={answers[q.id] === choice.value}
+                onChange={() => handleAnswer(q.id, choice.value)}
+              />
+              <span>{choice.label}</span>
+            </label>
+          ))}
+        </div>
+      );
+    }
+
+    return (
+      <textarea
+        className="input"
+        rows="4"
+        placeholder="자유롭게 의견을 작성해주세요"
+        value={answers[q.id] || ""}
+        onChange={(e) => handleAnswer(q.id, e.target.value)}
+      />
+    );
+  };
+
+  if (!survey) {
+    const notFound = loadError?.status === 404;
+    return (
+      <div className="survey-response-page">
+        <div className="survey-header">
+          <div className="container">
+            <button className="btn-back" onClick={() => navigate(-1)}>
+              <ArrowLeft size={20} />
+              돌아가기
+            </button>
+            <h1>설문조사</h1>
+          </div>
+        </div>
+        <div className="survey-container container">
+          <div className="card survey-unavailable">
+            {!loadError && <p>설문을 불러오는 중입니다...</p>}
+            {loadError && (
+              <>
+                <p>
+                  {notFound
+                    ? "설문을 찾을 수 없습니다."
+                    : "설문을 불러오지 못했습니다. 네트워크 연결을 확인한 뒤 다시 시도해주세요."}
+                </p>
+                {!notFound && (
+                  <button
+                    className="btn btn-outline"
+                    onClick={() => setReloadKey((key) => key + 1)}
+                  >
+                    다시 시도
+                  </button>
+                )}
+              </>
+            )}
+          </div>
+          {pending > 0 && (
+            <p className="pending-notice">
+              전송 대기 중인 응답 {pending}건 - 네트워크가 연결되면 자동으로
+              전송됩니다
+            </p>
+          )}
+        </div>
+      </div>
+    );
+  }
+
   return (
     <div className="survey-response-page">
       <div className="survey-header">
@@ -170,79 +376,12 @@ export default function SurveyResponse() {
 
         <div className="card">
           <h3 className="section-title">📋 기본 질문</h3>
-          {survey.standardQuestions.map((q, idx) => (
+          {survey.questions.map((q, idx) => (
             <div key={q.id} className="question-box">
               <div className="question-number">Q{idx + 1}</div>
               <div className="question-text">{q.text}</div>
 
-              {q.type === "rating" && (
-                <div className="rating-group">
-                  {[1, 2, 3, 4, 5].map((star) => (
-                    <button
-                      key={star}
-                      className={`star-btn ${
-                        answers[q.id] >= star ? "active" : ""
-                      }`}
-                      onClick={() => handleAnswer(q.id, star)}
-                    >
-                      ⭐
-                    </button>
-                  ))}
-                </div>
-              )}
-
-              {q.type === "checkbox" && (
-                <div className="checkbox-group">
-                  {q.choices.map((choice) => (
-                    <label key={choice.value} className="checkbox-option">
-                      <input
-                        type="checkbox"
-                        checked={(answers[q.id] || []).includes(choice.value)}
-                        onChange={() => handleCheckbox(q.id, choice.value)}
-                      />
-                      <span>{choice.label}</span>
-                    </label>
-                  ))}
-                </div>
-              )}
-
-              {q.type === "textarea" && (
-                <textarea
-                  className="input"
-                  rows="4"
-                  placeholder="자유롭게 의견을 작성해주세요"
-                  value={answers[q.id] || ""}
-                  onChange={(e) => handleAnswer(q.id, e.target.value)}
-                />
-              )}
-            </div>
-          ))}
-        </div>
-
-        <div className="card">
-          <h3 className="section-title">➕ 추가 질문</h3>
-          {survey.customQuestions.map((q, idx) => (
-            <div key={q.id} className="question-box">
-              <div className="question-number">
-                Q{survey.standardQuestions.length + idx + 1}
-              </div>
-              <div className="question-text">{q.text}</div>
-
-              {q.type === "radio" && (
-                <div className="radio-group">
-                  {q.choices.map((choice) => (
-                    <label key={choice.value} className="radio-option">
-                      <input
-                        type="radio"
-                        name={`question-${q.id}`}
-                        checked={answers[q.id] === choice.value}
-                        onChange={() => handleAnswer(q.id, choice.value)}
-                      />
-                      <span>{choice.label}</span>
-                    </label>
-                  ))}
-                </div>
-              )}
+              {renderAnswerInput(q)}
             </div>
           ))}
         </div>
@@ -251,6 +390,13 @@ export default function SurveyResponse() {
           <Send size={20} />
           제출하기
         </button>
+
+        {pending > 0 && (
+          <p className="pending-notice">
+            전송 대기 중인 응답 {pending}건 - 네트워크가 연결되면 자동으로
+            전송됩니다
+          </p>
+        )}
       </div>
     </div>
   );
@@ -0,0 +1,166 @@
+// Booth kiosk offline queue for survey responses
+// - 설문 번들(정의)을 localStorage에 보관해 전시장 와이파이가 끊겨도 설문을 띄운다
+// - 응답은 client_key(UUID)를 붙여 큐에 쌓고, 연결되면 설문별로 묶어 한 번에 보낸다
+//   (서버가 client_key로 중복을 걸러내므로 전송 도중 끊겨 같은 묶음을 다시 보내도 안전)
+import { getSurveyBundle, submitSurveyResponseBatch } from "../apiClient";
+
+const QUEUE_KEY = "survey_queue";
+const REJECTED_KEY = "survey_queue_rejected";
+const BUNDLE_PREFIX = "survey_bundle_";
+const RETRY_INTERVAL_MS = 30000;
+const DEFAULT_BATCH_SIZE = 200;
+
+let flushing = null;
+const listeners = new Set();
+
+function readJson(key, fallback) {
+  try {
+    const raw = window.localStorage.getItem(key);
+    return raw ? JSON.parse(raw) : fallback;
+  } catch {
+    return fallback;
+  }
+}
+
+function writeJson(key, value) {
+  window.localStorage.setItem(key, JSON.stringify(value));
+}
+
+function notify() {
+  const count = pendingCount();
+  listeners.forEach((listener) => listener(count));
+}
+
+function createClientKey() {
+  if (window.crypto?.randomUUID) return window.crypto.randomUUID();
+  // randomUUID가 없는 구형 태블릿 브라우저
+  const bytes = window.crypto.getRandomValues(new Uint8Array(16));
+  return Array.from(bytes, (b) => b.toString(16).padStart(2, "0")).join("");
+}
+
+// 서버가 처리를 거절한 경우(설문 없음/마감 등)는 다시 보내도 소용없으므로 큐에서 뺀다.
+// 네트워크 오류, 시간 초과, 429/5xx는 다음 기회에 다시 보낸다.
+function isRetryable(error) {
+  const status = error?.status;
+  return !status || status === 408 || status === 429 || status >= 500;
+}
+
+export function pendingCount() {
+  return readJson(QUEUE_KEY, []).length;
+}
+
+export function subscribePending(listener) {
+  listeners.add(listener);
+  listener(pendingCount());
+  return () => listeners.delete(listener);
+}
+
+export function enqueueResponse(surveyId, payload) {
+  const entry = {
+    survey_id: String(surveyId),
+    ...payload,
+    client_key: createClientKey(),
+    submitted_at: new Date().toISOString(),
+  };
+  writeJson(QUEUE_KEY, [...readJson(QUEUE_KEY, []), entry]);
+  notify();
+  return entry;
+}
+
+// 큐에 쌓인 응답을 설문별로 묶어 전송. 동시에 여러 번 불려도 전송은 하나만 진행
+export function flushQueue() {
+  if (!flushing) {
+    flushing = sendPending().finally(() => {
+      flushing = null;
+    });
+  }
+  return flushing;
+}
+
+async function sendPending() {
+  const summary = { sent: 0, rejected: 0, remaining: 0 };
+  const queue = readJson(QUEUE_KEY, []);
+  const surveyIds = [...new Set(queue.map((entry) => entry.survey_id))];
+
+  for (const surveyId of surveyIds) {
+    const batchSize =
+      readJson(BUNDLE_PREFIX + surveyId, null)?.data?.batch_max_items ||
+      DEFAULT_BATCH_SIZE;
+    const entries = queue.filter((entry) => entry.survey_id === surveyId);
+
+    for (let start = 0; start < entries.length; start += batchSize) {
+      const batch = entries.slice(start, start + batchSize);
+      const responses = batch.map(({ survey_id: _surveyId, ...rest }) => rest);
+      let done;
+      try {
+        const result = await submitSurveyResponseBatch(surveyId, responses);
+        const failed = result.results.filter((item) =>
+          ["repeat", "full", "invalid"].includes(item.status)
+        );
+        summary.sent += result.created + result.duplicates;
+        summary.rejected += failed.length;
+        keepRejected(batch, failed);
+        done = new Set(batch.map((entry) => entry.client_key));
+      } catch (error) {
+        if (isRetryable(error)) {
+          // 연결이 다시 끊김 - 남은 묶음은 다음 기회에
+          summary.remaining = pendingCount();
+          return summary;
+        }
+        summary.rejected += batch.length;
+        keepRejected(
+          batch,
+          batch.map((entry) => ({ client_key: entry.client_key, detail: error.message }))
+        );
+        done = new Set(batch.map((entry) => entry.client_key));
+      }
+      // 전송하는 동안 새로 쌓인 응답이 있으므로 저장소에서 다시 읽어 처리한 것만 지운다
+      writeJson(
+        QUEUE_KEY,
+        readJson(QUEUE_KEY, []).filter((entry) => !done.has(entry.client_key))
+      );
+      notify();
+    }
+  }
+  summary.remaining = pendingCount();
+  return summary;
+}
+
+// 거절된 응답은 버리지 않고 따로 보관 (부스 담당자가 확인할 수 있도록)
+function keepRejected(batch, failed) {
+  if (!failed.length) return;
+  const reasons = new Map(failed.map((item) => [item.client_key, item.detail]));
+  const rejected = batch
+    .filter((entry) => reasons.has(entry.client_key))
+    .map((entry) => ({ ...entry, reason: reasons.get(entry.client_key) }));
+  writeJson(REJECTED_KEY, [...readJson(REJECTED_KEY, []), ...rejected]);
+}
+
+// 온라인 전환 시 + 주기적으로 큐 전송. 정리 함수를 반환
+export function startAutoFlush() {
+  const flush = () => {
+    if (navigator.onLine !== false && pendingCount() > 0) flushQueue();
+  };
+  window.addEventListener("online", flush);
+  const timer = window.setInterval(flush, RETRY_INTERVAL_MS);
+  flush();
+  return () => {
+    window.removeEventListener("online", flush);
+    window.clearInterval(timer);
+  };
+}
+
+// 설문 번들 - 보관본이 있으면 ETag로 재검증만 하고, 오프라인이면 보관본을 그대로 쓴다
+export async function loadSurveyBundle(surveyId) {
+  const key = BUNDLE_PREFIX + surveyId;
+  const cached = readJson(key, null);
+  try {
+    const result = await getSurveyBundle(surveyId, cached?.etag);
+    if (result.notModified && cached) return cached.data;
+    writeJson(key, { etag: result.etag, data: result.data });
+    return result.data;
+  } catch (error) {
+    if (cached && isRetryable(error)) return cached.data;
+    throw error;
+  }
+}